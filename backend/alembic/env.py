@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from app.core.database import Base
 from app.models.database import (
     Tenant, User, AuditLog, Job, Model, Element,
-    Relationship, Space, Storey
+    Relationship, Space, Storey, ModelTreeNode, ElementPropertyValue, ModelRevision
 )
 from app.core.config import settings
 
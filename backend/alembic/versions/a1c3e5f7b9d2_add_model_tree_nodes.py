@@ -0,0 +1,41 @@
+"""Add model tree nodes
+
+Revision ID: a1c3e5f7b9d2
+Revises: 59a3d5cf7676
+Create Date: 2026-10-19 09:12:41.208533
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b9d2'
+down_revision = '59a3d5cf7676'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('model_tree_nodes',
+    sa.Column('model_id', sa.UUID(), nullable=False),
+    sa.Column('lft', sa.Integer(), nullable=False),
+    sa.Column('rgt', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('element_id', sa.UUID(), nullable=False),
+    sa.Column('parent_id', sa.UUID(), nullable=True),
+    sa.Column('guid', sa.UUID(), nullable=False),
+    sa.Column('ifc_type', sa.String(length=100), nullable=False),
+    sa.Column('name', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['element_id'], ['elements.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('model_id', 'lft')
+    )
+    op.create_index('ix_model_tree_nodes_model_element', 'model_tree_nodes', ['model_id', 'element_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_model_tree_nodes_model_element', table_name='model_tree_nodes')
+    op.drop_table('model_tree_nodes')
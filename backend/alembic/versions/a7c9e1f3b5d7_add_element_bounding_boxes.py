@@ -0,0 +1,32 @@
+"""Add element bounding boxes (box + z interval) with a GiST index
+
+Revision ID: a7c9e1f3b5d7
+Revises: f6b8d0e2a4c6
+Create Date: 2026-10-19 21:38:12.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c9e1f3b5d7'
+down_revision = 'f6b8d0e2a4c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Type box natif: pas d'extension requise (cube, postgis)
+    op.execute("ALTER TABLE elements ADD COLUMN bbox box")
+    op.add_column('elements', sa.Column('bbox_z_min', sa.Float(), nullable=True))
+    op.add_column('elements', sa.Column('bbox_z_max', sa.Float(), nullable=True))
+    # Les boîtes des modèles existants sont calculées à leur prochaine ingestion
+    op.create_index('ix_elements_bbox', 'elements', ['bbox'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_elements_bbox', table_name='elements')
+    op.drop_column('elements', 'bbox_z_max')
+    op.drop_column('elements', 'bbox_z_min')
+    op.drop_column('elements', 'bbox')
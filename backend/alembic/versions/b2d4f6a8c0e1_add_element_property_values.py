@@ -0,0 +1,46 @@
+"""Add element property values and JSONB path indexes
+
+Revision ID: b2d4f6a8c0e1
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-19 14:03:27.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c0e1'
+down_revision = 'a1c3e5f7b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('element_property_values',
+    sa.Column('element_id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('set_name', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('model_id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('value_text', sa.Text(), nullable=True),
+    sa.Column('value_num', sa.Float(), nullable=True),
+    sa.Column('value_bool', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['element_id'], ['elements.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('element_id', 'kind', 'set_name', 'name')
+    )
+    op.create_index('ix_element_property_values_model_name_num', 'element_property_values', ['model_id', 'name', 'value_num'], unique=False)
+    op.create_index('ix_element_property_values_model_name_text', 'element_property_values', ['model_id', 'name', 'value_text'], unique=False)
+    op.create_index('ix_elements_properties_path', 'elements', ['properties'], unique=False, postgresql_using='gin', postgresql_ops={'properties': 'jsonb_path_ops'})
+    op.create_index('ix_elements_quantities_path', 'elements', ['quantities'], unique=False, postgresql_using='gin', postgresql_ops={'quantities': 'jsonb_path_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_elements_quantities_path', table_name='elements', postgresql_using='gin')
+    op.drop_index('ix_elements_properties_path', table_name='elements', postgresql_using='gin')
+    op.drop_index('ix_element_property_values_model_name_text', table_name='element_property_values')
+    op.drop_index('ix_element_property_values_model_name_num', table_name='element_property_values')
+    op.drop_table('element_property_values')
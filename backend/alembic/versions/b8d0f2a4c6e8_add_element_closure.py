@@ -0,0 +1,49 @@
+"""Add element_closure (transitive closure of the element hierarchy)
+
+Revision ID: b8d0f2a4c6e8
+Revises: a7c9e1f3b5d7
+Create Date: 2026-10-19 22:07:45.281936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d0f2a4c6e8'
+down_revision = 'a7c9e1f3b5d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'element_closure',
+        sa.Column('ancestor_id', sa.UUID(), nullable=False),
+        sa.Column('descendant_id', sa.UUID(), nullable=False),
+        sa.Column('model_id', sa.UUID(), nullable=False),
+        sa.Column('tenant_id', sa.UUID(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['elements.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['elements.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    
+    # Modèles existants: couples ancêtre/descendant déduits des ensembles imbriqués
+    op.execute("""
+        INSERT INTO element_closure (ancestor_id, descendant_id, model_id, tenant_id, depth)
+        SELECT a.element_id, d.element_id, d.model_id, d.tenant_id, d.depth - a.depth
+        FROM model_tree_nodes a
+        JOIN model_tree_nodes d ON d.model_id = a.model_id AND d.lft > a.lft AND d.lft < a.rgt
+    """)
+    
+    op.create_index('ix_element_closure_descendant_depth', 'element_closure', ['descendant_id', 'depth'], unique=False)
+    op.create_index('ix_element_closure_model_id', 'element_closure', ['model_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_element_closure_model_id', table_name='element_closure')
+    op.drop_index('ix_element_closure_descendant_depth', table_name='element_closure')
+    op.drop_table('element_closure')
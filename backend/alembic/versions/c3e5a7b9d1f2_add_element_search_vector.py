@@ -0,0 +1,38 @@
+"""Add element full-text search vector
+
+Revision ID: c3e5a7b9d1f2
+Revises: b2d4f6a8c0e1
+Create Date: 2026-10-19 16:41:08.917342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e5a7b9d1f2'
+down_revision = 'b2d4f6a8c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Colonne générée: réécrit la table une fois, puis maintenue à chaque écriture
+    op.add_column('elements', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(tag, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+            "setweight(jsonb_to_tsvector('simple', coalesce(properties, '{}'::jsonb), '[\"string\"]'), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_elements_search_vector', 'elements', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_elements_search_vector', table_name='elements', postgresql_using='gin')
+    op.drop_column('elements', 'search_vector')
@@ -0,0 +1,29 @@
+"""Add (model_id, from/to element, type) indexes on relationships
+
+Revision ID: c9e1a3b5d7f9
+Revises: b8d0f2a4c6e8
+Create Date: 2026-10-19 22:31:18.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1a3b5d7f9'
+down_revision = 'b8d0f2a4c6e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_relationships_model_from_type', 'relationships', ['model_id', 'from_element_id', 'relationship_type'], unique=False)
+    op.create_index('ix_relationships_model_to_type', 'relationships', ['model_id', 'to_element_id', 'relationship_type'], unique=False)
+    # Préfixe (model_id) des nouveaux index
+    op.drop_index('ix_relationships_model_id', table_name='relationships')
+
+
+def downgrade() -> None:
+    op.create_index('ix_relationships_model_id', 'relationships', ['model_id'], unique=False)
+    op.drop_index('ix_relationships_model_to_type', table_name='relationships')
+    op.drop_index('ix_relationships_model_from_type', table_name='relationships')
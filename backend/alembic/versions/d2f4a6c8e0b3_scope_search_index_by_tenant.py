@@ -0,0 +1,28 @@
+"""Scope the element search index by tenant
+
+Revision ID: d2f4a6c8e0b3
+Revises: c9e1a3b5d7f9
+Create Date: 2026-10-20 09:12:44.381205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f4a6c8e0b3'
+down_revision = 'c9e1a3b5d7f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Opérateurs B-tree (uuid) dans un index GIN; extension de confiance depuis PostgreSQL 13
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index('ix_elements_tenant_search_vector', 'elements', ['tenant_id', 'search_vector'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_elements_search_vector', table_name='elements', postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.create_index('ix_elements_search_vector', 'elements', ['search_vector'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_elements_tenant_search_vector', table_name='elements', postgresql_using='gin')
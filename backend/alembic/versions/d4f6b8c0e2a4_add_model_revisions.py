@@ -0,0 +1,72 @@
+"""Add model revisions, element content hashes and foreign key indexes
+
+Revision ID: d4f6b8c0e2a4
+Revises: c3e5a7b9d1f2
+Create Date: 2026-10-19 18:12:44.203518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b8c0e2a4'
+down_revision = 'c3e5a7b9d1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('models', sa.Column('revision', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('elements', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    op.add_column('model_tree_nodes', sa.Column('descendants', sa.Integer(), server_default='0', nullable=False))
+    # Arbres existants: bornes consécutives (reconstruits espacés à la prochaine révision)
+    op.execute("UPDATE model_tree_nodes SET descendants = (rgt - lft - 1) / 2")
+    op.create_table('model_revisions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('model_id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('job_id', sa.UUID(), nullable=True),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('added', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('modified', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('removed', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('statistics', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('model_id', 'revision', name='uq_model_revisions_model_revision')
+    )
+    # Clés étrangères vers elements: suppressions d'éléments entre révisions
+    op.create_index('ix_elements_project_id', 'elements', ['project_id'], unique=False)
+    op.create_index('ix_elements_site_id', 'elements', ['site_id'], unique=False)
+    op.create_index('ix_elements_building_id', 'elements', ['building_id'], unique=False)
+    op.create_index('ix_elements_storey_id', 'elements', ['storey_id'], unique=False)
+    op.create_index('ix_elements_space_id', 'elements', ['space_id'], unique=False)
+    op.create_index('ix_relationships_model_id', 'relationships', ['model_id'], unique=False)
+    op.create_index('ix_relationships_from_element_id', 'relationships', ['from_element_id'], unique=False)
+    op.create_index('ix_relationships_to_element_id', 'relationships', ['to_element_id'], unique=False)
+    op.create_index('ix_spaces_element_id', 'spaces', ['element_id'], unique=False)
+    op.create_index('ix_storeys_element_id', 'storeys', ['element_id'], unique=False)
+    op.create_index('ix_model_tree_nodes_element_id', 'model_tree_nodes', ['element_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_model_tree_nodes_element_id', table_name='model_tree_nodes')
+    op.drop_index('ix_storeys_element_id', table_name='storeys')
+    op.drop_index('ix_spaces_element_id', table_name='spaces')
+    op.drop_index('ix_relationships_to_element_id', table_name='relationships')
+    op.drop_index('ix_relationships_from_element_id', table_name='relationships')
+    op.drop_index('ix_relationships_model_id', table_name='relationships')
+    op.drop_index('ix_elements_space_id', table_name='elements')
+    op.drop_index('ix_elements_storey_id', table_name='elements')
+    op.drop_index('ix_elements_building_id', table_name='elements')
+    op.drop_index('ix_elements_site_id', table_name='elements')
+    op.drop_index('ix_elements_project_id', table_name='elements')
+    op.drop_table('model_revisions')
+    op.drop_column('model_tree_nodes', 'descendants')
+    op.drop_column('elements', 'content_hash')
+    op.drop_column('models', 'revision')
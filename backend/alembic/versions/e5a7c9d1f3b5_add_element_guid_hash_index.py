@@ -0,0 +1,24 @@
+"""Add (model_id, guid, content_hash) index on elements
+
+Revision ID: e5a7c9d1f3b5
+Revises: d4f6b8c0e2a4
+Create Date: 2026-10-19 20:41:07.518332
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1f3b5'
+down_revision = 'd4f6b8c0e2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_elements_model_guid_hash', 'elements', ['model_id', 'guid', 'content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_elements_model_guid_hash', table_name='elements')
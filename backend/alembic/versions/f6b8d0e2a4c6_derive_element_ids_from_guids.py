@@ -0,0 +1,83 @@
+"""Derive element, storey and space ids from model id and IFC GUID
+
+Revision ID: f6b8d0e2a4c6
+Revises: e5a7c9d1f3b5
+Create Date: 2026-10-19 21:04:37.518290
+
+"""
+from uuid import UUID, uuid5
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e2a4c6'
+down_revision = 'e5a7c9d1f3b5'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 10000
+
+# Colonnes d'IDs d'éléments sans clé étrangère (non trouvées par pg_constraint)
+UNCONSTRAINED_ELEMENT_COLUMNS = (
+    ('model_tree_nodes', 'parent_id'),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    
+    # Correspondance ancien ID -> uuid5(model_id, guid), calculée par lots
+    op.execute("CREATE TEMPORARY TABLE element_id_map (old_id uuid PRIMARY KEY, new_id uuid NOT NULL)")
+    id_map = sa.table('element_id_map', sa.column('old_id', sa.UUID()), sa.column('new_id', sa.UUID()))
+    rows = bind.execute(
+        sa.text("SELECT id, model_id, guid FROM elements").execution_options(stream_results=True)
+    )
+    while True:
+        batch = rows.fetchmany(BATCH_SIZE)
+        if not batch:
+            break
+        mapping = [
+            {'old_id': row.id, 'new_id': uuid5(UUID(str(row.model_id)), str(row.guid))}
+            for row in batch
+        ]
+        mapping = [entry for entry in mapping if entry['old_id'] != entry['new_id']]
+        if mapping:
+            bind.execute(id_map.insert(), mapping)
+    
+    # Clés étrangères vers elements.id: supprimées le temps de réécrire les IDs
+    foreign_keys = bind.execute(sa.text("""
+        SELECT c.conrelid::regclass::text AS table_name, c.conname, a.attname AS column_name,
+               pg_get_constraintdef(c.oid) AS definition
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        WHERE c.contype = 'f' AND c.confrelid = 'elements'::regclass
+    """)).fetchall()
+    for fk in foreign_keys:
+        op.execute(f'ALTER TABLE {fk.table_name} DROP CONSTRAINT "{fk.conname}"')
+    
+    op.execute("UPDATE elements e SET id = m.new_id FROM element_id_map m WHERE e.id = m.old_id")
+    columns = [(fk.table_name, fk.column_name) for fk in foreign_keys]
+    columns += UNCONSTRAINED_ELEMENT_COLUMNS
+    for table_name, column_name in columns:
+        op.execute(
+            f"UPDATE {table_name} t SET {column_name} = m.new_id "
+            f"FROM element_id_map m WHERE t.{column_name} = m.old_id"
+        )
+    
+    for fk in foreign_keys:
+        op.execute(f'ALTER TABLE {fk.table_name} ADD CONSTRAINT "{fk.conname}" {fk.definition}')
+    
+    # Niveaux et espaces: même clé que leur élément
+    op.execute("UPDATE storeys SET id = element_id WHERE id <> element_id")
+    op.execute("UPDATE spaces SET id = element_id WHERE id <> element_id")
+    op.execute("DROP TABLE element_id_map")
+
+
+def downgrade() -> None:
+    # Migration de données irréversible: les anciens IDs aléatoires ne sont pas
+    # conservés. Le schéma est inchangé et les IDs dérivés restent des UUID
+    # valides pour la révision précédente: rien n'est restauré.
+    pass
@@ -4,23 +4,54 @@ Points d'extrémité pour les éléments
 Gère la consultation des éléments IFC.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import any_, bindparam, or_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional, List
 
+from app.core.cache import (
+    cache_generation, cached_response, compute_etag, make_cache_key, not_modified_response, store_response
+)
+from app.core.config import settings
 from app.core.dependencies import get_tenant_id, get_db_session
-from app.models.database import Element as ElementModel
+from app.models.database import Element as ElementModel, ElementClosure, Model, Job
+from app.models.schemas import ElementBatchRequest
+from app.services.property_service import property_service
+from app.services.graph_service import graph_service, parse_relationship_types, DIRECTIONS
+from app.services.search_service import search_service
+from app.services.spatial_service import spatial_service, parse_box, expand_box
+from app.utils.filter_utils import parse_filter_expression
+from app.utils.ifc_guid import parse_guids
 
 router = APIRouter(prefix="/elements", tags=["elements"])
 
+# Champs projetables par POST /elements/batch (id et guid sont toujours retournés)
+BATCH_FIELDS = (
+    "id", "guid", "ifc_type", "name", "description", "tag",
+    "properties", "quantities", "attributes", "storey_id", "space_id"
+)
+UUID_FIELDS = {"id", "guid", "storey_id", "space_id"}
+
 
 @router.get("")
 def list_elements(
+    request: Request,
     model_id: UUID = Query(...),
     ifc_type: Optional[str] = Query(None),
+    site_id: Optional[UUID] = Query(None),
+    building_id: Optional[UUID] = Query(None),
     storey_id: Optional[UUID] = Query(None),
     space_id: Optional[UUID] = Query(None),
+    ancestor_id: Optional[UUID] = Query(
+        None, description="Descendants (directs ou non) d'un élément: bâtiment, mur, assemblage..."
+    ),
+    filter_expression: Optional[str] = Query(
+        None,
+        alias="filter",
+        description="Filtre sur les Psets/Qtos, ex: Pset_WallCommon.FireRating=REI60;NetVolume>2"
+    ),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
     tenant_id: UUID = Depends(get_tenant_id),
@@ -32,16 +63,54 @@ def list_elements(
     Args:
         model_id: ID du modèle
         ifc_type: Filtrer par type IFC (optionnel)
+        site_id: Filtrer par site (optionnel)
+        building_id: Filtrer par bâtiment (optionnel)
         storey_id: Filtrer par niveau (optionnel)
         space_id: Filtrer par espace (optionnel)
+        ancestor_id: Filtrer par ancêtre quelconque dans la hiérarchie (optionnel)
+        filter_expression: Filtre sur les valeurs des propriétés et quantités (optionnel)
         page: Numéro de page
         page_size: Taille de la page
         tenant_id: ID du locataire
         db: Session de base de données
         
     Returns:
-        Liste des éléments
+        Liste des éléments (avec ETag une fois le modèle terminé)
+    
+    Raises:
+        HTTPException: Si le filtre est invalide
     """
+    filter_clauses = None
+    if filter_expression:
+        try:
+            filter_clauses = parse_filter_expression(filter_expression)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    cache_key = make_cache_key(
+        tenant_id, "elements", model_id=model_id, ifc_type=ifc_type, site_id=site_id,
+        building_id=building_id, storey_id=storey_id, space_id=space_id,
+        ancestor_id=ancestor_id, filter=filter_expression,
+        page=page, page_size=page_size
+    )
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    # Lue avant la base: une réponse construite pendant une invalidation n'est pas stockée
+    generation = cache_generation()
+    
+    completed_at = db.query(Job.completed_at).join(Model, Model.job_id == Job.id).filter(
+        Model.id == model_id,
+        Model.tenant_id == tenant_id
+    ).scalar()
+    etag = compute_etag(model_id, completed_at)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
     query = db.query(ElementModel).filter(
         ElementModel.model_id == model_id,
         ElementModel.tenant_id == tenant_id
@@ -53,13 +122,29 @@ def list_elements(
     if storey_id:
         query = query.filter(ElementModel.storey_id == storey_id)
     
+    # Ancêtres spatiaux: colonnes de hiérarchie indexées
+    if site_id:
+        query = query.filter(ElementModel.site_id == site_id)
+    
+    if building_id:
+        query = query.filter(ElementModel.building_id == building_id)
+    
     if space_id:
         query = query.filter(ElementModel.space_id == space_id)
     
+    # Ancêtre quelconque: une jointure sur la fermeture transitive (clé primaire)
+    if ancestor_id:
+        query = query.join(ElementClosure, ElementClosure.descendant_id == ElementModel.id).filter(
+            ElementClosure.ancestor_id == ancestor_id
+        )
+    
+    if filter_clauses:
+        query = query.filter(*property_service.build_filter_conditions(model_id, filter_clauses))
+    
     offset = (page - 1) * page_size
     elements = query.order_by(ElementModel.ifc_type, ElementModel.name).offset(offset).limit(page_size).all()
     
-    return {
+    return store_response(request, cache_key, model_id, etag, {
         "elements": [
             {
                 "id": str(elem.id),
@@ -76,11 +161,270 @@ def list_elements(
         "total": query.count(),
         "page": page,
         "page_size": page_size
+    }, generation)
+
+
+@router.get("/search")
+def search_elements(
+    q: str = Query(..., min_length=1, max_length=200),
+    model_id: Optional[UUID] = Query(None),
+    ifc_type: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Recherche plein texte dans les noms, tags, descriptions et valeurs de propriétés.
+    
+    Chaque terme est recherché par préfixe ('porte D-10' trouve 'Porte D-101');
+    les résultats sont classés par pertinence.
+    
+    Args:
+        q: Texte recherché
+        model_id: Restreindre à un modèle (optionnel)
+        ifc_type: Restreindre à un type IFC (optionnel)
+        limit: Nombre maximum de résultats
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Éléments trouvés, du plus pertinent au moins pertinent
+    
+    Raises:
+        HTTPException: Si le texte de recherche est invalide
+    """
+    try:
+        results = search_service.search(
+            db, tenant_id, q, model_id=model_id, ifc_type=ifc_type, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {"query": q, "results": results}
+
+
+@router.get("/within")
+def elements_within(
+    request: Request,
+    model_id: UUID = Query(...),
+    bbox: Optional[str] = Query(
+        None, description="Boîte de recherche en mètres: xmin,ymin,zmin,xmax,ymax,zmax"
+    ),
+    x: Optional[float] = Query(None),
+    y: Optional[float] = Query(None),
+    z: Optional[float] = Query(None),
+    element_id: Optional[UUID] = Query(None, description="Élément de référence (sa boîte, élargie de radius)"),
+    radius: Optional[float] = Query(None, ge=0, description="Rayon de recherche en mètres"),
+    contained: bool = Query(False, description="Éléments entièrement contenus dans la boîte"),
+    ifc_type: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Recherche spatiale sur les boîtes englobantes des éléments d'un modèle.
+    
+    Trois formes de requête: une boîte (bbox), un point et un rayon (x, y, z,
+    radius; résultats triés par distance), ou un élément de référence et une
+    marge (element_id, radius; l'élément est exclu des résultats).
+    
+    Args:
+        model_id: ID du modèle
+        bbox: Boîte de recherche (optionnel)
+        x: Abscisse du point de recherche (optionnel)
+        y: Ordonnée du point de recherche (optionnel)
+        z: Altitude du point de recherche (optionnel)
+        element_id: Élément de référence (optionnel)
+        radius: Rayon autour du point ou marge autour de l'élément (optionnel)
+        contained: Ne retenir que les éléments entièrement contenus (boîte ou élément)
+        ifc_type: Filtrer par type IFC (optionnel)
+        limit: Nombre maximum de résultats
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Éléments trouvés avec leur boîte [[xmin, ymin, zmin], [xmax, ymax, zmax]]
+        (avec ETag une fois le modèle terminé)
+    
+    Raises:
+        HTTPException: Si la requête spatiale est invalide ou l'élément introuvable
+    """
+    point = (x, y, z)
+    modes = [bbox is not None, any(value is not None for value in point), element_id is not None]
+    if sum(modes) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indiquer une boîte (bbox), un point (x, y, z) ou un élément (element_id)"
+        )
+    if modes[1] and (None in point or radius is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Une recherche par point requiert x, y, z et radius"
+        )
+    
+    search_box = None
+    if bbox is not None:
+        try:
+            search_box = parse_box(bbox)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    cache_key = make_cache_key(
+        tenant_id, "elements_within", model_id=model_id, bbox=search_box, point=point,
+        element_id=element_id, radius=radius, contained=contained, ifc_type=ifc_type, limit=limit
+    )
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    # Lue avant la base: une réponse construite pendant une invalidation n'est pas stockée
+    generation = cache_generation()
+    
+    completed_at = db.query(Job.completed_at).join(Model, Model.job_id == Job.id).filter(
+        Model.id == model_id,
+        Model.tenant_id == tenant_id
+    ).scalar()
+    etag = compute_etag(model_id, completed_at)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    if element_id is not None:
+        found, anchor_box = spatial_service.element_box(db, tenant_id, model_id, element_id)
+        if not found:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Élément non trouvé"
+            )
+        if anchor_box is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="L'élément n'a pas de boîte englobante"
+            )
+        search_box = expand_box(anchor_box, radius or 0.0)
+    
+    if search_box is not None:
+        elements, truncated = spatial_service.within_box(
+            db, tenant_id, model_id, search_box, contained=contained,
+            ifc_type=ifc_type, exclude_id=element_id, limit=limit
+        )
+    else:
+        elements, truncated = spatial_service.within_radius(
+            db, tenant_id, model_id, point, radius, ifc_type=ifc_type, limit=limit
+        )
+    
+    return store_response(request, cache_key, model_id, etag, {
+        "elements": elements,
+        "count": len(elements),
+        "truncated": truncated
+    }, generation)
+
+
+@router.post("/batch")
+def get_elements_batch(
+    payload: ElementBatchRequest,
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Récupère en une requête les éléments d'un modèle à partir de leurs GUID et/ou ID.
+    
+    Les GUID sont acceptés en GlobalId IFC compressé (décodés par lot) ou en
+    UUID, puis résolus via l'index uq_elements_model_guid avec une seule
+    condition `guid = ANY(:guids)`, quel que soit leur nombre.
+    
+    Args:
+        payload: ID du modèle, GUID et/ou ID recherchés, projection de champs
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Éléments trouvés et identifiants introuvables
+    """
+    requested = len(payload.guids) + len(payload.ids)
+    if requested == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Au moins un GUID ou un ID est requis"
+        )
+    if requested > settings.ELEMENT_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Au plus {settings.ELEMENT_BATCH_MAX} identifiants par requête"
+        )
+    
+    fields = list(BATCH_FIELDS)
+    if payload.fields is not None:
+        unknown = set(payload.fields) - set(BATCH_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Champs inconnus: {', '.join(sorted(unknown))}"
+            )
+        fields = ["id", "guid"] + [f for f in BATCH_FIELDS[2:] if f in payload.fields]
+    
+    guids = parse_guids(payload.guids)
+    invalid = [value for value, guid in zip(payload.guids, guids) if guid is None]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"GUID invalides: {', '.join(invalid[:10])}"
+        )
+    
+    model_exists = db.query(Model.id).filter(
+        Model.id == payload.model_id,
+        Model.tenant_id == tenant_id
+    ).first()
+    if not model_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modèle non trouvé"
+        )
+    
+    # Un seul paramètre tableau par liste: le plan ne dépend pas du nombre d'identifiants
+    uuid_array = ARRAY(PG_UUID(as_uuid=True))
+    conditions = []
+    if guids:
+        conditions.append(ElementModel.guid == any_(
+            bindparam("guids", list(set(guids)), type_=uuid_array)
+        ))
+    if payload.ids:
+        conditions.append(ElementModel.id == any_(
+            bindparam("ids", list(set(payload.ids)), type_=uuid_array)
+        ))
+    
+    rows = db.query(*[getattr(ElementModel, f) for f in fields]).filter(
+        ElementModel.model_id == payload.model_id,
+        ElementModel.tenant_id == tenant_id,
+        or_(*conditions)
+    ).all()
+    
+    elements = []
+    found_guids = set()
+    found_ids = set()
+    for row in rows:
+        found_guids.add(row.guid)
+        found_ids.add(row.id)
+        elements.append({
+            field: (str(value) if field in UUID_FIELDS and value is not None else value)
+            for field, value in zip(fields, row)
+        })
+    
+    return {
+        "elements": elements,
+        "missing_guids": [value for value, guid in zip(payload.guids, guids) if guid not in found_guids],
+        "missing_ids": [str(element_id) for element_id in payload.ids if element_id not in found_ids]
     }
 
 
 @router.get("/{element_id}")
 def get_element(
+    request: Request,
     element_id: UUID,
     tenant_id: UUID = Depends(get_tenant_id),
     db: Session = Depends(get_db_session)
@@ -94,20 +438,37 @@ def get_element(
         db: Session de base de données
         
     Returns:
-        Détails de l'élément
+        Détails de l'élément (avec ETag une fois le modèle terminé)
     """
-    element = db.query(ElementModel).filter(
+    cache_key = make_cache_key(tenant_id, "element", element_id=element_id)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    # Lue avant la base: une réponse construite pendant une invalidation n'est pas stockée
+    generation = cache_generation()
+    
+    row = db.query(ElementModel, Job.completed_at).join(
+        Model, Model.id == ElementModel.model_id
+    ).join(
+        Job, Job.id == Model.job_id
+    ).filter(
         ElementModel.id == element_id,
         ElementModel.tenant_id == tenant_id
     ).first()
     
-    if not element:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Élément non trouvé"
         )
     
-    return {
+    element, completed_at = row
+    etag = compute_etag(element.model_id, completed_at)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    return store_response(request, cache_key, element.model_id, etag, {
         "id": str(element.id),
         "guid": str(element.guid),
         "ifc_type": element.ifc_type,
@@ -117,11 +478,91 @@ def get_element(
         "properties": element.properties,
         "quantities": element.quantities,
         "attributes": element.attributes,
+        "geometry": element.geometry,
         "storey_id": str(element.storey_id) if element.storey_id else None,
         "space_id": str(element.space_id) if element.space_id else None
-    }
-
-
-
+    }, generation)
 
 
+@router.get("/{element_id}/graph")
+def get_element_graph(
+    request: Request,
+    element_id: UUID,
+    types: Optional[str] = Query(None, description="Types de relations suivis, ex: VOIDS,FILLS (tous par défaut)"),
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    direction: str = Query("outgoing", description="outgoing (source -> cible), incoming ou both"),
+    limit: int = Query(1000, ge=1, le=settings.GRAPH_MAX_NODES, description="Nombre maximum d'éléments"),
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Parcourt les relations à partir d'un élément (parcours en largeur borné).
+    
+    Une requête par niveau pour toute la frontière: murs → ouvertures → portes
+    en deux requêtes avec types=VOIDS,FILLS&depth=2.
+    
+    Args:
+        element_id: ID de l'élément de départ
+        types: Types de relations suivis (optionnel)
+        depth: Nombre maximum de niveaux
+        direction: Sens de parcours des relations
+        limit: Nombre maximum d'éléments atteints (élément de départ inclus)
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Éléments atteints avec leur niveau, relations parcourues, troncature
+        (avec ETag une fois le modèle terminé)
+    
+    Raises:
+        HTTPException: Si les paramètres sont invalides ou l'élément introuvable
+    """
+    try:
+        relationship_types = parse_relationship_types(types)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if direction not in DIRECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Sens de parcours invalide (attendus: {', '.join(DIRECTIONS)})"
+        )
+    
+    cache_key = make_cache_key(
+        tenant_id, "element_graph", element_id=element_id, types=relationship_types,
+        depth=depth, direction=direction, limit=limit
+    )
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    # Lue avant la base: une réponse construite pendant une invalidation n'est pas stockée
+    generation = cache_generation()
+    
+    row = db.query(ElementModel.model_id, Job.completed_at).join(
+        Model, Model.id == ElementModel.model_id
+    ).join(
+        Job, Job.id == Model.job_id
+    ).filter(
+        ElementModel.id == element_id,
+        ElementModel.tenant_id == tenant_id
+    ).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Élément non trouvé"
+        )
+    
+    model_id, completed_at = row
+    etag = compute_etag(model_id, completed_at)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    graph = graph_service.traverse(
+        db, model_id, element_id, types=relationship_types, depth=depth,
+        direction=direction, max_nodes=limit
+    )
+    return store_response(request, cache_key, model_id, etag, {"root": str(element_id), **graph}, generation)
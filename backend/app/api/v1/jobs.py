@@ -1,15 +1,23 @@
 """
 Points d'extrémité pour les tâches
 
-Gère la consultation du statut des tâches.
+Gère la consultation du statut des tâches, et le suivi de leur avancement
+en Server-Sent Events.
 """
 
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from uuid import UUID
-from typing import Optional
 
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.dependencies import get_tenant_id, get_db_session
+from app.core.job_events import job_events, job_state, FINAL_STATUSES
 from app.models.database import Job
 from app.models.schemas import JobResponse, JobListResponse, JobStatus
 
@@ -91,3 +99,107 @@ def get_job(
     
     return JobResponse.model_validate(job)
 
+
+@router.get("/{job_id}/events")
+def get_job_events(
+    job_id: UUID,
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Suit l'avancement d'une tâche en Server-Sent Events (text/event-stream).
+    
+    Le premier événement décrit l'état courant de la tâche; les suivants
+    sont publiés par le worker à chaque changement de statut et pendant la
+    lecture du fichier (progress: octets lus, débit, fin estimée). Le flux
+    se termine après un statut final (TERMINE ou ECHOUE). Sans événement
+    pendant JOB_EVENTS_KEEPALIVE_SECONDS, le statut est relu en base (tâche
+    traitée par un autre processus) et un commentaire keep-alive est envoyé.
+    
+    Args:
+        job_id: ID de la tâche
+        tenant_id: ID du locataire
+        db: Session de base de données
+        
+    Returns:
+        StreamingResponse: Flux d'événements 'progress' (données JSON)
+        
+    Raises:
+        HTTPException: Si la tâche n'existe pas ou n'appartient pas au locataire
+    """
+    job = db.query(Job).filter(
+        Job.id == job_id,
+        Job.tenant_id == tenant_id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tâche non trouvée"
+        )
+    
+    # Rendre la connexion au pool avant le flux: sinon elle reste « idle in
+    # transaction » jusqu'à la fin du flux (une par client abonné)
+    state = job_state(job)
+    db.close()
+    
+    return StreamingResponse(
+        _job_event_stream(job_id, state),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _job_event_stream(job_id: UUID, initial_state: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Produit les événements d'une tâche jusqu'à son statut final.
+    
+    Args:
+        job_id: ID de la tâche
+        initial_state: État lu en base à l'ouverture du flux
+    
+    Yields:
+        Événements SSE
+    """
+    subscription = job_events.subscribe(job_id)
+    try:
+        state = {"job_id": str(job_id), **initial_state}
+        while True:
+            yield _format_event(state)
+            if state.get("status") in FINAL_STATUSES:
+                return
+            
+            next_state = await subscription.next_state(settings.JOB_EVENTS_KEEPALIVE_SECONDS)
+            while next_state is None:
+                # Aucune publication dans ce processus: relire le statut en base
+                stored_state = await run_in_threadpool(_stored_job_state, job_id)
+                if stored_state is None:
+                    return
+                if stored_state["status"] != state.get("status"):
+                    next_state = {**state, **stored_state}
+                    break
+                yield ": keep-alive\n\n"
+                next_state = await subscription.next_state(settings.JOB_EVENTS_KEEPALIVE_SECONDS)
+            state = next_state
+    finally:
+        job_events.unsubscribe(subscription)
+
+
+def _stored_job_state(job_id: UUID) -> Optional[Dict[str, Any]]:
+    """État d'une tâche lu en base (None si elle a été supprimée)"""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        return job_state(job) if job else None
+    finally:
+        db.close()
+
+
+def _format_event(state: Dict[str, Any]) -> str:
+    """Sérialise un état en événement SSE 'progress'"""
+    lines = []
+    if state.get("sequence"):
+        lines.append(f"id: {state['sequence']}")
+    lines.append("event: progress")
+    lines.append(f"data: {json.dumps(state, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
@@ -4,14 +4,23 @@ Points d'extrémité pour les modèles
 Gère la consultation des modèles parsés.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional
 
+from app.core.cache import (
+    cache_generation, cached_response, compute_etag, make_cache_key, not_modified_response, store_response
+)
 from app.core.dependencies import get_tenant_id, get_db_session
-from app.models.database import Model
-from app.models.schemas import ModelResponse
+from app.models.database import Model, ModelRevision, Job
+from app.models.schemas import (
+    ModelResponse, ModelRevisionSummary, ModelRevisionResponse, ModelCompareResponse
+)
+from app.services.compare_service import compare_service
+from app.services.export_service import export_service, EXPORT_FORMATS
+from app.services.tree_service import tree_service
 
 router = APIRouter(prefix="/models", tags=["models"])
 
@@ -31,7 +40,7 @@ def list_models(
         page_size: Taille de la page
         tenant_id: ID du locataire
         db: Session de base de données
-        
+    
     Returns:
         Liste des modèles
     """
@@ -45,6 +54,7 @@ def list_models(
 
 @router.get("/{model_id}", response_model=ModelResponse)
 def get_model(
+    request: Request,
     model_id: UUID,
     tenant_id: UUID = Depends(get_tenant_id),
     db: Session = Depends(get_db_session)
@@ -56,14 +66,65 @@ def get_model(
         model_id: ID du modèle
         tenant_id: ID du locataire
         db: Session de base de données
-        
+    
+    Returns:
+        Détails du modèle (avec ETag une fois le modèle terminé)
+    
+    Raises:
+        HTTPException: Si le modèle n'existe pas
+    """
+    cache_key = make_cache_key(tenant_id, "model", model_id=model_id)
+    cached = cached_response(request, cache_key)
+    if cached is not None:
+        return cached
+    # Lue avant la base: une réponse construite pendant une invalidation n'est pas stockée
+    generation = cache_generation()
+    
+    row = db.query(Model, Job.completed_at).join(Job, Job.id == Model.job_id).filter(
+        Model.id == model_id,
+        Model.tenant_id == tenant_id
+    ).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modèle non trouvé"
+        )
+    
+    model, completed_at = row
+    etag = compute_etag(model.id, completed_at)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    return store_response(
+        request, cache_key, model.id, etag, ModelResponse.model_validate(model), generation
+    )
+
+
+@router.get("/{model_id}/revisions", response_model=list[ModelRevisionSummary])
+def list_model_revisions(
+    model_id: UUID,
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Liste les révisions d'un modèle, de la plus récente à la plus ancienne.
+    
+    La révision 1 (import initial) n'a pas d'enregistrement de différences.
+    
+    Args:
+        model_id: ID du modèle
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
     Returns:
-        Détails du modèle
-        
+        Révisions avec leurs compteurs (sans les listes de GUIDs)
+    
     Raises:
         HTTPException: Si le modèle n'existe pas
     """
-    model = db.query(Model).filter(
+    model = db.query(Model.id).filter(
         Model.id == model_id,
         Model.tenant_id == tenant_id
     ).first()
@@ -74,9 +135,200 @@ def get_model(
             detail="Modèle non trouvé"
         )
     
-    return ModelResponse.model_validate(model)
+    revisions = db.query(
+        ModelRevision.revision, ModelRevision.job_id,
+        ModelRevision.statistics, ModelRevision.created_at
+    ).filter(
+        ModelRevision.model_id == model_id,
+        ModelRevision.tenant_id == tenant_id
+    ).order_by(ModelRevision.revision.desc()).all()
+    
+    return [ModelRevisionSummary.model_validate(revision) for revision in revisions]
+
+
+@router.get("/{model_id}/revisions/{revision}", response_model=ModelRevisionResponse)
+def get_model_revision(
+    model_id: UUID,
+    revision: int,
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Récupère les GUIDs ajoutés, modifiés et supprimés par une révision.
+    
+    Args:
+        model_id: ID du modèle
+        revision: Numéro de révision (2 ou plus)
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Différences avec la révision précédente
+    
+    Raises:
+        HTTPException: Si la révision n'existe pas
+    """
+    model_revision = db.query(ModelRevision).filter(
+        ModelRevision.model_id == model_id,
+        ModelRevision.tenant_id == tenant_id,
+        ModelRevision.revision == revision
+    ).first()
+    
+    if not model_revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Révision non trouvée"
+        )
+    
+    return ModelRevisionResponse.model_validate(model_revision)
+
+
+@router.get("/{model_a}/compare/{model_b}", response_model=ModelCompareResponse)
+def compare_models(
+    model_a: UUID,
+    model_b: UUID,
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Compare les éléments de deux modèles par GUID et empreinte de contenu.
+    
+    Seuls les index sont lus (aucune colonne JSONB): quelques secondes
+    suffisent pour des modèles de plusieurs centaines de milliers d'éléments.
+    
+    Args:
+        model_a: ID du modèle de référence
+        model_b: ID du modèle comparé
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        GUIDs ajoutés, supprimés et modifiés de model_a à model_b
+    
+    Raises:
+        HTTPException: Si l'un des modèles n'existe pas
+    """
+    found = db.query(Model.id).filter(
+        Model.id.in_([model_a, model_b]),
+        Model.tenant_id == tenant_id
+    ).count()
+    
+    if found < len({model_a, model_b}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modèle non trouvé"
+        )
+    
+    differences = compare_service.compare(db, model_a, model_b)
+    return ModelCompareResponse(model_a=model_a, model_b=model_b, **differences)
 
 
+@router.get("/{model_id}/tree")
+def get_model_tree(
+    model_id: UUID,
+    root_id: Optional[UUID] = Query(None),
+    max_depth: Optional[int] = Query(None, ge=0),
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Récupère la hiérarchie spatiale d'un modèle (ou un sous-arbre).
+    
+    L'arbre est précalculé au parsing: une seule requête indexée suffit.
+    
+    Args:
+        model_id: ID du modèle
+        root_id: ID de l'élément racine du sous-arbre (optionnel)
+        max_depth: Profondeur maximale sous la racine (optionnel)
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Arbre du modèle
+    
+    Raises:
+        HTTPException: Si le modèle ou l'élément racine n'existe pas
+    """
+    nodes = tree_service.get_tree(
+        db, model_id, tenant_id, root_element_id=root_id, max_depth=max_depth
+    )
+    
+    if not nodes:
+        # Distinguer un modèle inexistant d'un arbre vide (seulement sur ce chemin)
+        model = db.query(Model.id).filter(
+            Model.id == model_id,
+            Model.tenant_id == tenant_id
+        ).first()
+        if not model:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Modèle non trouvé"
+            )
+        if root_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Élément racine non trouvé dans l'arbre du modèle"
+            )
+    
+    return {
+        "model_id": str(model_id),
+        "root_id": str(root_id) if root_id else None,
+        "nodes": nodes
+    }
 
 
+@router.get("/{model_id}/export")
+def export_model(
+    model_id: UUID,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|arrow|parquet)$"),
+    tenant_id: UUID = Depends(get_tenant_id),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Exporte tous les éléments d'un modèle (avec propriétés et quantités) en flux.
+    
+    La mémoire utilisée ne dépend pas de la taille du modèle: les éléments sont
+    lus par un curseur côté serveur et envoyés au fil de l'eau.
+    
+    Args:
+        model_id: ID du modèle
+        export_format: Format d'export (ndjson, arrow ou parquet)
+        tenant_id: ID du locataire
+        db: Session de base de données
+    
+    Returns:
+        Réponse en flux
+    
+    Raises:
+        HTTPException: Si le modèle n'existe pas ou si le format n'est pas disponible
+    """
+    model = db.query(Model.id).filter(
+        Model.id == model_id,
+        Model.tenant_id == tenant_id
+    ).first()
+    
+    if not model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Modèle non trouvé"
+        )
+    
+    try:
+        chunks = export_service.stream(model_id, tenant_id, export_format)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
+    
+    # Le flux lit par sa propre session (curseur côté serveur): rendre la
+    # connexion de la requête au pool plutôt que de la garder pendant l'export
+    db.close()
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{model_id}.{extension}"'}
+    )
 
@@ -1,10 +1,12 @@
 """
 Points d'extrémité d'upload de fichiers
 
-Gère l'upload de fichiers IFCXML.
+Gère l'upload de fichiers IFCXML: formulaire multipart (fichier enregistré
+puis traité), ou corps brut validé pendant la réception (POST /upload/stream).
 """
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -13,9 +15,10 @@ from app.models.database import Tenant
 from app.services.upload_service import upload_service
 from app.services.quota_service import quota_service
 from app.services.audit_service import audit_service
+from app.services.validation_service import validation_service
 from app.models.schemas import UploadResponse, JobResponse
 from app.core.config import settings
-from app.workers.processing_worker import process_job
+from app.workers.processing_worker import process_job, record_validation
 from fastapi import Request
 
 router = APIRouter(prefix="/upload", tags=["upload"])
@@ -59,26 +62,7 @@ async def upload_file(
         file_size = len(content)
         
         # Vérifier les quotas
-        is_valid, error_msg = quota_service.check_file_size_quota(tenant, file_size)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=error_msg
-            )
-        
-        is_valid, error_msg = quota_service.check_storage_quota(tenant, db, file_size)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=error_msg
-            )
-        
-        is_valid, error_msg = quota_service.check_files_per_month_quota(tenant, db)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=error_msg
-            )
+        _check_quotas(tenant, db, file_size)
         
         # Sauvegarder le fichier
         saved_path = upload_service.save_uploaded_file(
@@ -98,7 +82,6 @@ async def upload_file(
         
         # Logger l'action
         audit_service.log_action(
-            db=db,
             tenant_id=tenant.id,
             action="UPLOAD",
             resource_type="job",
@@ -129,3 +112,149 @@ async def upload_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de l'upload: {str(e)}"
         )
+
+
+@router.post("/stream", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_file_stream(
+    background_tasks: BackgroundTasks,
+    request: Request,
+    filename: str = Query(..., description="Nom du fichier (extension .ifcxml ou .xml)"),
+    tenant: Tenant = Depends(get_verified_tenant),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Upload un fichier IFCXML envoyé brut dans le corps de la requête.
+    
+    Chaque bloc reçu est écrit sur disque et passé à un parseur XSD en
+    streaming (détection de la version puis validation): à la fin de
+    l'upload, la validation est terminée et la tâche passe directement au
+    parsing. Un fichier invalide donne une tâche ECHOUE, sans traitement.
+    
+    Args:
+        filename: Nom du fichier
+        tenant: Locataire vérifié
+        db: Session de base de données
+        
+    Returns:
+        UploadResponse: Informations sur la tâche créée
+        
+    Raises:
+        HTTPException: Si le fichier est invalide, trop volumineux ou hors quota
+    """
+    # Taille annoncée: refuser avant de recevoir le fichier
+    declared_size = request.headers.get("content-length")
+    if declared_size and declared_size.isdigit():
+        if int(declared_size) > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Fichier trop volumineux. Maximum: {settings.MAX_FILE_SIZE / (1024*1024):.0f}MB"
+            )
+        _check_quotas(tenant, db, int(declared_size))
+    else:
+        _check_quotas(tenant, db, 0)
+    
+    # Terminer la transaction des vérifications: la connexion retourne au pool
+    # pendant la réception du fichier (rouverte pour créer la tâche)
+    tenant_id = tenant.id
+    db.commit()
+    
+    try:
+        stream = upload_service.open_stream(filename, tenant_id, validation_service.stream_validator())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Écriture et validation hors de la boucle d'événements, bloc par bloc
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(stream.write, chunk)
+        validation_result = await run_in_threadpool(stream.finish)
+    except ValueError as e:
+        stream.discard()
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except BaseException:
+        # Client déconnecté ou erreur d'écriture: pas de fichier partiel
+        stream.discard()
+        raise
+    
+    file_size = stream.file_size
+    try:
+        _check_quotas(tenant, db, file_size)
+    except HTTPException:
+        upload_service.delete_file(stream.file_path)
+        raise
+    
+    # Créer la tâche, déjà validée
+    job = upload_service.create_job(
+        db=db,
+        tenant_id=tenant.id,
+        filename=filename,
+        file_size=file_size,
+        file_path=stream.file_path
+    )
+    is_valid = record_validation(job, validation_result, stream.measurements())
+    db.commit()
+    
+    # Logger l'action
+    audit_service.log_action(
+        tenant_id=tenant.id,
+        action="UPLOAD",
+        resource_type="job",
+        resource_id=job.id,
+        request=request,
+        details={"filename": filename, "file_size": file_size, "streamed": True}
+    )
+    
+    if is_valid:
+        background_tasks.add_task(process_job, job.id)
+        message = "Fichier uploadé et validé. Traitement en cours."
+    else:
+        message = f"Fichier uploadé. Validation échouée: {len(validation_result.errors)} erreur(s)"
+    
+    return UploadResponse(
+        job_id=job.id,
+        filename=job.filename,
+        file_size=job.file_size,
+        status=job.status,
+        message=message
+    )
+
+
+def _check_quotas(tenant: Tenant, db: Session, file_size: int):
+    """
+    Vérifie les quotas du locataire pour un nouveau fichier.
+    
+    Args:
+        tenant: Locataire
+        db: Session de base de données
+        file_size: Taille du fichier en octets
+        
+    Raises:
+        HTTPException: Si un quota est dépassé
+    """
+    is_valid, error_msg = quota_service.check_file_size_quota(tenant, file_size)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=error_msg
+        )
+    
+    is_valid, error_msg = quota_service.check_storage_quota(tenant, db, file_size)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=error_msg
+        )
+    
+    is_valid, error_msg = quota_service.check_files_per_month_quota(tenant, db)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=error_msg
+        )
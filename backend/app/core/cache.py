@@ -0,0 +1,385 @@
+"""
+Cache de réponses HTTP
+
+Un modèle dont la tâche est TERMINE ne change plus: ses réponses de lecture
+(modèle, liste d'éléments, élément) sont mises en cache déjà sérialisées,
+indexées par locataire, modèle et paramètres de requête. Chaque entrée porte
+un ETag fort dérivé de (model_id, completed_at) pour les réponses
+304 Not Modified.
+
+Une nouvelle révision (ré-ingestion) invalide les entrées de son modèle. Le
+gestionnaire lit la génération du cache (generation) avant d'interroger la
+base: une réponse construite avant une invalidation n'est pas stockée. Le
+cache mémoire propage les invalidations aux autres processus (workers
+uvicorn, worker de traitement) par LISTEN/NOTIFY; tant que l'écoute n'est
+pas active, il ne sert ni ne stocke rien.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.core.notifications import notify, start_listener
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# Entrée de cache: (etag, corps JSON sérialisé)
+CacheEntry = Tuple[str, bytes]
+
+# Canal LISTEN/NOTIFY des invalidations du cache mémoire entre processus
+INVALIDATION_CHANNEL = "response_cache"
+
+# Attente maximale de la mise en écoute, au premier accès au cache
+LISTEN_TIMEOUT_SECONDS = 5.0
+
+
+def compute_etag(model_id: UUID, completed_at: Optional[datetime]) -> Optional[str]:
+    """
+    Calcule l'ETag fort des données d'un modèle.
+    
+    Args:
+        model_id: ID du modèle
+        completed_at: Date de fin de la tâche de traitement
+    
+    Returns:
+        ETag entre guillemets, ou None si le modèle n'est pas terminé
+    """
+    if completed_at is None:
+        return None
+    digest = hashlib.sha1(f"{model_id}:{completed_at.isoformat()}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Vérifie si un en-tête If-None-Match correspond à l'ETag courant.
+    
+    Args:
+        if_none_match: Valeur de l'en-tête If-None-Match
+        etag: ETag courant
+    
+    Returns:
+        True si le client possède déjà cette version
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparaison faible (RFC 9110): le préfixe W/ est ignoré
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def make_cache_key(tenant_id: UUID, scope: str, **params: Any) -> str:
+    """
+    Construit une clé de cache stable.
+    
+    Args:
+        tenant_id: ID du locataire
+        scope: Type de ressource (model, elements, element, ...)
+        **params: Paramètres de la requête
+    
+    Returns:
+        Clé de cache
+    """
+    encoded = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{tenant_id}:{scope}:{encoded}"
+
+
+class MemoryResponseCache:
+    """Cache LRU en mémoire, plafonné en octets"""
+    
+    def __init__(self, max_bytes: int, shared_invalidations: bool = True):
+        """
+        Initialise le cache.
+        
+        Args:
+            max_bytes: Taille maximale des corps en cache
+            shared_invalidations: Échanger les invalidations avec les autres
+                                  processus (LISTEN/NOTIFY)
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes, str, int]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # Nombre d'invalidations, tous modèles confondus
+        self._size = 0
+        self._lock = threading.Lock()
+        self._shared = shared_invalidations
+        self._listening = threading.Event()  # Invalidations des autres processus reçues
+        self._listener: Optional[threading.Thread] = None
+    
+    def generation(self) -> Optional[int]:
+        """
+        Génération courante, à lire avant les accès à la base qui produisent la réponse.
+        
+        Returns:
+            Jeton à passer à set, ou None si la réponse ne doit pas être stockée
+        """
+        if not self._ready():
+            return None
+        with self._lock:
+            return self._epoch
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Retourne l'entrée si elle existe et n'a pas été invalidée"""
+        if not self._ready():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            etag, body, model_id, generation = entry
+            if generation != self._generations.get(model_id, 0):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return etag, body
+    
+    def set(self, key: str, model_id: UUID, etag: str, body: bytes, generation: Optional[int]):
+        """Ajoute une entrée en évinçant les moins récemment utilisées (sauf invalidation depuis generation)"""
+        if generation is None or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._epoch:
+                # Invalidation pendant la construction de la réponse
+                return
+            if key in self._entries:
+                self._remove(key)
+            model_key = str(model_id)
+            self._entries[key] = (etag, body, model_key, self._generations.get(model_key, 0))
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+    
+    def invalidate_model(self, model_id: UUID):
+        """Invalide toutes les entrées d'un modèle, dans ce processus et les autres"""
+        self._invalidate_local(str(model_id))
+        if not self._shared:
+            return
+        try:
+            notify(INVALIDATION_CHANNEL, str(model_id))
+        except Exception as e:
+            print(f"Erreur lors de la diffusion de l'invalidation du modèle {model_id}: {str(e)}")
+    
+    def _invalidate_local(self, model_key: str):
+        """Invalide les entrées d'un modèle dans ce processus (paresseusement, à la lecture)"""
+        with self._lock:
+            self._generations[model_key] = self._generations.get(model_key, 0) + 1
+            self._epoch += 1
+    
+    def _invalidate_all(self):
+        """Vide le cache (invalidations peut-être manquées pendant une coupure de l'écoute)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._epoch += 1
+    
+    def _remove(self, key: str):
+        """Retire une entrée (le verrou doit être tenu)"""
+        entry = self._entries.pop(key)
+        self._size -= len(entry[1])
+    
+    def _ready(self) -> bool:
+        """Vrai si les entrées sont fiables: invalidations partagées écoutées"""
+        if not self._shared:
+            return True
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = start_listener(
+                        INVALIDATION_CHANNEL,
+                        "response-cache",
+                        self._invalidate_local,
+                        on_listening=self._on_listening,
+                        on_interrupted=self._on_interrupted
+                    )
+            self._listening.wait(LISTEN_TIMEOUT_SECONDS)
+        return self._listening.is_set()
+    
+    def _on_listening(self):
+        """Écoute (r)établie: invalidations peut-être manquées pendant la coupure"""
+        self._invalidate_all()
+        self._listening.set()
+    
+    def _on_interrupted(self, error: Exception):
+        """Écoute interrompue: le cache n'est plus fiable jusqu'à la reconnexion"""
+        self._listening.clear()
+        print(f"Écoute des invalidations du cache interrompue: {str(error)}")
+
+
+# Clé Redis du nombre d'invalidations, tous modèles confondus
+EPOCH_KEY = "generation:*"
+
+
+class RedisResponseCache:
+    """Cache partagé entre processus, adossé à Redis (REDIS_URL)"""
+    
+    def __init__(self, url: str, ttl_seconds: int):
+        """Initialise la connexion Redis"""
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+    
+    def generation(self) -> Optional[int]:
+        """Nombre d'invalidations, à lire avant les accès à la base qui produisent la réponse"""
+        return int(self._client.get(EPOCH_KEY) or 0)
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Retourne l'entrée si elle existe et n'a pas été invalidée"""
+        raw = self._client.get(f"response:{key}")
+        if raw is None:
+            return None
+        header, body = raw.split(b"\n", 1)
+        etag, model_id, generation = json.loads(header)
+        if generation != int(self._client.get(f"generation:{model_id}") or 0):
+            return None
+        return etag, body
+    
+    def set(self, key: str, model_id: UUID, etag: str, body: bytes, generation: Optional[int]):
+        """Ajoute une entrée avec expiration (sauf invalidation depuis generation)"""
+        if generation is None:
+            return
+        model_generation_key = f"generation:{model_id}"
+        with self._client.pipeline() as pipe:
+            try:
+                # Transaction annulée si une invalidation survient avant l'écriture
+                pipe.watch(EPOCH_KEY, model_generation_key)
+                if int(pipe.get(EPOCH_KEY) or 0) != generation:
+                    return
+                model_generation = int(pipe.get(model_generation_key) or 0)
+                header = json.dumps([etag, str(model_id), model_generation]).encode()
+                pipe.multi()
+                pipe.set(f"response:{key}", header + b"\n" + body, ex=self.ttl_seconds)
+                pipe.execute()
+            except redis.WatchError:
+                pass
+    
+    def invalidate_model(self, model_id: UUID):
+        """Invalide toutes les entrées d'un modèle"""
+        with self._client.pipeline() as pipe:
+            pipe.incr(f"generation:{model_id}")
+            pipe.incr(EPOCH_KEY)
+            pipe.execute()
+
+
+def build_response_cache():
+    """
+    Construit le cache selon RESPONSE_CACHE_BACKEND ('memory', 'redis' ou 'none').
+    
+    Returns:
+        Instance de cache, ou None si le cache est désactivé
+    """
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "redis":
+        if REDIS_AVAILABLE:
+            return RedisResponseCache(settings.REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+        print("ATTENTION: redis non installé. Utilisation du cache de réponses en mémoire.")
+    # Sans ré-ingestion, les entrées ne sont jamais invalidées: pas d'écoute
+    return MemoryResponseCache(
+        settings.RESPONSE_CACHE_MAX_BYTES,
+        shared_invalidations=settings.INCREMENTAL_REINGEST
+    )
+
+
+# Instance globale du cache (None si désactivé)
+response_cache = build_response_cache()
+
+
+def cache_generation() -> Optional[int]:
+    """
+    Génération du cache, à lire avant les accès à la base d'une réponse à stocker.
+    
+    Returns:
+        Jeton à passer à store_response (None: cache désactivé ou indisponible)
+    """
+    if response_cache is None:
+        return None
+    return response_cache.generation()
+
+
+def cached_response(request: Request, key: str) -> Optional[Response]:
+    """
+    Sert une réponse depuis le cache, sans accès à la base.
+    
+    Args:
+        request: Requête HTTP (pour If-None-Match)
+        key: Clé de cache
+    
+    Returns:
+        Réponse 200 ou 304, ou None si absente du cache
+    """
+    if response_cache is None:
+        return None
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    etag, body = entry
+    return _build_response(request, etag, body)
+
+
+def not_modified_response(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    Retourne une réponse 304 si le client possède déjà la version courante.
+    
+    Args:
+        request: Requête HTTP
+        etag: ETag courant (None si le modèle n'est pas terminé)
+    
+    Returns:
+        Réponse 304 ou None
+    """
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def store_response(
+    request: Request,
+    key: str,
+    model_id: UUID,
+    etag: Optional[str],
+    payload: Any,
+    generation: Optional[int] = None
+) -> Response:
+    """
+    Sérialise une réponse, la met en cache si le modèle est immuable, et la sert.
+    
+    Args:
+        request: Requête HTTP
+        key: Clé de cache
+        model_id: ID du modèle auquel appartiennent les données
+        etag: ETag du modèle (None si le modèle n'est pas terminé: pas de cache)
+        payload: Contenu de la réponse
+        generation: Génération lue avant les accès à la base (cache_generation);
+                    None: la réponse n'est pas stockée
+    
+    Returns:
+        Réponse JSON (avec ETag si disponible)
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    if etag is None:
+        return Response(content=body, media_type="application/json")
+    if response_cache is not None:
+        response_cache.set(key, model_id, etag, body, generation)
+    return _build_response(request, etag, body)
+
+
+def _build_response(request: Request, etag: str, body: bytes) -> Response:
+    """Construit la réponse 200 ou 304 pour une entrée"""
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
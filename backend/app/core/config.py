@@ -52,9 +52,58 @@ class Settings(BaseSettings):
             return Path(self.XSD_IFC4)
         return self.get_xsd_dir() / "ifcXML4.xsd"
     
+    # Logs d'audit (écriture asynchrone par lots)
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_MS: int = 500
+    AUDIT_SPOOL_PATH: Path = Path("audit_spool.jsonl")
+    AUDIT_SPOOL_RETRY_SECONDS: int = 30  # Intervalle entre deux rejeux du spool
+    
+    # Nombre maximum d'identifiants par requête POST /elements/batch
+    ELEMENT_BATCH_MAX: int = 5000
+    
+    # Parcours GET /elements/{id}/graph: profondeur et nombre d'éléments maximum
+    GRAPH_MAX_DEPTH: int = 10
+    GRAPH_MAX_NODES: int = 10000
+    
+    # Un fichier du même projet (project_guid) met à jour le modèle existant
+    # (seules les lignes modifiées sont écrites) au lieu d'en créer un nouveau
+    INCREMENTAL_REINGEST: bool = True
+    
+    # ANALYZE après l'indexation d'un modèle, seulement si le chargement a ajouté
+    # au moins ANALYZE_MIN_ROWS lignes et ANALYZE_MIN_FRACTION des lignes estimées
+    # de la table (sinon les statistiques sont laissées à l'autovacuum)
+    ANALYZE_MIN_ROWS: int = 10000
+    ANALYZE_MIN_FRACTION: float = 0.2
+    
+    # Processus de transformation XSLT (exécutée en parallèle du parsing)
+    XSLT_WORKERS: int = 2
+    
+    # Profil cProfile de chaque tâche, écrit à côté du fichier uploadé (<fichier>.prof)
+    JOB_PROFILING: bool = False
+    
+    # Mémoire des tables de références du parseur (IDs, parents, relations);
+    # au-delà, les tables débordent dans des fichiers temporaires projetés en mémoire
+    PARSER_MEMORY_BUDGET_MB: int = 256
+    PARSER_SPILL_DIR: Optional[Path] = None  # Répertoire temporaire système si None
+    
     # Redis (pour tâches en arrière-plan)
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Cache des réponses des modèles terminés: 'memory', 'redis' ou 'none'
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB
+    RESPONSE_CACHE_TTL_SECONDS: int = 24 * 3600  # Redis uniquement
+    
+    # Avancement des tâches (GET /jobs/{id}/events): diffuseur 'memory' (processus
+    # de l'API) ou 'postgres' (LISTEN/NOTIFY, plusieurs processus)
+    JOB_EVENTS_BACKEND: str = "memory"
+    JOB_EVENTS_KEEPALIVE_SECONDS: int = 15  # Commentaire keep-alive et relecture du statut en base
+    
+    # Avancement de la lecture (validation, parsing): écrit dans job_metadata["progress"]
+    # et publié au plus une fois par intervalle
+    JOB_PROGRESS_INTERVAL_MS: int = 1000
+    
     # CORS - peut être une liste ou une chaîne JSON
     CORS_ORIGINS: Union[list[str], str] = ["http://localhost:3000", "http://localhost:3001"]
     
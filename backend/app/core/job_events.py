@@ -0,0 +1,244 @@
+"""
+Diffusion de l'avancement des tâches
+
+Le worker publie l'état courant de chaque tâche (statut, étapes, avancement
+de la lecture) dans un diffuseur; GET /jobs/{id}/events le transmet aux
+clients en Server-Sent Events, sur une seule connexion au lieu de N requêtes
+par seconde.
+
+Chaque publication complète l'état de la tâche et les abonnés reçoivent cet
+état complet: un client lent ne reçoit que le dernier état (les états
+intermédiaires sont fusionnés), sans file qui grossit. L'avancement est
+publié au plus une fois par JOB_PROGRESS_INTERVAL_MS (ProgressTracker).
+
+Le diffuseur 'memory' est local au processus, comme le registre de métriques:
+il suffit tant que les tâches tournent dans le processus de l'API. Le
+diffuseur 'postgres' passe par LISTEN/NOTIFY pour les déploiements à
+plusieurs processus. Les notifications sont limitées à 8000 octets: les
+valeurs de taille non bornée (étapes, message d'erreur) n'y figurent pas et
+sont relues en base par les processus qui ont des abonnés à la tâche.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.notifications import notify, start_listener
+from app.models.database import Job
+
+
+# Canal LISTEN/NOTIFY du diffuseur 'postgres'
+NOTIFY_CHANNEL = "job_events"
+
+# Statuts finaux: plus aucun événement après eux
+FINAL_STATUSES = ("TERMINE", "ECHOUE")
+
+# Valeurs de taille non bornée, relues en base au lieu d'être notifiées
+RELOADED_KEYS = ("stages", "error_message")
+
+
+def job_state(job) -> Dict[str, Any]:
+    """
+    État diffusé d'une tâche: statut, états des étapes, avancement de la
+    lecture en cours (job_metadata["progress"]) et erreur éventuelle.
+    
+    Args:
+        job: Tâche (modèle Job)
+    
+    Returns:
+        Valeurs à publier (sérialisables en JSON)
+    """
+    metadata = job.job_metadata or {}
+    return {
+        "status": getattr(job.status, "value", job.status),
+        "stages": metadata.get("stages", {}),
+        "progress": metadata.get("progress"),
+        "error_message": job.error_message
+    }
+
+
+class JobSubscription:
+    """Abonnement d'un client aux événements d'une tâche (boucle asyncio du client)"""
+    
+    def __init__(self, job_id: UUID, loop: asyncio.AbstractEventLoop):
+        """Initialise l'abonnement"""
+        self.job_id = job_id
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._state: Optional[Dict[str, Any]] = None
+    
+    def notify(self, state: Dict[str, Any]):
+        """Transmet un état (appelable depuis n'importe quel thread)"""
+        try:
+            self._loop.call_soon_threadsafe(self._set, state)
+        except RuntimeError:
+            # Boucle fermée: le client est parti
+            pass
+    
+    def _set(self, state: Dict[str, Any]):
+        """Remplace l'état en attente (thread de la boucle)"""
+        self._state = state
+        self._ready.set()
+    
+    async def next_state(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Attend le prochain état de la tâche.
+        
+        Args:
+            timeout: Attente maximale en secondes
+        
+        Returns:
+            Dernier état publié, ou None si rien n'a été publié pendant timeout
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        state, self._state = self._state, None
+        return state
+
+
+class JobEventBroker:
+    """Diffuseur en mémoire de l'état des tâches (processus courant)"""
+    
+    def __init__(self):
+        """Initialise le diffuseur"""
+        self._lock = threading.Lock()
+        self._states: Dict[UUID, Dict[str, Any]] = {}  # Tâche en cours -> état courant
+        self._subscriptions: Dict[UUID, Set[JobSubscription]] = defaultdict(set)
+    
+    def publish(self, job_id: UUID, **values):
+        """
+        Complète l'état d'une tâche et le diffuse aux abonnés.
+        
+        Args:
+            job_id: ID de la tâche
+            **values: Valeurs à mettre à jour (status, stages, progress...)
+        """
+        with self._lock:
+            state = self._states.get(job_id, {"job_id": str(job_id), "sequence": 0})
+            state = {**state, **values, "sequence": state["sequence"] + 1}
+            if state.get("status") in FINAL_STATUSES:
+                self._states.pop(job_id, None)
+            else:
+                self._states[job_id] = state
+        
+        self._dispatch(job_id, state)
+    
+    def subscribe(self, job_id: UUID) -> JobSubscription:
+        """
+        Abonne le client courant (à appeler depuis sa boucle asyncio).
+        
+        L'état courant de la tâche, s'il est connu de ce processus, est
+        transmis immédiatement.
+        
+        Args:
+            job_id: ID de la tâche
+        
+        Returns:
+            Abonnement, à libérer avec unsubscribe
+        """
+        subscription = JobSubscription(job_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[job_id].add(subscription)
+            state = self._states.get(job_id)
+            if state is not None:
+                subscription.notify(dict(state))
+        return subscription
+    
+    def unsubscribe(self, subscription: JobSubscription):
+        """Libère un abonnement"""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.job_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.job_id]
+    
+    def _dispatch(self, job_id: UUID, state: Dict[str, Any]):
+        """Transmet un état aux abonnés de ce processus"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(job_id, ()))
+        for subscription in subscriptions:
+            subscription.notify(state)
+
+
+class PostgresJobEventBroker(JobEventBroker):
+    """Diffuseur partagé entre processus, par LISTEN/NOTIFY sur la base"""
+    
+    def __init__(self):
+        """Initialise le diffuseur (l'écoute démarre au premier abonnement)"""
+        super().__init__()
+        self._listener: Optional[threading.Thread] = None
+    
+    def subscribe(self, job_id: UUID) -> JobSubscription:
+        """Abonne le client courant et démarre l'écoute du canal si besoin"""
+        with self._lock:
+            if self._listener is None:
+                self._listener = start_listener(
+                    NOTIFY_CHANNEL, "job-events", self._receive, on_interrupted=self._on_interrupted
+                )
+        return super().subscribe(job_id)
+    
+    def _dispatch(self, job_id: UUID, state: Dict[str, Any]):
+        """Publie l'état sur le canal: tous les processus (celui-ci compris) le reçoivent"""
+        payload = {key: value for key, value in state.items() if key not in RELOADED_KEYS}
+        if len(payload) < len(state):
+            payload["reload"] = True
+        try:
+            notify(NOTIFY_CHANNEL, json.dumps(payload, separators=(",", ":")))
+        except Exception as e:
+            # L'avancement n'est pas essentiel au traitement de la tâche
+            print(f"Erreur lors de la publication de l'avancement de la tâche {job_id}: {str(e)}")
+    
+    def _receive(self, payload: str):
+        """Transmet un état reçu sur le canal aux abonnés locaux"""
+        state = json.loads(payload)
+        job_id = UUID(state["job_id"])
+        with self._lock:
+            if job_id not in self._subscriptions:
+                return
+        if state.pop("reload", False):
+            state.update(self._stored_values(job_id))
+        super()._dispatch(job_id, state)
+    
+    def _stored_values(self, job_id: UUID) -> Dict[str, Any]:
+        """Valeurs non notifiées (RELOADED_KEYS), relues en base"""
+        db = SessionLocal()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if job is None:
+                return {}
+            state = job_state(job)
+            return {key: state[key] for key in RELOADED_KEYS}
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'état de la tâche {job_id}: {str(e)}")
+            return {}
+        finally:
+            db.close()
+    
+    def _on_interrupted(self, error: Exception):
+        """Signale l'interruption de l'écoute (reprise par start_listener)"""
+        print(f"Écoute de l'avancement des tâches interrompue: {str(error)}")
+
+
+def build_job_event_broker() -> JobEventBroker:
+    """
+    Construit le diffuseur selon JOB_EVENTS_BACKEND ('memory' ou 'postgres').
+    
+    Returns:
+        Diffuseur d'avancement des tâches
+    """
+    if settings.JOB_EVENTS_BACKEND.lower() == "postgres":
+        return PostgresJobEventBroker()
+    return JobEventBroker()
+
+
+# Instance globale du diffuseur
+job_events = build_job_event_broker()
@@ -0,0 +1,296 @@
+"""
+Instrumentation des tâches de traitement
+
+Mesure chaque étape (durée, temps CPU, mémoire, débit) et agrège les
+mesures dans un registre exposé au format texte Prometheus par GET /metrics.
+Les tâches tournent dans le processus de l'API (tâches en arrière-plan):
+le registre est donc local au processus, comme le cache mémoire des réponses.
+
+Pendant une étape, ProgressTracker suit la position de lecture du fichier
+(octets lus, débits, fin estimée) et la rapporte à intervalle régulier.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+# Bornes des histogrammes de durée d'étape (secondes)
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Retourne le pic de mémoire résidente du processus courant.
+    
+    Returns:
+        Pic RSS en octets (depuis le démarrage du processus), ou None si indisponible
+    """
+    if not RESOURCE_AVAILABLE:
+        return None
+    # ru_maxrss est en kilo-octets sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class StageTimer:
+    """
+    Chronomètre d'une étape: durée, temps CPU du thread et mémoire.
+    
+    Le pic RSS (ru_maxrss) est celui du processus depuis son démarrage: dans
+    un worker de longue durée, il reste celui de la plus grosse tâche. L'étape
+    rapporte donc aussi de combien elle l'a fait monter (0 si elle est restée
+    sous le pic précédent).
+    """
+    
+    def __init__(self):
+        """Démarre la mesure"""
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        self.rss_start = peak_rss_bytes()
+    
+    def stop(self, elements: Optional[int] = None, bytes_read: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Termine la mesure.
+        
+        Args:
+            elements: Nombre d'entités traitées par l'étape (pour le débit)
+            bytes_read: Octets lus par l'étape
+        
+        Returns:
+            Mesures de l'étape (sérialisables en JSON)
+        """
+        seconds = time.perf_counter() - self.wall_start
+        measurements = {
+            "seconds": round(seconds, 3),
+            "cpu_seconds": round(time.thread_time() - self.cpu_start, 3),
+        }
+        
+        rss = peak_rss_bytes()
+        if rss is not None:
+            measurements["process_peak_rss_mb"] = round(rss / (1024 * 1024), 1)
+            measurements["peak_rss_growth_mb"] = round(max(0, rss - self.rss_start) / (1024 * 1024), 1)
+        
+        if elements is not None:
+            measurements["elements"] = elements
+            measurements["elements_per_second"] = round(elements / seconds, 1) if seconds > 0 else None
+        
+        if bytes_read is not None:
+            measurements["bytes_read"] = bytes_read
+        
+        return measurements
+
+
+class ProgressTracker:
+    """
+    Avancement d'une étape qui lit le fichier, éventuellement en plusieurs lectures.
+    
+    La position de lecture (rappel on_read d'iter_entities) et le nombre
+    d'entités lues donnent les octets lus sur le total attendu, les débits et
+    la fin estimée de la lecture. L'état est rapporté au plus une fois par
+    intervalle, et à chaque changement de sous-étape.
+    """
+    
+    def __init__(
+        self,
+        file_size: int,
+        reads: int,
+        report: Callable[[Dict[str, Any]], None],
+        interval_seconds: float
+    ):
+        """
+        Démarre le suivi.
+        
+        Args:
+            file_size: Taille du fichier en octets
+            reads: Nombre de lectures complètes du fichier attendues
+            report: Appelé avec l'état de l'avancement (sérialisable en JSON)
+            interval_seconds: Intervalle minimal entre deux rapports
+        """
+        self.file_size = file_size
+        self.total_bytes = file_size * reads
+        self.report = report
+        self.interval_seconds = interval_seconds
+        self.stage: Optional[str] = None
+        self.entities = 0
+        self.completed_bytes = 0  # Lectures terminées
+        self.position = 0  # Position dans la lecture en cours
+        self.wall_start = time.perf_counter()
+        self.stage_start = self.wall_start
+        self.reported_at = self.wall_start
+    
+    def start_stage(self, stage: str, reads_file: bool = True):
+        """
+        Commence une sous-étape (rapportée immédiatement).
+        
+        Args:
+            stage: Nom de la sous-étape
+            reads_file: La sous-étape relit le fichier depuis le début (une
+                        lecture au-delà du nombre attendu augmente le total)
+        """
+        if reads_file:
+            self.completed_bytes += self.position
+            self.position = 0
+            self.total_bytes = max(self.total_bytes, self.completed_bytes + self.file_size)
+        self.stage = stage
+        self.entities = 0
+        self.stage_start = time.perf_counter()
+        self._report()
+    
+    def read(self, position: int):
+        """Position de lecture dans le fichier (rappel on_read)"""
+        self.position = position
+        if time.perf_counter() - self.reported_at >= self.interval_seconds:
+            self._report()
+    
+    def count(self, entities: int):
+        """Entités lues depuis le début de la sous-étape"""
+        self.entities = entities
+        if time.perf_counter() - self.reported_at >= self.interval_seconds:
+            self._report()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        État de l'avancement.
+        
+        Returns:
+            Sous-étape, octets lus et attendus, pourcentage, débits
+            (entités de la sous-étape, octets de l'étape) et secondes restantes
+            estimées pour la lecture (None tant que le débit est inconnu)
+        """
+        now = time.perf_counter()
+        bytes_read = min(self.completed_bytes + self.position, self.total_bytes)
+        seconds = now - self.wall_start
+        stage_seconds = now - self.stage_start
+        bytes_per_second = bytes_read / seconds if seconds > 0 else 0.0
+        return {
+            "stage": self.stage,
+            "bytes_read": bytes_read,
+            "bytes_total": self.total_bytes,
+            "percent": round(100.0 * bytes_read / self.total_bytes, 1) if self.total_bytes else 100.0,
+            "entities": self.entities,
+            "entities_per_second": round(self.entities / stage_seconds, 1) if stage_seconds > 0 else None,
+            "bytes_per_second": round(bytes_per_second),
+            "eta_seconds": (
+                round((self.total_bytes - bytes_read) / bytes_per_second, 1) if bytes_per_second > 0 else None
+            ),
+        }
+    
+    def _report(self):
+        """Rapporte l'état courant"""
+        self.reported_at = time.perf_counter()
+        self.report(self.snapshot())
+
+
+class MetricsRegistry:
+    """Agrégats des mesures de tâches, rendus au format texte Prometheus"""
+    
+    def __init__(self):
+        """Initialise le registre"""
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, int] = defaultdict(int)
+        self._stage_count: Dict[str, int] = defaultdict(int)
+        self._stage_seconds: Dict[str, float] = defaultdict(float)
+        self._stage_cpu_seconds: Dict[str, float] = defaultdict(float)
+        self._stage_elements: Dict[str, int] = defaultdict(int)
+        self._stage_bytes: Dict[str, int] = defaultdict(int)
+        self._stage_buckets: Dict[str, list] = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+    
+    def observe_stage(self, stage: str, measurements: Dict[str, Any]):
+        """
+        Enregistre les mesures d'une étape terminée.
+        
+        Args:
+            stage: Nom de l'étape (ex: 'parsing', 'parsing.relationships')
+            measurements: Mesures retournées par StageTimer.stop
+        """
+        seconds = measurements.get("seconds")
+        if seconds is None:
+            return
+        
+        with self._lock:
+            self._stage_count[stage] += 1
+            self._stage_seconds[stage] += seconds
+            self._stage_cpu_seconds[stage] += measurements.get("cpu_seconds") or 0.0
+            self._stage_elements[stage] += measurements.get("elements") or 0
+            self._stage_bytes[stage] += measurements.get("bytes_read") or 0
+            buckets = self._stage_buckets[stage]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+    
+    def count_job(self, status: str):
+        """
+        Compte une tâche terminée.
+        
+        Args:
+            status: Statut final (TERMINE ou ECHOUE)
+        """
+        with self._lock:
+            self._jobs[status] += 1
+    
+    def render(self) -> str:
+        """
+        Rend le registre au format d'exposition texte Prometheus (0.0.4).
+        
+        Returns:
+            Texte des métriques
+        """
+        lines = []
+        
+        with self._lock:
+            lines.append("# HELP archiparse_jobs_total Tâches de traitement terminées, par statut final")
+            lines.append("# TYPE archiparse_jobs_total counter")
+            for status, count in sorted(self._jobs.items()):
+                lines.append(f'archiparse_jobs_total{{status="{status}"}} {count}')
+            
+            lines.append("# HELP archiparse_stage_duration_seconds Durée des étapes de traitement")
+            lines.append("# TYPE archiparse_stage_duration_seconds histogram")
+            for stage in sorted(self._stage_count):
+                for bound, count in zip(DURATION_BUCKETS, self._stage_buckets[stage]):
+                    lines.append(
+                        f'archiparse_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'archiparse_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} '
+                    f'{self._stage_count[stage]}'
+                )
+                lines.append(
+                    f'archiparse_stage_duration_seconds_sum{{stage="{stage}"}} {self._stage_seconds[stage]:.3f}'
+                )
+                lines.append(
+                    f'archiparse_stage_duration_seconds_count{{stage="{stage}"}} {self._stage_count[stage]}'
+                )
+            
+            for name, help_text, values in (
+                ("archiparse_stage_cpu_seconds_total", "Temps CPU des étapes", self._stage_cpu_seconds),
+                ("archiparse_stage_elements_total", "Entités traitées par les étapes", self._stage_elements),
+                ("archiparse_stage_bytes_read_total", "Octets lus par les étapes", self._stage_bytes),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for stage in sorted(values):
+                    value = values[stage]
+                    formatted = f"{value:.3f}" if isinstance(value, float) else str(value)
+                    lines.append(f'{name}{{stage="{stage}"}} {formatted}')
+        
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines.append(
+                "# HELP archiparse_process_peak_rss_bytes Pic de mémoire résidente du processus "
+                "depuis son démarrage (toutes tâches confondues)"
+            )
+            lines.append("# TYPE archiparse_process_peak_rss_bytes gauge")
+            lines.append(f"archiparse_process_peak_rss_bytes {rss}")
+        
+        return "\n".join(lines) + "\n"
+
+
+# Instance globale du registre
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,104 @@
+"""
+Notifications PostgreSQL entre processus (LISTEN/NOTIFY)
+
+Utilisées par le cache de réponses (invalidations) et le diffuseur
+d'avancement des tâches: un processus publie sur un canal, chaque processus
+qui l'écoute reçoit la charge utile dans un thread dédié, sur une connexion
+retirée du pool. Après une coupure, l'écoute reprend sur une nouvelle
+connexion; les notifications émises entre-temps sont perdues.
+"""
+
+import select
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.database import engine
+
+
+# Attente entre deux tentatives de reconnexion, et entre deux vérifications
+# de la connexion d'écoute sans notification
+RECONNECT_DELAY_SECONDS = 5.0
+POLL_TIMEOUT_SECONDS = 5.0
+
+
+def notify(channel: str, payload: str):
+    """
+    Publie une notification sur un canal (tous les processus à l'écoute, celui-ci compris).
+    
+    Args:
+        channel: Canal LISTEN/NOTIFY
+        payload: Charge utile (moins de 8000 octets)
+    """
+    with engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": channel, "payload": payload}
+        )
+        connection.commit()
+
+
+def start_listener(
+    channel: str,
+    name: str,
+    on_notification: Callable[[str], None],
+    on_listening: Optional[Callable[[], None]] = None,
+    on_interrupted: Optional[Callable[[Exception], None]] = None
+) -> threading.Thread:
+    """
+    Démarre l'écoute d'un canal dans un thread dédié.
+    
+    Args:
+        channel: Canal LISTEN/NOTIFY
+        name: Nom du thread
+        on_notification: Appelé avec la charge utile de chaque notification
+        on_listening: Appelé à chaque (re)connexion, une fois l'écoute active
+        on_interrupted: Appelé avec l'erreur quand l'écoute est interrompue
+    
+    Returns:
+        Thread d'écoute (démon)
+    """
+    listener = threading.Thread(
+        target=_listen,
+        args=(channel, on_notification, on_listening, on_interrupted),
+        name=name,
+        daemon=True
+    )
+    listener.start()
+    return listener
+
+
+def _listen(
+    channel: str,
+    on_notification: Callable[[str], None],
+    on_listening: Optional[Callable[[], None]],
+    on_interrupted: Optional[Callable[[Exception], None]]
+):
+    """Écoute un canal indéfiniment, en se reconnectant après une coupure"""
+    while True:
+        connection = None
+        try:
+            # Connexion dédiée, retirée du pool pour la durée de l'écoute
+            connection = engine.raw_connection()
+            driver_connection = connection.driver_connection
+            connection.detach()
+            driver_connection.autocommit = True
+            with driver_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {channel}")
+            if on_listening is not None:
+                on_listening()
+            
+            while True:
+                if select.select([driver_connection], [], [], POLL_TIMEOUT_SECONDS)[0] == []:
+                    continue
+                driver_connection.poll()
+                while driver_connection.notifies:
+                    on_notification(driver_connection.notifies.pop(0).payload)
+        except Exception as e:
+            if on_interrupted is not None:
+                on_interrupted(e)
+            if connection is not None:
+                connection.close()
+            time.sleep(RECONNECT_DELAY_SECONDS)
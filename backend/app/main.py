@@ -6,10 +6,13 @@ Configure et démarre l'application FastAPI.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
 from app.api.v1 import api_router
 from app.core.database import Base, engine
+from app.core.metrics import metrics_registry
+from app.services.audit_service import audit_service
 
 # Créer les tables (en développement seulement)
 # En production, utiliser Alembic pour les migrations
@@ -35,6 +38,12 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("shutdown")
+def flush_audit_logs():
+    """Écrit les logs d'audit encore en file avant l'arrêt"""
+    audit_service.shutdown()
+
+
 @app.get("/")
 def root():
     """Point d'extrémité racine"""
@@ -49,3 +58,12 @@ def root():
 def health_check():
     """Point d'extrémité de vérification de santé"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métriques des tâches de traitement au format texte Prometheus"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
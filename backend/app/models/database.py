@@ -4,10 +4,11 @@ Modèles de base de données SQLAlchemy
 Correspond au schéma défini dans DATABASE_SCHEMA.md
 """
 
-from sqlalchemy import Column, String, Text, BigInteger, Boolean, ForeignKey, Numeric, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DDL, String, Text, BigInteger, Boolean, Float, ForeignKey, Index, Integer, Numeric, UniqueConstraint, event
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
 from uuid import uuid4
 
 from app.core.database import Base
@@ -105,12 +106,74 @@ class Model(Base):
     name = Column(String(500))
     description = Column(Text)
     project_guid = Column(UUID(as_uuid=True))
+    revision = Column(Integer, nullable=False, default=1, server_default="1")
     normalized_json = Column(JSONB)
     statistics = Column(JSONB)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
 
 
+class ModelRevision(Base):
+    """Historique des révisions d'un modèle (différences avec la révision précédente)"""
+    
+    __tablename__ = "model_revisions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="SET NULL"))
+    revision = Column(Integer, nullable=False)
+    added = Column(JSONB)  # GUIDs des éléments ajoutés
+    modified = Column(JSONB)  # GUIDs des éléments dont l'empreinte a changé
+    removed = Column(JSONB)  # GUIDs des éléments supprimés
+    statistics = Column(JSONB)  # Compteurs et durée de l'ingestion
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("model_id", "revision", name="uq_model_revisions_model_revision"),
+    )
+
+
+class Box(UserDefinedType):
+    """
+    Type géométrique box de PostgreSQL (rectangle aligné sur les axes).
+    
+    Écrit et lu en tuple (xmin, ymin, xmax, ymax); PostgreSQL restitue les
+    coins dans l'ordre (haut droit),(bas gauche).
+    """
+    
+    cache_ok = True
+    
+    def get_col_spec(self, **kw):
+        return "BOX"
+    
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            xmin, ymin, xmax, ymax = value
+            return f"({xmin},{ymin}),({xmax},{ymax})"
+        return process
+    
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            xmax, ymax, xmin, ymin = (float(item) for item in value.replace("(", "").replace(")", "").split(","))
+            return (xmin, ymin, xmax, ymax)
+        return process
+
+
+# Vecteur de recherche plein texte des éléments: nom et tag (A), description (B),
+# valeurs textuelles des Psets (C). Configuration 'simple': pas de racinisation,
+# les numéros de pièce et tags sont indexés tels quels.
+ELEMENT_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(tag, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+    "setweight(jsonb_to_tsvector('simple', coalesce(properties, '{}'::jsonb), '[\"string\"]'), 'C')"
+)
+
+
 class Element(Base):
     """Table des éléments IFC"""
     
@@ -133,13 +196,68 @@ class Element(Base):
     # Propriétés
     properties = Column(JSONB)
     quantities = Column(JSONB)
-    geometry = Column(JSONB)
+    geometry = Column(JSONB)  # {"bbox": [[xmin, ymin, zmin], [xmax, ymax, zmax]]} en mètres
     attributes = Column(JSONB)
+    # Boîte englobante dans le repère du projet (mètres): emprise x/y et intervalle z
+    bbox = Column(Box)
+    bbox_z_min = Column(Float)
+    bbox_z_max = Column(Float)
+    # Empreinte du contenu (compute_content_hash): détection des modifications entre révisions
+    content_hash = Column(String(32))
+    # Recherche plein texte (colonne générée, recalculée à chaque écriture; non chargée par défaut)
+    search_vector = deferred(Column(TSVECTOR, Computed(ELEMENT_SEARCH_VECTOR_SQL, persisted=True)))
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
     
     __table_args__ = (
         UniqueConstraint("model_id", "guid", name="uq_elements_model_guid"),
+        # Comparaison de modèles par (guid, empreinte) en parcours d'index seul
+        Index("ix_elements_model_guid_hash", "model_id", "guid", "content_hash"),
+        # Recherche plein texte limitée au locataire dans l'index (btree_gin)
+        Index("ix_elements_tenant_search_vector", "tenant_id", "search_vector", postgresql_using="gin"),
+        # Filtres par contenance (@>) et chemin JSON (@?) sur les Psets/Qtos
+        Index(
+            "ix_elements_properties_path", "properties",
+            postgresql_using="gin", postgresql_ops={"properties": "jsonb_path_ops"}
+        ),
+        Index(
+            "ix_elements_quantities_path", "quantities",
+            postgresql_using="gin", postgresql_ops={"quantities": "jsonb_path_ops"}
+        ),
+        # Clés étrangères de la hiérarchie: sans index, chaque suppression
+        # d'élément parcourt toute la table pour vérifier les références
+        Index("ix_elements_project_id", "project_id"),
+        Index("ix_elements_site_id", "site_id"),
+        Index("ix_elements_building_id", "building_id"),
+        Index("ix_elements_storey_id", "storey_id"),
+        Index("ix_elements_space_id", "space_id"),
+        # Requêtes spatiales (&&, @>, <->): R-tree sur l'emprise x/y
+        Index("ix_elements_bbox", "bbox", postgresql_using="gist"),
+    )
+
+
+# Index GIN sur (tenant_id, search_vector): opérateurs B-tree dans un index GIN
+event.listen(Element.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+
+
+class ElementPropertyValue(Base):
+    """Valeurs de propriétés et de quantités normalisées et typées (requêtes par intervalle)"""
+    
+    __tablename__ = "element_property_values"
+    
+    element_id = Column(UUID(as_uuid=True), ForeignKey("elements.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String(20), primary_key=True)  # properties ou quantities
+    set_name = Column(String(255), primary_key=True)
+    name = Column(String(255), primary_key=True)
+    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    value_text = Column(Text)
+    value_num = Column(Float)
+    value_bool = Column(Boolean)
+    
+    __table_args__ = (
+        Index("ix_element_property_values_model_name_num", "model_id", "name", "value_num"),
+        Index("ix_element_property_values_model_name_text", "model_id", "name", "value_text"),
     )
 
 
@@ -156,6 +274,15 @@ class Relationship(Base):
     to_element_id = Column(UUID(as_uuid=True), ForeignKey("elements.id", ondelete="CASCADE"), nullable=False)
     relationship_metadata = Column(JSONB)  # Renommé pour éviter conflit avec SQLAlchemy.metadata
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Parcours du graphe par niveau (from/to = ANY(:frontier)); servent aussi les requêtes par modèle
+        Index("ix_relationships_model_from_type", "model_id", "from_element_id", "relationship_type"),
+        Index("ix_relationships_model_to_type", "model_id", "to_element_id", "relationship_type"),
+        # Suppressions en cascade depuis elements
+        Index("ix_relationships_from_element_id", "from_element_id"),
+        Index("ix_relationships_to_element_id", "to_element_id"),
+    )
 
 
 class Space(Base):
@@ -178,6 +305,7 @@ class Space(Base):
     
     __table_args__ = (
         UniqueConstraint("model_id", "guid", name="uq_spaces_model_guid"),
+        Index("ix_spaces_element_id", "element_id"),
     )
 
 
@@ -199,4 +327,47 @@ class Storey(Base):
     
     __table_args__ = (
         UniqueConstraint("model_id", "guid", name="uq_storeys_model_guid"),
+        Index("ix_storeys_element_id", "element_id"),
+    )
+
+
+class ModelTreeNode(Base):
+    """Arbre spatial précalculé d'un modèle (ensembles imbriqués)"""
+    
+    __tablename__ = "model_tree_nodes"
+    
+    # Un sous-arbre est l'intervalle [lft, rgt] d'un noeud: une seule requête indexée
+    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), primary_key=True)
+    lft = Column(Integer, primary_key=True)
+    rgt = Column(Integer, nullable=False)
+    depth = Column(Integer, nullable=False)
+    descendants = Column(Integer, nullable=False, default=0, server_default="0")  # Bornes espacées: non déductible de lft/rgt
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    element_id = Column(UUID(as_uuid=True), ForeignKey("elements.id", ondelete="CASCADE"), nullable=False)
+    parent_id = Column(UUID(as_uuid=True), nullable=True)  # ID de l'élément parent
+    guid = Column(UUID(as_uuid=True), nullable=False)
+    ifc_type = Column(String(100), nullable=False)
+    name = Column(String(500))
+    
+    __table_args__ = (
+        Index("ix_model_tree_nodes_model_element", "model_id", "element_id", unique=True),
+        Index("ix_model_tree_nodes_element_id", "element_id"),
+    )
+
+
+class ElementClosure(Base):
+    """Fermeture transitive de la hiérarchie d'un modèle (une ligne par couple ancêtre/descendant)"""
+    
+    __tablename__ = "element_closure"
+    
+    ancestor_id = Column(UUID(as_uuid=True), ForeignKey("elements.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(UUID(as_uuid=True), ForeignKey("elements.id", ondelete="CASCADE"), primary_key=True)
+    model_id = Column(UUID(as_uuid=True), ForeignKey("models.id", ondelete="CASCADE"), nullable=False)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    depth = Column(Integer, nullable=False)  # 1 pour le parent direct
+    
+    __table_args__ = (
+        # Descendants d'un élément: clé primaire; ancêtres d'un élément: index inverse
+        Index("ix_element_closure_descendant_depth", "descendant_id", "depth"),
+        Index("ix_element_closure_model_id", "model_id"),
     )
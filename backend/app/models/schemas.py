@@ -104,8 +104,48 @@ class ModelResponse(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     project_guid: Optional[UUID] = None
+    revision: int = 1
     statistics: Optional[Dict[str, Any]] = None
     created_at: datetime
     
     model_config = {"from_attributes": True}
 
+
+class ModelRevisionSummary(BaseModel):
+    """Résumé d'une révision de modèle (compteurs, sans les GUIDs)"""
+    revision: int
+    job_id: Optional[UUID] = None
+    statistics: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    
+    model_config = {"from_attributes": True}
+
+
+class ModelRevisionResponse(ModelRevisionSummary):
+    """Différences d'une révision avec la précédente"""
+    added: List[str] = []
+    modified: List[str] = []
+    removed: List[str] = []
+
+
+class ModelCompareResponse(BaseModel):
+    """Différences d'éléments entre deux modèles (par GUID et empreinte de contenu)"""
+    model_a: UUID
+    model_b: UUID
+    added: List[str] = []
+    removed: List[str] = []
+    modified: List[str] = []
+    unchanged: int = 0
+
+
+# ========== Elements ==========
+
+class ElementBatchRequest(BaseModel):
+    """Requête de récupération groupée d'éléments d'un modèle"""
+    model_id: UUID
+    guids: List[str] = Field([], description="GUID des éléments: GlobalId IFC (22 caractères) ou UUID")
+    ids: List[UUID] = []
+    fields: Optional[List[str]] = Field(
+        None, description="Champs à retourner (tous par défaut; id et guid toujours inclus)"
+    )
+
@@ -2,22 +2,299 @@
 Service de logs d'audit
 
 Enregistre toutes les actions importantes pour traçabilité.
+
+Les événements sont placés dans une file bornée en mémoire et écrits par un
+thread d'arrière-plan, par lots (insertion multi-lignes), tous les N
+événements ou toutes les T millisecondes. Si la base est indisponible, les
+lots sont ajoutés à un fichier de spool local, rejoué au démarrage de
+l'écrivain puis périodiquement tant qu'il n'est pas vide.
+
+Le spool est partagé par les processus (workers uvicorn, worker de
+traitement): les ajouts et la reprise du spool sont protégés par un verrou
+de fichier (flock), et un seul processus à la fois rejoue.
 """
 
-from sqlalchemy.orm import Session
-from uuid import UUID
-from typing import Optional
+import fcntl
+import json
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Any
+from uuid import UUID, uuid4
+
 from fastapi import Request
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.models.database import AuditLog
 
 
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Verrou exclusif entre processus (flock sur un fichier dédié).
+    
+    Args:
+        path: Fichier de verrou (créé si besoin)
+        blocking: Attendre le verrou; sinon, y renoncer s'il est déjà pris
+    
+    Yields:
+        True si le verrou est tenu, False s'il était pris (blocking=False)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class AuditWriter:
+    """Écrivain d'arrière-plan des logs d'audit (file bornée + insertions par lots)"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        queue_size: int,
+        batch_size: int,
+        flush_interval_ms: int,
+        spool_path: Path,
+        spool_retry_seconds: float = 30.0
+    ):
+        """Initialise l'écrivain (le thread est démarré à la première utilisation)"""
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._spool_path = spool_path
+        self._replay_path = spool_path.with_suffix(spool_path.suffix + ".replay")
+        # Verrous entre processus: ajouts au spool, et rejeu (un processus à la fois)
+        self._spool_lock_path = spool_path.with_suffix(spool_path.suffix + ".lock")
+        self._replay_lock_path = spool_path.with_suffix(spool_path.suffix + ".replay.lock")
+        self._spool_retry = spool_retry_seconds
+        self._spool_lock = threading.Lock()
+        self._next_replay: Optional[float] = None  # Prochain rejeu du spool (None: spool vide)
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, event: Dict[str, Any]):
+        """
+        Ajoute un événement à la file sans jamais bloquer l'appelant.
+        
+        Si la file est pleine, l'événement est écrit directement dans le spool.
+        
+        Args:
+            event: Valeurs de colonnes de la table audit_logs
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._spool([event])
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        Vide la file et arrête le thread d'écriture.
+        
+        Args:
+            timeout: Délai maximum d'attente du thread (secondes)
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        # Sentinelle bloquante: on veut qu'elle passe après les événements en attente
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+    
+    def _ensure_started(self):
+        """Démarre le thread d'écriture si nécessaire"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        """Boucle du thread: accumule les événements et les écrit par lots"""
+        self._replay_spool()
+        
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        
+        while True:
+            if self._next_replay is not None and time.monotonic() >= self._next_replay:
+                self._replay_spool()
+            
+            # Réveil à l'échéance du lot ou du prochain rejeu du spool
+            wakeups = [moment for moment in (deadline, self._next_replay) if moment is not None]
+            timeout = max(0.0, min(wakeups) - time.monotonic()) if wakeups else None
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = False  # Délai écoulé
+            
+            if event is None:
+                self._flush(batch)
+                return
+            
+            if event is not False:
+                batch.append(event)
+                if deadline is None:
+                    deadline = time.monotonic() + self._flush_interval
+            
+            if batch and (len(batch) >= self._batch_size or time.monotonic() >= deadline):
+                # Base de nouveau disponible: rejouer le spool sans attendre l'échéance
+                if self._flush(batch) and self._next_replay is not None:
+                    self._replay_spool()
+                batch = []
+                deadline = None
+    
+    def _flush(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Écrit un lot en une seule insertion multi-lignes.
+        
+        Args:
+            batch: Événements à écrire
+        
+        Returns:
+            True si le lot a été écrit en base, False s'il a été mis en spool
+        """
+        if not batch:
+            return True
+        
+        db = self._session_factory()
+        try:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
+            return True
+        except (OperationalError, InterfaceError) as e:
+            db.rollback()
+            print(f"Base indisponible pour les logs d'audit, écriture dans le spool: {str(e)}")
+            self._spool(batch)
+            return False
+        except SQLAlchemyError:
+            # Erreur de données (ex: locataire supprimé): ne pas perdre tout le lot
+            db.rollback()
+            self._insert_one_by_one(db, batch)
+            return True
+        finally:
+            db.close()
+    
+    def _insert_one_by_one(self, db: Session, batch: List[Dict[str, Any]]):
+        """Insère les événements un par un en écartant ceux qui sont rejetés"""
+        for event in batch:
+            try:
+                db.execute(insert(AuditLog), [event])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                print(f"Log d'audit {event.get('id')} rejeté: {str(e)}")
+    
+    def _spool(self, events: List[Dict[str, Any]]):
+        """Ajoute des événements au fichier de spool local (une ligne JSON par événement)"""
+        with self._spool_lock, file_lock(self._spool_lock_path):
+            with open(self._spool_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, default=str) + "\n")
+            if self._next_replay is None:
+                self._next_replay = time.monotonic() + self._spool_retry
+    
+    def _replay_spool(self):
+        """
+        Rejoue le spool laissé par une indisponibilité de la base.
+        
+        Le spool est d'abord ajouté au fichier de rejeu (qui peut rester d'un
+        arrêt brutal pendant un rejeu précédent), puis le fichier de rejeu est
+        écrit par lots. Au premier lot refusé, le reste retourne dans le spool
+        pour le rejeu suivant.
+        
+        Le fichier de rejeu appartient au processus qui tient le verrou de
+        rejeu: si un autre processus rejoue déjà, le rejeu est reporté.
+        """
+        with file_lock(self._replay_lock_path, blocking=False) as locked:
+            if not locked:
+                with self._spool_lock:
+                    self._next_replay = time.monotonic() + self._spool_retry
+                return
+            self._replay_locked()
+    
+    def _replay_locked(self):
+        """Rejoue le spool (le verrou de rejeu doit être tenu)"""
+        with self._spool_lock, file_lock(self._spool_lock_path):
+            self._next_replay = None
+            if self._spool_path.exists():
+                if self._replay_path.exists():
+                    with open(self._replay_path, "a", encoding="utf-8") as replay, \
+                            open(self._spool_path, encoding="utf-8") as spool:
+                        shutil.copyfileobj(spool, replay)
+                    self._spool_path.unlink()
+                else:
+                    self._spool_path.replace(self._replay_path)
+            elif not self._replay_path.exists():
+                return
+        
+        events = []
+        with open(self._replay_path, encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    events.append(self._decode_spooled_event(json.loads(line)))
+                except (ValueError, TypeError, AttributeError) as e:
+                    print(f"Ligne {number} du spool d'audit ignorée (illisible): {str(e)}")
+        
+        for start in range(0, len(events), self._batch_size):
+            # En cas d'échec, _flush remet le lot dans le spool
+            if not self._flush(events[start:start + self._batch_size]):
+                remaining = events[start + self._batch_size:]
+                if remaining:
+                    self._spool(remaining)
+                break
+        self._replay_path.unlink()
+    
+    @staticmethod
+    def _decode_spooled_event(event: Dict[str, Any]) -> Dict[str, Any]:
+        """Reconvertit les UUID et dates sérialisés en texte dans le spool"""
+        for key in ("id", "tenant_id", "user_id", "resource_id"):
+            if event.get(key):
+                event[key] = UUID(event[key])
+        if event.get("created_at"):
+            event["created_at"] = datetime.fromisoformat(event["created_at"])
+        return event
+
+
 class AuditService:
     """Service de logs d'audit"""
     
+    def __init__(self, writer: Optional[AuditWriter] = None):
+        """Initialise le service"""
+        self.writer = writer or AuditWriter(
+            session_factory=SessionLocal,
+            queue_size=settings.AUDIT_QUEUE_SIZE,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+            flush_interval_ms=settings.AUDIT_FLUSH_INTERVAL_MS,
+            spool_path=settings.AUDIT_SPOOL_PATH,
+            spool_retry_seconds=settings.AUDIT_SPOOL_RETRY_SECONDS
+        )
+    
     def log_action(
         self,
-        db: Session,
         tenant_id: UUID,
         action: str,
         resource_type: str,
@@ -25,12 +302,15 @@ class AuditService:
         user_id: Optional[UUID] = None,
         request: Optional[Request] = None,
         details: Optional[dict] = None
-    ) -> AuditLog:
+    ) -> UUID:
         """
         Enregistre une action dans les logs d'audit.
         
+        L'écriture est asynchrone: l'événement est mis en file et n'ajoute ni
+        commit ni aller-retour à la base dans le chemin de la requête. La
+        transaction de l'appelant n'est pas affectée.
+        
         Args:
-            db: Session de base de données
             tenant_id: ID du locataire
             action: Action effectuée (CREATE, READ, UPDATE, DELETE, UPLOAD, etc.)
             resource_type: Type de ressource (job, model, element, etc.)
@@ -38,9 +318,9 @@ class AuditService:
             user_id: ID de l'utilisateur (optionnel)
             request: Requête HTTP (pour extraire IP et User-Agent)
             details: Détails supplémentaires (optionnel)
-            
+        
         Returns:
-            AuditLog: Enregistrement créé
+            UUID: ID de l'enregistrement d'audit (écrit ultérieurement)
         """
         ip_address = None
         user_agent = None
@@ -49,22 +329,26 @@ class AuditService:
             ip_address = request.client.host if request.client else None
             user_agent = request.headers.get("user-agent")
         
-        audit_log = AuditLog(
-            tenant_id=tenant_id,
-            user_id=user_id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            details=details or {}
-        )
-        
-        db.add(audit_log)
-        db.commit()
-        db.refresh(audit_log)
+        audit_id = uuid4()
+        self.writer.submit({
+            "id": audit_id,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "details": details or {},
+            # Horodatage de l'action, pas de l'écriture du lot
+            "created_at": datetime.now(timezone.utc)
+        })
         
-        return audit_log
+        return audit_id
+    
+    def shutdown(self):
+        """Écrit les événements en attente (à appeler à l'arrêt de l'application)"""
+        self.writer.stop()
     
     def get_audit_logs(
         self,
@@ -81,7 +365,7 @@ class AuditService:
             tenant_id: ID du locataire
             resource_type: Filtrer par type de ressource (optionnel)
             limit: Nombre maximum de logs à retourner
-            
+        
         Returns:
             Liste des logs d'audit
         """
@@ -97,4 +381,3 @@ class AuditService:
 
 # Instance globale du service
 audit_service = AuditService()
-
@@ -0,0 +1,68 @@
+"""
+Service de comparaison de modèles
+
+Compare deux modèles par GUID et empreinte de contenu (elements.content_hash)
+sans charger les colonnes JSONB: la jointure est servie par deux parcours
+d'index seuls sur ix_elements_model_guid_hash (model_id, guid, content_hash).
+"""
+
+from typing import Any, Dict
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+# Un élément sans empreinte dans l'un des modèles (importé avant son calcul)
+# est considéré modifié
+COMPARE_SQL = """
+    SELECT coalesce(a.guid, b.guid)::text AS guid,
+           CASE WHEN a.guid IS NULL THEN 'added'
+                WHEN b.guid IS NULL THEN 'removed'
+                ELSE 'modified' END AS change
+    FROM (SELECT guid, content_hash FROM elements WHERE model_id = :model_a) a
+    FULL JOIN (SELECT guid, content_hash FROM elements WHERE model_id = :model_b) b
+        ON a.guid = b.guid
+    WHERE a.guid IS NULL OR b.guid IS NULL
+       OR a.content_hash IS NULL OR a.content_hash IS DISTINCT FROM b.content_hash
+"""
+
+COUNT_SQL = "SELECT count(*) FROM elements WHERE model_id = :model_a"
+
+
+class CompareService:
+    """Service de comparaison de modèles"""
+    
+    def compare(
+        self,
+        db: Session,
+        model_a: UUID,
+        model_b: UUID
+    ) -> Dict[str, Any]:
+        """
+        Calcule les différences d'éléments entre deux modèles.
+        
+        Les modèles doivent avoir été vérifiés pour le locataire par l'appelant.
+        
+        Args:
+            db: Session de base de données
+            model_a: ID du modèle de référence
+            model_b: ID du modèle comparé
+        
+        Returns:
+            GUIDs ajoutés (dans b seulement), supprimés (dans a seulement) et
+            modifiés (empreintes différentes), avec le nombre d'inchangés
+        """
+        params = {"model_a": str(model_a), "model_b": str(model_b)}
+        result = {"added": [], "removed": [], "modified": []}
+        
+        for guid, change in db.execute(text(COMPARE_SQL), params):
+            result[change].append(guid)
+        
+        total = db.execute(text(COUNT_SQL), params).scalar()
+        result["unchanged"] = total - len(result["removed"]) - len(result["modified"])
+        return result
+
+
+# Instance globale du service
+compare_service = CompareService()
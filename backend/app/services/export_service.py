@@ -0,0 +1,165 @@
+"""
+Service d'export des éléments
+
+Exporte tous les éléments d'un modèle (propriétés et quantités comprises) en
+flux, sans jamais charger le modèle entier en mémoire: les lignes sont lues
+par un curseur côté serveur, par paquets, et chaque paquet est encodé puis
+envoyé avant la lecture du suivant.
+
+Formats:
+- ndjson: un objet JSON par ligne, construit directement par PostgreSQL
+- arrow: flux IPC Apache Arrow (nécessite pyarrow)
+- parquet: fichier Parquet, un row group par paquet (nécessite pyarrow)
+"""
+
+from typing import Iterator, List
+from uuid import UUID
+
+from sqlalchemy import String, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.database import Element as ElementModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Nombre de lignes lues par aller-retour du curseur serveur
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Colonnes exportées (les colonnes JSONB sont exportées en texte JSON)
+EXPORT_COLUMNS = (
+    "id", "guid", "ifc_type", "name", "description", "tag",
+    "storey_id", "space_id", "properties", "quantities", "attributes"
+)
+
+
+class _ChunkSink:
+    """Fichier en écriture seule dont le contenu est récupéré par morceaux"""
+    
+    def __init__(self):
+        """Initialise le tampon"""
+        self._chunks: List[bytes] = []
+        self.closed = False
+    
+    def write(self, data) -> int:
+        """Mémorise un morceau écrit par pyarrow"""
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        """Rien à faire: les morceaux sont récupérés par drain()"""
+    
+    def close(self):
+        """Marque le fichier comme fermé"""
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        """Retourne et oublie ce qui a été écrit depuis le dernier appel"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Service d'export des éléments"""
+    
+    def stream(self, model_id: UUID, tenant_id: UUID, export_format: str) -> Iterator[bytes]:
+        """
+        Prépare l'export d'un modèle sous forme de morceaux d'octets.
+        
+        Le format est vérifié immédiatement (avant l'envoi des en-têtes); le
+        générateur retourné ouvre sa propre session car il est consommé pendant
+        l'envoi de la réponse, indépendamment de la session de la requête.
+        
+        Args:
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            export_format: 'ndjson', 'arrow' ou 'parquet'
+        
+        Returns:
+            Générateur des morceaux du fichier exporté
+        
+        Raises:
+            ValueError: Si le format est inconnu
+            RuntimeError: Si pyarrow est requis mais non installé
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu: {export_format}")
+        if export_format != "ndjson" and not PYARROW_AVAILABLE:
+            raise RuntimeError(
+                "pyarrow n'est pas installé. "
+                "Installez-le pour les exports arrow et parquet: pip install pyarrow"
+            )
+        return self._generate(model_id, tenant_id, export_format)
+    
+    def _generate(self, model_id: UUID, tenant_id: UUID, export_format: str) -> Iterator[bytes]:
+        """Génère l'export dans une session dédiée"""
+        db = SessionLocal()
+        try:
+            if export_format == "ndjson":
+                yield from self._stream_ndjson(db, model_id, tenant_id)
+            else:
+                yield from self._stream_arrow(db, model_id, tenant_id, export_format)
+        finally:
+            db.close()
+    
+    def _filtered(self, statement, model_id: UUID, tenant_id: UUID):
+        """Restreint une requête aux éléments du modèle, lue par curseur serveur"""
+        return statement.where(
+            ElementModel.model_id == model_id,
+            ElementModel.tenant_id == tenant_id
+        ).execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    
+    def _stream_ndjson(self, db: Session, model_id: UUID, tenant_id: UUID) -> Iterator[bytes]:
+        """Export NDJSON: la sérialisation JSON est faite par PostgreSQL"""
+        document = func.json_build_object(
+            *[part for column in EXPORT_COLUMNS for part in (column, getattr(ElementModel, column))]
+        )
+        statement = self._filtered(select(cast(document, String)), model_id, tenant_id)
+        
+        for partition in db.execute(statement).scalars().partitions():
+            yield ("\n".join(partition) + "\n").encode()
+    
+    def _stream_arrow(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        export_format: str
+    ) -> Iterator[bytes]:
+        """Export Arrow IPC ou Parquet, un record batch par paquet de lignes"""
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        columns = [
+            cast(getattr(ElementModel, column), String) for column in EXPORT_COLUMNS
+        ]
+        statement = self._filtered(select(*columns), model_id, tenant_id)
+        
+        sink = _ChunkSink()
+        if export_format == "parquet":
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        
+        for partition in db.execute(statement).partitions():
+            arrays = [pa.array(values, type=pa.string()) for values in zip(*partition)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+        
+        writer.close()
+        yield sink.drain()
+
+
+# Instance globale du service
+export_service = ExportService()
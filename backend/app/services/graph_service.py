@@ -0,0 +1,169 @@
+"""
+Service de parcours du graphe des relations
+
+Parcourt en largeur les relations (AGGREGATES, CONTAINS, VOIDS, FILLS) à
+partir d'un élément, avec une seule requête par niveau sur toute la
+frontière (from/to_element_id = ANY(:frontier)) au lieu d'une par élément.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import any_, bindparam, or_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.models.database import Element as ElementModel, Relationship
+from app.utils.ifc_utils import RELATIONSHIP_TYPES
+
+
+# Sens de parcours: relations sortantes (from -> to), entrantes ou les deux
+DIRECTIONS = ("outgoing", "incoming", "both")
+
+UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+
+
+def parse_relationship_types(text: Optional[str]) -> Optional[List[str]]:
+    """
+    Lit une liste de types de relations saisie en 'VOIDS,FILLS'.
+    
+    Args:
+        text: Types séparés par des virgules (None: tous les types)
+    
+    Returns:
+        Types en majuscules ou None pour tous les types
+    
+    Raises:
+        ValueError: Si un type est inconnu
+    """
+    if not text:
+        return None
+    types = [item.strip().upper() for item in text.split(",") if item.strip()]
+    unknown = [item for item in types if item not in RELATIONSHIP_TYPES]
+    if unknown:
+        raise ValueError(
+            f"Types de relations inconnus: {', '.join(unknown)} (attendus: {', '.join(RELATIONSHIP_TYPES)})"
+        )
+    return types or None
+
+
+class GraphService:
+    """Service de parcours du graphe des relations"""
+    
+    def traverse(
+        self,
+        db: Session,
+        model_id: UUID,
+        root_id: UUID,
+        types: Optional[Sequence[str]] = None,
+        depth: int = 1,
+        direction: str = "outgoing",
+        max_nodes: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Parcours en largeur borné à partir d'un élément.
+        
+        Chaque niveau est une requête sur les index (model_id, from_element_id,
+        relationship_type) et (model_id, to_element_id, relationship_type).
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle de l'élément
+            root_id: ID de l'élément de départ
+            types: Types de relations suivis (tous si None)
+            depth: Nombre maximum de niveaux
+            direction: 'outgoing', 'incoming' ou 'both'
+            max_nodes: Nombre maximum d'éléments atteints (élément de départ inclus)
+        
+        Returns:
+            Éléments atteints (avec leur niveau), relations parcourues et
+            indicateur de troncature (truncated)
+        """
+        levels: Dict[UUID, int] = {root_id: 0}
+        edges: Dict[UUID, Any] = {}  # ID de relation -> ligne
+        frontier = [root_id]
+        truncated = False
+        
+        for level in range(1, depth + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for row in self._level_edges(db, model_id, frontier, types, direction):
+                edges.setdefault(row.id, row)
+                for neighbor_id in (row.from_element_id, row.to_element_id):
+                    if neighbor_id in levels:
+                        continue
+                    if len(levels) >= max_nodes:
+                        truncated = True
+                        continue
+                    levels[neighbor_id] = level
+                    next_frontier.append(neighbor_id)
+            frontier = next_frontier
+        
+        # Relations vers des éléments écartés par la troncature: non retournées
+        return {
+            "nodes": self._nodes(db, levels),
+            "edges": [
+                {
+                    "id": str(row.id),
+                    "type": row.relationship_type,
+                    "from": str(row.from_element_id),
+                    "to": str(row.to_element_id)
+                }
+                for row in edges.values()
+                if row.from_element_id in levels and row.to_element_id in levels
+            ],
+            "truncated": truncated
+        }
+    
+    def _level_edges(
+        self,
+        db: Session,
+        model_id: UUID,
+        frontier: List[UUID],
+        types: Optional[Sequence[str]],
+        direction: str
+    ):
+        """Relations d'un niveau: une requête pour toute la frontière"""
+        frontier_param = bindparam("frontier", frontier, type_=UUID_ARRAY)
+        conditions = []
+        if direction in ("outgoing", "both"):
+            conditions.append(Relationship.from_element_id == any_(frontier_param))
+        if direction in ("incoming", "both"):
+            conditions.append(Relationship.to_element_id == any_(frontier_param))
+        
+        query = db.query(
+            Relationship.id, Relationship.relationship_type,
+            Relationship.from_element_id, Relationship.to_element_id
+        ).filter(
+            Relationship.model_id == model_id,
+            or_(*conditions)
+        )
+        if types:
+            query = query.filter(Relationship.relationship_type.in_(types))
+        return query.order_by(Relationship.relationship_type, Relationship.id).all()
+    
+    def _nodes(self, db: Session, levels: Dict[UUID, int]) -> List[Dict[str, Any]]:
+        """Éléments atteints, par niveau puis type et nom"""
+        rows = db.query(
+            ElementModel.id, ElementModel.guid, ElementModel.ifc_type, ElementModel.name, ElementModel.tag
+        ).filter(
+            ElementModel.id == any_(bindparam("node_ids", list(levels), type_=UUID_ARRAY))
+        ).all()
+        nodes = [
+            {
+                "id": str(row.id),
+                "guid": str(row.guid),
+                "ifc_type": row.ifc_type,
+                "name": row.name,
+                "tag": row.tag,
+                "depth": levels[row.id]
+            }
+            for row in rows
+        ]
+        nodes.sort(key=lambda node: (node["depth"], node["ifc_type"], node["name"] or ""))
+        return nodes
+
+
+# Instance globale du service
+graph_service = GraphService()
@@ -2,73 +2,222 @@
 Service de parsing IFCXML en streaming
 
 Parse les fichiers IFCXML et extrait les entités, éléments et relations.
+
+Sur une nouvelle révision d'un modèle existant (parsing incrémental), chaque
+entité est comparée à la révision précédente par son empreinte de contenu:
+seules les lignes ajoutées, modifiées ou supprimées sont écrites.
 """
 
+import pickle
+import struct
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 from uuid import UUID
-from lxml import etree
 from lxml.etree import _Element as Element
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import ProgressTracker, StageTimer
 from app.models.database import (
     Model, Element as ElementModel, Relationship, Space, Storey
 )
 from app.utils.ifc_utils import (
     extract_guid, extract_name, extract_description, extract_tag,
     get_ifc_type, is_hierarchy_entity, is_element_entity,
-    extract_properties, extract_quantities, extract_reference
+    extract_properties, extract_quantities, extract_reference,
+    extract_references, extract_property_set, extract_property_value,
+    extract_attribute_or_child, compute_content_hash, element_id_for,
+    RELATIONSHIP_ROLES, RELATIONSHIP_TYPES, PROPERTY_SET_TYPES, PROPERTY_VALUE_TYPES,
+    HIERARCHY_ENTITY_TYPES, ELEMENT_ENTITY_TYPES
+)
+from app.utils.xml_utils import iter_entities
+from app.utils.ifc_guid import parse_guid
+from app.utils.geometry_utils import (
+    GeometryReader, length_unit_scale, POINT, MATRIX, BOX, GEOMETRY_ENTITY_TYPES
 )
+from app.utils.reference_store import (
+    SpillBudget, CompactTable, UUIDMap, RecordLog, BlobLog, BlobTable, reference_key, record_key
+)
+from app.services.property_service import property_service
+from app.services.tree_service import tree_service, HIERARCHY_COLUMNS
 
 
-class ParserService:
-    """Service de parsing IFCXML"""
+# Taille des lots d'écriture (mises à jour, insertions et suppressions en masse)
+WRITE_BATCH_SIZE = 5000
+
+# Types de relations extraites, codés sur un octet dans les tables de références
+RELATIONSHIP_CODES = {relationship_type: code for code, relationship_type in enumerate(RELATIONSHIP_TYPES)}
+
+# Enregistrement d'une relation: code du type + ID source + ID cible
+RELATIONSHIP_RECORD_SIZE = 1 + 16 + 16
+
+# Élément de la révision précédente: ID DB + empreinte + indicateur (revu dans le fichier)
+EXISTING_RECORD_SIZE = 16 + 16 + 1
+NOT_SEEN, SEEN = b"\x00", b"\x01"
+
+# Changements d'une révision, par élément
+CHANGE_TYPES = ("added", "modified", "removed")
+
+# Empreinte absente (éléments antérieurs aux empreintes de contenu)
+NO_CONTENT_HASH = bytes(16)
+
+# Sérialisation des Psets/Qtos dans les tables de références
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# Valeurs géométriques mémorisées par référence: point, matrice 3x4, boîte
+GEOMETRY_FORMATS = {POINT: struct.Struct("<3d"), MATRIX: struct.Struct("<12d"), BOX: struct.Struct("<6d")}
+
+# Nombre d'entités lues entre deux mises à jour de l'avancement
+PROGRESS_EVERY = 1000
+
+# Lectures complètes du fichier par le parsing (définitions, entités, relations)
+PARSE_READS = 3
+
+# Lectures des définitions géométriques (références vers des entités écrites plus loin)
+MAX_GEOMETRY_PASSES = 3
+
+# Entités portant l'unité de longueur du fichier
+LENGTH_UNIT_TYPES = ["IfcProject", "IfcUnitAssignment", "IfcSIUnit", "IfcConversionBasedUnit"]
+
+
+class ParseContext:
+    """État d'un parsing: une instance par fichier parsé, jamais partagée entre threads"""
     
     def __init__(self):
-        """Initialise le service"""
-        self.guid_to_element_id: Dict[UUID, UUID] = {}  # GUID IFC -> ID DB
-        self.references_to_resolve: List[Dict] = []  # Références à résoudre plus tard
+        """Initialise un état vide"""
+        # Tables de références compactes (reference_store), ouvertes le temps d'un parsing
+        self.reference_budget: Optional[SpillBudget] = None
+        self.references_to_resolve: Optional[RecordLog] = None  # (ID élément, GUID niveau) à résoudre plus tard
+        self.entity_refs: Optional[CompactTable] = None  # Clé d'attribut XML id (ou GUID) -> GUID IFC des entités parsées
+        self.model_id: Optional[UUID] = None  # Modèle parsé (IDs des éléments dérivés du GUID)
+        self.spatial_parents: Optional[UUIDMap] = None  # ID DB enfant -> ID DB parent
+        self.host_parents: Optional[UUIDMap] = None  # ID DB ouverture/remplissage -> ID DB hôte (VOIDS, FILLS)
+        # Psets/Qtos sérialisés (pickle), libérés après usage
+        self.property_sets: Optional[BlobTable] = None  # Clé d'attribut XML id -> (colonne, nom, valeurs, refs)
+        self.property_values: Optional[BlobTable] = None  # Clé d'attribut XML id -> (nom, valeur)
+        self.property_assignments: Optional[BlobLog] = None  # (refs d'éléments, ref d'ensemble, ensemble inclus)
+        self.assigned_sets: Optional[BlobTable] = None  # Clé de ref d'élément -> {colonne: {ensemble: valeurs}}
+        self.relationship_keys: Optional[CompactTable] = None  # Empreinte -> (code du type, ID source, ID cible)
+        self.geometry: Dict[str, CompactTable] = {}  # Genre -> (clé d'attribut XML id -> valeur packée)
+        self.geometry_reader = GeometryReader(self._lookup_geometry, self._register_geometry)
+        self.geometry_misses = 0  # Références géométriques non résolues (lecture en cours)
+        self.length_scale: Optional[float] = None  # Mètres par unité de longueur du fichier
+        self.progress: Optional[ProgressTracker] = None  # Avancement du parsing en cours
+        # Parsing incrémental
+        self.incremental = False
+        self.existing_elements: Optional[CompactTable] = None  # GUID IFC -> ID DB, empreinte, revu
+        self.pending_inserts: Dict[type, List[Dict[str, Any]]] = {  # Lignes nouvelles à écrire
+            ElementModel: [], Storey: [], Space: []
+        }
+        self.pending_updates: List[Dict[str, Any]] = []  # Éléments modifiés à écrire
+        self.changes: Dict[str, RecordLog] = {}  # added/modified/removed -> GUIDs
+        self.changed_element_ids: Optional[RecordLog] = None  # Éléments ajoutés ou modifiés
     
-    def parse_file(
+    def parse(
         self,
         xml_file_path: Path,
         model_id: UUID,
         tenant_id: UUID,
-        db: Session
-    ) -> Dict[str, int]:
-        """
-        Parse un fichier IFCXML et stocke les données dans la base.
-        
-        Args:
-            xml_file_path: Chemin vers le fichier XML
-            model_id: ID du modèle dans la base
-            tenant_id: ID du locataire
-            db: Session de base de données
-            
-        Returns:
-            Dictionnaire avec statistiques (nombre d'éléments, espaces, etc.)
-        """
+        db: Session,
+        incremental: bool = False,
+        progress: Optional[ProgressTracker] = None
+    ) -> Dict[str, Any]:
+        """Parse un fichier (voir ParserService.parse_file) et libère les tables de références"""
+        self._open_reference_stores()
+        self.progress = progress
+        try:
+            return self._parse_file(xml_file_path, model_id, tenant_id, db, incremental)
+        finally:
+            self.progress = None
+            self._close_reference_stores()
+    
+    def _open_reference_stores(self):
+        """Ouvre les tables de références du parsing, dans le budget mémoire configuré"""
+        self.reference_budget = SpillBudget(
+            settings.PARSER_MEMORY_BUDGET_MB * 1024 * 1024, settings.PARSER_SPILL_DIR
+        )
+        self.entity_refs = CompactTable(self.reference_budget)
+        self.spatial_parents = UUIDMap(self.reference_budget)
+        self.host_parents = UUIDMap(self.reference_budget)
+        self.relationship_keys = CompactTable(self.reference_budget, value_size=RELATIONSHIP_RECORD_SIZE)
+        self.references_to_resolve = RecordLog(self.reference_budget, record_size=32)
+        self.geometry = {
+            kind: CompactTable(self.reference_budget, value_size=value_format.size)
+            for kind, value_format in GEOMETRY_FORMATS.items()
+        }
+        self.property_sets = BlobTable(self.reference_budget)
+        self.property_values = BlobTable(self.reference_budget)
+        self.property_assignments = BlobLog(self.reference_budget)
+        self.assigned_sets = BlobTable(self.reference_budget)
+        self.existing_elements = CompactTable(self.reference_budget, value_size=EXISTING_RECORD_SIZE)
+        self.changes = {change: RecordLog(self.reference_budget, record_size=16) for change in CHANGE_TYPES}
+        self.changed_element_ids = RecordLog(self.reference_budget, record_size=16)
+    
+    def _close_reference_stores(self):
+        """Libère les tables de références (tampons et fichiers de débordement)"""
+        stores = (
+            self.entity_refs, self.spatial_parents, self.host_parents,
+            self.relationship_keys, self.references_to_resolve,
+            self.existing_elements, self.changed_element_ids
+        )
+        for store in (*stores, *self.geometry.values(), *self.changes.values()):
+            if store is not None:
+                store.close()
+        self.entity_refs = self.spatial_parents = self.host_parents = self.relationship_keys = None
+        self.references_to_resolve = self.existing_elements = self.changed_element_ids = None
+        self.geometry = {}
+        self.changes = {}
+        self._clear_property_state()
+        self._clear_assigned_sets()
+    
+    def _parse_file(
+        self,
+        xml_file_path: Path,
+        model_id: UUID,
+        tenant_id: UUID,
+        db: Session,
+        incremental: bool
+    ) -> Dict[str, Any]:
+        """Parse le fichier, tables de références ouvertes"""
         stats = {
             "elements": 0,
             "spaces": 0,
             "storeys": 0,
             "relationships": 0,
+            "tree_nodes": 0,
+            "property_values": 0,
+            "bounding_boxes": 0,
             "project_guid": None
         }
         
-        # Réinitialiser les caches
-        self.guid_to_element_id.clear()
-        self.references_to_resolve.clear()
+        # Réinitialiser les lots d'écriture (tables de références: ouvertes vides)
+        for rows in self.pending_inserts.values():
+            rows.clear()
+        self.pending_updates.clear()
+        self.model_id = model_id
+        self.length_scale = None
+        self.incremental = incremental
+        stages = {}
+        file_size = Path(xml_file_path).stat().st_size
         
-        # Parser en streaming
-        context = etree.iterparse(
-            str(xml_file_path),
-            events=("end",),
-            huge_tree=True
-        )
+        timer = StageTimer()
+        if incremental:
+            self._start_stage("load_previous")
+            self._load_existing_elements(db, model_id)
+            stages["load_previous"] = timer.stop(elements=len(self.existing_elements))
+        
+        # Psets/Qtos affectés par IfcRelDefinesByProperties, placements et
+        # représentations, lus avant les entités: chaque élément est écrit une
+        # seule fois, avec sa boîte englobante et son empreinte définitives
+        timer = StageTimer()
+        passes = self._collect_definitions(xml_file_path)
+        stages["definitions"] = timer.stop(bytes_read=file_size * passes)
         
-        # Première passe: extraire les entités de hiérarchie et les éléments
-        for event, elem in context:
+        # Première passe (en streaming): extraire les entités de hiérarchie et les éléments
+        timer = StageTimer()
+        entity_types = [*HIERARCHY_ENTITY_TYPES, *ELEMENT_ENTITY_TYPES]
+        for elem in self._read_entities("entities", xml_file_path, entity_types):
             ifc_type = get_ifc_type(elem)
             
             # Parser les entités de hiérarchie
@@ -82,17 +231,198 @@ class ParserService:
                 self._parse_element(
                     elem, ifc_type, model_id, tenant_id, db, stats
                 )
-            
-            # Nettoyer pour libérer la mémoire
-            elem.clear()
-            while elem.getprevious() is not None:
-                del elem.getparent()[0]
+        
+        self._flush_writes(db)
+        self._clear_assigned_sets()
+        stages["entities"] = timer.stop(elements=stats["elements"], bytes_read=file_size)
         
         # Deuxième passe: résoudre les relations
-        self._resolve_relationships(xml_file_path, model_id, tenant_id, db, stats)
+        timer = StageTimer()
+        self._resolve_relationships(xml_file_path)
+        stages["relationships"] = timer.stop(bytes_read=file_size)
+        stages["relationships"]["spilled_mb"] = round(self.reference_budget.spilled_bytes / (1024 * 1024), 1)
+        
+        timer = StageTimer()
+        self._start_stage("flush")
+        relationship_changes = self._store_relationships(db, model_id, tenant_id, stats)
+        
+        # Éléments de la révision précédente absents du fichier
+        self._remove_missing_elements(db, model_id)
+        db.flush()
+        stages["flush"] = timer.stop(elements=stats["relationships"])
+        
+        # Hiérarchie spatiale précalculée (arbre + colonnes project_id..space_id):
+        # mise à jour sur place si possible, reconstruction complète sinon
+        timer = StageTimer()
+        self._start_stage("tree")
+        tree_nodes = None
+        if incremental:
+            tree_nodes = tree_service.update_tree(
+                db, model_id, tenant_id, self.spatial_parents, list(self._changed_element_ids())
+            )
+        if tree_nodes is None:
+            tree_nodes = tree_service.build_tree(
+                db, model_id, tenant_id, self.spatial_parents, self.reference_budget
+            )
+        stats["tree_nodes"] = tree_nodes
+        stages["tree"] = timer.stop(elements=tree_nodes)
+        
+        # Valeurs typées pour les filtres par intervalle
+        timer = StageTimer()
+        self._start_stage("property_index")
+        stats["property_values"] = property_service.index_model(
+            db, model_id, self._changed_element_ids() if incremental else None
+        )
+        stages["property_index"] = timer.stop(elements=stats["property_values"])
+        stats["stages"] = stages
+        
+        if incremental:
+            stats["changes"] = {
+                change: [str(UUID(bytes=guid)) for guid in guids] for change, guids in self.changes.items()
+            }
+            stats["relationship_changes"] = relationship_changes
         
         return stats
     
+    def _read_entities(self, stage: str, xml_file_path: Path, tags: Iterable[str]) -> Iterator[Element]:
+        """Lit les entités du fichier pour une sous-étape, en suivant l'avancement"""
+        if self.progress is None:
+            yield from iter_entities(xml_file_path, tags)
+            return
+        
+        self.progress.start_stage(stage)
+        count = 0
+        for elem in iter_entities(xml_file_path, tags, on_read=self.progress.read):
+            yield elem
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                self.progress.count(count)
+        self.progress.count(count)
+    
+    def _start_stage(self, stage: str):
+        """Signale une sous-étape qui ne lit pas le fichier"""
+        if self.progress is not None:
+            self.progress.start_stage(stage, reads_file=False)
+    
+    def _load_existing_elements(self, db: Session, model_id: UUID):
+        """Charge GUID, ID et empreinte des éléments de la révision précédente (sans JSONB)"""
+        rows = db.query(
+            ElementModel.guid, ElementModel.id, ElementModel.content_hash
+        ).filter(ElementModel.model_id == model_id).yield_per(WRITE_BATCH_SIZE)
+        for row in rows:
+            content_hash = bytes.fromhex(row.content_hash) if row.content_hash else NO_CONTENT_HASH
+            self.existing_elements.put(row.guid.bytes, row.id.bytes + content_hash + NOT_SEEN)
+    
+    def _changed_element_ids(self) -> Iterator[UUID]:
+        """IDs des éléments ajoutés ou modifiés"""
+        for record in self.changed_element_ids:
+            yield UUID(bytes=record)
+    
+    def _entity_values(self, element: Element, ifc_type: str, guid: UUID) -> Dict[str, Any]:
+        """Champs stockés d'une entité, Psets/Qtos affectés par relation inclus"""
+        properties = extract_properties(element)
+        quantities = extract_quantities(element)
+        
+        xml_id = element.get("id")
+        assigned = self._load_object(self.assigned_sets, xml_id) if xml_id else None
+        assigned = assigned or self._load_object(self.assigned_sets, str(guid))
+        if assigned:
+            # Un ensemble affecté par relation remplace l'ensemble inclus de même nom
+            properties.update(assigned["properties"])
+            quantities.update(assigned["quantities"])
+        
+        return {
+            "ifc_type": ifc_type,
+            "name": extract_name(element),
+            "description": extract_description(element),
+            "tag": extract_tag(element),
+            "properties": properties,
+            "quantities": quantities
+        }
+    
+    def _store_element(
+        self,
+        element: Element,
+        guid: UUID,
+        values: Dict[str, Any],
+        model_id: UUID,
+        tenant_id: UUID,
+        db: Session
+    ) -> tuple:
+        """
+        Écrit un élément selon son empreinte: insertion, mise à jour ou rien.
+        
+        Args:
+            element: Élément XML
+            guid: GUID IFC de l'élément
+            values: Champs à stocker (content_hash inclus)
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            db: Session de base de données
+        
+        Returns:
+            Tuple (ID de l'élément, 'added' | 'modified' | 'unchanged')
+        """
+        existing = self.existing_elements.get(guid.bytes)
+        if existing is not None and existing[32:] == SEEN:
+            # GUID déjà rencontré dans le fichier
+            existing = None
+        
+        if existing is None:
+            # ID dérivé du GUID: écrit en lot, sans aller-retour vers la base
+            element_id, change = element_id_for(model_id, guid), "added"
+            self._queue_insert(db, ElementModel, {
+                "id": element_id,
+                "model_id": model_id,
+                "tenant_id": tenant_id,
+                "guid": guid,
+                **values
+            })
+        else:
+            self.existing_elements.put(guid.bytes, existing[:32] + SEEN)
+            element_id, previous_hash = UUID(bytes=existing[:16]), existing[16:32]
+            if previous_hash.hex() == values["content_hash"]:
+                change = "unchanged"
+            else:
+                self.pending_updates.append({"id": element_id, **values})
+                if len(self.pending_updates) >= WRITE_BATCH_SIZE:
+                    self._flush_writes(db)
+                change = "modified"
+        
+        if change != "unchanged" and self.incremental:
+            self.changes[change].append(guid.bytes)
+            self.changed_element_ids.append(element_id.bytes)
+        
+        self._register_entity(element, guid)
+        return element_id, change
+    
+    def _queue_insert(self, db: Session, table: type, row: Dict[str, Any]):
+        """
+        Ajoute une ligne nouvelle au lot d'insertion de sa table.
+        
+        Args:
+            db: Session de base de données
+            table: Modèle (ElementModel, Storey ou Space)
+            row: Valeurs de la ligne, clé primaire incluse
+        """
+        rows = self.pending_inserts[table]
+        rows.append(row)
+        if len(rows) >= WRITE_BATCH_SIZE:
+            self._flush_writes(db)
+    
+    def _flush_writes(self, db: Session):
+        """
+        Écrit les lignes en attente: insertions en masse (éléments d'abord, les
+        niveaux et espaces les référencent), puis mises à jour par clé primaire.
+        """
+        for table, rows in self.pending_inserts.items():
+            if rows:
+                db.execute(insert(table), rows)
+                rows.clear()
+        if self.pending_updates:
+            db.execute(update(ElementModel), self.pending_updates)
+            self.pending_updates.clear()
+    
     def _parse_hierarchy_entity(
         self,
         element: Element,
@@ -107,26 +437,15 @@ class ParserService:
         if not guid:
             return
         
-        name = extract_name(element)
-        description = extract_description(element)
-        
-        # Créer l'élément de base
-        element_db = ElementModel(
-            model_id=model_id,
-            tenant_id=tenant_id,
-            guid=guid,
-            ifc_type=ifc_type,
-            name=name,
-            description=description,
-            properties=extract_properties(element),
-            quantities=extract_quantities(element)
+        values = self._entity_values(element, ifc_type, guid)
+        elevation = self._extract_elevation(element) if ifc_type == "IfcBuildingStorey" else None
+        geometry = self._geometry_values(element, stats)
+        values["content_hash"] = compute_content_hash(
+            {**values, "elevation": elevation, **self._hashed_geometry(geometry)}
         )
+        values.update(geometry)
         
-        db.add(element_db)
-        db.flush()  # Pour obtenir l'ID
-        
-        # Stocker le mapping GUID -> ID
-        self.guid_to_element_id[guid] = element_db.id
+        element_id, change = self._store_element(element, guid, values, model_id, tenant_id, db)
         
         # Traitement spécifique par type
         if ifc_type == "IfcProject":
@@ -137,37 +456,47 @@ class ParserService:
                 model.project_guid = guid
         
         elif ifc_type == "IfcBuildingStorey":
-            # Extraire l'élévation si disponible
-            elevation = self._extract_elevation(element)
-            
-            storey = Storey(
-                element_id=element_db.id,
-                model_id=model_id,
-                tenant_id=tenant_id,
-                guid=guid,
-                name=name,
-                elevation=elevation,
-                properties=extract_properties(element),
-                quantities=extract_quantities(element)
-            )
-            db.add(storey)
+            storey_values = {
+                "name": values["name"],
+                "elevation": elevation,
+                "properties": values["properties"]
+            }
+            if change == "added":
+                self._queue_insert(db, Storey, {
+                    "id": element_id,
+                    "element_id": element_id,
+                    "model_id": model_id,
+                    "tenant_id": tenant_id,
+                    "guid": guid,
+                    **storey_values
+                })
+            elif change == "modified":
+                db.query(Storey).filter(
+                    Storey.model_id == model_id, Storey.element_id == element_id
+                ).update(storey_values, synchronize_session=False)
             stats["storeys"] += 1
         
         elif ifc_type == "IfcSpace":
-            # Extraire le numéro de pièce
-            number = extract_tag(element)
-            
-            space = Space(
-                element_id=element_db.id,
-                model_id=model_id,
-                tenant_id=tenant_id,
-                guid=guid,
-                name=name,
-                number=number,
-                properties=extract_properties(element),
-                quantities=extract_quantities(element)
-            )
-            db.add(space)
+            # Le numéro de pièce est le tag de l'espace
+            space_values = {
+                "name": values["name"],
+                "number": values["tag"],
+                "properties": values["properties"],
+                "quantities": values["quantities"]
+            }
+            if change == "added":
+                self._queue_insert(db, Space, {
+                    "id": element_id,
+                    "element_id": element_id,
+                    "model_id": model_id,
+                    "tenant_id": tenant_id,
+                    "guid": guid,
+                    **space_values
+                })
+            elif change == "modified":
+                db.query(Space).filter(
+                    Space.model_id == model_id, Space.element_id == element_id
+                ).update(space_values, synchronize_session=False)
             stats["spaces"] += 1
         
         stats["elements"] += 1
@@ -186,50 +515,63 @@ class ParserService:
         if not guid:
             return
         
-        name = extract_name(element)
-        description = extract_description(element)
-        tag = extract_tag(element)
-        
         # Extraire les relations de hiérarchie (seront résolues plus tard)
         storey_ref = self._extract_storey_reference(element)
-        space_ref = self._extract_space_reference(element)
-        
-        element_db = ElementModel(
-            model_id=model_id,
-            tenant_id=tenant_id,
-            guid=guid,
-            ifc_type=ifc_type,
-            name=name,
-            description=description,
-            tag=tag,
-            properties=extract_properties(element),
-            quantities=extract_quantities(element),
-            attributes=self._extract_attributes(element)
-        )
         
-        db.add(element_db)
-        db.flush()
+        values = self._entity_values(element, ifc_type, guid)
+        values["attributes"] = self._extract_attributes(element)
+        geometry = self._geometry_values(element, stats)
+        values["content_hash"] = compute_content_hash({**values, **self._hashed_geometry(geometry)})
+        values.update(geometry)
         
-        # Stocker le mapping
-        self.guid_to_element_id[guid] = element_db.id
+        element_id, change = self._store_element(element, guid, values, model_id, tenant_id, db)
         
-        # Stocker les références à résoudre
-        if storey_ref or space_ref:
-            self.references_to_resolve.append({
-                "element_id": element_db.id,
-                "storey_ref": storey_ref,
-                "space_ref": space_ref
-            })
+        # Stocker les références à résoudre (l'espace est résolu par les relations)
+        if storey_ref:
+            self.references_to_resolve.append(element_id.bytes + storey_ref.bytes)
         
         stats["elements"] += 1
     
+    def _hashed_geometry(self, geometry: Dict[str, Any]) -> Dict[str, Any]:
+        """Part de la géométrie dans l'empreinte (rien sans boîte: empreintes antérieures inchangées)"""
+        return {"geometry": geometry["geometry"]} if geometry["geometry"] else {}
+    
+    def _register_entity(self, element: Element, guid: UUID):
+        """Enregistre une entité parsée pour la résolution des références"""
+        # Les références IFCXML pointent vers l'attribut id (ex: ref="i16")
+        self.entity_refs.put(reference_key(element.get("id") or str(guid)), guid.bytes)
+    
+    def _lookup_reference(self, ref: str) -> Optional[UUID]:
+        """
+        Résout une référence (attribut id XML ou GUID) en ID d'élément DB.
+        
+        L'ID est dérivé du GUID (element_id_for): seule l'appartenance de
+        l'entité au fichier parsé est conservée en mémoire.
+        
+        Args:
+            ref: Valeur de ref/href
+        
+        Returns:
+            ID de l'élément ou None si l'entité n'a pas été parsée
+        """
+        guid = self.entity_refs.get(reference_key(ref))
+        if guid is None:
+            # GUID dans une autre forme que l'attribut id (casse, accolades, GlobalId...)
+            parsed = parse_guid(ref)
+            if parsed is None:
+                return None
+            guid = self.entity_refs.get(reference_key(str(parsed)))
+            if guid is None:
+                return None
+        return element_id_for(self.model_id, UUID(bytes=guid))
+    
     def _extract_elevation(self, element: Element) -> Optional[float]:
         """Extrait l'élévation d'un niveau"""
-        elevation_elem = element.find(".//{*}Elevation")
-        if elevation_elem is not None and elevation_elem.text:
+        elevation = extract_attribute_or_child(element, "Elevation")
+        if elevation:
             try:
-                return float(elevation_elem.text.strip())
-            except (ValueError, AttributeError):
+                return float(elevation)
+            except ValueError:
                 pass
         return None
     
@@ -240,17 +582,7 @@ class ParserService:
         if contained_in is not None:
             ref = extract_reference(contained_in)
             if ref:
-                try:
-                    return UUID(ref)
-                except ValueError:
-                    pass
-        return None
-    
-    def _extract_space_reference(self, element: Element) -> Optional[UUID]:
-        """Extrait la référence à l'espace (Space)"""
-        # Chercher dans ContainedInStructure ou BoundedBy
-        # Pour l'instant, on cherche dans les relations
-        # Ce sera complété dans la résolution des relations
+                return parse_guid(ref)
         return None
     
     def _extract_attributes(self, element: Element) -> Dict[str, Any]:
@@ -266,123 +598,430 @@ class ParserService:
         
         return attributes
     
-    def _resolve_relationships(
-        self,
-        xml_file_path: Path,
-        model_id: UUID,
-        tenant_id: UUID,
-        db: Session,
-        stats: Dict
-    ):
+    def _resolve_relationships(self, xml_file_path: Path):
         """Résout les relations entre éléments"""
-        # Résoudre les références de hiérarchie stockées
-        for ref_data in self.references_to_resolve:
-            element_id = ref_data["element_id"]
-            storey_ref = ref_data.get("storey_ref")
-            
-            if storey_ref and storey_ref in self.guid_to_element_id:
-                storey_element_id = self.guid_to_element_id[storey_ref]
-                # Trouver le storey dans la table storeys
-                storey = db.query(Storey).filter(
-                    Storey.element_id == storey_element_id
-                ).first()
-                
-                if storey:
-                    element = db.query(ElementModel).filter(
-                        ElementModel.id == element_id
-                    ).first()
-                    if element:
-                        element.storey_id = storey.element_id
-        
         # Parser les relations explicites (IfcRelContainedInSpatialStructure, etc.)
-        context = etree.iterparse(
-            str(xml_file_path),
-            events=("end",),
-            huge_tree=True,
-            tag=lambda x: x and (
-                "IfcRelContainedInSpatialStructure" in x or
-                "IfcRelAggregates" in x or
-                "IfcRelVoidsElement" in x or
-                "IfcRelFillsElement" in x
-            )
-        )
+        for elem in self._read_entities("relationships", xml_file_path, RELATIONSHIP_ROLES):
+            self._parse_relationship(elem)
         
-        for event, elem in context:
-            self._parse_relationship(elem, model_id, tenant_id, db, stats)
-            elem.clear()
-            while elem.getprevious() is not None:
-                del elem.getparent()[0]
+        # Niveaux référencés par les éléments (ContainedInStructure): arêtes de la
+        # hiérarchie, storey_id est écrit par la construction de l'arbre
+        for record in self.references_to_resolve:
+            storey_element_id = self._lookup_reference(str(UUID(bytes=record[16:])))
+            if storey_element_id is not None:
+                self.spatial_parents.setdefault(UUID(bytes=record[:16]), storey_element_id)
+        
+        # Ouvertures et remplissages hors de la structure spatiale: sous leur hôte
+        for child_id, host_id in self.host_parents.items():
+            self.spatial_parents.setdefault(child_id, host_id)
     
-    def _parse_relationship(
-        self,
-        element: Element,
-        model_id: UUID,
-        tenant_id: UUID,
-        db: Session,
-        stats: Dict
-    ):
+    def _parse_relationship(self, element: Element):
         """Parse une relation IFC"""
         ifc_type = get_ifc_type(element)
+        relationship_type, relating_role, related_role = RELATIONSHIP_ROLES[ifc_type]
         
-        # Déterminer le type de relation
-        relationship_type = "CONTAINS"
-        if "Aggregates" in ifc_type:
-            relationship_type = "AGGREGATES"
-        elif "Voids" in ifc_type:
-            relationship_type = "VOIDS"
-        elif "Fills" in ifc_type:
-            relationship_type = "FILLS"
+        # Extraire les références (rôles propres à chaque type de relation)
+        relating_obj = element.find("{*}" + relating_role)
+        related_objs = element.find("{*}" + related_role)
         
-        # Extraire les références
-        relating_obj = element.find(".//{*}RelatingObject")
-        related_objs = element.findall(".//{*}RelatedObjects//{*}Entity")
-        
-        if not relating_obj or not related_objs:
-            return
-        
-        from_ref = extract_reference(relating_obj)
-        if not from_ref:
+        if relating_obj is None or related_objs is None:
             return
         
-        try:
-            from_guid = UUID(from_ref)
-        except ValueError:
+        from_refs = extract_references(relating_obj)
+        if not from_refs:
             return
         
-        if from_guid not in self.guid_to_element_id:
+        from_element_id = self._lookup_reference(from_refs[0])
+        if from_element_id is None:
             return
         
-        from_element_id = self.guid_to_element_id[from_guid]
-        
         # Créer les relations pour chaque objet lié
-        for related_obj in related_objs:
-            to_ref = extract_reference(related_obj)
-            if not to_ref:
+        for to_ref in extract_references(related_objs):
+            to_element_id = self._lookup_reference(to_ref)
+            if to_element_id is None:
                 continue
             
-            try:
-                to_guid = UUID(to_ref)
-            except ValueError:
-                continue
+            self._add_relationship(relationship_type, from_element_id, to_element_id)
             
-            if to_guid not in self.guid_to_element_id:
-                continue
+            # Arêtes de la hiérarchie spatiale (la décomposition prime sur le contenu)
+            if relationship_type == "AGGREGATES":
+                self.spatial_parents[to_element_id] = from_element_id
+            elif relationship_type == "CONTAINS":
+                self.spatial_parents.setdefault(to_element_id, from_element_id)
+            else:
+                self.host_parents.setdefault(to_element_id, from_element_id)
+    
+    def _relationship_record(
+        self,
+        relationship_type: str,
+        from_element_id: UUID,
+        to_element_id: UUID
+    ) -> Optional[bytes]:
+        """Enregistrement de taille fixe d'une relation (None si le type n'est pas extrait)"""
+        code = RELATIONSHIP_CODES.get(relationship_type)
+        if code is None:
+            return None
+        return bytes((code,)) + from_element_id.bytes + to_element_id.bytes
+    
+    def _relationship_key(
+        self,
+        relationship_type: str,
+        from_element_id: UUID,
+        to_element_id: UUID
+    ) -> Optional[bytes]:
+        """Clé d'une relation dans relationship_keys (None si le type n'est pas extrait)"""
+        record = self._relationship_record(relationship_type, from_element_id, to_element_id)
+        return record_key(record) if record is not None else None
+    
+    def _add_relationship(self, relationship_type: str, from_element_id: UUID, to_element_id: UUID):
+        """Enregistre une relation parsée (les doublons sont ignorés)"""
+        record = self._relationship_record(relationship_type, from_element_id, to_element_id)
+        self.relationship_keys.put(record_key(record), record, replace=False)
+    
+    def _store_relationships(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        stats: Dict
+    ) -> int:
+        """
+        Écrit les relations parsées, en ne touchant que celles qui ont changé.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            stats: Statistiques à compléter
+        
+        Returns:
+            Nombre de relations ajoutées ou supprimées
+        """
+        # Relations déjà en base et conservées (empreintes des enregistrements)
+        existing = CompactTable(self.reference_budget, value_size=0)
+        obsolete: List[UUID] = []
+        added = 0
+        try:
+            if self.incremental:
+                rows = db.query(
+                    Relationship.id, Relationship.relationship_type,
+                    Relationship.from_element_id, Relationship.to_element_id
+                ).filter(Relationship.model_id == model_id)
+                for row in rows:
+                    key = self._relationship_key(
+                        row.relationship_type, row.from_element_id, row.to_element_id
+                    )
+                    if key is None or key in existing or key not in self.relationship_keys:
+                        obsolete.append(row.id)
+                    else:
+                        existing.put(key, b"")
             
-            to_element_id = self.guid_to_element_id[to_guid]
+            for start in range(0, len(obsolete), WRITE_BATCH_SIZE):
+                db.query(Relationship).filter(
+                    Relationship.id.in_(obsolete[start:start + WRITE_BATCH_SIZE])
+                ).delete(synchronize_session=False)
             
-            # Créer la relation
-            relationship = Relationship(
-                model_id=model_id,
-                tenant_id=tenant_id,
-                relationship_type=relationship_type,
-                from_element_id=from_element_id,
-                to_element_id=to_element_id
+            # Nouvelles relations, insérées par lots au fil du parcours de la table
+            new_rows = []
+            for key, record in self.relationship_keys.items():
+                if key in existing:
+                    continue
+                new_rows.append({
+                    "model_id": model_id,
+                    "tenant_id": tenant_id,
+                    "relationship_type": RELATIONSHIP_TYPES[record[0]],
+                    "from_element_id": UUID(bytes=record[1:17]),
+                    "to_element_id": UUID(bytes=record[17:33])
+                })
+                if len(new_rows) >= WRITE_BATCH_SIZE:
+                    db.execute(insert(Relationship), new_rows)
+                    added += len(new_rows)
+                    new_rows = []
+            if new_rows:
+                db.execute(insert(Relationship), new_rows)
+                added += len(new_rows)
+        finally:
+            existing.close()
+        
+        stats["relationships"] = len(self.relationship_keys)
+        return len(obsolete) + added
+    
+    def _remove_missing_elements(self, db: Session, model_id: UUID):
+        """
+        Supprime les éléments de la révision précédente absents du nouveau fichier.
+        
+        Les colonnes de hiérarchie qui les référencent sont d'abord vidées
+        (elles sont recalculées par la construction de l'arbre).
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+        """
+        batch = []
+        for guid, existing in self.existing_elements.items():
+            if existing[32:] == SEEN:
+                continue
+            self.changes["removed"].append(guid)
+            batch.append(UUID(bytes=existing[:16]))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                self._delete_elements(db, model_id, batch)
+                batch = []
+        if batch:
+            self._delete_elements(db, model_id, batch)
+    
+    def _delete_elements(self, db: Session, model_id: UUID, element_ids: List[UUID]):
+        """Supprime un lot d'éléments après avoir vidé les colonnes qui les référencent"""
+        elements = ElementModel.__table__
+        spaces = Space.__table__
+        storeys = Storey.__table__
+        references = [
+            *((elements, column) for column in HIERARCHY_COLUMNS.values()),
+            (spaces, "storey_id"), (spaces, "building_id"), (storeys, "building_id")
+        ]
+        
+        for table, column in references:
+            db.execute(
+                update(table)
+                .where(table.c.model_id == model_id, table.c[column].in_(element_ids))
+                .values({column: None})
             )
+        # Relations, espaces, niveaux, noeuds d'arbre et valeurs typées: ON DELETE CASCADE
+        db.query(ElementModel).filter(
+            ElementModel.id.in_(element_ids)
+        ).delete(synchronize_session=False)
+    
+    def _collect_definitions(self, xml_file_path: Path) -> int:
+        """
+        Lit les Psets/Qtos et leurs affectations (IfcRelDefinesByProperties),
+        l'unité de longueur et les définitions géométriques de premier niveau.
+        
+        Les définitions géométriques qui référencent une entité écrite plus loin
+        dans le fichier sont relues (au plus MAX_GEOMETRY_PASSES lectures).
+        
+        Args:
+            xml_file_path: Chemin vers le fichier XML
+        
+        Returns:
+            Nombre de lectures du fichier
+        """
+        property_types = ["IfcRelDefinesByProperties", *PROPERTY_SET_TYPES, *PROPERTY_VALUE_TYPES]
+        self.geometry_misses = 0
+        # Les Psets/valeurs inclus dans une autre entité sont traités avec elle
+        definition_types = [*property_types, *LENGTH_UNIT_TYPES, *GEOMETRY_ENTITY_TYPES]
+        for elem in self._read_entities("definitions", xml_file_path, definition_types):
+            ifc_type = get_ifc_type(elem)
+            if ifc_type == "IfcRelDefinesByProperties":
+                self._collect_property_assignment(elem)
+            elif ifc_type in PROPERTY_SET_TYPES:
+                self._collect_property_set(elem)
+            elif ifc_type in PROPERTY_VALUE_TYPES:
+                self._collect_property_value(elem)
+            elif ifc_type in LENGTH_UNIT_TYPES:
+                if self.length_scale is None:
+                    self.length_scale = length_unit_scale(elem)
+            else:
+                self.geometry_reader.value(elem)
+        
+        self._merge_property_sets()
+        
+        passes = 1
+        while self.geometry_misses and passes < MAX_GEOMETRY_PASSES:
+            self._collect_geometry(xml_file_path)
+            passes += 1
+        return passes
+    
+    def _collect_geometry(self, xml_file_path: Path):
+        """Relit les définitions géométriques de premier niveau non encore mémorisées"""
+        self.geometry_misses = 0
+        for elem in self._read_entities("definitions", xml_file_path, GEOMETRY_ENTITY_TYPES):
+            xml_id = elem.get("id")
+            kind = self.geometry_reader.kind(get_ifc_type(elem))
+            if xml_id is not None and reference_key(xml_id) not in self.geometry[kind]:
+                self.geometry_reader.value(elem)
+    
+    def _lookup_geometry(self, kind: str, ref: str) -> Optional[tuple]:
+        """
+        Valeur mémorisée d'une définition géométrique référencée.
+        
+        Args:
+            kind: Genre de valeur (POINT, MATRIX ou BOX)
+            ref: Attribut ref de la référence
+        
+        Returns:
+            Point, matrice ou boîte; None si la définition n'est pas (encore) lue
+        """
+        packed = self.geometry[kind].get(reference_key(ref))
+        if packed is None:
+            self.geometry_misses += 1
+            return None
+        return GEOMETRY_FORMATS[kind].unpack(packed)
+    
+    def _register_geometry(self, kind: str, xml_id: str, value: tuple):
+        """Mémorise la valeur d'une définition géométrique identifiée"""
+        self.geometry[kind].put(reference_key(xml_id), GEOMETRY_FORMATS[kind].pack(*value))
+    
+    def _geometry_values(self, element: Element, stats: Dict) -> Dict[str, Any]:
+        """
+        Boîte englobante d'un produit, en mètres dans le repère du projet.
+        
+        Args:
+            element: Élément XML du produit
+            stats: Statistiques du parsing (bounding_boxes)
+        
+        Returns:
+            Colonnes geometry, bbox (x/y), bbox_z_min et bbox_z_max (None sans boîte)
+        """
+        box = self.geometry_reader.product_box(element)
+        if box is None:
+            return {"geometry": None, "bbox": None, "bbox_z_min": None, "bbox_z_max": None}
+        
+        scale = self.length_scale or 1.0
+        xmin, ymin, zmin, xmax, ymax, zmax = (round(value * scale, 6) for value in box)
+        stats["bounding_boxes"] += 1
+        return {
+            "geometry": {"bbox": [[xmin, ymin, zmin], [xmax, ymax, zmax]]},
+            "bbox": (xmin, ymin, xmax, ymax),
+            "bbox_z_min": zmin,
+            "bbox_z_max": zmax
+        }
+    
+    def _collect_property_assignment(self, element: Element):
+        """Mémorise l'affectation d'un Pset/Qto à des éléments (IfcRelDefinesByProperties)"""
+        related_objs = element.find("{*}RelatedObjects")
+        definition = element.find("{*}RelatingPropertyDefinition")
+        if related_objs is None or definition is None:
+            return
+        
+        element_refs = extract_references(related_objs)
+        if not element_refs:
+            return
+        
+        # L'ensemble est soit référencé (ref="i201"), soit inclus dans la relation
+        set_refs = extract_references(definition)
+        if set_refs:
+            self.property_assignments.append(pickle.dumps((element_refs, set_refs[0], None), PICKLE_PROTOCOL))
+            return
+        for child in definition:
+            set_column = PROPERTY_SET_TYPES.get(get_ifc_type(child))
+            if set_column:
+                self.property_assignments.append(pickle.dumps(
+                    (element_refs, None, (set_column, *extract_property_set(child))), PICKLE_PROTOCOL
+                ))
+    
+    def _collect_property_set(self, element: Element):
+        """Mémorise un IfcPropertySet/IfcElementQuantity de premier niveau"""
+        xml_id = element.get("id")
+        if xml_id:
+            set_column = PROPERTY_SET_TYPES[get_ifc_type(element)]
+            self._store_object(self.property_sets, xml_id, (set_column, *extract_property_set(element)))
+    
+    def _collect_property_value(self, element: Element):
+        """Mémorise une propriété/quantité de premier niveau (référencée par un ensemble)"""
+        xml_id = element.get("id")
+        extracted = extract_property_value(element)
+        if xml_id and extracted is not None:
+            self._store_object(self.property_values, xml_id, extracted)
+    
+    def _merge_property_sets(self):
+        """Regroupe par élément les Psets/Qtos affectés par relation (assigned_sets)"""
+        for record in self.property_assignments:
+            element_refs, set_ref, inline_set = pickle.loads(record)
+            definition = inline_set or self._load_object(self.property_sets, set_ref)
+            if definition is None:
+                continue
+            set_column, set_name, values, value_refs = definition
             
-            db.add(relationship)
-            stats["relationships"] += 1
+            for value_ref in value_refs:
+                resolved = self._load_object(self.property_values, value_ref)
+                if resolved is not None:
+                    values[resolved[0]] = resolved[1]
+            if not values:
+                continue
+            
+            for element_ref in element_refs:
+                assigned = self._load_object(self.assigned_sets, element_ref)
+                if assigned is None:
+                    assigned = {"properties": {}, "quantities": {}}
+                assigned[set_column].setdefault(set_name, {}).update(values)
+                self._store_object(self.assigned_sets, element_ref, assigned)
+        
+        self._clear_property_state()
+    
+    def _store_object(self, table: BlobTable, ref: str, value: Any):
+        """Enregistre une valeur sérialisée sous une référence (attribut id XML ou GUID)"""
+        table.put(reference_key(ref), pickle.dumps(value, PICKLE_PROTOCOL))
+    
+    def _load_object(self, table: BlobTable, ref: str) -> Any:
+        """Valeur enregistrée sous une référence (None si absente)"""
+        value = table.get(reference_key(ref))
+        return pickle.loads(value) if value is not None else None
+    
+    def _clear_property_state(self):
+        """Libère les Psets/Qtos collectés"""
+        for store in (self.property_sets, self.property_values, self.property_assignments):
+            if store is not None:
+                store.close()
+        self.property_sets = self.property_values = self.property_assignments = None
+    
+    def _clear_assigned_sets(self):
+        """Libère les Psets/Qtos regroupés par élément"""
+        if self.assigned_sets is not None:
+            self.assigned_sets.close()
+        self.assigned_sets = None
+
+
+class ParserService:
+    """
+    Service de parsing IFCXML
+    
+    Sans état: chaque parsing travaille dans son propre ParseContext, si bien
+    que plusieurs tâches peuvent parser en parallèle dans le même processus.
+    """
+    
+    def find_project_guid(self, xml_file_path: Path) -> Optional[UUID]:
+        """
+        Lit le GUID du projet (IfcProject) sans parser le reste du fichier.
+        
+        Args:
+            xml_file_path: Chemin vers le fichier XML
+        
+        Returns:
+            GUID du projet ou None
+        """
+        for elem in iter_entities(xml_file_path, ["IfcProject"]):
+            return extract_guid(elem)
+        return None
+    
+    def parse_file(
+        self,
+        xml_file_path: Path,
+        model_id: UUID,
+        tenant_id: UUID,
+        db: Session,
+        incremental: bool = False,
+        progress: Optional[ProgressTracker] = None
+    ) -> Dict[str, Any]:
+        """
+        Parse un fichier IFCXML et stocke les données dans la base.
+        
+        Args:
+            xml_file_path: Chemin vers le fichier XML
+            model_id: ID du modèle dans la base
+            tenant_id: ID du locataire
+            db: Session de base de données
+            incremental: Le modèle contient la révision précédente: n'écrire
+                         que les éléments et relations qui ont changé
+            progress: Suivi de l'avancement (sous-étape, position de lecture,
+                      entités lues), prévu pour PARSE_READS lectures du fichier
+        
+        Returns:
+            Dictionnaire avec statistiques (nombre d'éléments, espaces, etc.),
+            mesures de chaque sous-étape (stages), et en mode incrémental les
+            GUIDs ajoutés/modifiés/supprimés (changes)
+        """
+        context = ParseContext()
+        return context.parse(xml_file_path, model_id, tenant_id, db, incremental, progress)
 
 
 # Instance globale du service
 parser_service = ParserService()
-
@@ -0,0 +1,188 @@
+"""
+Service de propriétés
+
+Indexe les valeurs des Psets/Qtos d'un modèle dans la table typée
+element_property_values et compile les expressions de filtre de
+GET /elements en prédicats SQL:
+- égalité sur Ensemble.Nom: contenance JSONB (@>), index GIN jsonb_path_ops
+- égalité sur Nom seul, intervalles (> >= < <=) et différence (!=): table
+  typée, index B-tree (model_id, name, valeur). Un chemin SQL/JSON sur un
+  ensemble quelconque ($.* ? ...) ne peut pas utiliser l'index GIN.
+"""
+
+import operator
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import Element as ElementModel, ElementPropertyValue
+
+
+# Colonnes JSONB indexées (valeur de la colonne kind de element_property_values)
+PROPERTY_COLUMNS = ("properties", "quantities")
+
+SQL_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+# Taille des lots de réindexation partielle (révisions)
+INDEX_BATCH_SIZE = 5000
+
+# Une seule instruction ensembliste par colonne: pas d'aller-retour par élément
+INDEX_VALUES_SQL = """
+    INSERT INTO element_property_values
+        (element_id, kind, set_name, name, model_id, tenant_id, value_text, value_num, value_bool)
+    SELECT e.id, '{column}', left(s.key, 255), left(p.key, 255), e.model_id, e.tenant_id,
+           p.value #>> '{{}}',
+           CASE WHEN jsonb_typeof(p.value) = 'number' THEN (p.value #>> '{{}}')::float8 END,
+           CASE WHEN jsonb_typeof(p.value) = 'boolean' THEN (p.value #>> '{{}}')::boolean END
+    FROM elements e
+    CROSS JOIN LATERAL jsonb_each(e.{column}) s
+    CROSS JOIN LATERAL jsonb_each(
+        CASE WHEN jsonb_typeof(s.value) = 'object' THEN s.value ELSE '{{}}'::jsonb END
+    ) p
+    WHERE e.model_id = :model_id AND jsonb_typeof(e.{column}) = 'object' {element_filter}
+    ON CONFLICT DO NOTHING
+"""
+
+
+class PropertyService:
+    """Service de propriétés"""
+    
+    def index_model(
+        self,
+        db: Session,
+        model_id: UUID,
+        element_ids: Optional[Iterable[UUID]] = None
+    ) -> int:
+        """
+        (Re)construit les valeurs typées des Psets/Qtos d'un modèle.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            element_ids: Limiter aux éléments ajoutés/modifiés d'une révision
+                         (tout le modèle par défaut)
+        
+        Returns:
+            Nombre de valeurs indexées
+        """
+        if element_ids is not None:
+            return self._index_elements(db, model_id, element_ids)
+        
+        db.query(ElementPropertyValue).filter(
+            ElementPropertyValue.model_id == model_id
+        ).delete(synchronize_session=False)
+        
+        indexed = 0
+        for column in PROPERTY_COLUMNS:
+            result = db.execute(
+                text(INDEX_VALUES_SQL.format(column=column, element_filter="")),
+                {"model_id": model_id}
+            )
+            indexed += result.rowcount
+        
+        # Statistiques à jour pour le planificateur: sans elles, les filtres
+        # sur un modèle qui fait grossir nettement la table choisissent des
+        # boucles imbriquées. Les petits chargements attendent l'autovacuum.
+        elements = db.query(func.count(ElementModel.id)).filter(
+            ElementModel.model_id == model_id
+        ).scalar()
+        self._analyze_if_grown(db, "elements", elements)
+        self._analyze_if_grown(db, "element_property_values", indexed)
+        return indexed
+    
+    def _analyze_if_grown(self, db: Session, table: str, added_rows: int):
+        """ANALYZE d'une table si added_rows dépasse les seuils ANALYZE_MIN_ROWS/FRACTION"""
+        if added_rows < settings.ANALYZE_MIN_ROWS:
+            return
+        # reltuples: -1 (ou 0) pour une table jamais analysée
+        estimated_rows = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table}
+        ).scalar() or 0
+        if added_rows >= settings.ANALYZE_MIN_FRACTION * max(estimated_rows, 0):
+            db.execute(text(f"ANALYZE {table}"))
+    
+    def _index_elements(self, db: Session, model_id: UUID, element_ids: Iterable[UUID]) -> int:
+        """Réindexe les valeurs typées d'un sous-ensemble d'éléments (lus par lots)"""
+        element_filter = "AND e.id = ANY(CAST(:element_ids AS uuid[]))"
+        indexed = 0
+        element_ids = iter(element_ids)
+        while True:
+            batch = list(islice(element_ids, INDEX_BATCH_SIZE))
+            if not batch:
+                break
+            db.query(ElementPropertyValue).filter(
+                ElementPropertyValue.element_id.in_(batch)
+            ).delete(synchronize_session=False)
+            params = {"model_id": model_id, "element_ids": [str(element_id) for element_id in batch]}
+            for column in PROPERTY_COLUMNS:
+                result = db.execute(
+                    text(INDEX_VALUES_SQL.format(column=column, element_filter=element_filter)),
+                    params
+                )
+                indexed += result.rowcount
+        return indexed
+    
+    def build_filter_conditions(self, model_id: UUID, clauses: List[Dict[str, Any]]) -> List:
+        """
+        Compile les clauses d'un filtre en conditions sur la table elements.
+        
+        Args:
+            model_id: ID du modèle filtré
+            clauses: Clauses issues de parse_filter_expression
+        
+        Returns:
+            Liste de conditions SQLAlchemy (à combiner par ET)
+        """
+        conditions = []
+        for clause in clauses:
+            if clause["operator"] == "=" and clause["set_name"]:
+                conditions.append(self._containment_condition(clause))
+            else:
+                conditions.append(ElementModel.id.in_(self._value_subquery(model_id, clause)))
+        return conditions
+    
+    def _containment_condition(self, clause: Dict[str, Any]):
+        """Égalité Ensemble.Nom résolue par l'index GIN des colonnes JSONB"""
+        document = {clause["set_name"]: {clause["name"]: clause["value"]}}
+        return or_(
+            ElementModel.properties.contains(document),
+            ElementModel.quantities.contains(document)
+        )
+    
+    def _value_subquery(self, model_id: UUID, clause: Dict[str, Any]):
+        """Éléments dont une valeur typée satisfait la clause"""
+        values = ElementPropertyValue
+        compare = SQL_OPERATORS[clause["operator"]]
+        value = clause["value"]
+        
+        if isinstance(value, bool):
+            predicate = compare(values.value_bool, value)
+        elif isinstance(value, (int, float)):
+            predicate = compare(values.value_num, value)
+        else:
+            predicate = compare(values.value_text, value)
+        
+        query = select(values.element_id).where(
+            values.model_id == model_id,
+            values.name == clause["name"],
+            predicate
+        )
+        if clause["set_name"]:
+            query = query.where(values.set_name == clause["set_name"])
+        return query
+
+
+# Instance globale du service
+property_service = PropertyService()
@@ -0,0 +1,122 @@
+"""
+Service de recherche plein texte
+
+Recherche les éléments par nom, tag, description et valeurs textuelles de
+propriétés via la colonne générée elements.search_vector. L'index GIN porte
+sur (tenant_id, search_vector) (extension btree_gin): le filtre par locataire
+est appliqué dans le parcours d'index, pas sur les lignes trouvées dans tous
+les locataires.
+"""
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.models.database import Element as ElementModel
+
+
+# Configuration de recherche (identique à celle de ELEMENT_SEARCH_VECTOR_SQL)
+SEARCH_CONFIG = "simple"
+
+# Nombre maximum de termes par recherche
+MAX_SEARCH_TERMS = 8
+
+# Longueur minimale d'un terme pour la recherche par préfixe ('a:*' parcourrait tout l'index)
+MIN_PREFIX_LENGTH = 2
+
+
+def build_prefix_tsquery(text: str) -> str:
+    """
+    Construit une requête tsquery où chaque terme est recherché par préfixe.
+    
+    Chaque terme est cité: les caractères spéciaux de tsquery (&, |, !, :)
+    saisis par l'utilisateur restent littéraux.
+    
+    Args:
+        text: Texte saisi (ex: 'porte D-10')
+    
+    Returns:
+        Requête tsquery (ex: "'porte':* & 'D-10':*")
+    
+    Raises:
+        ValueError: Si le texte ne contient aucun terme ou trop de termes
+    """
+    terms = text.split()
+    if not terms:
+        raise ValueError("Texte de recherche vide")
+    if len(terms) > MAX_SEARCH_TERMS:
+        raise ValueError(f"Au plus {MAX_SEARCH_TERMS} termes par recherche")
+    
+    parts = []
+    for term in terms:
+        quoted = "'" + term.replace("\\", "\\\\").replace("'", "''") + "'"
+        parts.append(quoted + ":*" if len(term) >= MIN_PREFIX_LENGTH else quoted)
+    return " & ".join(parts)
+
+
+class SearchService:
+    """Service de recherche plein texte"""
+    
+    def search(
+        self,
+        db: Session,
+        tenant_id: UUID,
+        text: str,
+        model_id: Optional[UUID] = None,
+        ifc_type: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Recherche des éléments, classés par pertinence.
+        
+        Args:
+            db: Session de base de données
+            tenant_id: ID du locataire
+            text: Texte recherché (termes combinés par ET, recherche par préfixe)
+            model_id: Restreindre à un modèle (optionnel)
+            ifc_type: Restreindre à un type IFC (optionnel)
+            limit: Nombre maximum de résultats
+        
+        Returns:
+            Éléments trouvés, du plus pertinent au moins pertinent
+        
+        Raises:
+            ValueError: Si le texte de recherche est invalide
+        """
+        query_vector = func.to_tsquery(SEARCH_CONFIG, build_prefix_tsquery(text))
+        rank = func.ts_rank_cd(ElementModel.search_vector, query_vector).label("rank")
+        
+        query = db.query(
+            ElementModel.id, ElementModel.model_id, ElementModel.guid,
+            ElementModel.ifc_type, ElementModel.name, ElementModel.tag, rank
+        ).filter(
+            ElementModel.tenant_id == tenant_id,
+            ElementModel.search_vector.op("@@")(query_vector)
+        )
+        
+        if model_id:
+            query = query.filter(ElementModel.model_id == model_id)
+        
+        if ifc_type:
+            query = query.filter(ElementModel.ifc_type == ifc_type)
+        
+        rows = query.order_by(desc(rank), ElementModel.name).limit(limit).all()
+        
+        return [
+            {
+                "id": str(row.id),
+                "model_id": str(row.model_id),
+                "guid": str(row.guid),
+                "ifc_type": row.ifc_type,
+                "name": row.name,
+                "tag": row.tag,
+                "rank": row.rank
+            }
+            for row in rows
+        ]
+
+
+# Instance globale du service
+search_service = SearchService()
@@ -0,0 +1,211 @@
+"""
+Service de requêtes spatiales
+
+Recherche les éléments d'un modèle par boîte englobante (elements.bbox, index
+GiST sur l'emprise x/y, puis filtrage sur l'intervalle z) et par distance à un
+point ou à un autre élément.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, Float, func
+from sqlalchemy.orm import Session
+
+from app.models.database import Element as ElementModel
+from app.utils.geometry_utils import Box
+
+
+def parse_box(text: str) -> Box:
+    """
+    Lit une boîte saisie en 'xmin,ymin,zmin,xmax,ymax,zmax'.
+    
+    Args:
+        text: Six nombres séparés par des virgules
+    
+    Returns:
+        Boîte (xmin, ymin, zmin, xmax, ymax, zmax), coins remis dans l'ordre
+    
+    Raises:
+        ValueError: Si la boîte est invalide
+    """
+    try:
+        values = [float(item) for item in text.split(",")]
+    except ValueError:
+        raise ValueError(f"Boîte invalide (6 nombres attendus): {text}")
+    if len(values) != 6 or not all(math.isfinite(value) for value in values):
+        raise ValueError(f"Boîte invalide (6 nombres attendus): {text}")
+    low, high = values[:3], values[3:]
+    return (*(min(a, b) for a, b in zip(low, high)), *(max(a, b) for a, b in zip(low, high)))
+
+
+def expand_box(box: Box, margin: float) -> Box:
+    """Boîte élargie de margin dans toutes les directions"""
+    return (box[0] - margin, box[1] - margin, box[2] - margin, box[3] + margin, box[4] + margin, box[5] + margin)
+
+
+def _sql_box(box: Box):
+    """Emprise x/y d'une boîte en valeur box PostgreSQL"""
+    return func.box(func.point(box[0], box[1]), func.point(box[3], box[4]))
+
+
+class SpatialService:
+    """Service de requêtes spatiales sur les boîtes englobantes des éléments"""
+    
+    def element_box(self, db: Session, tenant_id: UUID, model_id: UUID, element_id: UUID) -> Tuple[bool, Optional[Box]]:
+        """
+        Boîte englobante d'un élément.
+        
+        Args:
+            db: Session de base de données
+            tenant_id: ID du locataire
+            model_id: ID du modèle
+            element_id: ID de l'élément
+        
+        Returns:
+            Tuple (élément trouvé, boîte ou None si l'élément n'a pas de géométrie)
+        """
+        geometry = db.query(ElementModel.geometry).filter(
+            ElementModel.id == element_id,
+            ElementModel.model_id == model_id,
+            ElementModel.tenant_id == tenant_id
+        ).first()
+        if geometry is None:
+            return False, None
+        bbox = (geometry[0] or {}).get("bbox")
+        return True, (tuple(bbox[0]) + tuple(bbox[1])) if bbox else None
+    
+    def within_box(
+        self,
+        db: Session,
+        tenant_id: UUID,
+        model_id: UUID,
+        box: Box,
+        contained: bool = False,
+        ifc_type: Optional[str] = None,
+        exclude_id: Optional[UUID] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Éléments dont la boîte touche (ou est contenue dans) une boîte.
+        
+        L'index GiST sélectionne les emprises x/y qui se chevauchent (&&) ou
+        sont contenues (<@); l'intervalle z est vérifié ensuite. Les résultats
+        sont dans l'ordre de l'index (non triés).
+        
+        Args:
+            db: Session de base de données
+            tenant_id: ID du locataire
+            model_id: ID du modèle
+            box: Boîte de recherche (mètres, repère du projet)
+            contained: Ne retenir que les éléments entièrement contenus
+            ifc_type: Restreindre à un type IFC (optionnel)
+            exclude_id: Élément à exclure (optionnel)
+            limit: Nombre maximum de résultats
+        
+        Returns:
+            Tuple (éléments, résultats tronqués à limit)
+        """
+        query_box = _sql_box(box)
+        if contained:
+            conditions = [
+                ElementModel.bbox.op("<@", return_type=Boolean)(query_box),
+                ElementModel.bbox_z_min >= box[2],
+                ElementModel.bbox_z_max <= box[5]
+            ]
+        else:
+            conditions = [
+                ElementModel.bbox.op("&&", return_type=Boolean)(query_box),
+                ElementModel.bbox_z_max >= box[2],
+                ElementModel.bbox_z_min <= box[5]
+            ]
+        
+        query = self._base_query(db, tenant_id, model_id, ifc_type, exclude_id).filter(*conditions)
+        rows = query.limit(limit + 1).all()
+        return [self._serialize(row) for row in rows[:limit]], len(rows) > limit
+    
+    def within_radius(
+        self,
+        db: Session,
+        tenant_id: UUID,
+        model_id: UUID,
+        point: Tuple[float, float, float],
+        radius: float,
+        ifc_type: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Éléments dont la boîte est à moins de radius d'un point, du plus proche au plus éloigné.
+        
+        Les candidats sont ceux dont la boîte touche le cube de côté 2 x radius
+        centré sur le point (index GiST); la distance exacte à la boîte
+        combine la distance x/y (point <-> box) et l'écart en z.
+        
+        Args:
+            db: Session de base de données
+            tenant_id: ID du locataire
+            model_id: ID du modèle
+            point: Point (x, y, z) en mètres, repère du projet
+            radius: Rayon de recherche en mètres
+            ifc_type: Restreindre à un type IFC (optionnel)
+            limit: Nombre maximum de résultats
+        
+        Returns:
+            Tuple (éléments avec leur distance, résultats tronqués à limit)
+        """
+        x, y, z = point
+        planar = func.point(x, y).op("<->", return_type=Float)(ElementModel.bbox)
+        vertical = func.greatest(ElementModel.bbox_z_min - z, z - ElementModel.bbox_z_max, 0.0)
+        distance = func.sqrt(planar * planar + vertical * vertical).label("distance")
+        
+        query = self._base_query(db, tenant_id, model_id, ifc_type, None, distance).filter(
+            ElementModel.bbox.op("&&", return_type=Boolean)(_sql_box(expand_box((x, y, z, x, y, z), radius))),
+            ElementModel.bbox_z_max >= z - radius,
+            ElementModel.bbox_z_min <= z + radius,
+            distance <= radius
+        )
+        rows = query.order_by(distance, ElementModel.id).limit(limit + 1).all()
+        return [self._serialize(row) for row in rows[:limit]], len(rows) > limit
+    
+    def _base_query(
+        self,
+        db: Session,
+        tenant_id: UUID,
+        model_id: UUID,
+        ifc_type: Optional[str],
+        exclude_id: Optional[UUID],
+        *columns
+    ):
+        """Requête des éléments d'un modèle (colonnes retournées par _serialize)"""
+        query = db.query(
+            ElementModel.id, ElementModel.guid, ElementModel.ifc_type, ElementModel.name,
+            ElementModel.tag, ElementModel.storey_id, ElementModel.geometry, *columns
+        ).filter(
+            ElementModel.model_id == model_id,
+            ElementModel.tenant_id == tenant_id
+        )
+        if ifc_type:
+            query = query.filter(ElementModel.ifc_type == ifc_type)
+        if exclude_id:
+            query = query.filter(ElementModel.id != exclude_id)
+        return query
+    
+    def _serialize(self, row) -> Dict[str, Any]:
+        """Élément trouvé, avec sa boîte et sa distance éventuelle"""
+        result = {
+            "id": str(row.id),
+            "guid": str(row.guid),
+            "ifc_type": row.ifc_type,
+            "name": row.name,
+            "tag": row.tag,
+            "storey_id": str(row.storey_id) if row.storey_id else None,
+            "bbox": (row.geometry or {}).get("bbox")
+        }
+        if "distance" in row._fields:
+            result["distance"] = round(row.distance, 6)
+        return result
+
+
+# Instance globale du service
+spatial_service = SpatialService()
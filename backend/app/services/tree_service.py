@@ -0,0 +1,584 @@
+"""
+Service d'arbre spatial
+
+Construit, à la fin du parsing, la hiérarchie Project → Site → Building →
+Storey → Space → éléments d'un modèle et la stocke sous forme d'ensembles
+imbriqués (nested sets) pour la servir en une seule requête indexée, ainsi
+que sa fermeture transitive (element_closure) pour filtrer les éléments par
+ancêtre avec une seule jointure indexée.
+
+Les bornes sont espacées de NODE_SPACING: une nouvelle révision insère ses
+feuilles dans les intervalles libres au lieu de renuméroter tout l'arbre.
+"""
+
+import pickle
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, List, Optional, Any
+from uuid import UUID
+
+from sqlalchemy import func, insert, or_, select, update, bindparam
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.models.database import (
+    Element as ElementModel, ElementClosure, ModelTreeNode, Space, Storey
+)
+from app.utils.reference_store import BlobTable, CompactTable, RecordLog, SpillBudget, UUIDMap
+
+
+# Ordre d'affichage des niveaux de la hiérarchie spatiale
+SPATIAL_ORDER = {
+    "IfcProject": 0,
+    "IfcSite": 1,
+    "IfcBuilding": 2,
+    "IfcBuildingStorey": 3,
+    "IfcSpace": 4,
+}
+
+# Colonne de hiérarchie de la table elements renseignée pour chaque type spatial
+HIERARCHY_COLUMNS = {
+    "IfcProject": "project_id",
+    "IfcSite": "site_id",
+    "IfcBuilding": "building_id",
+    "IfcBuildingStorey": "storey_id",
+    "IfcSpace": "space_id",
+}
+
+# Taille des lots pour les insertions/mises à jour en masse
+BATCH_SIZE = 5000
+
+# Écart entre deux bornes consécutives: place pour insérer des feuilles entre frères
+NODE_SPACING = 64
+
+
+def _sort_key(ifc_type: str, name: Optional[str]) -> tuple:
+    """Rang d'un noeud parmi ses frères (niveau spatial, type, nom)"""
+    return (SPATIAL_ORDER.get(ifc_type, len(SPATIAL_ORDER)), ifc_type, name or "")
+
+
+def _pack_row(row: Any) -> bytes:
+    """Sérialise une ligne d'élément pour la construction de l'arbre (UUID en octets)"""
+    columns = [getattr(row, column) for column in HIERARCHY_COLUMNS.values()]
+    return pickle.dumps(
+        (row.guid.bytes, row.ifc_type, row.name, [value.bytes if value else None for value in columns]),
+        pickle.HIGHEST_PROTOCOL
+    )
+
+
+def _unpack_row(data: bytes) -> tuple:
+    """
+    Relit une ligne sérialisée par _pack_row.
+    
+    Returns:
+        Tuple (GUID, type IFC, nom, {colonne de hiérarchie: ID ou None})
+    """
+    guid, ifc_type, name, columns = pickle.loads(data)
+    return UUID(bytes=guid), ifc_type, name, {
+        column: UUID(bytes=value) if value else None
+        for column, value in zip(HIERARCHY_COLUMNS.values(), columns)
+    }
+
+
+class TreeService:
+    """Service d'arbre spatial"""
+    
+    def build_tree(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        parents: Dict[UUID, UUID],
+        budget: Optional[SpillBudget] = None
+    ) -> int:
+        """
+        Construit l'arbre spatial d'un modèle et renseigne les colonnes de hiérarchie.
+        
+        Seules les colonnes de hiérarchie qui changent sont écrites: sur une
+        nouvelle révision, les éléments non déplacés ne sont pas réécrits.
+        
+        Les lignes des éléments et les listes d'enfants sont gardées dans des
+        tables de références (reference_store), dans le budget mémoire du
+        parsing; noeuds, fermeture et colonnes de hiérarchie sont écrits par lots
+        pendant le parcours. Seuls les enfants d'un même noeud (et les racines)
+        sont triés en mémoire: la mémoire est bornée par le plus grand nombre
+        d'enfants d'un noeud, pas par la taille du modèle.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            parents: ID d'élément enfant -> ID d'élément parent
+                     (issus de IfcRelAggregates / IfcRelContainedInSpatialStructure,
+                     à défaut IfcRelVoidsElement / IfcRelFillsElement)
+            budget: Budget mémoire des tables (celui du parsing; sinon PARSER_MEMORY_BUDGET_MB)
+        
+        Returns:
+            Nombre de noeuds de l'arbre
+        """
+        if budget is None:
+            budget = SpillBudget(settings.PARSER_MEMORY_BUDGET_MB * 1024 * 1024, settings.PARSER_SPILL_DIR)
+        
+        db.query(ElementClosure).filter(ElementClosure.model_id == model_id).delete(
+            synchronize_session=False
+        )
+        db.query(ModelTreeNode).filter(ModelTreeNode.model_id == model_id).delete(
+            synchronize_session=False
+        )
+        
+        info = BlobTable(budget)  # ID -> ligne sérialisée (_pack_row)
+        row_ids = RecordLog(budget, record_size=16)  # IDs dans l'ordre de lecture
+        roots = RecordLog(budget, record_size=16)
+        # Listes d'enfants chaînées: premier et dernier enfant d'un parent, frère suivant
+        first_child, last_child, next_sibling = UUIDMap(budget), UUIDMap(budget), UUIDMap(budget)
+        visited = CompactTable(budget, value_size=0)
+        try:
+            hierarchy = [getattr(ElementModel, column) for column in HIERARCHY_COLUMNS.values()]
+            rows = db.query(
+                ElementModel.id, ElementModel.guid, ElementModel.ifc_type, ElementModel.name, *hierarchy
+            ).filter(ElementModel.model_id == model_id).yield_per(BATCH_SIZE)
+            for row in rows:
+                info.put(row.id.bytes, _pack_row(row))
+                row_ids.append(row.id.bytes)
+            
+            for record in row_ids:
+                element_id = UUID(bytes=record)
+                parent_id = parents.get(element_id)
+                if parent_id is not None and parent_id != element_id and parent_id.bytes in info:
+                    previous_id = last_child.get(parent_id)
+                    if previous_id is None:
+                        first_child[parent_id] = element_id
+                    else:
+                        next_sibling[previous_id] = element_id
+                    last_child[parent_id] = element_id
+                else:
+                    roots.append(record)
+            
+            def load(element_id: UUID) -> tuple:
+                return _unpack_row(info.get(element_id.bytes))
+            
+            def sort_key(element_id: UUID):
+                _, ifc_type, name, _ = load(element_id)
+                return _sort_key(ifc_type, name)
+            
+            def children_of(element_id: UUID) -> List[UUID]:
+                children = []
+                child_id = first_child.get(element_id)
+                while child_id is not None:
+                    children.append(child_id)
+                    child_id = next_sibling.get(child_id)
+                return children
+            
+            closure: List[Dict[str, Any]] = []
+            nodes: List[Dict[str, Any]] = []
+            hierarchy_updates: List[Dict[str, Any]] = []
+            update_types: Dict[UUID, str] = {}
+            counter = 0
+            node_count = 0
+            no_ancestors = {column: None for column in HIERARCHY_COLUMNS.values()}
+            
+            # Racines d'abord, puis les éléments pris dans un cycle de relations
+            start_ids = chain(
+                sorted((UUID(bytes=record) for record in roots), key=sort_key),
+                (UUID(bytes=record) for record in row_ids)
+            )
+            
+            for start_id in start_ids:
+                if start_id.bytes in visited:
+                    continue
+                # Parcours en profondeur itératif (pas de récursion sur les gros modèles);
+                # path: IDs des ancêtres, de la racine au parent
+                stack = [(start_id, None, 0, no_ancestors, (), None)]
+                while stack:
+                    element_id, parent_id, depth, ancestors, path, leaving = stack.pop()
+                    if leaving is not None:
+                        # Noeud complet: écrit dès la sortie de son sous-arbre
+                        counter += NODE_SPACING
+                        leaving["rgt"] = counter
+                        leaving["descendants"] = (counter - leaving["lft"] - NODE_SPACING) // (2 * NODE_SPACING)
+                        nodes.append(leaving)
+                        if len(nodes) >= BATCH_SIZE:
+                            db.execute(insert(ModelTreeNode), nodes)
+                            nodes.clear()
+                        continue
+                    if element_id.bytes in visited:
+                        continue
+                    visited.put(element_id.bytes, b"")
+                    
+                    guid, ifc_type, name, columns = load(element_id)
+                    counter += NODE_SPACING
+                    node_count += 1
+                    node = {
+                        "model_id": model_id,
+                        "tenant_id": tenant_id,
+                        "element_id": element_id,
+                        "parent_id": parent_id,
+                        "guid": guid,
+                        "ifc_type": ifc_type,
+                        "name": name,
+                        "lft": counter,
+                        "rgt": None,
+                        "depth": depth,
+                        "descendants": 0
+                    }
+                    
+                    if any(columns[column] != value for column, value in ancestors.items()):
+                        hierarchy_updates.append({"id": element_id, **ancestors})
+                        update_types[element_id] = ifc_type
+                        if len(hierarchy_updates) >= BATCH_SIZE:
+                            self._write_hierarchy(db, model_id, hierarchy_updates, update_types)
+                            hierarchy_updates.clear()
+                            update_types.clear()
+                    
+                    for level, ancestor_id in enumerate(path):
+                        closure.append({
+                            "ancestor_id": ancestor_id,
+                            "descendant_id": element_id,
+                            "model_id": model_id,
+                            "tenant_id": tenant_id,
+                            "depth": depth - level
+                        })
+                        if len(closure) >= BATCH_SIZE:
+                            db.execute(insert(ElementClosure), closure)
+                            closure.clear()
+                    
+                    # Le noeud courant devient ancêtre de ses descendants
+                    column = HIERARCHY_COLUMNS.get(ifc_type)
+                    child_ancestors = {**ancestors, column: element_id} if column else ancestors
+                    child_path = path + (element_id,)
+                    
+                    stack.append((element_id, parent_id, depth, ancestors, path, node))
+                    for child_id in sorted(children_of(element_id), key=sort_key, reverse=True):
+                        stack.append((child_id, element_id, depth + 1, child_ancestors, child_path, None))
+            
+            if closure:
+                db.execute(insert(ElementClosure), closure)
+            if nodes:
+                db.execute(insert(ModelTreeNode), nodes)
+            if hierarchy_updates:
+                self._write_hierarchy(db, model_id, hierarchy_updates, update_types)
+            
+            return node_count
+        finally:
+            for store in (info, row_ids, roots, first_child, last_child, next_sibling, visited):
+                store.close()
+    
+    def _write_hierarchy(
+        self,
+        db: Session,
+        model_id: UUID,
+        hierarchy_updates: List[Dict[str, Any]],
+        ifc_types: Dict[UUID, str]
+    ):
+        """Écrit un lot de colonnes de hiérarchie (elements, puis spaces et storeys)"""
+        db.execute(update(ElementModel), hierarchy_updates)
+        self._update_space_storey_links(db, model_id, hierarchy_updates, ifc_types)
+    
+    def update_tree(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        parents: Dict[UUID, UUID],
+        changed_ids: List[UUID]
+    ) -> Optional[int]:
+        """
+        Met à jour l'arbre d'une nouvelle révision sans le reconstruire.
+        
+        Les noeuds des éléments supprimés ont disparu avec eux (ON DELETE CASCADE);
+        les feuilles ajoutées, modifiées ou déplacées sont (ré)insérées à leur rang
+        parmi leurs frères, dans les intervalles libres laissés par NODE_SPACING.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            parents: ID d'élément enfant -> ID d'élément parent (nouvelle révision)
+            changed_ids: IDs des éléments ajoutés ou modifiés
+        
+        Returns:
+            Nombre de noeuds de l'arbre, ou None si l'arbre doit être reconstruit
+            (noeud parent ajouté, déplacé ou supprimé, intervalle libre épuisé)
+        """
+        node = ModelTreeNode
+        rows = db.query(
+            node.element_id, node.parent_id, node.lft, node.rgt, node.depth, node.ifc_type, node.name
+        ).filter(node.model_id == model_id).all()
+        existing = {row.element_id: row for row in rows}
+        old_parents = {row.parent_id for row in rows if row.parent_id is not None}
+        
+        # Enfants d'un parent supprimé
+        if not old_parents.issubset(existing):
+            return None
+        
+        changed = set(changed_ids)
+        
+        def new_parent(element_id: UUID) -> Optional[UUID]:
+            parent_id = parents.get(element_id)
+            if parent_id != element_id and (parent_id in existing or parent_id in changed):
+                return parent_id
+            return None
+        
+        new_parents = {element_id: new_parent(element_id) for element_id in existing.keys() | changed}
+        parent_ids = set(new_parents.values())
+        moved = {
+            element_id for element_id, row in existing.items()
+            if element_id not in changed and new_parents[element_id] != row.parent_id
+        }
+        
+        hierarchy = [getattr(ElementModel, column) for column in HIERARCHY_COLUMNS.values()]
+        info = {}
+        lookup_ids = list(changed | moved | {new_parents[element_id] for element_id in changed | moved} - {None})
+        for start in range(0, len(lookup_ids), BATCH_SIZE):
+            for row in db.query(
+                ElementModel.id, ElementModel.guid, ElementModel.ifc_type, ElementModel.name, *hierarchy
+            ).filter(ElementModel.id.in_(lookup_ids[start:start + BATCH_SIZE])):
+                info[row.id] = row
+        
+        # Noeud inchangé (même parent, même rang): rien à écrire. Sinon seule
+        # une feuille peut être (ré)insérée; un parent impose la reconstruction
+        placed = changed | moved
+        for element_id in list(placed):
+            row = existing.get(element_id)
+            element = info[element_id]
+            if (
+                row is not None and new_parents[element_id] == row.parent_id
+                and _sort_key(element.ifc_type, element.name) == _sort_key(row.ifc_type, row.name)
+            ):
+                placed.discard(element_id)
+            elif element_id in old_parents or element_id in parent_ids:
+                return None
+        
+        # Frères restants de chaque parent concerné, dans l'ordre de l'arbre
+        siblings: Dict[Optional[UUID], List[tuple]] = {new_parents[element_id]: [] for element_id in placed}
+        for row in rows:
+            if row.element_id not in placed and row.parent_id in siblings:
+                siblings[row.parent_id].append((_sort_key(row.ifc_type, row.name), row.lft, row.rgt))
+        for children in siblings.values():
+            children.sort(key=lambda child: child[1])
+        last_right = max((row.rgt for row in rows), default=0)
+        
+        nodes: List[Dict[str, Any]] = []
+        hierarchy_updates: List[Dict[str, Any]] = []
+        for element_id in sorted(placed, key=lambda element_id: _sort_key(info[element_id].ifc_type, info[element_id].name)):
+            element = info[element_id]
+            key = _sort_key(element.ifc_type, element.name)
+            parent_id = new_parents[element_id]
+            
+            if parent_id is None:
+                # Nouvelle racine: après le dernier noeud
+                left, right = last_right + NODE_SPACING, last_right + 2 * NODE_SPACING
+                last_right, depth = right, 0
+                ancestors = {column: None for column in HIERARCHY_COLUMNS.values()}
+            else:
+                parent = existing[parent_id]
+                children = siblings[parent_id]
+                keys = [child[0] for child in children]
+                # Entre frères de même rang, position répartie: les intervalles s'épuisent moins vite
+                first, last = bisect_left(keys, key), bisect_right(keys, key)
+                index = first + element_id.int % (last - first + 1)
+                low = children[index - 1][2] if index else parent.lft
+                high = children[index][1] if index < len(children) else parent.rgt
+                if high - low < 3:
+                    return None
+                left, right = low + (high - low) // 3, low + 2 * (high - low) // 3
+                children.insert(index, (key, left, right))
+                depth = parent.depth + 1
+                parent_info = info[parent_id]
+                ancestors = {column: getattr(parent_info, column) for column in HIERARCHY_COLUMNS.values()}
+                column = HIERARCHY_COLUMNS.get(parent_info.ifc_type)
+                if column:
+                    ancestors[column] = parent_id
+            
+            nodes.append({
+                "model_id": model_id,
+                "tenant_id": tenant_id,
+                "element_id": element_id,
+                "parent_id": parent_id,
+                "guid": element.guid,
+                "ifc_type": element.ifc_type,
+                "name": element.name,
+                "lft": left,
+                "rgt": right,
+                "depth": depth,
+                "descendants": 0
+            })
+            if any(getattr(element, column) != value for column, value in ancestors.items()):
+                hierarchy_updates.append({"id": element_id, **ancestors})
+        
+        stale = [element_id for element_id in placed if element_id in existing]
+        for start in range(0, len(stale), BATCH_SIZE):
+            db.query(ModelTreeNode).filter(
+                ModelTreeNode.model_id == model_id,
+                ModelTreeNode.element_id.in_(stale[start:start + BATCH_SIZE])
+            ).delete(synchronize_session=False)
+            db.query(ElementClosure).filter(
+                ElementClosure.descendant_id.in_(stale[start:start + BATCH_SIZE])
+            ).delete(synchronize_session=False)
+        self._insert_leaf_closure(db, model_id, tenant_id, {
+            element_id: new_parents[element_id] for element_id in placed if new_parents[element_id]
+        })
+        for start in range(0, len(nodes), BATCH_SIZE):
+            db.execute(insert(ModelTreeNode), nodes[start:start + BATCH_SIZE])
+        for start in range(0, len(hierarchy_updates), BATCH_SIZE):
+            db.execute(update(ElementModel), hierarchy_updates[start:start + BATCH_SIZE])
+        self._update_space_storey_links(
+            db, model_id, hierarchy_updates, {element_id: row.ifc_type for element_id, row in info.items()}
+        )
+        
+        self._count_descendants(db, model_id, [parent_id for parent_id in siblings if parent_id])
+        return len(rows) - len(stale) + len(nodes)
+    
+    def _insert_leaf_closure(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        leaf_parents: Dict[UUID, UUID]
+    ):
+        """
+        Ajoute à la fermeture transitive des feuilles (re)placées sous un parent existant.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            leaf_parents: ID de la feuille -> ID de son parent
+        """
+        parent_ids = list(set(leaf_parents.values()))
+        parent_ancestors: Dict[UUID, List[tuple]] = defaultdict(list)
+        for start in range(0, len(parent_ids), BATCH_SIZE):
+            for row in db.query(
+                ElementClosure.descendant_id, ElementClosure.ancestor_id, ElementClosure.depth
+            ).filter(ElementClosure.descendant_id.in_(parent_ids[start:start + BATCH_SIZE])):
+                parent_ancestors[row.descendant_id].append((row.ancestor_id, row.depth))
+        
+        closure: List[Dict[str, Any]] = []
+        for element_id, parent_id in leaf_parents.items():
+            for ancestor_id, depth in [(parent_id, 0), *parent_ancestors[parent_id]]:
+                closure.append({
+                    "ancestor_id": ancestor_id,
+                    "descendant_id": element_id,
+                    "model_id": model_id,
+                    "tenant_id": tenant_id,
+                    "depth": depth + 1
+                })
+        for start in range(0, len(closure), BATCH_SIZE):
+            db.execute(insert(ElementClosure), closure[start:start + BATCH_SIZE])
+    
+    def _count_descendants(self, db: Session, model_id: UUID, parent_ids: List[UUID]):
+        """Recompte les descendants des noeuds parents (anciens et nouveaux)"""
+        child = aliased(ModelTreeNode)
+        count = select(func.count()).where(
+            child.model_id == ModelTreeNode.model_id,
+            child.lft > ModelTreeNode.lft,
+            child.lft < ModelTreeNode.rgt
+        ).scalar_subquery()
+        db.query(ModelTreeNode).filter(
+            ModelTreeNode.model_id == model_id,
+            or_(ModelTreeNode.descendants > 0, ModelTreeNode.element_id.in_(parent_ids))
+        ).update({"descendants": count}, synchronize_session=False)
+    
+    def _update_space_storey_links(
+        self,
+        db: Session,
+        model_id: UUID,
+        hierarchy_updates: List[Dict[str, Any]],
+        ifc_types: Dict[UUID, str]
+    ):
+        """Renseigne storey_id/building_id des tables spaces et storeys"""
+        space_links = []
+        storey_links = []
+        for values in hierarchy_updates:
+            ifc_type = ifc_types[values["id"]]
+            if ifc_type == "IfcSpace":
+                space_links.append({
+                    "e_id": values["id"],
+                    "storey": values["storey_id"],
+                    "building": values["building_id"]
+                })
+            elif ifc_type == "IfcBuildingStorey":
+                storey_links.append({"e_id": values["id"], "building": values["building_id"]})
+        
+        # Tables Core: mise à jour par element_id (executemany), pas par clé primaire
+        spaces = Space.__table__
+        storeys = Storey.__table__
+        if space_links:
+            db.execute(
+                update(spaces)
+                .where(spaces.c.model_id == model_id, spaces.c.element_id == bindparam("e_id"))
+                .values(storey_id=bindparam("storey"), building_id=bindparam("building")),
+                space_links
+            )
+        if storey_links:
+            db.execute(
+                update(storeys)
+                .where(storeys.c.model_id == model_id, storeys.c.element_id == bindparam("e_id"))
+                .values(building_id=bindparam("building")),
+                storey_links
+            )
+    
+    def get_tree(
+        self,
+        db: Session,
+        model_id: UUID,
+        tenant_id: UUID,
+        root_element_id: Optional[UUID] = None,
+        max_depth: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupère l'arbre (ou un sous-arbre) d'un modèle en une seule requête.
+        
+        Args:
+            db: Session de base de données
+            model_id: ID du modèle
+            tenant_id: ID du locataire
+            root_element_id: Élément racine du sous-arbre (optionnel)
+            max_depth: Profondeur maximale relative à la racine (optionnel)
+        
+        Returns:
+            Liste des noeuds racines, chacun avec ses enfants imbriqués
+        """
+        node = ModelTreeNode
+        query = db.query(
+            node.lft, node.rgt, node.depth, node.descendants, node.element_id,
+            node.guid, node.ifc_type, node.name
+        ).filter(
+            node.model_id == model_id,
+            node.tenant_id == tenant_id
+        )
+        
+        if root_element_id:
+            root = aliased(ModelTreeNode)
+            query = query.join(
+                root,
+                (root.model_id == node.model_id) & (root.element_id == root_element_id)
+            ).filter(node.lft.between(root.lft, root.rgt))
+            if max_depth is not None:
+                query = query.filter(node.depth <= root.depth + max_depth)
+        elif max_depth is not None:
+            query = query.filter(node.depth <= max_depth)
+        
+        result: List[Dict[str, Any]] = []
+        stack: List[tuple] = []  # (noeud, rgt)
+        
+        for row in query.order_by(node.lft):
+            item = {
+                "id": str(row.element_id),
+                "guid": str(row.guid),
+                "ifc_type": row.ifc_type,
+                "name": row.name,
+                "descendants": row.descendants,
+                "children": []
+            }
+            while stack and stack[-1][1] < row.lft:
+                stack.pop()
+            (stack[-1][0]["children"] if stack else result).append(item)
+            stack.append((item, row.rgt))
+        
+        return result
+
+
+# Instance globale du service
+tree_service = TreeService()
@@ -1,21 +1,85 @@
 """
 Service d'upload de fichiers
 
-Gère l'upload et le stockage des fichiers IFCXML.
+Gère l'upload et le stockage des fichiers IFCXML. Un fichier peut aussi être
+reçu par blocs (UploadStream): chaque bloc est écrit sur disque et validé au
+fil de l'eau, la validation est donc terminée à la fin de l'upload.
 """
 
 from pathlib import Path
 from uuid import UUID
 from typing import Optional
 import shutil
+import time
 from datetime import datetime
 
 from app.core.config import settings
 from app.models.database import Job, Tenant
-from app.models.schemas import JobStatus
+from app.models.schemas import JobStatus, ValidationResponse
+from app.services.validation_service import StreamingValidator
 from sqlalchemy.orm import Session
 
 
+class UploadStream:
+    """Fichier reçu par blocs: écrit sur disque et validé au fil de l'eau"""
+    
+    def __init__(self, file_path: Path, validator: StreamingValidator, max_file_size: int):
+        """
+        Ouvre le fichier de destination.
+        
+        Args:
+            file_path: Chemin du fichier à écrire
+            validator: Validateur alimenté avec les mêmes blocs
+            max_file_size: Taille maximale du fichier en octets
+        """
+        self.file_path = file_path
+        self.validator = validator
+        self.max_file_size = max_file_size
+        self.file_size = 0
+        self.wall_start = time.perf_counter()
+        self._file = open(file_path, "wb")
+    
+    def write(self, chunk: bytes):
+        """
+        Écrit et valide un bloc.
+        
+        Args:
+            chunk: Bloc suivant du fichier
+            
+        Raises:
+            ValueError: Si le fichier dépasse la taille maximale
+        """
+        self.file_size += len(chunk)
+        if self.file_size > self.max_file_size:
+            raise ValueError(
+                f"Fichier trop volumineux. Maximum: {self.max_file_size / (1024*1024):.0f}MB"
+            )
+        self._file.write(chunk)
+        self.validator.feed(chunk)
+    
+    def finish(self) -> ValidationResponse:
+        """
+        Ferme le fichier et termine la validation.
+        
+        Returns:
+            ValidationResponse: Résultat de la validation
+        """
+        self._file.close()
+        return self.validator.close()
+    
+    def measurements(self) -> dict:
+        """Mesures de la validation, avec la durée totale de l'upload"""
+        return {
+            **self.validator.measurements(),
+            "upload_seconds": round(time.perf_counter() - self.wall_start, 3)
+        }
+    
+    def discard(self):
+        """Abandonne l'upload et supprime le fichier partiel"""
+        self._file.close()
+        self.file_path.unlink(missing_ok=True)
+
+
 class UploadService:
     """Service d'upload de fichiers"""
     
@@ -50,6 +114,50 @@ class UploadService:
                 f"Fichier trop volumineux. Maximum: {self.max_file_size / (1024*1024):.0f}MB"
             )
         
+        file_path = self._destination(filename, tenant_id)
+        
+        # Sauvegarder le fichier
+        with open(file_path, "wb") as f:
+            f.write(file_content)
+        
+        return file_path
+    
+    def open_stream(
+        self,
+        filename: str,
+        tenant_id: UUID,
+        validator: StreamingValidator
+    ) -> UploadStream:
+        """
+        Prépare la réception d'un fichier par blocs.
+        
+        Args:
+            filename: Nom du fichier
+            tenant_id: ID du locataire
+            validator: Validateur alimenté avec les blocs reçus
+            
+        Returns:
+            UploadStream: Fichier ouvert, à alimenter avec write() puis finish()
+            
+        Raises:
+            ValueError: Si l'extension est invalide
+        """
+        return UploadStream(self._destination(filename, tenant_id), validator, self.max_file_size)
+    
+    def _destination(self, filename: str, tenant_id: UUID) -> Path:
+        """
+        Chemin unique du fichier d'un locataire.
+        
+        Args:
+            filename: Nom du fichier
+            tenant_id: ID du locataire
+            
+        Returns:
+            Path: Chemin dans le répertoire du locataire
+            
+        Raises:
+            ValueError: Si l'extension est invalide
+        """
         # Vérifier l'extension
         file_path = Path(filename)
         if file_path.suffix.lower() not in settings.ALLOWED_EXTENSIONS:
@@ -64,13 +172,7 @@ class UploadService:
         # Générer un nom de fichier unique
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_filename = f"{timestamp}_{file_path.name}"
-        file_path = tenant_dir / safe_filename
-        
-        # Sauvegarder le fichier
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        return file_path
+        return tenant_dir / safe_filename
     
     def create_job(
         self,
@@ -1,17 +1,26 @@
 """
 Service de validation XSD
 
-Valide les fichiers IFCXML contre les schémas XSD officiels en streaming.
+Valide les fichiers IFCXML contre les schémas XSD officiels en streaming,
+depuis un fichier enregistré ou depuis les blocs d'un upload en cours
+(StreamingValidator).
 """
 
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from lxml import etree
 from lxml.etree import XMLSchema, XMLSchemaParseError, XMLParser
 
 from app.core.config import settings
+from app.core.metrics import ProgressTracker
 from app.models.schemas import ValidationError, ValidationResponse, IFCVersion
-from app.utils.xml_utils import detect_ifc_version
+from app.utils.xml_utils import detect_ifc_version, ifc_version_from_root, iter_entities, release_entities
+
+
+# Nombre d'entités validées entre deux mises à jour de l'avancement
+VALIDATION_PROGRESS_EVERY = 1000
 
 
 class ValidationService:
@@ -20,6 +29,7 @@ class ValidationService:
     def __init__(self):
         """Initialise le service avec les schémas XSD"""
         self._schemas: dict[str, XMLSchema] = {}
+        self._schemas_lock = threading.Lock()  # Un seul rechargement à la fois
         self._load_schemas()
     
     def _load_schemas(self):
@@ -59,7 +69,8 @@ class ValidationService:
     def validate_file(
         self,
         xml_file_path: Path,
-        ifc_version: Optional[str] = None
+        ifc_version: Optional[str] = None,
+        progress: Optional[ProgressTracker] = None
     ) -> ValidationResponse:
         """
         Valide un fichier IFCXML contre le schéma XSD approprié.
@@ -67,6 +78,7 @@ class ValidationService:
         Args:
             xml_file_path: Chemin vers le fichier XML à valider
             ifc_version: Version IFC ('IFC2X3' ou 'IFC4'). Si None, détection automatique.
+            progress: Suivi de l'avancement (position de lecture, entités validées), optionnel
             
         Returns:
             ValidationResponse: Résultat de la validation
@@ -79,84 +91,32 @@ class ValidationService:
             ifc_version = detect_ifc_version(xml_file_path)
         
         if not ifc_version:
-            return ValidationResponse(
-                is_valid=False,
-                errors=[ValidationError(
-                    line=0,
-                    column=0,
-                    message="Impossible de détecter la version IFC"
-                )],
-                warnings=warnings
-            )
+            return self.undetected_version_response()
         
         # Vérifier que le schéma existe
-        if ifc_version not in self._schemas:
-            # Essayer de recharger le schéma
-            self._load_schemas()
-            if ifc_version not in self._schemas:
-                # Si le schéma ne peut pas être chargé, retourner une erreur bloquante
-                return ValidationResponse(
-                    is_valid=False,
-                    ifc_version=IFCVersion(ifc_version) if ifc_version in ["IFC2X3", "IFC4"] else None,
-                    errors=[ValidationError(
-                        line=0,
-                        column=0,
-                        message=f"Schéma XSD pour {ifc_version} non disponible. Le fichier XSD se trouve dans xsd/{ifc_version}.xsd mais n'a pas pu être chargé correctement. Veuillez vérifier le fichier XSD."
-                    )],
-                    warnings=warnings
-                )
-        
-        schema = self._schemas[ifc_version]
-        
-        # Valider en streaming
+        schema = self.get_schema(ifc_version)
+        if schema is None:
+            # Si le schéma ne peut pas être chargé, retourner une erreur bloquante
+            return self.unavailable_schema_response(ifc_version)
+        
+        # Valider en streaming: libxml2 valide le document complet pendant la
+        # lecture, sans le charger en mémoire
         try:
-            # Parser en streaming pour validation
-            context = etree.iterparse(
-                str(xml_file_path),
-                events=("end",),
-                huge_tree=True
-            )
-            
-            for event, elem in context:
-                # Valider l'élément
-                try:
-                    schema.assertValid(elem)
-                except etree.DocumentInvalid as e:
-                    # Extraire les erreurs de validation
-                    error_log = schema.error_log
-                    for error in error_log:
-                        errors.append(ValidationError(
-                            line=error.line,
-                            column=error.column,
-                            message=error.message,
-                            element=elem.tag if elem is not None else None
-                        ))
-                
-                # Nettoyer pour libérer la mémoire
-                elem.clear()
-                while elem.getprevious() is not None:
-                    del elem.getparent()[0]
-            
-            # Valider le document complet
-            try:
-                doc = etree.parse(str(xml_file_path))
-                schema.assertValid(doc)
-            except etree.DocumentInvalid:
-                # Les erreurs ont déjà été collectées ci-dessus
-                pass
-            except Exception as e:
-                errors.append(ValidationError(
-                    line=0,
-                    column=0,
-                    message=f"Erreur lors de la validation: {str(e)}"
-                ))
+            if progress is None:
+                for elem in iter_entities(xml_file_path, schema=schema):
+                    pass
+            else:
+                progress.start_stage("validation")
+                count = 0
+                for elem in iter_entities(xml_file_path, schema=schema, on_read=progress.read):
+                    count += 1
+                    if count % VALIDATION_PROGRESS_EVERY == 0:
+                        progress.count(count)
+                progress.count(count)
         
         except etree.XMLSyntaxError as e:
-            errors.append(ValidationError(
-                line=e.lineno if hasattr(e, 'lineno') else 0,
-                column=e.offset if hasattr(e, 'offset') else 0,
-                message=f"Erreur de syntaxe XML: {str(e)}"
-            ))
+            # Erreurs de schéma (validation interrompue au premier élément invalide)
+            errors.extend(syntax_errors(e))
         except Exception as e:
             errors.append(ValidationError(
                 line=0,
@@ -171,6 +131,241 @@ class ValidationService:
             warnings=warnings
         )
     
+    def get_schema(self, ifc_version: str) -> Optional[XMLSchema]:
+        """
+        Retourne le schéma XSD d'une version IFC (rechargé s'il manque).
+        
+        Args:
+            ifc_version: Version IFC ('IFC2X3' ou 'IFC4')
+            
+        Returns:
+            Schéma XSD ou None s'il ne peut pas être chargé
+        """
+        if ifc_version not in self._schemas:
+            # Essayer de recharger le schéma (les schémas chargés restent
+            # utilisables par les validations en cours dans d'autres threads)
+            with self._schemas_lock:
+                if ifc_version not in self._schemas:
+                    self._load_schemas()
+        return self._schemas.get(ifc_version)
+    
+    def undetected_version_response(self) -> ValidationResponse:
+        """Résultat d'un fichier dont la version IFC n'a pas pu être détectée"""
+        return ValidationResponse(
+            is_valid=False,
+            errors=[ValidationError(
+                line=0,
+                column=0,
+                message="Impossible de détecter la version IFC"
+            )],
+            warnings=[]
+        )
+    
+    def unavailable_schema_response(self, ifc_version: str) -> ValidationResponse:
+        """Résultat d'un fichier dont le schéma XSD n'a pas pu être chargé"""
+        return ValidationResponse(
+            is_valid=False,
+            ifc_version=IFCVersion(ifc_version) if ifc_version in ["IFC2X3", "IFC4"] else None,
+            errors=[ValidationError(
+                line=0,
+                column=0,
+                message=f"Schéma XSD pour {ifc_version} non disponible. Le fichier XSD se trouve dans xsd/{ifc_version}.xsd mais n'a pas pu être chargé correctement. Veuillez vérifier le fichier XSD."
+            )],
+            warnings=[]
+        )
+    
+    def stream_validator(self) -> "StreamingValidator":
+        """
+        Crée un validateur alimenté par blocs (upload en cours).
+        
+        Returns:
+            StreamingValidator: Validateur à alimenter avec feed() puis close()
+        """
+        return StreamingValidator(self)
+
+
+class StreamingValidator:
+    """
+    Validation XSD d'un fichier reçu par blocs.
+    
+    Les premiers blocs sont gardés jusqu'à la balise racine, qui donne la
+    version IFC et donc le schéma; ils sont ensuite passés, avec les suivants,
+    à un XMLPullParser validant. Les entités validées sont libérées au fur et
+    à mesure: la mémoire reste bornée quelle que soit la taille du fichier.
+    Après la première erreur, les blocs suivants sont ignorés.
+    """
+    
+    def __init__(self, service: ValidationService):
+        """
+        Initialise le validateur.
+        
+        Args:
+            service: Service de validation (schémas XSD chargés)
+        """
+        self._service = service
+        self._detector = etree.XMLPullParser(events=("start-ns", "start"), huge_tree=True)
+        self._namespaces: Dict[str, str] = {}
+        self._pending: List[bytes] = []  # Blocs reçus avant la balise racine
+        self._parser: Optional[etree.XMLPullParser] = None
+        self._result: Optional[ValidationResponse] = None  # Résultat connu avant la fin (erreur)
+        self.ifc_version: Optional[str] = None
+        self.bytes_read = 0
+        self.entities = 0
+        self.seconds = 0.0  # Temps passé à valider (hors attente des blocs)
+        self.cpu_seconds = 0.0
+    
+    def feed(self, chunk: bytes):
+        """
+        Valide un bloc du fichier.
+        
+        Args:
+            chunk: Bloc suivant du fichier
+        """
+        self.bytes_read += len(chunk)
+        if self._result is not None:
+            return
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            if self._parser is None:
+                self._pending.append(chunk)
+                if not self._detect_version(chunk):
+                    return
+                chunks, self._pending = self._pending, []
+            else:
+                chunks = [chunk]
+            
+            for data in chunks:
+                self._parser.feed(data)
+                self.entities += release_entities(self._parser.read_events())
+        except etree.XMLSyntaxError as e:
+            self._result = self._failure(syntax_errors(e))
+        finally:
+            self.seconds += time.perf_counter() - wall_start
+            self.cpu_seconds += time.thread_time() - cpu_start
+    
+    def close(self) -> ValidationResponse:
+        """
+        Termine la validation (fin du fichier).
+        
+        Returns:
+            ValidationResponse: Résultat de la validation
+        """
+        if self._result is not None:
+            return self._result
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            if self._parser is None:
+                # Fin du fichier avant la balise racine
+                try:
+                    self._detector.close()
+                except etree.XMLSyntaxError as e:
+                    return self._failure(syntax_errors(e))
+                return self._service.undetected_version_response()
+            
+            self._parser.close()
+            self.entities += release_entities(self._parser.read_events())
+        except etree.XMLSyntaxError as e:
+            return self._failure(syntax_errors(e))
+        finally:
+            self.seconds += time.perf_counter() - wall_start
+            self.cpu_seconds += time.thread_time() - cpu_start
+        
+        return ValidationResponse(
+            is_valid=True,
+            ifc_version=IFCVersion(self.ifc_version),
+            errors=[],
+            warnings=[]
+        )
+    
+    def measurements(self) -> Dict[str, Any]:
+        """
+        Mesures de la validation, au format de StageTimer.stop.
+        
+        Returns:
+            Durée et temps CPU passés à valider, octets et entités lus
+        """
+        return {
+            "seconds": round(self.seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "elements": self.entities,
+            "bytes_read": self.bytes_read,
+            "during_upload": True
+        }
+    
+    def _detect_version(self, chunk: bytes) -> bool:
+        """
+        Cherche la balise racine et prépare le parseur validant.
+        
+        Args:
+            chunk: Dernier bloc reçu
+        
+        Returns:
+            True si le parseur validant est prêt
+        """
+        self._detector.feed(chunk)
+        root_tag = None
+        for event, value in self._detector.read_events():
+            if event == "start-ns":
+                prefix, uri = value
+                self._namespaces[prefix] = uri
+            else:
+                root_tag = value.tag
+                break
+        if root_tag is None:
+            return False
+        
+        self._detector = None
+        self.ifc_version = ifc_version_from_root(self._namespaces, root_tag)
+        if not self.ifc_version:
+            self._result = self._service.undetected_version_response()
+            return False
+        schema = self._service.get_schema(self.ifc_version)
+        if schema is None:
+            self._result = self._service.unavailable_schema_response(self.ifc_version)
+            return False
+        
+        self._parser = etree.XMLPullParser(events=("end",), schema=schema, huge_tree=True)
+        return True
+    
+    def _failure(self, errors: List[ValidationError]) -> ValidationResponse:
+        """Résultat d'un fichier invalide"""
+        return ValidationResponse(
+            is_valid=False,
+            ifc_version=IFCVersion(self.ifc_version) if self.ifc_version in ["IFC2X3", "IFC4"] else None,
+            errors=errors,
+            warnings=[]
+        )
+
+
+def syntax_errors(e: etree.XMLSyntaxError) -> List[ValidationError]:
+    """
+    Convertit une erreur de lecture en erreurs de validation.
+    
+    Args:
+        e: Erreur levée par libxml2 (détail dans error_log)
+        
+    Returns:
+        Erreurs de schéma, ou l'erreur de syntaxe XML s'il n'y en a pas
+    """
+    schema_errors = [
+        error for error in e.error_log
+        if error.domain == etree.ErrorDomains.SCHEMASV
+    ]
+    if schema_errors:
+        return [
+            ValidationError(
+                line=error.line,
+                column=error.column,
+                message=error.message,
+                element=error.path
+            )
+            for error in schema_errors
+        ]
+    return [ValidationError(
+        line=e.lineno if hasattr(e, 'lineno') else 0,
+        column=e.offset if hasattr(e, 'offset') else 0,
+        message=f"Erreur de syntaxe XML: {str(e)}"
+    )]
 
 
 # Instance globale du service
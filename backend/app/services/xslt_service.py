@@ -2,11 +2,19 @@
 Service de transformation XSLT
 
 Exécute les transformations XSLT 2.0+ avec Saxon-HE pour générer du JSON normalisé.
+Le worker lance transform_file dans un processus séparé, en parallèle du parsing.
+
+Le service peut être appelé depuis plusieurs threads: chaque stylesheet est
+compilé une seule fois (sous verrou) et chaque transformation travaille sur
+une copie (clone) de l'exécutable compilé.
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import json
+import threading
+
+from app.core.metrics import StageTimer
 
 try:
     from saxonche import PySaxonProcessor
@@ -25,8 +33,10 @@ class XSLTService:
         self.templates_dir = self.xslt_dir / "templates"
         self.modules_dir = self.xslt_dir / "modules"
         
-        # Cache des stylesheets compilés
+        # Cache des stylesheets compilés (liés au processeur qui les a compilés)
         self._compiled_stylesheets: Dict[str, Any] = {}
+        self._processor = None
+        self._lock = threading.RLock()  # Compilation et création du processeur
         
         if not SAXON_AVAILABLE:
             raise RuntimeError(
@@ -61,35 +71,45 @@ class XSLTService:
         if not xslt_path.exists():
             raise FileNotFoundError(f"Template XSLT non trouvé: {xslt_path}")
         
-        # Compiler le stylesheet (avec cache)
-        stylesheet_key = str(xslt_path)
-        if stylesheet_key not in self._compiled_stylesheets:
-            self._compiled_stylesheets[stylesheet_key] = self._compile_stylesheet(xslt_path)
-        
-        stylesheet = self._compiled_stylesheets[stylesheet_key]
+        # Compiler le stylesheet (avec cache); la copie garde les paramètres et
+        # messages de cette transformation à l'écart des autres threads
+        stylesheet = self._get_stylesheet(xslt_path).clone()
         
         # Exécuter la transformation
         try:
-            with PySaxonProcessor(license=False) as proc:
-                # Charger le document XML source
-                xml_doc = proc.parse_xml(xml_file=str(xml_file_path))
-                
-                # Créer un transformer
-                transformer = proc.new_xslt30_processor()
-                
-                # Exécuter la transformation
-                # Utiliser transform_to_string pour obtenir le résultat textuel
-                result_str = transformer.transform_to_string(
-                    stylesheet_node=stylesheet,
-                    source_node=xml_doc
-                )
-                
-                # Parser le JSON résultant
-                return json.loads(result_str)
+            # Charger le document XML source
+            xml_doc = self._get_processor().parse_xml(xml_file_name=str(xml_file_path))
+            
+            # Exécuter la transformation
+            # Utiliser transform_to_string pour obtenir le résultat textuel
+            result_str = stylesheet.transform_to_string(xdm_node=xml_doc)
+            
+            # Parser le JSON résultant
+            return json.loads(result_str)
         
         except Exception as e:
             raise Exception(f"Erreur lors de la transformation XSLT: {str(e)}")
     
+    def _get_stylesheet(self, xslt_path: Path) -> Any:
+        """
+        Retourne le stylesheet compilé (compilé au premier appel, une seule fois).
+        
+        Args:
+            xslt_path: Chemin vers le fichier XSLT
+            
+        Returns:
+            Stylesheet compilé, partagé: à copier (clone) avant de le configurer
+        """
+        stylesheet_key = str(xslt_path)
+        stylesheet = self._compiled_stylesheets.get(stylesheet_key)
+        if stylesheet is None:
+            with self._lock:
+                stylesheet = self._compiled_stylesheets.get(stylesheet_key)
+                if stylesheet is None:
+                    stylesheet = self._compile_stylesheet(xslt_path)
+                    self._compiled_stylesheets[stylesheet_key] = stylesheet
+        return stylesheet
+    
     def _compile_stylesheet(self, xslt_path: Path) -> Any:
         """
         Compile un stylesheet XSLT.
@@ -100,17 +120,23 @@ class XSLTService:
         Returns:
             Stylesheet compilé
         """
-        with PySaxonProcessor(license=False) as proc:
-            xslt_processor = proc.new_xslt30_processor()
-            
-            # Compiler le stylesheet
-            stylesheet = xslt_processor.compile_stylesheet(stylesheet_file=str(xslt_path))
-            
-            return stylesheet
+        xslt_processor = self._get_processor().new_xslt30_processor()
+        
+        # Compiler le stylesheet
+        return xslt_processor.compile_stylesheet(stylesheet_file=str(xslt_path))
+    
+    def _get_processor(self) -> Any:
+        """Retourne le processeur Saxon du service (créé au premier besoin)"""
+        if self._processor is None:
+            with self._lock:
+                if self._processor is None:
+                    self._processor = PySaxonProcessor(license=False)
+        return self._processor
     
     def clear_cache(self):
         """Vide le cache des stylesheets compilés"""
-        self._compiled_stylesheets.clear()
+        with self._lock:
+            self._compiled_stylesheets.clear()
 
 
 # Instance globale du service (sera None si saxonche n'est pas disponible)
@@ -120,3 +146,35 @@ except (RuntimeError, ImportError):
     xslt_service = None
     print("ATTENTION: Service XSLT non disponible. Installez saxonche pour l'activer.")
 
+
+
+def transform_file(
+    xml_file_path: str,
+    ifc_version: Optional[str] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Transforme un fichier depuis un processus de transformation du worker.
+    
+    Chaque processus garde sa propre instance du service (et son cache de
+    stylesheets compilés) d'une tâche à l'autre.
+    
+    Args:
+        xml_file_path: Chemin vers le fichier XML
+        ifc_version: Version IFC détectée à la validation
+    
+    Returns:
+        JSON normalisé et mesures de la transformation (durée, CPU, mémoire du processus)
+    
+    Raises:
+        RuntimeError: Si saxonche n'est pas disponible ou si la transformation échoue
+    """
+    if xslt_service is None:
+        raise RuntimeError("saxonche n'est pas disponible")
+    
+    timer = StageTimer()
+    try:
+        normalized_json = xslt_service.transform_to_json(Path(xml_file_path), ifc_version)
+    except Exception as e:
+        # Les exceptions Saxon ne se sérialisent pas vers le processus parent
+        raise RuntimeError(str(e)) from None
+    return normalized_json, timer.stop(bytes_read=Path(xml_file_path).stat().st_size)
@@ -0,0 +1,98 @@
+"""
+Utilitaires de filtres sur les propriétés
+
+Analyse les expressions de filtre sur les Psets et Qtos des éléments
+(paramètre `filter` de GET /elements).
+
+Syntaxe: clauses séparées par ';' (ET logique), chacune de la forme
+`[Ensemble.]Nom opérateur valeur`, avec les opérateurs = != > >= < <=.
+Exemples:
+    Pset_WallCommon.FireRating=REI60
+    NetVolume>2;Pset_SlabCommon.IsExternal=true
+
+Les valeurs true/false sont des booléens, les nombres sont numériques, le
+reste est du texte (entre guillemets doubles pour forcer le texte: "60").
+"""
+
+import re
+from typing import Any, Dict, List
+
+
+FILTER_OPERATORS = ("=", "!=", ">", ">=", "<", "<=")
+RANGE_OPERATORS = (">", ">=", "<", "<=")
+
+# Nombre maximum de clauses par expression
+MAX_FILTER_CLAUSES = 10
+
+CLAUSE_PATTERN = re.compile(
+    r"^\s*(?:(?P<set_name>[^.=<>!;]+)\.)?(?P<name>[^.=<>!;]+?)\s*"
+    r"(?P<operator>>=|<=|!=|=|>|<)\s*(?P<value>.*?)\s*$"
+)
+
+
+def parse_filter_value(text: str) -> Any:
+    """
+    Convertit la valeur littérale d'une clause.
+    
+    Args:
+        text: Valeur telle qu'écrite dans l'expression
+    
+    Returns:
+        Booléen, nombre ou texte
+    """
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1]
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_filter_expression(expression: str) -> List[Dict[str, Any]]:
+    """
+    Analyse une expression de filtre.
+    
+    Args:
+        expression: Expression (ex: 'Pset_WallCommon.FireRating=REI60;NetVolume>2')
+    
+    Returns:
+        Liste de clauses {set_name, name, operator, value}
+    
+    Raises:
+        ValueError: Si l'expression est invalide
+    """
+    clauses = []
+    
+    for raw_clause in expression.split(";"):
+        if not raw_clause.strip():
+            continue
+        
+        match = CLAUSE_PATTERN.match(raw_clause)
+        if not match or not match.group("value"):
+            raise ValueError(f"Clause de filtre invalide: '{raw_clause.strip()}'")
+        
+        value = parse_filter_value(match.group("value"))
+        operator = match.group("operator")
+        if operator in RANGE_OPERATORS and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"L'opérateur {operator} attend une valeur numérique: '{raw_clause.strip()}'")
+        
+        set_name = match.group("set_name")
+        clauses.append({
+            "set_name": set_name.strip() if set_name else None,
+            "name": match.group("name").strip(),
+            "operator": operator,
+            "value": value
+        })
+    
+    if not clauses:
+        raise ValueError("Expression de filtre vide")
+    if len(clauses) > MAX_FILTER_CLAUSES:
+        raise ValueError(f"Au plus {MAX_FILTER_CLAUSES} clauses par filtre")
+    
+    return clauses
@@ -0,0 +1,586 @@
+"""
+Boîtes englobantes des éléments IFC
+
+Réduit les placements (chaînes d'IfcLocalPlacement et IfcAxis2Placement) et
+les représentations simples (extrusions, IfcBoundingBox, éléments mappés,
+ensembles de points) en boîtes englobantes alignées sur les axes du repère
+global du projet.
+
+Les entités géométriques référencées (ref="i42") sont lues une fois et
+mémorisées sous une forme réduite: point (3 flottants), matrice (3x4) ou boîte
+locale (6 flottants). Les géométries plus complexes (surfaces, opérations
+booléennes autres que la soustraction) sont approchées par leurs points.
+"""
+
+import math
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from lxml.etree import _Element as Element
+
+from app.utils.ifc_schema import IFC4_SUPERTYPES, IFC4_ABSTRACT_TYPES
+from app.utils.ifc_utils import get_ifc_type, is_subtype
+
+# Matrice affine 3x4 ligne par ligne (rotation/échelle puis translation)
+Matrix = Tuple[float, ...]
+# Boîte alignée sur les axes: (xmin, ymin, zmin, xmax, ymax, zmax)
+Box = Tuple[float, ...]
+
+# Genres de valeurs mémorisées par référence
+POINT = "point"
+MATRIX = "matrix"
+BOX = "box"
+
+# Types lus comme points ou directions
+POINT_TYPES = {"IfcCartesianPoint", "IfcDirection"}
+
+# Types lus comme matrices (placements et opérateurs de transformation)
+MATRIX_TYPES = {
+    "IfcAxis2Placement2D",
+    "IfcAxis2Placement3D",
+    "IfcLocalPlacement",
+    "IfcCartesianTransformationOperator2D",
+    "IfcCartesianTransformationOperator2DnonUniform",
+    "IfcCartesianTransformationOperator3D",
+    "IfcCartesianTransformationOperator3DnonUniform",
+}
+
+# Représentations sans volume (symboles de plan, textes)
+ANNOTATION_REPRESENTATION_TYPES = {"Annotation2D"}
+
+# Profils paramétrés: (largeur(s), hauteur(s)) en attributs IFC, centrés sur leur Position
+PROFILE_DIMENSIONS = {
+    "IfcRectangleProfileDef": (("XDim",), ("YDim",)),
+    "IfcRectangleHollowProfileDef": (("XDim",), ("YDim",)),
+    "IfcRoundedRectangleProfileDef": (("XDim",), ("YDim",)),
+    "IfcTrapeziumProfileDef": (("BottomXDim", "TopXDim"), ("YDim",)),
+    "IfcIShapeProfileDef": (("OverallWidth",), ("OverallDepth",)),
+    "IfcAsymmetricIShapeProfileDef": (("BottomFlangeWidth", "TopFlangeWidth"), ("OverallDepth",)),
+    "IfcLShapeProfileDef": (("Width", "Depth"), ("Depth",)),
+    "IfcCShapeProfileDef": (("Width",), ("Depth",)),
+    "IfcUShapeProfileDef": (("FlangeWidth",), ("Depth",)),
+    "IfcTShapeProfileDef": (("FlangeWidth",), ("Depth",)),
+    "IfcZShapeProfileDef": (("FlangeWidth",), ("Depth",)),
+}
+
+# Unités de longueur (énumérations ifcXML en minuscules, comparées en majuscules):
+# préfixes SI et unités converties courantes -> mètres
+SI_PREFIXES = {
+    None: 1.0, "KILO": 1e3, "HECTO": 1e2, "DECA": 1e1,
+    "DECI": 1e-1, "CENTI": 1e-2, "MILLI": 1e-3, "MICRO": 1e-6,
+}
+CONVERTED_LENGTH_UNITS = {"FOOT": 0.3048, "INCH": 0.0254, "YARD": 0.9144, "MILE": 1609.344}
+
+
+def _vector(values: List[float]) -> Tuple[float, float, float]:
+    """Complète une liste de 2 ou 3 coordonnées en vecteur 3D"""
+    x, y, z = (list(values) + [0.0, 0.0, 0.0])[:3]
+    return (x, y, z)
+
+
+def _normalize(vector: Tuple[float, float, float]) -> Optional[Tuple[float, float, float]]:
+    """Vecteur unitaire (None si nul)"""
+    length = math.sqrt(vector[0] ** 2 + vector[1] ** 2 + vector[2] ** 2)
+    if length == 0.0 or not math.isfinite(length):
+        return None
+    return (vector[0] / length, vector[1] / length, vector[2] / length)
+
+
+def _cross(a: Tuple[float, float, float], b: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    """Produit vectoriel"""
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _dot(a: Tuple[float, float, float], b: Tuple[float, float, float]) -> float:
+    """Produit scalaire"""
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _orthogonal(
+    reference: Tuple[float, float, float],
+    axis: Tuple[float, float, float]
+) -> Optional[Tuple[float, float, float]]:
+    """Composante unitaire de reference orthogonale à axis (None si parallèles)"""
+    projection = _dot(reference, axis)
+    return _normalize((
+        reference[0] - projection * axis[0],
+        reference[1] - projection * axis[1],
+        reference[2] - projection * axis[2]
+    ))
+
+
+def axes_matrix(
+    origin: Tuple[float, float, float],
+    z_axis: Optional[Tuple[float, float, float]] = None,
+    x_axis: Optional[Tuple[float, float, float]] = None,
+    scales: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+) -> Matrix:
+    """
+    Matrice d'un repère défini par son origine et ses axes Z et X (IfcAxis2Placement3D).
+    
+    L'axe X est projeté orthogonalement à Z; Y complète le repère direct.
+    
+    Args:
+        origin: Origine du repère
+        z_axis: Axe Z (Z global par défaut)
+        x_axis: Direction de référence de l'axe X (X global par défaut)
+        scales: Échelles des axes X, Y et Z
+    
+    Returns:
+        Matrice 3x4
+    """
+    z = (_normalize(z_axis) if z_axis else None) or (0.0, 0.0, 1.0)
+    x = _orthogonal(x_axis, z) if x_axis else None
+    if x is None:
+        # Pas de direction de référence (ou parallèle à Z): X global, ou Y si Z en est proche
+        x = _orthogonal((1.0, 0.0, 0.0) if abs(z[0]) < 0.9 else (0.0, 1.0, 0.0), z)
+    y = _cross(z, x)
+    sx, sy, sz = scales
+    return (
+        x[0] * sx, y[0] * sy, z[0] * sz, origin[0],
+        x[1] * sx, y[1] * sy, z[1] * sz, origin[1],
+        x[2] * sx, y[2] * sy, z[2] * sz, origin[2],
+    )
+
+
+def compose(outer: Matrix, inner: Matrix) -> Matrix:
+    """
+    Compose deux transformations (inner appliquée d'abord).
+    
+    Args:
+        outer: Transformation appliquée en second (ex: placement du parent)
+        inner: Transformation appliquée en premier (ex: placement relatif)
+    
+    Returns:
+        Matrice outer · inner
+    """
+    result = []
+    for row in range(3):
+        a0, a1, a2, a3 = outer[row * 4:row * 4 + 4]
+        for column in range(4):
+            value = a0 * inner[column] + a1 * inner[4 + column] + a2 * inner[8 + column]
+            if column == 3:
+                value += a3
+            result.append(value)
+    return tuple(result)
+
+
+def transform_box(matrix: Matrix, box: Box) -> Box:
+    """
+    Boîte alignée englobant une boîte transformée.
+    
+    Args:
+        matrix: Transformation
+        box: Boîte dans le repère local
+    
+    Returns:
+        Boîte dans le repère de destination
+    """
+    low = [matrix[3], matrix[7], matrix[11]]
+    high = list(low)
+    for row in range(3):
+        for axis in range(3):
+            coefficient = matrix[row * 4 + axis]
+            a, b = coefficient * box[axis], coefficient * box[axis + 3]
+            if a < b:
+                low[row] += a
+                high[row] += b
+            else:
+                low[row] += b
+                high[row] += a
+    return (low[0], low[1], low[2], high[0], high[1], high[2])
+
+
+def union_boxes(boxes: Iterable[Optional[Box]]) -> Optional[Box]:
+    """
+    Boîte englobant plusieurs boîtes.
+    
+    Args:
+        boxes: Boîtes (les None sont ignorées)
+    
+    Returns:
+        Boîte englobante ou None si aucune boîte
+    """
+    result = None
+    for box in boxes:
+        if box is None:
+            continue
+        if result is None:
+            result = box
+        else:
+            result = (
+                min(result[0], box[0]), min(result[1], box[1]), min(result[2], box[2]),
+                max(result[3], box[3]), max(result[4], box[4]), max(result[5], box[5])
+            )
+    return result
+
+
+def points_box(coordinates: Iterable[Tuple[float, float, float]]) -> Optional[Box]:
+    """Boîte englobant des points"""
+    xs, ys, zs = [], [], []
+    for x, y, z in coordinates:
+        xs.append(x)
+        ys.append(y)
+        zs.append(z)
+    if not xs:
+        return None
+    return (min(xs), min(ys), min(zs), max(xs), max(ys), max(zs))
+
+
+def is_finite_box(box: Optional[Box]) -> bool:
+    """Vérifie qu'une boîte existe et ne contient que des valeurs finies"""
+    return box is not None and all(math.isfinite(value) for value in box)
+
+
+def _numbers(element: Element, name: str) -> Optional[List[float]]:
+    """
+    Lit un attribut IFC numérique ou une liste de nombres.
+    
+    Args:
+        element: Entité XML
+        name: Nom de l'attribut IFC (ex: 'Coordinates', 'Depth')
+    
+    Returns:
+        Liste de nombres ou None si absent ou invalide
+    """
+    value = element.get(name)
+    if value is None:
+        child = element.find("{*}" + name)
+        if child is None:
+            return None
+        value = child.text if child.text and child.text.strip() else " ".join(
+            item.text or "" for item in child
+        )
+    try:
+        numbers = [float(item) for item in value.split()]
+    except ValueError:
+        return None
+    return numbers or None
+
+
+def _number(element: Element, name: str, default: Optional[float] = None) -> Optional[float]:
+    """Lit un attribut IFC numérique simple"""
+    numbers = _numbers(element, name)
+    return numbers[0] if numbers else default
+
+
+def _role_entities(element: Element, role: str) -> List[Element]:
+    """Entités portées par un rôle (ex: <Location><IfcCartesianPoint .../></Location>)"""
+    role_element = element.find("{*}" + role)
+    if role_element is None:
+        return []
+    return [child for child in role_element if isinstance(child.tag, str)]
+
+
+def _role_entity(element: Element, role: str) -> Optional[Element]:
+    """Première entité portée par un rôle"""
+    entities = _role_entities(element, role)
+    return entities[0] if entities else None
+
+
+def length_unit_scale(element: Element) -> Optional[float]:
+    """
+    Facteur de conversion en mètres de l'unité de longueur déclarée dans une entité.
+    
+    Args:
+        element: IfcSIUnit, IfcConversionBasedUnit, IfcUnitAssignment ou IfcProject
+    
+    Returns:
+        Mètres par unité du fichier ou None si aucune unité de longueur
+    """
+    candidates = [element] if element.get("UnitType") else element.iter()
+    for unit in candidates:
+        if not isinstance(unit.tag, str) or (unit.get("UnitType") or "").upper() != "LENGTHUNIT":
+            continue
+        unit_type = get_ifc_type(unit)
+        if unit_type == "IfcSIUnit" and unit.get("Name", "METRE").upper() == "METRE":
+            prefix = unit.get("Prefix")
+            return SI_PREFIXES.get(prefix.upper() if prefix else None)
+        if unit_type == "IfcConversionBasedUnit":
+            return CONVERTED_LENGTH_UNITS.get((unit.get("Name") or "").upper())
+    return None
+
+
+class GeometryReader:
+    """
+    Lecture des placements et représentations ifcXML en matrices et boîtes.
+    
+    Les valeurs des entités référencées sont demandées à lookup(genre, ref) et
+    celles des entités identifiées (attribut id) sont transmises à
+    register(genre, id, valeur), pour être retrouvées par les références suivantes.
+    """
+    
+    def __init__(
+        self,
+        lookup: Callable[[str, str], Optional[tuple]],
+        register: Callable[[str, str, tuple], None]
+    ):
+        """
+        Initialise le lecteur.
+        
+        Args:
+            lookup: Valeur mémorisée d'une référence (genre POINT, MATRIX ou BOX)
+            register: Mémorise la valeur d'une entité identifiée
+        """
+        self.lookup = lookup
+        self.register = register
+    
+    @staticmethod
+    def kind(ifc_type: str) -> str:
+        """Genre de valeur d'un type d'entité géométrique"""
+        if ifc_type in POINT_TYPES:
+            return POINT
+        if ifc_type in MATRIX_TYPES:
+            return MATRIX
+        return BOX
+    
+    def value(self, entity: Optional[Element]) -> Optional[tuple]:
+        """
+        Valeur réduite d'une entité, incluse ou référencée.
+        
+        Args:
+            entity: Entité XML (éventuellement <IfcXxx ref="..."/>)
+        
+        Returns:
+            Point, matrice ou boîte selon le type; None si illisible
+        """
+        if entity is None:
+            return None
+        ifc_type = get_ifc_type(entity)
+        kind = self.kind(ifc_type)
+        
+        ref = entity.get("ref")
+        if ref is not None:
+            return self.lookup(kind, ref)
+        
+        if kind == POINT:
+            value = self._point(entity, ifc_type)
+        elif kind == MATRIX:
+            value = self._matrix(entity, ifc_type)
+        else:
+            value = self._box(entity, ifc_type)
+        
+        xml_id = entity.get("id")
+        if xml_id is not None and value is not None:
+            self.register(kind, xml_id, value)
+        return value
+    
+    def typed_value(self, entity: Optional[Element], kind: str) -> Optional[tuple]:
+        """
+        Valeur d'une entité si elle est du genre attendu par son rôle.
+        
+        Args:
+            entity: Entité XML ou None
+            kind: Genre attendu (POINT, MATRIX ou BOX)
+        
+        Returns:
+            Valeur réduite ou None (entité absente, illisible ou d'un autre genre)
+        """
+        if entity is None or self.kind(get_ifc_type(entity)) != kind:
+            return None
+        return self.value(entity)
+    
+    def product_box(self, product: Element) -> Optional[Box]:
+        """
+        Boîte englobante d'un produit dans le repère global.
+        
+        Args:
+            product: Élément XML du produit (ObjectPlacement, Representation)
+        
+        Returns:
+            Boîte ou None si le produit n'a pas de représentation lisible
+        """
+        box = self.typed_value(_role_entity(product, "Representation"), BOX)
+        if box is None:
+            return None
+        
+        # Sans placement, la représentation est dans le repère global
+        placement = _role_entity(product, "ObjectPlacement")
+        if placement is not None:
+            matrix = self.typed_value(placement, MATRIX)
+            if matrix is None:
+                return None
+            box = transform_box(matrix, box)
+        return box if is_finite_box(box) else None
+    
+    # ---------- Points et matrices ----------
+    
+    def _point(self, entity: Element, ifc_type: str) -> Optional[Tuple[float, float, float]]:
+        """Coordonnées d'un IfcCartesianPoint ou composantes d'un IfcDirection"""
+        name = "Coordinates" if ifc_type == "IfcCartesianPoint" else "DirectionRatios"
+        numbers = _numbers(entity, name)
+        return _vector(numbers) if numbers else None
+    
+    def _role_point(self, entity: Element, role: str) -> Optional[Tuple[float, float, float]]:
+        """Point ou direction porté par un rôle"""
+        return self.typed_value(_role_entity(entity, role), POINT)
+    
+    def _matrix(self, entity: Element, ifc_type: str) -> Optional[Matrix]:
+        """Matrice d'un placement ou d'un opérateur de transformation"""
+        if ifc_type == "IfcLocalPlacement":
+            relative = self.typed_value(_role_entity(entity, "RelativePlacement"), MATRIX)
+            if relative is None:
+                return None
+            parent = _role_entity(entity, "PlacementRelTo")
+            if parent is None:
+                return relative
+            parent_matrix = self.typed_value(parent, MATRIX)
+            return compose(parent_matrix, relative) if parent_matrix is not None else None
+        
+        if ifc_type == "IfcAxis2Placement3D":
+            origin = self._role_point(entity, "Location") or (0.0, 0.0, 0.0)
+            return axes_matrix(origin, self._role_point(entity, "Axis"), self._role_point(entity, "RefDirection"))
+        
+        if ifc_type == "IfcAxis2Placement2D":
+            origin = self._role_point(entity, "Location") or (0.0, 0.0, 0.0)
+            return axes_matrix(origin, None, self._role_point(entity, "RefDirection"))
+        
+        # IfcCartesianTransformationOperator2D/3D (uniforme ou non)
+        origin = self._role_point(entity, "LocalOrigin") or (0.0, 0.0, 0.0)
+        scale = _number(entity, "Scale", 1.0)
+        scales = (scale, _number(entity, "Scale2", scale), _number(entity, "Scale3", scale))
+        if ifc_type.startswith("IfcCartesianTransformationOperator2D"):
+            scales = (scales[0], scales[1], 1.0)
+        return axes_matrix(
+            origin, self._role_point(entity, "Axis3"), self._role_point(entity, "Axis1"), scales
+        )
+    
+    # ---------- Boîtes ----------
+    
+    def _box(self, entity: Element, ifc_type: str) -> Optional[Box]:
+        """Boîte locale d'une représentation, d'un élément de représentation ou d'un profil"""
+        if ifc_type == "IfcProductDefinitionShape":
+            return union_boxes(self.typed_value(item, BOX) for item in _role_entities(entity, "Representations"))
+        
+        if ifc_type in ("IfcShapeRepresentation", "IfcTopologyRepresentation"):
+            if entity.get("RepresentationType") in ANNOTATION_REPRESENTATION_TYPES:
+                return None
+            return union_boxes(self.typed_value(item, BOX) for item in _role_entities(entity, "Items"))
+        
+        if ifc_type == "IfcRepresentationMap":
+            box = self.typed_value(_role_entity(entity, "MappedRepresentation"), BOX)
+            origin = self.typed_value(_role_entity(entity, "MappingOrigin"), MATRIX)
+            if box is None or origin is None:
+                return box
+            return transform_box(origin, box)
+        
+        if ifc_type == "IfcMappedItem":
+            box = self.typed_value(_role_entity(entity, "MappingSource"), BOX)
+            target = self.typed_value(_role_entity(entity, "MappingTarget"), MATRIX)
+            if box is None or target is None:
+                return box
+            return transform_box(target, box)
+        
+        if ifc_type == "IfcBoundingBox":
+            corner = self._role_point(entity, "Corner") or (0.0, 0.0, 0.0)
+            dimensions = [_number(entity, name) for name in ("XDim", "YDim", "ZDim")]
+            if None in dimensions:
+                return None
+            return (*corner, corner[0] + dimensions[0], corner[1] + dimensions[1], corner[2] + dimensions[2])
+        
+        if ifc_type in ("IfcExtrudedAreaSolid", "IfcExtrudedAreaSolidTapered"):
+            return self._extrusion_box(entity)
+        
+        if ifc_type in ("IfcBooleanResult", "IfcBooleanClippingResult"):
+            first = self.typed_value(_role_entity(entity, "FirstOperand"), BOX)
+            if (entity.get("Operator") or "").upper() == "UNION":
+                return union_boxes((first, self.typed_value(_role_entity(entity, "SecondOperand"), BOX)))
+            # Différence et intersection: contenues dans le premier opérande
+            return first
+        
+        if ifc_type in PROFILE_DIMENSIONS or ifc_type in ("IfcCircleProfileDef", "IfcCircleHollowProfileDef",
+                                                          "IfcEllipseProfileDef"):
+            return self._profile_box(entity, ifc_type)
+        
+        return self._points_box(entity)
+    
+    def _extrusion_box(self, entity: Element) -> Optional[Box]:
+        """Boîte d'un solide extrudé (profil balayé sur Depth selon ExtrudedDirection)"""
+        profile = self.typed_value(_role_entity(entity, "SweptArea"), BOX)
+        depth = _number(entity, "Depth")
+        if profile is None or depth is None:
+            return None
+        direction = _normalize(self._role_point(entity, "ExtrudedDirection") or (0.0, 0.0, 1.0))
+        direction = direction or (0.0, 0.0, 1.0)
+        offset = (direction[0] * depth, direction[1] * depth, direction[2] * depth)
+        box = union_boxes((
+            profile,
+            (profile[0] + offset[0], profile[1] + offset[1], profile[2] + offset[2],
+             profile[3] + offset[0], profile[4] + offset[1], profile[5] + offset[2])
+        ))
+        matrix = self.typed_value(_role_entity(entity, "Position"), MATRIX)
+        if matrix is not None:
+            box = transform_box(matrix, box)
+        return box
+    
+    def _profile_box(self, entity: Element, ifc_type: str) -> Optional[Box]:
+        """Boîte d'un profil paramétré, dans le plan XY du solide"""
+        if ifc_type in PROFILE_DIMENSIONS:
+            width_names, depth_names = PROFILE_DIMENSIONS[ifc_type]
+            widths = [_number(entity, name) for name in width_names]
+            depths = [_number(entity, name) for name in depth_names]
+            widths = [value for value in widths if value is not None]
+            depths = [value for value in depths if value is not None]
+            if not widths or not depths:
+                return None
+            half_x, half_y = max(widths) / 2, max(depths) / 2
+        elif ifc_type == "IfcEllipseProfileDef":
+            half_x, half_y = _number(entity, "SemiAxis1"), _number(entity, "SemiAxis2")
+            if half_x is None or half_y is None:
+                return None
+        else:
+            radius = _number(entity, "Radius")
+            if radius is None:
+                return None
+            half_x = half_y = radius
+        
+        box = (-half_x, -half_y, 0.0, half_x, half_y, 0.0)
+        matrix = self.typed_value(_role_entity(entity, "Position"), MATRIX)
+        if matrix is not None:
+            box = transform_box(matrix, box)
+        return box
+    
+    def _points_box(self, entity: Element) -> Optional[Box]:
+        """
+        Boîte englobant les points d'une géométrie non interprétée.
+        
+        Parcourt les points inclus (IfcCartesianPoint, listes de coordonnées)
+        et les boîtes des entités référencées; les placements intermédiaires
+        sont ignorés (approximation).
+        """
+        coordinates = []
+        boxes = []
+        for node in entity.iter():
+            if not isinstance(node.tag, str):
+                continue
+            node_type = get_ifc_type(node)
+            if not node_type.startswith("Ifc"):
+                continue
+            
+            ref = node.get("ref")
+            if node_type == "IfcCartesianPoint":
+                point = self.lookup(POINT, ref) if ref is not None else self._point(node, node_type)
+                if point is not None:
+                    coordinates.append(point)
+            elif node_type in ("IfcCartesianPointList2D", "IfcCartesianPointList3D") and ref is None:
+                values = _numbers(node, "CoordList") or []
+                size = 2 if node_type.endswith("2D") else 3
+                coordinates.extend(
+                    _vector(values[index:index + size]) for index in range(0, len(values) - size + 1, size)
+                )
+            elif ref is not None and node is not entity and self.kind(node_type) == BOX:
+                boxes.append(self.lookup(BOX, ref))
+        
+        return union_boxes((points_box(coordinates), *boxes))
+
+
+# Types réduits et mémorisés (placements, représentations, éléments de représentation, profils)
+GEOMETRY_ENTITY_TYPES = frozenset(
+    ifc_type for ifc_type in IFC4_SUPERTYPES
+    if ifc_type not in IFC4_ABSTRACT_TYPES and any(
+        is_subtype(ifc_type, ancestor) for ancestor in (
+            "IfcGeometricRepresentationItem", "IfcTopologicalRepresentationItem", "IfcMappedItem",
+            "IfcObjectPlacement", "IfcProductDefinitionShape", "IfcShapeRepresentation",
+            "IfcTopologyRepresentation", "IfcRepresentationMap", "IfcProfileDef"
+        )
+    )
+)
@@ -0,0 +1,187 @@
+"""
+Codec des GUID IFC compressés (GlobalId)
+
+Un GlobalId IFC est un UUID de 128 bits écrit en 22 caractères d'une base 64
+propre à IFC (0-9, A-Z, a-z, _ et $): le premier caractère porte les 2 bits de
+poids fort, les 21 suivants 6 bits chacun.
+
+L'alphabet IFC est traduit vers celui de base64 (bytes.translate) puis décodé
+par binascii: après deux caractères nuls de bourrage, un GlobalId forme un bloc
+base64 de 24 caractères (18 octets, dont 2 nuls). Les conversions par lot
+traduisent, vérifient et décodent toute la liste en quelques appels C, sans
+boucle Python par caractère ni par GUID.
+"""
+
+import binascii
+import struct
+from operator import itemgetter
+from typing import Iterable, List, Optional, Sequence
+from uuid import UUID
+
+
+IFC_GUID_LENGTH = 22
+
+IFC_GUID_ALPHABET = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$"
+BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+# Tables de traduction caractère IFC <-> caractère base64 de même valeur
+_IFC_TO_BASE64 = bytes.maketrans(IFC_GUID_ALPHABET, BASE64_ALPHABET)
+_BASE64_TO_IFC = bytes.maketrans(BASE64_ALPHABET, IFC_GUID_ALPHABET)
+
+# Premier caractère: 2 bits seulement (valeurs 0 à 3)
+_FIRST_CHARACTERS = IFC_GUID_ALPHABET[:4]
+
+# Bourrage: 2 caractères nuls devant chaque GUID (bloc base64 de 24 caractères)
+_PADDING = "00"
+_BLOCK_PADDING = b"\0\0"
+
+# Bloc décodé: 2 octets nuls puis les 16 octets de l'UUID
+_DECODED_BLOCK = struct.Struct("2x16s")
+_first = itemgetter(0)
+
+
+def _decode_blocks(padded: bytes) -> bytes:
+    """
+    Décode des GUID IFC précédés chacun de leur bourrage.
+    
+    Args:
+        padded: Blocs de 24 caractères ASCII ("00" + GlobalId)
+    
+    Returns:
+        Blocs de 18 octets (2 octets nuls + UUID)
+    
+    Raises:
+        ValueError: Si un caractère est hors de l'alphabet IFC ou si un premier
+                    caractère dépasse 3
+    """
+    if padded.translate(None, IFC_GUID_ALPHABET):
+        raise ValueError("Caractère hors de l'alphabet des GUID IFC")
+    if padded[2::IFC_GUID_LENGTH + 2].translate(None, _FIRST_CHARACTERS):
+        raise ValueError("GUID IFC hors de l'intervalle 128 bits")
+    return binascii.a2b_base64(padded.translate(_IFC_TO_BASE64))
+
+
+def decode_ifc_guid(global_id: str) -> UUID:
+    """
+    Décode un GUID IFC compressé.
+    
+    Args:
+        global_id: GlobalId de 22 caractères
+    
+    Returns:
+        UUID correspondant
+    
+    Raises:
+        ValueError: Si la valeur n'est pas un GUID IFC valide
+    """
+    if len(global_id) != IFC_GUID_LENGTH:
+        raise ValueError(f"GUID IFC invalide (22 caractères attendus): {global_id!r}")
+    try:
+        padded = (_PADDING + global_id).encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError(f"GUID IFC invalide: {global_id!r}")
+    return UUID(bytes=_decode_blocks(padded)[2:])
+
+
+def encode_ifc_guid(value: UUID) -> str:
+    """
+    Encode un UUID en GUID IFC compressé.
+    
+    Args:
+        value: UUID à encoder
+    
+    Returns:
+        GlobalId de 22 caractères
+    """
+    encoded = binascii.b2a_base64(_BLOCK_PADDING + value.bytes, newline=False)
+    return encoded[2:].translate(_BASE64_TO_IFC).decode("ascii")
+
+
+def decode_ifc_guids(global_ids: Sequence[str]) -> bytes:
+    """
+    Décode une liste de GUID IFC compressés en un seul passage.
+    
+    Args:
+        global_ids: GlobalId de 22 caractères
+    
+    Returns:
+        UUID concaténés (16 octets par GUID, dans l'ordre de la liste)
+    
+    Raises:
+        ValueError: Si une valeur n'est pas un GUID IFC valide
+    """
+    if not global_ids:
+        return b""
+    if set(map(len, global_ids)) != {IFC_GUID_LENGTH}:
+        raise ValueError("GUID IFC invalide (22 caractères attendus)")
+    try:
+        padded = (_PADDING + _PADDING.join(global_ids)).encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError("Caractère hors de l'alphabet des GUID IFC")
+    
+    blocks = _decode_blocks(padded)
+    return b"".join(map(_first, _DECODED_BLOCK.iter_unpack(blocks)))
+
+
+def encode_ifc_guids(values: Iterable[UUID]) -> List[str]:
+    """
+    Encode une liste d'UUID en GUID IFC compressés en un seul passage.
+    
+    Args:
+        values: UUID à encoder
+    
+    Returns:
+        GlobalId de 22 caractères, dans l'ordre des UUID
+    """
+    raw = b"".join([_BLOCK_PADDING + value.bytes for value in values])
+    if not raw:
+        return []
+    encoded = binascii.b2a_base64(raw, newline=False).translate(_BASE64_TO_IFC).decode("ascii")
+    return [encoded[offset + 2:offset + 24] for offset in range(0, len(encoded), 24)]
+
+
+def parse_guid(value: str) -> Optional[UUID]:
+    """
+    Lit un GUID écrit en GlobalId IFC compressé ou en UUID standard.
+    
+    Args:
+        value: GlobalId de 22 caractères ou UUID (36 ou 32 caractères)
+    
+    Returns:
+        UUID ou None si la valeur n'est ni l'un ni l'autre
+    """
+    try:
+        if len(value) == IFC_GUID_LENGTH:
+            return decode_ifc_guid(value)
+        return UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def parse_guids(values: Sequence[str]) -> List[Optional[UUID]]:
+    """
+    Lit une liste de GUID (GlobalId IFC ou UUID), les GlobalId étant décodés par lot.
+    
+    Args:
+        values: GlobalId de 22 caractères ou UUID
+    
+    Returns:
+        UUID dans l'ordre des valeurs (None pour une valeur invalide)
+    """
+    results: List[Optional[UUID]] = [None] * len(values)
+    compressed = [index for index, value in enumerate(values) if len(value) == IFC_GUID_LENGTH]
+    
+    try:
+        raw = decode_ifc_guids([values[index] for index in compressed])
+        for position, index in enumerate(compressed):
+            results[index] = UUID(bytes=raw[position * 16:position * 16 + 16])
+    except ValueError:
+        # Au moins une valeur invalide: décodage individuel pour isoler les erreurs
+        for index in compressed:
+            results[index] = parse_guid(values[index])
+    
+    compressed_indexes = set(compressed)
+    for index, value in enumerate(values):
+        if index not in compressed_indexes:
+            results[index] = parse_guid(value)
+    return results
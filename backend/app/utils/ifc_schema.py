@@ -0,0 +1,903 @@
+"""
+Hiérarchie des entités IFC4 (ifcXML4.xsd)
+
+Généré par scripts/generate_ifc_schema.py - ne pas modifier à la main.
+"""
+
+
+# Type IFC -> supertype direct (None pour les entités racines)
+IFC4_SUPERTYPES = {
+    "IfcActionRequest": "IfcControl",
+    "IfcActor": "IfcObject",
+    "IfcActorRole": None,
+    "IfcActuator": "IfcDistributionControlElement",
+    "IfcActuatorType": "IfcDistributionControlElementType",
+    "IfcAddress": None,
+    "IfcAdvancedBrep": "IfcManifoldSolidBrep",
+    "IfcAdvancedBrepWithVoids": "IfcAdvancedBrep",
+    "IfcAdvancedFace": "IfcFaceSurface",
+    "IfcAirTerminal": "IfcFlowTerminal",
+    "IfcAirTerminalBox": "IfcFlowController",
+    "IfcAirTerminalBoxType": "IfcFlowControllerType",
+    "IfcAirTerminalType": "IfcFlowTerminalType",
+    "IfcAirToAirHeatRecovery": "IfcEnergyConversionDevice",
+    "IfcAirToAirHeatRecoveryType": "IfcEnergyConversionDeviceType",
+    "IfcAlarm": "IfcDistributionControlElement",
+    "IfcAlarmType": "IfcDistributionControlElementType",
+    "IfcAnnotation": "IfcProduct",
+    "IfcAnnotationFillArea": "IfcGeometricRepresentationItem",
+    "IfcApplication": None,
+    "IfcAppliedValue": None,
+    "IfcApproval": None,
+    "IfcApprovalRelationship": "IfcResourceLevelRelationship",
+    "IfcArbitraryClosedProfileDef": "IfcProfileDef",
+    "IfcArbitraryOpenProfileDef": "IfcProfileDef",
+    "IfcArbitraryProfileDefWithVoids": "IfcArbitraryClosedProfileDef",
+    "IfcAsset": "IfcGroup",
+    "IfcAsymmetricIShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcAudioVisualAppliance": "IfcFlowTerminal",
+    "IfcAudioVisualApplianceType": "IfcFlowTerminalType",
+    "IfcAxis1Placement": "IfcPlacement",
+    "IfcAxis2Placement2D": "IfcPlacement",
+    "IfcAxis2Placement3D": "IfcPlacement",
+    "IfcBSplineCurve": "IfcBoundedCurve",
+    "IfcBSplineCurveWithKnots": "IfcBSplineCurve",
+    "IfcBSplineSurface": "IfcBoundedSurface",
+    "IfcBSplineSurfaceWithKnots": "IfcBSplineSurface",
+    "IfcBeam": "IfcBuildingElement",
+    "IfcBeamStandardCase": "IfcBeam",
+    "IfcBeamType": "IfcBuildingElementType",
+    "IfcBlobTexture": "IfcSurfaceTexture",
+    "IfcBlock": "IfcCsgPrimitive3D",
+    "IfcBoiler": "IfcEnergyConversionDevice",
+    "IfcBoilerType": "IfcEnergyConversionDeviceType",
+    "IfcBooleanClippingResult": "IfcBooleanResult",
+    "IfcBooleanResult": "IfcGeometricRepresentationItem",
+    "IfcBoundaryCondition": None,
+    "IfcBoundaryCurve": "IfcCompositeCurveOnSurface",
+    "IfcBoundaryEdgeCondition": "IfcBoundaryCondition",
+    "IfcBoundaryFaceCondition": "IfcBoundaryCondition",
+    "IfcBoundaryNodeCondition": "IfcBoundaryCondition",
+    "IfcBoundaryNodeConditionWarping": "IfcBoundaryNodeCondition",
+    "IfcBoundedCurve": "IfcCurve",
+    "IfcBoundedSurface": "IfcSurface",
+    "IfcBoundingBox": "IfcGeometricRepresentationItem",
+    "IfcBoxedHalfSpace": "IfcHalfSpaceSolid",
+    "IfcBuilding": "IfcSpatialStructureElement",
+    "IfcBuildingElement": "IfcElement",
+    "IfcBuildingElementPart": "IfcElementComponent",
+    "IfcBuildingElementPartType": "IfcElementComponentType",
+    "IfcBuildingElementProxy": "IfcBuildingElement",
+    "IfcBuildingElementProxyType": "IfcBuildingElementType",
+    "IfcBuildingElementType": "IfcElementType",
+    "IfcBuildingStorey": "IfcSpatialStructureElement",
+    "IfcBuildingSystem": "IfcSystem",
+    "IfcBurner": "IfcEnergyConversionDevice",
+    "IfcBurnerType": "IfcEnergyConversionDeviceType",
+    "IfcCShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcCableCarrierFitting": "IfcFlowFitting",
+    "IfcCableCarrierFittingType": "IfcFlowFittingType",
+    "IfcCableCarrierSegment": "IfcFlowSegment",
+    "IfcCableCarrierSegmentType": "IfcFlowSegmentType",
+    "IfcCableFitting": "IfcFlowFitting",
+    "IfcCableFittingType": "IfcFlowFittingType",
+    "IfcCableSegment": "IfcFlowSegment",
+    "IfcCableSegmentType": "IfcFlowSegmentType",
+    "IfcCartesianPoint": "IfcPoint",
+    "IfcCartesianPointList": "IfcGeometricRepresentationItem",
+    "IfcCartesianPointList3D": "IfcCartesianPointList",
+    "IfcCartesianTransformationOperator": "IfcGeometricRepresentationItem",
+    "IfcCartesianTransformationOperator2D": "IfcCartesianTransformationOperator",
+    "IfcCartesianTransformationOperator2DnonUniform": "IfcCartesianTransformationOperator2D",
+    "IfcCartesianTransformationOperator3D": "IfcCartesianTransformationOperator",
+    "IfcCartesianTransformationOperator3DnonUniform": "IfcCartesianTransformationOperator3D",
+    "IfcCenterLineProfileDef": "IfcArbitraryOpenProfileDef",
+    "IfcChiller": "IfcEnergyConversionDevice",
+    "IfcChillerType": "IfcEnergyConversionDeviceType",
+    "IfcChimney": "IfcBuildingElement",
+    "IfcChimneyType": "IfcBuildingElementType",
+    "IfcCircle": "IfcConic",
+    "IfcCircleHollowProfileDef": "IfcCircleProfileDef",
+    "IfcCircleProfileDef": "IfcParameterizedProfileDef",
+    "IfcCivilElement": "IfcElement",
+    "IfcCivilElementType": "IfcElementType",
+    "IfcClassification": "IfcExternalInformation",
+    "IfcClassificationReference": "IfcExternalReference",
+    "IfcClosedShell": "IfcConnectedFaceSet",
+    "IfcCoil": "IfcEnergyConversionDevice",
+    "IfcCoilType": "IfcEnergyConversionDeviceType",
+    "IfcColourRgb": "IfcColourSpecification",
+    "IfcColourRgbList": "IfcPresentationItem",
+    "IfcColourSpecification": "IfcPresentationItem",
+    "IfcColumn": "IfcBuildingElement",
+    "IfcColumnStandardCase": "IfcColumn",
+    "IfcColumnType": "IfcBuildingElementType",
+    "IfcCommunicationsAppliance": "IfcFlowTerminal",
+    "IfcCommunicationsApplianceType": "IfcFlowTerminalType",
+    "IfcComplexProperty": "IfcProperty",
+    "IfcComplexPropertyTemplate": "IfcPropertyTemplate",
+    "IfcCompositeCurve": "IfcBoundedCurve",
+    "IfcCompositeCurveOnSurface": "IfcCompositeCurve",
+    "IfcCompositeCurveSegment": "IfcGeometricRepresentationItem",
+    "IfcCompositeProfileDef": "IfcProfileDef",
+    "IfcCompressor": "IfcFlowMovingDevice",
+    "IfcCompressorType": "IfcFlowMovingDeviceType",
+    "IfcCondenser": "IfcEnergyConversionDevice",
+    "IfcCondenserType": "IfcEnergyConversionDeviceType",
+    "IfcConic": "IfcCurve",
+    "IfcConnectedFaceSet": "IfcTopologicalRepresentationItem",
+    "IfcConnectionCurveGeometry": "IfcConnectionGeometry",
+    "IfcConnectionGeometry": None,
+    "IfcConnectionPointEccentricity": "IfcConnectionPointGeometry",
+    "IfcConnectionPointGeometry": "IfcConnectionGeometry",
+    "IfcConnectionSurfaceGeometry": "IfcConnectionGeometry",
+    "IfcConnectionVolumeGeometry": "IfcConnectionGeometry",
+    "IfcConstraint": None,
+    "IfcConstructionEquipmentResource": "IfcConstructionResource",
+    "IfcConstructionEquipmentResourceType": "IfcConstructionResourceType",
+    "IfcConstructionMaterialResource": "IfcConstructionResource",
+    "IfcConstructionMaterialResourceType": "IfcConstructionResourceType",
+    "IfcConstructionProductResource": "IfcConstructionResource",
+    "IfcConstructionProductResourceType": "IfcConstructionResourceType",
+    "IfcConstructionResource": "IfcResource",
+    "IfcConstructionResourceType": "IfcTypeResource",
+    "IfcContext": "IfcObjectDefinition",
+    "IfcContextDependentUnit": "IfcNamedUnit",
+    "IfcControl": "IfcObject",
+    "IfcController": "IfcDistributionControlElement",
+    "IfcControllerType": "IfcDistributionControlElementType",
+    "IfcConversionBasedUnit": "IfcNamedUnit",
+    "IfcConversionBasedUnitWithOffset": "IfcConversionBasedUnit",
+    "IfcCooledBeam": "IfcEnergyConversionDevice",
+    "IfcCooledBeamType": "IfcEnergyConversionDeviceType",
+    "IfcCoolingTower": "IfcEnergyConversionDevice",
+    "IfcCoolingTowerType": "IfcEnergyConversionDeviceType",
+    "IfcCoordinateOperation": None,
+    "IfcCoordinateReferenceSystem": None,
+    "IfcCostItem": "IfcControl",
+    "IfcCostSchedule": "IfcControl",
+    "IfcCostValue": "IfcAppliedValue",
+    "IfcCovering": "IfcBuildingElement",
+    "IfcCoveringType": "IfcBuildingElementType",
+    "IfcCrewResource": "IfcConstructionResource",
+    "IfcCrewResourceType": "IfcConstructionResourceType",
+    "IfcCsgPrimitive3D": "IfcGeometricRepresentationItem",
+    "IfcCsgSolid": "IfcSolidModel",
+    "IfcCurrencyRelationship": "IfcResourceLevelRelationship",
+    "IfcCurtainWall": "IfcBuildingElement",
+    "IfcCurtainWallType": "IfcBuildingElementType",
+    "IfcCurve": "IfcGeometricRepresentationItem",
+    "IfcCurveBoundedPlane": "IfcBoundedSurface",
+    "IfcCurveBoundedSurface": "IfcBoundedSurface",
+    "IfcCurveStyle": "IfcPresentationStyle",
+    "IfcCurveStyleFont": "IfcPresentationItem",
+    "IfcCurveStyleFontAndScaling": "IfcPresentationItem",
+    "IfcCurveStyleFontPattern": "IfcPresentationItem",
+    "IfcCylindricalSurface": "IfcElementarySurface",
+    "IfcDamper": "IfcFlowController",
+    "IfcDamperType": "IfcFlowControllerType",
+    "IfcDerivedProfileDef": "IfcProfileDef",
+    "IfcDerivedUnit": None,
+    "IfcDerivedUnitElement": None,
+    "IfcDimensionalExponents": None,
+    "IfcDirection": "IfcGeometricRepresentationItem",
+    "IfcDiscreteAccessory": "IfcElementComponent",
+    "IfcDiscreteAccessoryType": "IfcElementComponentType",
+    "IfcDistributionChamberElement": "IfcDistributionFlowElement",
+    "IfcDistributionChamberElementType": "IfcDistributionFlowElementType",
+    "IfcDistributionCircuit": "IfcDistributionSystem",
+    "IfcDistributionControlElement": "IfcDistributionElement",
+    "IfcDistributionControlElementType": "IfcDistributionElementType",
+    "IfcDistributionElement": "IfcElement",
+    "IfcDistributionElementType": "IfcElementType",
+    "IfcDistributionFlowElement": "IfcDistributionElement",
+    "IfcDistributionFlowElementType": "IfcDistributionElementType",
+    "IfcDistributionPort": "IfcPort",
+    "IfcDistributionSystem": "IfcSystem",
+    "IfcDocumentInformation": "IfcExternalInformation",
+    "IfcDocumentInformationRelationship": "IfcResourceLevelRelationship",
+    "IfcDocumentReference": "IfcExternalReference",
+    "IfcDoor": "IfcBuildingElement",
+    "IfcDoorLiningProperties": "IfcPreDefinedPropertySet",
+    "IfcDoorPanelProperties": "IfcPreDefinedPropertySet",
+    "IfcDoorStandardCase": "IfcDoor",
+    "IfcDoorStyle": "IfcTypeProduct",
+    "IfcDoorType": "IfcBuildingElementType",
+    "IfcDraughtingPreDefinedColour": "IfcPreDefinedColour",
+    "IfcDraughtingPreDefinedCurveFont": "IfcPreDefinedCurveFont",
+    "IfcDuctFitting": "IfcFlowFitting",
+    "IfcDuctFittingType": "IfcFlowFittingType",
+    "IfcDuctSegment": "IfcFlowSegment",
+    "IfcDuctSegmentType": "IfcFlowSegmentType",
+    "IfcDuctSilencer": "IfcFlowTreatmentDevice",
+    "IfcDuctSilencerType": "IfcFlowTreatmentDeviceType",
+    "IfcEdge": "IfcTopologicalRepresentationItem",
+    "IfcEdgeCurve": "IfcEdge",
+    "IfcEdgeLoop": "IfcLoop",
+    "IfcElectricAppliance": "IfcFlowTerminal",
+    "IfcElectricApplianceType": "IfcFlowTerminalType",
+    "IfcElectricDistributionBoard": "IfcFlowController",
+    "IfcElectricDistributionBoardType": "IfcFlowControllerType",
+    "IfcElectricFlowStorageDevice": "IfcFlowStorageDevice",
+    "IfcElectricFlowStorageDeviceType": "IfcFlowStorageDeviceType",
+    "IfcElectricGenerator": "IfcEnergyConversionDevice",
+    "IfcElectricGeneratorType": "IfcEnergyConversionDeviceType",
+    "IfcElectricMotor": "IfcEnergyConversionDevice",
+    "IfcElectricMotorType": "IfcEnergyConversionDeviceType",
+    "IfcElectricTimeControl": "IfcFlowController",
+    "IfcElectricTimeControlType": "IfcFlowControllerType",
+    "IfcElement": "IfcProduct",
+    "IfcElementAssembly": "IfcElement",
+    "IfcElementAssemblyType": "IfcElementType",
+    "IfcElementComponent": "IfcElement",
+    "IfcElementComponentType": "IfcElementType",
+    "IfcElementQuantity": "IfcQuantitySet",
+    "IfcElementType": "IfcTypeProduct",
+    "IfcElementarySurface": "IfcSurface",
+    "IfcEllipse": "IfcConic",
+    "IfcEllipseProfileDef": "IfcParameterizedProfileDef",
+    "IfcEnergyConversionDevice": "IfcDistributionFlowElement",
+    "IfcEnergyConversionDeviceType": "IfcDistributionFlowElementType",
+    "IfcEngine": "IfcEnergyConversionDevice",
+    "IfcEngineType": "IfcEnergyConversionDeviceType",
+    "IfcEvaporativeCooler": "IfcEnergyConversionDevice",
+    "IfcEvaporativeCoolerType": "IfcEnergyConversionDeviceType",
+    "IfcEvaporator": "IfcEnergyConversionDevice",
+    "IfcEvaporatorType": "IfcEnergyConversionDeviceType",
+    "IfcEvent": "IfcProcess",
+    "IfcEventTime": "IfcSchedulingTime",
+    "IfcEventType": "IfcTypeProcess",
+    "IfcExtendedProperties": "IfcPropertyAbstraction",
+    "IfcExternalInformation": None,
+    "IfcExternalReference": None,
+    "IfcExternalReferenceRelationship": "IfcResourceLevelRelationship",
+    "IfcExternalSpatialElement": "IfcExternalSpatialStructureElement",
+    "IfcExternalSpatialStructureElement": "IfcSpatialElement",
+    "IfcExternallyDefinedHatchStyle": "IfcExternalReference",
+    "IfcExternallyDefinedSurfaceStyle": "IfcExternalReference",
+    "IfcExternallyDefinedTextFont": "IfcExternalReference",
+    "IfcExtrudedAreaSolid": "IfcSweptAreaSolid",
+    "IfcExtrudedAreaSolidTapered": "IfcExtrudedAreaSolid",
+    "IfcFace": "IfcTopologicalRepresentationItem",
+    "IfcFaceBasedSurfaceModel": "IfcGeometricRepresentationItem",
+    "IfcFaceBound": "IfcTopologicalRepresentationItem",
+    "IfcFaceOuterBound": "IfcFaceBound",
+    "IfcFaceSurface": "IfcFace",
+    "IfcFacetedBrep": "IfcManifoldSolidBrep",
+    "IfcFacetedBrepWithVoids": "IfcFacetedBrep",
+    "IfcFailureConnectionCondition": "IfcStructuralConnectionCondition",
+    "IfcFan": "IfcFlowMovingDevice",
+    "IfcFanType": "IfcFlowMovingDeviceType",
+    "IfcFastener": "IfcElementComponent",
+    "IfcFastenerType": "IfcElementComponentType",
+    "IfcFeatureElement": "IfcElement",
+    "IfcFeatureElementAddition": "IfcFeatureElement",
+    "IfcFeatureElementSubtraction": "IfcFeatureElement",
+    "IfcFillAreaStyle": "IfcPresentationStyle",
+    "IfcFillAreaStyleHatching": "IfcGeometricRepresentationItem",
+    "IfcFillAreaStyleTiles": "IfcGeometricRepresentationItem",
+    "IfcFilter": "IfcFlowTreatmentDevice",
+    "IfcFilterType": "IfcFlowTreatmentDeviceType",
+    "IfcFireSuppressionTerminal": "IfcFlowTerminal",
+    "IfcFireSuppressionTerminalType": "IfcFlowTerminalType",
+    "IfcFixedReferenceSweptAreaSolid": "IfcSweptAreaSolid",
+    "IfcFlowController": "IfcDistributionFlowElement",
+    "IfcFlowControllerType": "IfcDistributionFlowElementType",
+    "IfcFlowFitting": "IfcDistributionFlowElement",
+    "IfcFlowFittingType": "IfcDistributionFlowElementType",
+    "IfcFlowInstrument": "IfcDistributionControlElement",
+    "IfcFlowInstrumentType": "IfcDistributionControlElementType",
+    "IfcFlowMeter": "IfcFlowController",
+    "IfcFlowMeterType": "IfcFlowControllerType",
+    "IfcFlowMovingDevice": "IfcDistributionFlowElement",
+    "IfcFlowMovingDeviceType": "IfcDistributionFlowElementType",
+    "IfcFlowSegment": "IfcDistributionFlowElement",
+    "IfcFlowSegmentType": "IfcDistributionFlowElementType",
+    "IfcFlowStorageDevice": "IfcDistributionFlowElement",
+    "IfcFlowStorageDeviceType": "IfcDistributionFlowElementType",
+    "IfcFlowTerminal": "IfcDistributionFlowElement",
+    "IfcFlowTerminalType": "IfcDistributionFlowElementType",
+    "IfcFlowTreatmentDevice": "IfcDistributionFlowElement",
+    "IfcFlowTreatmentDeviceType": "IfcDistributionFlowElementType",
+    "IfcFooting": "IfcBuildingElement",
+    "IfcFootingType": "IfcBuildingElementType",
+    "IfcFurnishingElement": "IfcElement",
+    "IfcFurnishingElementType": "IfcElementType",
+    "IfcFurniture": "IfcFurnishingElement",
+    "IfcFurnitureType": "IfcFurnishingElementType",
+    "IfcGeographicElement": "IfcElement",
+    "IfcGeographicElementType": "IfcElementType",
+    "IfcGeometricCurveSet": "IfcGeometricSet",
+    "IfcGeometricRepresentationContext": "IfcRepresentationContext",
+    "IfcGeometricRepresentationItem": "IfcRepresentationItem",
+    "IfcGeometricRepresentationSubContext": "IfcGeometricRepresentationContext",
+    "IfcGeometricSet": "IfcGeometricRepresentationItem",
+    "IfcGrid": "IfcProduct",
+    "IfcGridAxis": None,
+    "IfcGridPlacement": "IfcObjectPlacement",
+    "IfcGroup": "IfcObject",
+    "IfcHalfSpaceSolid": "IfcGeometricRepresentationItem",
+    "IfcHeatExchanger": "IfcEnergyConversionDevice",
+    "IfcHeatExchangerType": "IfcEnergyConversionDeviceType",
+    "IfcHumidifier": "IfcEnergyConversionDevice",
+    "IfcHumidifierType": "IfcEnergyConversionDeviceType",
+    "IfcIShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcImageTexture": "IfcSurfaceTexture",
+    "IfcIndexedColourMap": "IfcPresentationItem",
+    "IfcIndexedTextureMap": "IfcTextureCoordinate",
+    "IfcIndexedTriangleTextureMap": "IfcIndexedTextureMap",
+    "IfcInterceptor": "IfcFlowTreatmentDevice",
+    "IfcInterceptorType": "IfcFlowTreatmentDeviceType",
+    "IfcInventory": "IfcGroup",
+    "IfcIrregularTimeSeries": "IfcTimeSeries",
+    "IfcIrregularTimeSeriesValue": None,
+    "IfcJunctionBox": "IfcFlowFitting",
+    "IfcJunctionBoxType": "IfcFlowFittingType",
+    "IfcLShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcLaborResource": "IfcConstructionResource",
+    "IfcLaborResourceType": "IfcConstructionResourceType",
+    "IfcLagTime": "IfcSchedulingTime",
+    "IfcLamp": "IfcFlowTerminal",
+    "IfcLampType": "IfcFlowTerminalType",
+    "IfcLibraryInformation": "IfcExternalInformation",
+    "IfcLibraryReference": "IfcExternalReference",
+    "IfcLightDistributionData": None,
+    "IfcLightFixture": "IfcFlowTerminal",
+    "IfcLightFixtureType": "IfcFlowTerminalType",
+    "IfcLightIntensityDistribution": None,
+    "IfcLightSource": "IfcGeometricRepresentationItem",
+    "IfcLightSourceAmbient": "IfcLightSource",
+    "IfcLightSourceDirectional": "IfcLightSource",
+    "IfcLightSourceGoniometric": "IfcLightSource",
+    "IfcLightSourcePositional": "IfcLightSource",
+    "IfcLightSourceSpot": "IfcLightSourcePositional",
+    "IfcLine": "IfcCurve",
+    "IfcLocalPlacement": "IfcObjectPlacement",
+    "IfcLoop": "IfcTopologicalRepresentationItem",
+    "IfcManifoldSolidBrep": "IfcSolidModel",
+    "IfcMapConversion": "IfcCoordinateOperation",
+    "IfcMappedItem": "IfcRepresentationItem",
+    "IfcMaterial": "IfcMaterialDefinition",
+    "IfcMaterialClassificationRelationship": None,
+    "IfcMaterialConstituent": "IfcMaterialDefinition",
+    "IfcMaterialConstituentSet": "IfcMaterialDefinition",
+    "IfcMaterialDefinition": None,
+    "IfcMaterialDefinitionRepresentation": "IfcProductRepresentation",
+    "IfcMaterialLayer": "IfcMaterialDefinition",
+    "IfcMaterialLayerSet": "IfcMaterialDefinition",
+    "IfcMaterialLayerSetUsage": "IfcMaterialUsageDefinition",
+    "IfcMaterialLayerWithOffsets": "IfcMaterialLayer",
+    "IfcMaterialList": None,
+    "IfcMaterialProfile": "IfcMaterialDefinition",
+    "IfcMaterialProfileSet": "IfcMaterialDefinition",
+    "IfcMaterialProfileSetUsage": "IfcMaterialUsageDefinition",
+    "IfcMaterialProfileSetUsageTapering": "IfcMaterialProfileSetUsage",
+    "IfcMaterialProfileWithOffsets": "IfcMaterialProfile",
+    "IfcMaterialProperties": "IfcExtendedProperties",
+    "IfcMaterialRelationship": "IfcResourceLevelRelationship",
+    "IfcMaterialUsageDefinition": None,
+    "IfcMeasureWithUnit": None,
+    "IfcMechanicalFastener": "IfcElementComponent",
+    "IfcMechanicalFastenerType": "IfcElementComponentType",
+    "IfcMedicalDevice": "IfcFlowTerminal",
+    "IfcMedicalDeviceType": "IfcFlowTerminalType",
+    "IfcMember": "IfcBuildingElement",
+    "IfcMemberStandardCase": "IfcMember",
+    "IfcMemberType": "IfcBuildingElementType",
+    "IfcMetric": "IfcConstraint",
+    "IfcMirroredProfileDef": "IfcDerivedProfileDef",
+    "IfcMonetaryUnit": None,
+    "IfcMotorConnection": "IfcEnergyConversionDevice",
+    "IfcMotorConnectionType": "IfcEnergyConversionDeviceType",
+    "IfcNamedUnit": None,
+    "IfcObject": "IfcObjectDefinition",
+    "IfcObjectDefinition": "IfcRoot",
+    "IfcObjectPlacement": None,
+    "IfcObjective": "IfcConstraint",
+    "IfcOccupant": "IfcActor",
+    "IfcOffsetCurve2D": "IfcCurve",
+    "IfcOffsetCurve3D": "IfcCurve",
+    "IfcOpenShell": "IfcConnectedFaceSet",
+    "IfcOpeningElement": "IfcFeatureElementSubtraction",
+    "IfcOpeningStandardCase": "IfcOpeningElement",
+    "IfcOrganization": None,
+    "IfcOrganizationRelationship": "IfcResourceLevelRelationship",
+    "IfcOrientedEdge": "IfcEdge",
+    "IfcOuterBoundaryCurve": "IfcBoundaryCurve",
+    "IfcOutlet": "IfcFlowTerminal",
+    "IfcOutletType": "IfcFlowTerminalType",
+    "IfcOwnerHistory": None,
+    "IfcParameterizedProfileDef": "IfcProfileDef",
+    "IfcPath": "IfcTopologicalRepresentationItem",
+    "IfcPcurve": "IfcCurve",
+    "IfcPerformanceHistory": "IfcControl",
+    "IfcPermeableCoveringProperties": "IfcPreDefinedPropertySet",
+    "IfcPermit": "IfcControl",
+    "IfcPerson": None,
+    "IfcPersonAndOrganization": None,
+    "IfcPhysicalComplexQuantity": "IfcPhysicalQuantity",
+    "IfcPhysicalQuantity": None,
+    "IfcPhysicalSimpleQuantity": "IfcPhysicalQuantity",
+    "IfcPile": "IfcBuildingElement",
+    "IfcPileType": "IfcBuildingElementType",
+    "IfcPipeFitting": "IfcFlowFitting",
+    "IfcPipeFittingType": "IfcFlowFittingType",
+    "IfcPipeSegment": "IfcFlowSegment",
+    "IfcPipeSegmentType": "IfcFlowSegmentType",
+    "IfcPixelTexture": "IfcSurfaceTexture",
+    "IfcPlacement": "IfcGeometricRepresentationItem",
+    "IfcPlanarBox": "IfcPlanarExtent",
+    "IfcPlanarExtent": "IfcGeometricRepresentationItem",
+    "IfcPlane": "IfcElementarySurface",
+    "IfcPlate": "IfcBuildingElement",
+    "IfcPlateStandardCase": "IfcPlate",
+    "IfcPlateType": "IfcBuildingElementType",
+    "IfcPoint": "IfcGeometricRepresentationItem",
+    "IfcPointOnCurve": "IfcPoint",
+    "IfcPointOnSurface": "IfcPoint",
+    "IfcPolyLoop": "IfcLoop",
+    "IfcPolygonalBoundedHalfSpace": "IfcHalfSpaceSolid",
+    "IfcPolyline": "IfcBoundedCurve",
+    "IfcPort": "IfcProduct",
+    "IfcPostalAddress": "IfcAddress",
+    "IfcPreDefinedColour": "IfcPreDefinedItem",
+    "IfcPreDefinedCurveFont": "IfcPreDefinedItem",
+    "IfcPreDefinedItem": "IfcPresentationItem",
+    "IfcPreDefinedProperties": "IfcPropertyAbstraction",
+    "IfcPreDefinedPropertySet": "IfcPropertySetDefinition",
+    "IfcPreDefinedTextFont": "IfcPreDefinedItem",
+    "IfcPresentationItem": None,
+    "IfcPresentationLayerAssignment": None,
+    "IfcPresentationLayerWithStyle": "IfcPresentationLayerAssignment",
+    "IfcPresentationStyle": None,
+    "IfcPresentationStyleAssignment": None,
+    "IfcProcedure": "IfcProcess",
+    "IfcProcedureType": "IfcTypeProcess",
+    "IfcProcess": "IfcObject",
+    "IfcProduct": "IfcObject",
+    "IfcProductDefinitionShape": "IfcProductRepresentation",
+    "IfcProductRepresentation": None,
+    "IfcProfileDef": None,
+    "IfcProfileProperties": "IfcExtendedProperties",
+    "IfcProject": "IfcContext",
+    "IfcProjectLibrary": "IfcContext",
+    "IfcProjectOrder": "IfcControl",
+    "IfcProjectedCRS": "IfcCoordinateReferenceSystem",
+    "IfcProjectionElement": "IfcFeatureElementAddition",
+    "IfcProperty": "IfcPropertyAbstraction",
+    "IfcPropertyAbstraction": None,
+    "IfcPropertyBoundedValue": "IfcSimpleProperty",
+    "IfcPropertyDefinition": "IfcRoot",
+    "IfcPropertyDependencyRelationship": "IfcResourceLevelRelationship",
+    "IfcPropertyEnumeratedValue": "IfcSimpleProperty",
+    "IfcPropertyEnumeration": "IfcPropertyAbstraction",
+    "IfcPropertyListValue": "IfcSimpleProperty",
+    "IfcPropertyReferenceValue": "IfcSimpleProperty",
+    "IfcPropertySet": "IfcPropertySetDefinition",
+    "IfcPropertySetDefinition": "IfcPropertyDefinition",
+    "IfcPropertySetTemplate": "IfcPropertyTemplateDefinition",
+    "IfcPropertySingleValue": "IfcSimpleProperty",
+    "IfcPropertyTableValue": "IfcSimpleProperty",
+    "IfcPropertyTemplate": "IfcPropertyTemplateDefinition",
+    "IfcPropertyTemplateDefinition": "IfcPropertyDefinition",
+    "IfcProtectiveDevice": "IfcFlowController",
+    "IfcProtectiveDeviceTrippingUnit": "IfcDistributionControlElement",
+    "IfcProtectiveDeviceTrippingUnitType": "IfcDistributionControlElementType",
+    "IfcProtectiveDeviceType": "IfcFlowControllerType",
+    "IfcProxy": "IfcProduct",
+    "IfcPump": "IfcFlowMovingDevice",
+    "IfcPumpType": "IfcFlowMovingDeviceType",
+    "IfcQuantityArea": "IfcPhysicalSimpleQuantity",
+    "IfcQuantityCount": "IfcPhysicalSimpleQuantity",
+    "IfcQuantityLength": "IfcPhysicalSimpleQuantity",
+    "IfcQuantitySet": "IfcPropertySetDefinition",
+    "IfcQuantityTime": "IfcPhysicalSimpleQuantity",
+    "IfcQuantityVolume": "IfcPhysicalSimpleQuantity",
+    "IfcQuantityWeight": "IfcPhysicalSimpleQuantity",
+    "IfcRailing": "IfcBuildingElement",
+    "IfcRailingType": "IfcBuildingElementType",
+    "IfcRamp": "IfcBuildingElement",
+    "IfcRampFlight": "IfcBuildingElement",
+    "IfcRampFlightType": "IfcBuildingElementType",
+    "IfcRampType": "IfcBuildingElementType",
+    "IfcRationalBSplineCurveWithKnots": "IfcBSplineCurveWithKnots",
+    "IfcRationalBSplineSurfaceWithKnots": "IfcBSplineSurfaceWithKnots",
+    "IfcRectangleHollowProfileDef": "IfcRectangleProfileDef",
+    "IfcRectangleProfileDef": "IfcParameterizedProfileDef",
+    "IfcRectangularPyramid": "IfcCsgPrimitive3D",
+    "IfcRectangularTrimmedSurface": "IfcBoundedSurface",
+    "IfcRecurrencePattern": None,
+    "IfcReference": None,
+    "IfcRegularTimeSeries": "IfcTimeSeries",
+    "IfcReinforcementBarProperties": "IfcPreDefinedProperties",
+    "IfcReinforcementDefinitionProperties": "IfcPreDefinedPropertySet",
+    "IfcReinforcingBar": "IfcReinforcingElement",
+    "IfcReinforcingBarType": "IfcReinforcingElementType",
+    "IfcReinforcingElement": "IfcElementComponent",
+    "IfcReinforcingElementType": "IfcElementComponentType",
+    "IfcReinforcingMesh": "IfcReinforcingElement",
+    "IfcReinforcingMeshType": "IfcReinforcingElementType",
+    "IfcRelAggregates": "IfcRelDecomposes",
+    "IfcRelAssigns": "IfcRelationship",
+    "IfcRelAssignsToActor": "IfcRelAssigns",
+    "IfcRelAssignsToControl": "IfcRelAssigns",
+    "IfcRelAssignsToGroup": "IfcRelAssigns",
+    "IfcRelAssignsToGroupByFactor": "IfcRelAssignsToGroup",
+    "IfcRelAssignsToProcess": "IfcRelAssigns",
+    "IfcRelAssignsToProduct": "IfcRelAssigns",
+    "IfcRelAssignsToResource": "IfcRelAssigns",
+    "IfcRelAssociates": "IfcRelationship",
+    "IfcRelAssociatesApproval": "IfcRelAssociates",
+    "IfcRelAssociatesClassification": "IfcRelAssociates",
+    "IfcRelAssociatesConstraint": "IfcRelAssociates",
+    "IfcRelAssociatesDocument": "IfcRelAssociates",
+    "IfcRelAssociatesLibrary": "IfcRelAssociates",
+    "IfcRelAssociatesMaterial": "IfcRelAssociates",
+    "IfcRelConnects": "IfcRelationship",
+    "IfcRelConnectsElements": "IfcRelConnects",
+    "IfcRelConnectsPathElements": "IfcRelConnectsElements",
+    "IfcRelConnectsPortToElement": "IfcRelConnects",
+    "IfcRelConnectsPorts": "IfcRelConnects",
+    "IfcRelConnectsStructuralActivity": "IfcRelConnects",
+    "IfcRelConnectsStructuralMember": "IfcRelConnects",
+    "IfcRelConnectsWithEccentricity": "IfcRelConnectsStructuralMember",
+    "IfcRelConnectsWithRealizingElements": "IfcRelConnectsElements",
+    "IfcRelContainedInSpatialStructure": "IfcRelConnects",
+    "IfcRelCoversBldgElements": "IfcRelConnects",
+    "IfcRelCoversSpaces": "IfcRelConnects",
+    "IfcRelDeclares": "IfcRelationship",
+    "IfcRelDecomposes": "IfcRelationship",
+    "IfcRelDefines": "IfcRelationship",
+    "IfcRelDefinesByObject": "IfcRelDefines",
+    "IfcRelDefinesByProperties": "IfcRelDefines",
+    "IfcRelDefinesByTemplate": "IfcRelDefines",
+    "IfcRelDefinesByType": "IfcRelDefines",
+    "IfcRelFillsElement": "IfcRelConnects",
+    "IfcRelFlowControlElements": "IfcRelConnects",
+    "IfcRelInterferesElements": "IfcRelConnects",
+    "IfcRelNests": "IfcRelDecomposes",
+    "IfcRelProjectsElement": "IfcRelDecomposes",
+    "IfcRelReferencedInSpatialStructure": "IfcRelConnects",
+    "IfcRelSequence": "IfcRelConnects",
+    "IfcRelServicesBuildings": "IfcRelConnects",
+    "IfcRelSpaceBoundary": "IfcRelConnects",
+    "IfcRelSpaceBoundary1stLevel": "IfcRelSpaceBoundary",
+    "IfcRelSpaceBoundary2ndLevel": "IfcRelSpaceBoundary1stLevel",
+    "IfcRelVoidsElement": "IfcRelDecomposes",
+    "IfcRelationship": "IfcRoot",
+    "IfcReparametrisedCompositeCurveSegment": "IfcCompositeCurveSegment",
+    "IfcRepresentation": None,
+    "IfcRepresentationContext": None,
+    "IfcRepresentationItem": None,
+    "IfcRepresentationMap": None,
+    "IfcResource": "IfcObject",
+    "IfcResourceApprovalRelationship": "IfcResourceLevelRelationship",
+    "IfcResourceConstraintRelationship": "IfcResourceLevelRelationship",
+    "IfcResourceLevelRelationship": None,
+    "IfcResourceTime": "IfcSchedulingTime",
+    "IfcRevolvedAreaSolid": "IfcSweptAreaSolid",
+    "IfcRevolvedAreaSolidTapered": "IfcRevolvedAreaSolid",
+    "IfcRightCircularCone": "IfcCsgPrimitive3D",
+    "IfcRightCircularCylinder": "IfcCsgPrimitive3D",
+    "IfcRoof": "IfcBuildingElement",
+    "IfcRoofType": "IfcBuildingElementType",
+    "IfcRoot": None,
+    "IfcRoundedRectangleProfileDef": "IfcRectangleProfileDef",
+    "IfcSIUnit": "IfcNamedUnit",
+    "IfcSanitaryTerminal": "IfcFlowTerminal",
+    "IfcSanitaryTerminalType": "IfcFlowTerminalType",
+    "IfcSchedulingTime": None,
+    "IfcSectionProperties": "IfcPreDefinedProperties",
+    "IfcSectionReinforcementProperties": "IfcPreDefinedProperties",
+    "IfcSectionedSpine": "IfcGeometricRepresentationItem",
+    "IfcSensor": "IfcDistributionControlElement",
+    "IfcSensorType": "IfcDistributionControlElementType",
+    "IfcShadingDevice": "IfcBuildingElement",
+    "IfcShadingDeviceType": "IfcBuildingElementType",
+    "IfcShapeAspect": None,
+    "IfcShapeModel": "IfcRepresentation",
+    "IfcShapeRepresentation": "IfcShapeModel",
+    "IfcShellBasedSurfaceModel": "IfcGeometricRepresentationItem",
+    "IfcSimpleProperty": "IfcProperty",
+    "IfcSimplePropertyTemplate": "IfcPropertyTemplate",
+    "IfcSite": "IfcSpatialStructureElement",
+    "IfcSlab": "IfcBuildingElement",
+    "IfcSlabElementedCase": "IfcSlab",
+    "IfcSlabStandardCase": "IfcSlab",
+    "IfcSlabType": "IfcBuildingElementType",
+    "IfcSlippageConnectionCondition": "IfcStructuralConnectionCondition",
+    "IfcSolarDevice": "IfcEnergyConversionDevice",
+    "IfcSolarDeviceType": "IfcEnergyConversionDeviceType",
+    "IfcSolidModel": "IfcGeometricRepresentationItem",
+    "IfcSpace": "IfcSpatialStructureElement",
+    "IfcSpaceHeater": "IfcFlowTerminal",
+    "IfcSpaceHeaterType": "IfcFlowTerminalType",
+    "IfcSpaceType": "IfcSpatialStructureElementType",
+    "IfcSpatialElement": "IfcProduct",
+    "IfcSpatialElementType": "IfcTypeProduct",
+    "IfcSpatialStructureElement": "IfcSpatialElement",
+    "IfcSpatialStructureElementType": "IfcSpatialElementType",
+    "IfcSpatialZone": "IfcSpatialElement",
+    "IfcSpatialZoneType": "IfcSpatialElementType",
+    "IfcSphere": "IfcCsgPrimitive3D",
+    "IfcStackTerminal": "IfcFlowTerminal",
+    "IfcStackTerminalType": "IfcFlowTerminalType",
+    "IfcStair": "IfcBuildingElement",
+    "IfcStairFlight": "IfcBuildingElement",
+    "IfcStairFlightType": "IfcBuildingElementType",
+    "IfcStairType": "IfcBuildingElementType",
+    "IfcStructuralAction": "IfcStructuralActivity",
+    "IfcStructuralActivity": "IfcProduct",
+    "IfcStructuralAnalysisModel": "IfcSystem",
+    "IfcStructuralConnection": "IfcStructuralItem",
+    "IfcStructuralConnectionCondition": None,
+    "IfcStructuralCurveAction": "IfcStructuralAction",
+    "IfcStructuralCurveConnection": "IfcStructuralConnection",
+    "IfcStructuralCurveMember": "IfcStructuralMember",
+    "IfcStructuralCurveMemberVarying": "IfcStructuralCurveMember",
+    "IfcStructuralCurveReaction": "IfcStructuralReaction",
+    "IfcStructuralItem": "IfcProduct",
+    "IfcStructuralLinearAction": "IfcStructuralCurveAction",
+    "IfcStructuralLoad": None,
+    "IfcStructuralLoadCase": "IfcStructuralLoadGroup",
+    "IfcStructuralLoadConfiguration": "IfcStructuralLoad",
+    "IfcStructuralLoadGroup": "IfcGroup",
+    "IfcStructuralLoadLinearForce": "IfcStructuralLoadStatic",
+    "IfcStructuralLoadOrResult": "IfcStructuralLoad",
+    "IfcStructuralLoadPlanarForce": "IfcStructuralLoadStatic",
+    "IfcStructuralLoadSingleDisplacement": "IfcStructuralLoadStatic",
+    "IfcStructuralLoadSingleDisplacementDistortion": "IfcStructuralLoadSingleDisplacement",
+    "IfcStructuralLoadSingleForce": "IfcStructuralLoadStatic",
+    "IfcStructuralLoadSingleForceWarping": "IfcStructuralLoadSingleForce",
+    "IfcStructuralLoadStatic": "IfcStructuralLoadOrResult",
+    "IfcStructuralLoadTemperature": "IfcStructuralLoadStatic",
+    "IfcStructuralMember": "IfcStructuralItem",
+    "IfcStructuralPlanarAction": "IfcStructuralSurfaceAction",
+    "IfcStructuralPointAction": "IfcStructuralAction",
+    "IfcStructuralPointConnection": "IfcStructuralConnection",
+    "IfcStructuralPointReaction": "IfcStructuralReaction",
+    "IfcStructuralReaction": "IfcStructuralActivity",
+    "IfcStructuralResultGroup": "IfcGroup",
+    "IfcStructuralSurfaceAction": "IfcStructuralAction",
+    "IfcStructuralSurfaceConnection": "IfcStructuralConnection",
+    "IfcStructuralSurfaceMember": "IfcStructuralMember",
+    "IfcStructuralSurfaceMemberVarying": "IfcStructuralSurfaceMember",
+    "IfcStructuralSurfaceReaction": "IfcStructuralReaction",
+    "IfcStyleModel": "IfcRepresentation",
+    "IfcStyledItem": "IfcRepresentationItem",
+    "IfcStyledRepresentation": "IfcStyleModel",
+    "IfcSubContractResource": "IfcConstructionResource",
+    "IfcSubContractResourceType": "IfcConstructionResourceType",
+    "IfcSubedge": "IfcEdge",
+    "IfcSurface": "IfcGeometricRepresentationItem",
+    "IfcSurfaceCurveSweptAreaSolid": "IfcSweptAreaSolid",
+    "IfcSurfaceFeature": "IfcFeatureElement",
+    "IfcSurfaceOfLinearExtrusion": "IfcSweptSurface",
+    "IfcSurfaceOfRevolution": "IfcSweptSurface",
+    "IfcSurfaceReinforcementArea": "IfcStructuralLoadOrResult",
+    "IfcSurfaceStyle": "IfcPresentationStyle",
+    "IfcSurfaceStyleLighting": "IfcPresentationItem",
+    "IfcSurfaceStyleRefraction": "IfcPresentationItem",
+    "IfcSurfaceStyleRendering": "IfcSurfaceStyleShading",
+    "IfcSurfaceStyleShading": "IfcPresentationItem",
+    "IfcSurfaceStyleWithTextures": "IfcPresentationItem",
+    "IfcSurfaceTexture": "IfcPresentationItem",
+    "IfcSweptAreaSolid": "IfcSolidModel",
+    "IfcSweptDiskSolid": "IfcSolidModel",
+    "IfcSweptDiskSolidPolygonal": "IfcSweptDiskSolid",
+    "IfcSweptSurface": "IfcSurface",
+    "IfcSwitchingDevice": "IfcFlowController",
+    "IfcSwitchingDeviceType": "IfcFlowControllerType",
+    "IfcSystem": "IfcGroup",
+    "IfcSystemFurnitureElement": "IfcFurnishingElement",
+    "IfcSystemFurnitureElementType": "IfcFurnishingElementType",
+    "IfcTShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcTable": None,
+    "IfcTableColumn": None,
+    "IfcTableRow": None,
+    "IfcTank": "IfcFlowStorageDevice",
+    "IfcTankType": "IfcFlowStorageDeviceType",
+    "IfcTask": "IfcProcess",
+    "IfcTaskTime": "IfcSchedulingTime",
+    "IfcTaskTimeRecurring": "IfcTaskTime",
+    "IfcTaskType": "IfcTypeProcess",
+    "IfcTelecomAddress": "IfcAddress",
+    "IfcTendon": "IfcReinforcingElement",
+    "IfcTendonAnchor": "IfcReinforcingElement",
+    "IfcTendonAnchorType": "IfcReinforcingElementType",
+    "IfcTendonType": "IfcReinforcingElementType",
+    "IfcTessellatedFaceSet": "IfcTessellatedItem",
+    "IfcTessellatedItem": "IfcGeometricRepresentationItem",
+    "IfcTextLiteral": "IfcGeometricRepresentationItem",
+    "IfcTextLiteralWithExtent": "IfcTextLiteral",
+    "IfcTextStyle": "IfcPresentationStyle",
+    "IfcTextStyleFontModel": "IfcPreDefinedTextFont",
+    "IfcTextStyleForDefinedFont": "IfcPresentationItem",
+    "IfcTextStyleTextModel": "IfcPresentationItem",
+    "IfcTextureCoordinate": "IfcPresentationItem",
+    "IfcTextureCoordinateGenerator": "IfcTextureCoordinate",
+    "IfcTextureMap": "IfcTextureCoordinate",
+    "IfcTextureVertex": "IfcPresentationItem",
+    "IfcTextureVertexList": "IfcPresentationItem",
+    "IfcTimePeriod": None,
+    "IfcTimeSeries": None,
+    "IfcTimeSeriesValue": None,
+    "IfcTopologicalRepresentationItem": "IfcRepresentationItem",
+    "IfcTopologyRepresentation": "IfcShapeModel",
+    "IfcTransformer": "IfcEnergyConversionDevice",
+    "IfcTransformerType": "IfcEnergyConversionDeviceType",
+    "IfcTransportElement": "IfcElement",
+    "IfcTransportElementType": "IfcElementType",
+    "IfcTrapeziumProfileDef": "IfcParameterizedProfileDef",
+    "IfcTriangulatedFaceSet": "IfcTessellatedFaceSet",
+    "IfcTrimmedCurve": "IfcBoundedCurve",
+    "IfcTubeBundle": "IfcEnergyConversionDevice",
+    "IfcTubeBundleType": "IfcEnergyConversionDeviceType",
+    "IfcTypeObject": "IfcObjectDefinition",
+    "IfcTypeProcess": "IfcTypeObject",
+    "IfcTypeProduct": "IfcTypeObject",
+    "IfcTypeResource": "IfcTypeObject",
+    "IfcUShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcUnitAssignment": None,
+    "IfcUnitaryControlElement": "IfcDistributionControlElement",
+    "IfcUnitaryControlElementType": "IfcDistributionControlElementType",
+    "IfcUnitaryEquipment": "IfcEnergyConversionDevice",
+    "IfcUnitaryEquipmentType": "IfcEnergyConversionDeviceType",
+    "IfcValve": "IfcFlowController",
+    "IfcValveType": "IfcFlowControllerType",
+    "IfcVector": "IfcGeometricRepresentationItem",
+    "IfcVertex": "IfcTopologicalRepresentationItem",
+    "IfcVertexLoop": "IfcLoop",
+    "IfcVertexPoint": "IfcVertex",
+    "IfcVibrationIsolator": "IfcElementComponent",
+    "IfcVibrationIsolatorType": "IfcElementComponentType",
+    "IfcVirtualElement": "IfcElement",
+    "IfcVirtualGridIntersection": None,
+    "IfcVoidingFeature": "IfcFeatureElementSubtraction",
+    "IfcWall": "IfcBuildingElement",
+    "IfcWallElementedCase": "IfcWall",
+    "IfcWallStandardCase": "IfcWall",
+    "IfcWallType": "IfcBuildingElementType",
+    "IfcWasteTerminal": "IfcFlowTerminal",
+    "IfcWasteTerminalType": "IfcFlowTerminalType",
+    "IfcWindow": "IfcBuildingElement",
+    "IfcWindowLiningProperties": "IfcPreDefinedPropertySet",
+    "IfcWindowPanelProperties": "IfcPreDefinedPropertySet",
+    "IfcWindowStandardCase": "IfcWindow",
+    "IfcWindowStyle": "IfcTypeProduct",
+    "IfcWindowType": "IfcBuildingElementType",
+    "IfcWorkCalendar": "IfcControl",
+    "IfcWorkControl": "IfcControl",
+    "IfcWorkPlan": "IfcWorkControl",
+    "IfcWorkSchedule": "IfcWorkControl",
+    "IfcWorkTime": "IfcSchedulingTime",
+    "IfcZShapeProfileDef": "IfcParameterizedProfileDef",
+    "IfcZone": "IfcSystem",
+}
+
+# Types abstraits (jamais instanciés)
+IFC4_ABSTRACT_TYPES = frozenset({
+    "IfcAddress",
+    "IfcBSplineCurve",
+    "IfcBSplineSurface",
+    "IfcBoundaryCondition",
+    "IfcBoundedCurve",
+    "IfcBoundedSurface",
+    "IfcBuildingElement",
+    "IfcBuildingElementType",
+    "IfcCartesianPointList",
+    "IfcCartesianTransformationOperator",
+    "IfcColourSpecification",
+    "IfcConic",
+    "IfcConnectionGeometry",
+    "IfcConstraint",
+    "IfcConstructionResource",
+    "IfcConstructionResourceType",
+    "IfcContext",
+    "IfcControl",
+    "IfcCoordinateOperation",
+    "IfcCoordinateReferenceSystem",
+    "IfcCsgPrimitive3D",
+    "IfcCurve",
+    "IfcDistributionControlElementType",
+    "IfcDistributionFlowElementType",
+    "IfcElement",
+    "IfcElementComponent",
+    "IfcElementComponentType",
+    "IfcElementType",
+    "IfcElementarySurface",
+    "IfcEnergyConversionDeviceType",
+    "IfcExtendedProperties",
+    "IfcExternalInformation",
+    "IfcExternalReference",
+    "IfcExternalSpatialStructureElement",
+    "IfcFeatureElement",
+    "IfcFeatureElementAddition",
+    "IfcFeatureElementSubtraction",
+    "IfcFlowControllerType",
+    "IfcFlowFittingType",
+    "IfcFlowMovingDeviceType",
+    "IfcFlowSegmentType",
+    "IfcFlowStorageDeviceType",
+    "IfcFlowTerminalType",
+    "IfcFlowTreatmentDeviceType",
+    "IfcGeometricRepresentationItem",
+    "IfcIndexedTextureMap",
+    "IfcLightSource",
+    "IfcManifoldSolidBrep",
+    "IfcMaterialDefinition",
+    "IfcMaterialUsageDefinition",
+    "IfcNamedUnit",
+    "IfcObject",
+    "IfcObjectDefinition",
+    "IfcObjectPlacement",
+    "IfcParameterizedProfileDef",
+    "IfcPhysicalQuantity",
+    "IfcPhysicalSimpleQuantity",
+    "IfcPlacement",
+    "IfcPoint",
+    "IfcPort",
+    "IfcPreDefinedColour",
+    "IfcPreDefinedCurveFont",
+    "IfcPreDefinedItem",
+    "IfcPreDefinedProperties",
+    "IfcPreDefinedPropertySet",
+    "IfcPreDefinedTextFont",
+    "IfcPresentationItem",
+    "IfcPresentationStyle",
+    "IfcProcess",
+    "IfcProduct",
+    "IfcProductRepresentation",
+    "IfcProperty",
+    "IfcPropertyAbstraction",
+    "IfcPropertyDefinition",
+    "IfcPropertySetDefinition",
+    "IfcPropertyTemplate",
+    "IfcPropertyTemplateDefinition",
+    "IfcQuantitySet",
+    "IfcReinforcingElement",
+    "IfcReinforcingElementType",
+    "IfcRelAssigns",
+    "IfcRelAssociates",
+    "IfcRelConnects",
+    "IfcRelDecomposes",
+    "IfcRelDefines",
+    "IfcRelationship",
+    "IfcRepresentation",
+    "IfcRepresentationContext",
+    "IfcRepresentationItem",
+    "IfcResource",
+    "IfcResourceLevelRelationship",
+    "IfcRoot",
+    "IfcSchedulingTime",
+    "IfcShapeModel",
+    "IfcSimpleProperty",
+    "IfcSolidModel",
+    "IfcSpatialElement",
+    "IfcSpatialElementType",
+    "IfcSpatialStructureElement",
+    "IfcSpatialStructureElementType",
+    "IfcStructuralAction",
+    "IfcStructuralActivity",
+    "IfcStructuralConnection",
+    "IfcStructuralConnectionCondition",
+    "IfcStructuralItem",
+    "IfcStructuralLoad",
+    "IfcStructuralLoadOrResult",
+    "IfcStructuralLoadStatic",
+    "IfcStructuralMember",
+    "IfcStructuralReaction",
+    "IfcStyleModel",
+    "IfcSurface",
+    "IfcSurfaceTexture",
+    "IfcSweptAreaSolid",
+    "IfcSweptSurface",
+    "IfcTessellatedFaceSet",
+    "IfcTessellatedItem",
+    "IfcTextureCoordinate",
+    "IfcTimeSeries",
+    "IfcTopologicalRepresentationItem",
+    "IfcTypeProcess",
+    "IfcTypeResource",
+    "IfcWorkControl",
+})
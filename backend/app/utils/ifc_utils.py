@@ -4,36 +4,115 @@ Utilitaires spécifiques IFC
 Fonctions utilitaires pour le traitement des données IFC.
 """
 
-from typing import Optional, Dict, Any
-from uuid import UUID
+import hashlib
+import json
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
+from uuid import UUID, uuid5
 from lxml.etree import _Element as Element
 
+from app.utils.ifc_guid import parse_guid
+from app.utils.ifc_schema import IFC4_SUPERTYPES, IFC4_ABSTRACT_TYPES
+
+
+def _concrete_subtypes(*ancestors: str) -> frozenset:
+    """
+    Types concrets de la table IFC4 descendant d'un des ancêtres (inclus).
+    
+    Args:
+        ancestors: Types IFC racines des sous-arbres
+        
+    Returns:
+        Ensemble figé des types instanciables
+    """
+    subtypes = set()
+    for ifc_type in IFC4_SUPERTYPES:
+        current = ifc_type
+        while current is not None and current not in ancestors:
+            current = IFC4_SUPERTYPES.get(current)
+        if current is not None and ifc_type not in IFC4_ABSTRACT_TYPES:
+            subtypes.add(ifc_type)
+    return frozenset(subtypes)
+
+
+# Entités de la hiérarchie spatiale (IfcSite, IfcBuilding, IfcBuildingStorey, IfcSpace)
+HIERARCHY_ENTITY_TYPES = frozenset({"IfcProject"}) | _concrete_subtypes("IfcSpatialStructureElement")
+
+# Types IFC2x3 absents d'IFC4, traités comme éléments de construction
+IFC2X3_ELEMENT_TYPES = frozenset({
+    "IfcBuildingElementComponent",
+    "IfcElectricalElement",
+    "IfcEquipmentElement",
+})
+
+# Éléments: tout le sous-arbre IfcElement (construction, distribution, mobilier, ouvertures...)
+ELEMENT_ENTITY_TYPES = _concrete_subtypes("IfcElement") | IFC2X3_ELEMENT_TYPES
+
+# Cache tag XML (avec namespace) -> type IFC
+_TAG_TYPES: Dict[str, str] = {}
+_TAG_TYPES_MAX_SIZE = 4096
+
+# Relations IFC extraites: type IFC -> (type de relation, rôle source, rôle cible)
+RELATIONSHIP_ROLES = {
+    "IfcRelAggregates": ("AGGREGATES", "RelatingObject", "RelatedObjects"),
+    "IfcRelContainedInSpatialStructure": ("CONTAINS", "RelatingStructure", "RelatedElements"),
+    "IfcRelVoidsElement": ("VOIDS", "RelatingBuildingElement", "RelatedOpeningElement"),
+    "IfcRelFillsElement": ("FILLS", "RelatingOpeningElement", "RelatedBuildingElement"),
+}
+
+# Types de relations stockés (relationships.relationship_type)
+RELATIONSHIP_TYPES = tuple(roles[0] for roles in RELATIONSHIP_ROLES.values())
+
+# Ensembles de propriétés: type IFC -> colonne JSONB de la table elements
+PROPERTY_SET_TYPES = {
+    "IfcPropertySet": "properties",
+    "IfcElementQuantity": "quantities",
+}
+
+# Valeurs de propriétés et de quantités: type IFC -> attribut portant la valeur
+PROPERTY_VALUE_TYPES = {
+    "IfcPropertySingleValue": "NominalValue",
+    "IfcQuantityLength": "LengthValue",
+    "IfcQuantityArea": "AreaValue",
+    "IfcQuantityVolume": "VolumeValue",
+    "IfcQuantityCount": "CountValue",
+    "IfcQuantityWeight": "WeightValue",
+    "IfcQuantityTime": "TimeValue",
+}
+
+# Types de valeurs conservés en texte même s'ils ressemblent à des nombres
+TEXT_VALUE_TYPES = {"IfcLabel", "IfcText", "IfcIdentifier"}
+BOOLEAN_VALUE_TYPES = {"IfcBoolean", "IfcLogical"}
+
 
 def extract_guid(element: Element) -> Optional[UUID]:
     """
     Extrait le GUID d'un élément IFC.
     
+    L'attribut id est retenu s'il contient un UUID (fichiers qui identifient
+    les entités par leur GUID); sinon le GlobalId (attribut ou sous-élément),
+    au format IFC compressé de 22 caractères ou UUID.
+    
     Args:
         element: Élément XML
         
     Returns:
         UUID ou None si non trouvé
     """
-    # Le GUID peut être dans l'attribut id ou dans un sous-élément GlobalId
     guid_str = element.get("id")
+    if guid_str and len(guid_str) >= 32:
+        guid = parse_guid(guid_str)
+        if guid is not None:
+            return guid
     
+    guid_str = element.get("GlobalId")
     if not guid_str:
-        # Chercher dans les sous-éléments
         global_id_elem = element.find(".//{*}GlobalId")
         if global_id_elem is not None and global_id_elem.text:
-            guid_str = global_id_elem.text.strip()
+            guid_str = global_id_elem.text
     
     if guid_str:
-        try:
-            # Les GUIDs IFC sont au format standard UUID
-            return UUID(guid_str)
-        except (ValueError, AttributeError):
-            return None
+        return parse_guid(guid_str.strip())
     
     return None
 
@@ -48,10 +127,7 @@ def extract_name(element: Element) -> Optional[str]:
     Returns:
         Nom ou None
     """
-    name_elem = element.find(".//{*}Name")
-    if name_elem is not None and name_elem.text:
-        return name_elem.text.strip()
-    return None
+    return extract_attribute_or_child(element, "Name") or None
 
 
 def extract_description(element: Element) -> Optional[str]:
@@ -64,10 +140,7 @@ def extract_description(element: Element) -> Optional[str]:
     Returns:
         Description ou None
     """
-    desc_elem = element.find(".//{*}Description")
-    if desc_elem is not None and desc_elem.text:
-        return desc_elem.text.strip()
-    return None
+    return extract_attribute_or_child(element, "Description") or None
 
 
 def extract_tag(element: Element) -> Optional[str]:
@@ -80,10 +153,7 @@ def extract_tag(element: Element) -> Optional[str]:
     Returns:
         Tag ou None
     """
-    tag_elem = element.find(".//{*}Tag")
-    if tag_elem is not None and tag_elem.text:
-        return tag_elem.text.strip()
-    return None
+    return extract_attribute_or_child(element, "Tag") or None
 
 
 def extract_reference(element: Element) -> Optional[str]:
@@ -110,6 +180,49 @@ def extract_reference(element: Element) -> Optional[str]:
     return None
 
 
+def extract_references(element: Element) -> List[str]:
+    """
+    Extrait les références portées par un élément de rôle d'une relation.
+    
+    Le rôle peut porter la référence lui-même, ou contenir des entités
+    référencées (ex: <RelatedObjects><IfcSite ref="i17"/></RelatedObjects>).
+    
+    Args:
+        element: Élément XML du rôle
+        
+    Returns:
+        Liste des IDs de référence
+    """
+    ref = extract_reference(element)
+    if ref:
+        return [ref]
+    
+    references = []
+    for child in element:
+        child_ref = extract_reference(child)
+        if child_ref:
+            references.append(child_ref)
+    return references
+
+
+def element_id_for(model_id: UUID, guid: UUID) -> UUID:
+    """
+    Clé primaire d'un élément, dérivée de son modèle et de son GUID IFC.
+    
+    Déterministe: le parseur, la résolution des relations et une révision
+    ultérieure du même modèle calculent la même clé sans consulter la base.
+    Les niveaux et espaces partagent la clé de leur élément.
+    
+    Args:
+        model_id: ID du modèle
+        guid: GUID IFC de l'élément
+        
+    Returns:
+        uuid5(model_id, str(guid))
+    """
+    return uuid5(model_id, str(guid))
+
+
 def get_ifc_type(element: Element) -> str:
     """
     Obtient le type IFC d'un élément depuis son tag XML.
@@ -121,10 +234,46 @@ def get_ifc_type(element: Element) -> str:
         Type IFC (ex: 'IfcWall', 'IfcProject')
     """
     tag = element.tag
-    # Enlever le namespace si présent
-    if "}" in tag:
-        tag = tag.split("}")[1]
-    return tag
+    ifc_type = _TAG_TYPES.get(tag)
+    if ifc_type is None:
+        # Enlever le namespace si présent
+        ifc_type = tag.rpartition("}")[2]
+        if len(_TAG_TYPES) < _TAG_TYPES_MAX_SIZE:
+            _TAG_TYPES[tag] = ifc_type
+    return ifc_type
+
+
+def is_subtype(ifc_type: str, ancestor: str) -> bool:
+    """
+    Vérifie si un type IFC hérite d'un autre (ou est ce type).
+    
+    Args:
+        ifc_type: Type IFC (ex: 'IfcWallStandardCase')
+        ancestor: Supertype recherché (ex: 'IfcBuildingElement')
+        
+    Returns:
+        True si ancestor est dans la chaîne des supertypes de ifc_type
+    """
+    return ancestor in ifc_supertypes(ifc_type)
+
+
+@lru_cache(maxsize=None)
+def ifc_supertypes(ifc_type: str) -> tuple:
+    """
+    Chaîne des supertypes d'un type IFC4, du type lui-même jusqu'à la racine.
+    
+    Args:
+        ifc_type: Type IFC
+        
+    Returns:
+        Tuple (ifc_type, supertype, ..., racine); (ifc_type,) si inconnu
+    """
+    chain = [ifc_type]
+    parent = IFC4_SUPERTYPES.get(ifc_type)
+    while parent is not None:
+        chain.append(parent)
+        parent = IFC4_SUPERTYPES.get(parent)
+    return tuple(chain)
 
 
 def is_hierarchy_entity(ifc_type: str) -> bool:
@@ -137,14 +286,7 @@ def is_hierarchy_entity(ifc_type: str) -> bool:
     Returns:
         True si c'est une entité de hiérarchie
     """
-    hierarchy_types = {
-        "IfcProject",
-        "IfcSite",
-        "IfcBuilding",
-        "IfcBuildingStorey",
-        "IfcSpace"
-    }
-    return ifc_type in hierarchy_types
+    return ifc_type in HIERARCHY_ENTITY_TYPES
 
 
 def is_element_entity(ifc_type: str) -> bool:
@@ -157,93 +299,182 @@ def is_element_entity(ifc_type: str) -> bool:
     Returns:
         True si c'est un élément
     """
-    element_types = {
-        "IfcWall",
-        "IfcSlab",
-        "IfcDoor",
-        "IfcWindow",
-        "IfcBeam",
-        "IfcColumn",
-        "IfcRoof",
-        "IfcStair",
-        "IfcRailing",
-        "IfcCurtainWall",
-        "IfcPlate",
-        "IfcMember",
-        "IfcCovering",
-        "IfcOpeningElement",
-        "IfcBuildingElementProxy"
-    }
-    return ifc_type in element_types or ifc_type.startswith("IfcBuildingElement")
+    return ifc_type in ELEMENT_ENTITY_TYPES
 
 
 def extract_properties(element: Element) -> Dict[str, Any]:
     """
-    Extrait les Property Sets (Psets) d'un élément.
+    Extrait les Property Sets (Psets) inclus dans un élément.
+    
+    Les Psets seulement référencés (IfcRelDefinesByProperties de premier
+    niveau) sont résolus par le parser dans une passe ultérieure.
     
     Args:
         element: Élément XML
         
     Returns:
-        Dictionnaire des propriétés
+        Dictionnaire {nom du Pset: {nom de propriété: valeur}}
     """
-    properties = {}
-    
-    # Chercher les Property Sets
     # Structure: IsDefinedBy -> IfcRelDefinesByProperties -> RelatingPropertyDefinition -> IfcPropertySet -> HasProperties
-    is_defined_by = element.findall(".//{*}IsDefinedBy")
+    return _extract_inline_sets(element, "IfcPropertySet")
+
+
+def extract_quantities(element: Element) -> Dict[str, Any]:
+    """
+    Extrait les Quantities (Qto) incluses dans un élément.
     
-    for rel in is_defined_by:
-        # Suivre la référence
-        ref = extract_reference(rel)
-        if not ref:
-            continue
-        
-        # Pour l'instant, on stocke juste la référence
-        # Le parsing complet nécessiterait de résoudre toutes les références
-        # Ce sera fait dans une passe ultérieure
-        if "properties" not in properties:
-            properties["property_sets"] = []
+    Args:
+        element: Élément XML
         
-        properties["property_sets"].append({
-            "reference": ref
-        })
+    Returns:
+        Dictionnaire {nom du Qto: {nom de quantité: valeur}}
+    """
+    # Structure similaire aux Property Sets, avec IfcElementQuantity -> Quantities
+    return _extract_inline_sets(element, "IfcElementQuantity")
+
+
+def _extract_inline_sets(element: Element, set_type: str) -> Dict[str, Any]:
+    """Extrait les ensembles d'un type donné inclus sous IsDefinedBy"""
+    sets: Dict[str, Any] = {}
+    
+    for rel in element.findall(".//{*}IsDefinedBy"):
+        for set_element in rel.iter("{*}" + set_type):
+            name, values, _ = extract_property_set(set_element)
+            if values:
+                sets.setdefault(name, {}).update(values)
     
-    return properties
+    return sets
 
 
-def extract_quantities(element: Element) -> Dict[str, Any]:
+def extract_attribute_or_child(element: Element, name: str) -> Optional[str]:
     """
-    Extrait les Quantities (Qto) d'un élément.
+    Extrait un attribut IFC simple, porté en attribut XML (IFC4) ou en sous-élément.
     
     Args:
         element: Élément XML
-        
+        name: Nom de l'attribut IFC (ex: 'Name', 'VolumeValue')
+    
     Returns:
-        Dictionnaire des quantités
+        Valeur textuelle ou None
     """
-    quantities = {}
+    value = element.get(name)
+    if value is None:
+        child = element.find("{*}" + name)
+        if child is not None and child.text:
+            value = child.text
+    return value.strip() if value is not None else None
+
+
+def convert_property_value(value_type: Optional[str], text: Optional[str]) -> Any:
+    """
+    Convertit la valeur textuelle d'une propriété selon son type IFC.
     
-    # Chercher les Quantities
-    # Structure similaire aux Property Sets
-    is_defined_by = element.findall(".//{*}IsDefinedBy")
+    Args:
+        value_type: Type IFC de la valeur (ex: 'IfcLabel', 'IfcBoolean-wrapper'), si connu
+        text: Valeur textuelle
     
-    for rel in is_defined_by:
-        ref = extract_reference(rel)
-        if not ref:
-            continue
-        
-        # Pour l'instant, on stocke juste la référence
-        if "quantities" not in quantities:
-            quantities["quantity_sets"] = []
-        
-        quantities["quantity_sets"].append({
-            "reference": ref
-        })
+    Returns:
+        Booléen, nombre ou texte
+    """
+    if text is None:
+        return None
+    if value_type:
+        value_type = value_type.removesuffix("-wrapper")
+    if value_type in TEXT_VALUE_TYPES:
+        return text
+    
+    lowered = text.lower()
+    if value_type in BOOLEAN_VALUE_TYPES or lowered in ("true", "false"):
+        if lowered in ("true", ".t."):
+            return True
+        if lowered in ("false", ".f."):
+            return False
+        return text  # IfcLogical UNKNOWN
     
-    return quantities
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
 
 
+def extract_property_value(element: Element) -> Optional[tuple]:
+    """
+    Extrait le nom et la valeur typée d'une propriété ou d'une quantité.
+    
+    Gère IfcPropertySingleValue (NominalValue) et les IfcQuantity*.
+    
+    Args:
+        element: Élément XML de la propriété
+    
+    Returns:
+        Tuple (nom, valeur) ou None si l'élément n'est qu'une référence
+    """
+    ifc_type = get_ifc_type(element)
+    value_attribute = PROPERTY_VALUE_TYPES.get(ifc_type)
+    name = extract_attribute_or_child(element, "Name")
+    if value_attribute is None or not name:
+        return None
+    
+    if ifc_type != "IfcPropertySingleValue":
+        return name, convert_property_value(None, extract_attribute_or_child(element, value_attribute))
+    
+    # NominalValue contient la valeur typée: <NominalValue><IfcLabel-wrapper>REI60</...>
+    nominal = element.find("{*}" + value_attribute)
+    if nominal is None:
+        return name, None
+    typed = next(iter(nominal), None)
+    if typed is not None:
+        return name, convert_property_value(get_ifc_type(typed), (typed.text or "").strip())
+    return name, convert_property_value(None, (nominal.text or "").strip() or None)
+
 
+def extract_property_set(element: Element) -> tuple:
+    """
+    Extrait un ensemble de propriétés (IfcPropertySet) ou de quantités (IfcElementQuantity).
+    
+    Args:
+        element: Élément XML de l'ensemble
+    
+    Returns:
+        Tuple (nom de l'ensemble, valeurs par nom, références de valeurs non incluses)
+    """
+    name = extract_attribute_or_child(element, "Name") or get_ifc_type(element)
+    values: Dict[str, Any] = {}
+    pending: List[str] = []
+    
+    container_role = "HasProperties" if get_ifc_type(element) == "IfcPropertySet" else "Quantities"
+    container = element.find("{*}" + container_role)
+    if container is None:
+        return name, values, pending
+    
+    for child in container:
+        extracted = extract_property_value(child)
+        if extracted is not None:
+            values[extracted[0]] = extracted[1]
+        else:
+            ref = extract_reference(child)
+            if ref:
+                pending.append(ref)
+    
+    return name, values, pending
 
 
+def compute_content_hash(values: Dict[str, Any]) -> str:
+    """
+    Calcule l'empreinte stable du contenu d'une entité.
+    
+    Le JSON canonique (clés triées, séparateurs compacts) rend l'empreinte
+    indépendante de l'ordre des attributs et des ensembles dans le fichier.
+    
+    Args:
+        values: Champs stockés de l'entité (type, nom, attributs, Psets, Qtos...)
+    
+    Returns:
+        Empreinte hexadécimale de 32 caractères
+    """
+    canonical = json.dumps(values, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
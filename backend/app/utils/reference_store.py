@@ -0,0 +1,585 @@
+"""
+Tables de références compactes du parseur
+
+Stocke les références d'un modèle (identifiants XML -> GUID, parents spatiaux,
+relations, références à résoudre) dans des tampons d'octets à taille fixe
+plutôt qu'en objets Python: une entrée coûte la taille de ses clés et valeurs
+(32 octets pour deux UUID) au lieu de plusieurs centaines d'octets. Les
+valeurs de taille variable (Psets, lignes de l'arbre) sont sérialisées dans
+un journal (BlobLog), indexé par une table compacte (BlobTable).
+
+Les tampons sont alloués en mémoire tant que le budget du parsing le permet,
+puis dans des fichiers temporaires projetés en mémoire (mmap): au-delà du
+budget, les pages sont adossées au disque et le noyau peut les libérer.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+
+# Taille des clés (UUID ou empreinte blake2b de 16 octets)
+KEY_SIZE = 16
+
+# Clé réservée marquant une case vide
+EMPTY_KEY = bytes(KEY_SIZE)
+
+# Taux de remplissage au-delà duquel une table double de capacité
+MAX_LOAD_FACTOR = 0.6
+
+# Taille des blocs des journaux d'enregistrements
+CHUNK_SIZE = 1024 * 1024
+
+# Taille du préfixe de longueur des enregistrements de taille variable
+LENGTH_SIZE = 4
+
+# Taille d'une position dans un journal d'enregistrements de taille variable
+POSITION_SIZE = 8
+
+Buffer = Union[bytearray, mmap.mmap]
+
+
+def reference_key(reference: str) -> bytes:
+    """
+    Clé de 16 octets d'une référence textuelle (attribut id XML, GUID...).
+    
+    Args:
+        reference: Valeur de l'attribut id ou ref
+    
+    Returns:
+        Empreinte blake2b de 16 octets
+    """
+    return hashlib.blake2b(reference.encode(), digest_size=KEY_SIZE).digest()
+
+
+def record_key(record: bytes) -> bytes:
+    """
+    Clé de 16 octets d'un enregistrement binaire (ex: relation type + source + cible).
+    
+    Args:
+        record: Enregistrement
+    
+    Returns:
+        Empreinte blake2b de 16 octets
+    """
+    return hashlib.blake2b(record, digest_size=KEY_SIZE).digest()
+
+
+class SpillBudget:
+    """Budget mémoire partagé par les tables d'un parsing"""
+    
+    def __init__(self, budget_bytes: int, directory: Optional[Path] = None):
+        """
+        Initialise le budget.
+        
+        Args:
+            budget_bytes: Octets allouables en mémoire
+            directory: Répertoire des fichiers de débordement (temporaire système si None)
+        """
+        self.budget_bytes = budget_bytes
+        self.directory = directory
+        self.in_memory_bytes = 0
+        self.spilled_bytes = 0
+    
+    def reserve(self, size: int) -> bool:
+        """
+        Réserve des octets en mémoire si le budget le permet.
+        
+        Args:
+            size: Nombre d'octets
+        
+        Returns:
+            True si la réservation est accordée
+        """
+        if self.in_memory_bytes + size > self.budget_bytes:
+            return False
+        self.in_memory_bytes += size
+        return True
+    
+    def release(self, size: int):
+        """Rend des octets réservés en mémoire"""
+        self.in_memory_bytes -= size
+    
+    def temporary_file(self):
+        """Ouvre un fichier temporaire de débordement (supprimé à la fermeture)"""
+        if self.directory is not None:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+        return tempfile.TemporaryFile(dir=self.directory)
+    
+    def allocate(self, size: int) -> Buffer:
+        """
+        Alloue un tampon initialisé à zéro, en mémoire ou projeté depuis un fichier.
+        
+        Args:
+            size: Taille en octets
+        
+        Returns:
+            bytearray dans le budget, mmap d'un fichier temporaire au-delà
+        """
+        if self.reserve(size):
+            return bytearray(size)
+        
+        with self.temporary_file() as spill_file:
+            spill_file.truncate(size)
+            buffer = mmap.mmap(spill_file.fileno(), size)
+        self.spilled_bytes += size
+        return buffer
+    
+    def free(self, buffer: Buffer):
+        """
+        Libère un tampon alloué par allocate.
+        
+        Args:
+            buffer: Tampon à libérer
+        """
+        if isinstance(buffer, mmap.mmap):
+            self.spilled_bytes -= len(buffer)
+            buffer.close()
+        else:
+            self.release(len(buffer))
+
+
+class CompactTable:
+    """
+    Table de hachage à adressage ouvert (sondage linéaire) dans un tampon d'octets.
+    
+    Clés de 16 octets (UUID, empreintes), valeurs de taille fixe. La clé nulle
+    est réservée aux cases vides.
+    """
+    
+    def __init__(self, budget: SpillBudget, value_size: int = KEY_SIZE, capacity: int = 1024):
+        """
+        Initialise une table vide.
+        
+        Args:
+            budget: Budget mémoire du parsing
+            value_size: Taille des valeurs en octets
+            capacity: Capacité initiale (puissance de 2)
+        """
+        self.budget = budget
+        self.value_size = value_size
+        self.slot_size = KEY_SIZE + value_size
+        self.size = 0
+        self._allocate(capacity)
+    
+    def _allocate(self, capacity: int):
+        """Alloue un tampon vide de la capacité donnée"""
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.buffer = self.budget.allocate(capacity * self.slot_size)
+        self.view = memoryview(self.buffer)
+    
+    def _find(self, key: bytes) -> Tuple[int, bool]:
+        """
+        Cherche la case d'une clé.
+        
+        Args:
+            key: Clé de 16 octets
+        
+        Returns:
+            (position de la case, clé présente)
+        """
+        view = self.view
+        slot_size = self.slot_size
+        slot = int.from_bytes(key[:8], "little") & self.mask
+        while True:
+            offset = slot * slot_size
+            current = view[offset:offset + KEY_SIZE]
+            if current == key:
+                return offset, True
+            if current == EMPTY_KEY:
+                return offset, False
+            slot = (slot + 1) & self.mask
+    
+    def _check(self, key: bytes, value: bytes):
+        """Vérifie les tailles de la clé et de la valeur"""
+        if len(key) != KEY_SIZE or key == EMPTY_KEY:
+            raise ValueError("Clé invalide: 16 octets non nuls attendus")
+        if len(value) != self.value_size:
+            raise ValueError(f"Valeur invalide: {self.value_size} octets attendus")
+    
+    def put(self, key: bytes, value: bytes, replace: bool = True) -> bool:
+        """
+        Enregistre une valeur.
+        
+        Args:
+            key: Clé de 16 octets
+            value: Valeur de value_size octets
+            replace: Remplacer la valeur d'une clé déjà présente
+        
+        Returns:
+            True si la clé était absente
+        """
+        self._check(key, value)
+        offset, found = self._find(key)
+        if found:
+            if replace:
+                self.view[offset + KEY_SIZE:offset + self.slot_size] = value
+            return False
+        
+        self.view[offset:offset + self.slot_size] = key + value
+        self.size += 1
+        if self.size > self.capacity * MAX_LOAD_FACTOR:
+            self._grow()
+        return True
+    
+    def get(self, key: bytes) -> Optional[bytes]:
+        """
+        Lit la valeur d'une clé.
+        
+        Args:
+            key: Clé de 16 octets
+        
+        Returns:
+            Valeur ou None si la clé est absente
+        """
+        offset, found = self._find(key)
+        if not found:
+            return None
+        return bytes(self.view[offset + KEY_SIZE:offset + self.slot_size])
+    
+    def __contains__(self, key: bytes) -> bool:
+        return self._find(key)[1]
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def items(self) -> Iterator[Tuple[bytes, bytes]]:
+        """
+        Parcourt les entrées (ordre des cases).
+        
+        Yields:
+            (clé, valeur)
+        """
+        view = self.view
+        slot_size = self.slot_size
+        for offset in range(0, self.capacity * slot_size, slot_size):
+            key = bytes(view[offset:offset + KEY_SIZE])
+            if key != EMPTY_KEY:
+                yield key, bytes(view[offset + KEY_SIZE:offset + slot_size])
+    
+    def values(self) -> Iterator[bytes]:
+        """Parcourt les valeurs"""
+        for key, value in self.items():
+            yield value
+    
+    def _grow(self):
+        """Double la capacité et réinsère les entrées"""
+        old_buffer, old_view, old_capacity = self.buffer, self.view, self.capacity
+        self._allocate(old_capacity * 2)
+        view, slot_size, mask = self.view, self.slot_size, self.mask
+        
+        for old_offset in range(0, old_capacity * slot_size, slot_size):
+            entry = bytes(old_view[old_offset:old_offset + slot_size])
+            if entry[:KEY_SIZE] == EMPTY_KEY:
+                continue
+            slot = int.from_bytes(entry[:8], "little") & mask
+            while view[slot * slot_size:slot * slot_size + KEY_SIZE] != EMPTY_KEY:
+                slot = (slot + 1) & mask
+            view[slot * slot_size:(slot + 1) * slot_size] = entry
+        
+        old_view.release()
+        self.budget.free(old_buffer)
+    
+    def close(self):
+        """Libère le tampon"""
+        if self.buffer is not None:
+            self.view.release()
+            self.budget.free(self.buffer)
+            self.buffer = None
+
+
+class UUIDMap:
+    """Dictionnaire UUID -> UUID adossé à une CompactTable (interface de dict réduite)"""
+    
+    def __init__(self, budget: SpillBudget):
+        """
+        Initialise un dictionnaire vide.
+        
+        Args:
+            budget: Budget mémoire du parsing
+        """
+        self.table = CompactTable(budget)
+    
+    def __setitem__(self, key: UUID, value: UUID):
+        self.table.put(key.bytes, value.bytes)
+    
+    def setdefault(self, key: UUID, value: UUID) -> UUID:
+        """Enregistre la valeur si la clé est absente; retourne la valeur retenue"""
+        if self.table.put(key.bytes, value.bytes, replace=False):
+            return value
+        return self.get(key)
+    
+    def get(self, key: UUID, default: Optional[UUID] = None) -> Optional[UUID]:
+        value = self.table.get(key.bytes)
+        return UUID(bytes=value) if value is not None else default
+    
+    def __contains__(self, key: UUID) -> bool:
+        return key.bytes in self.table
+    
+    def __len__(self) -> int:
+        return len(self.table)
+    
+    def items(self) -> Iterator[Tuple[UUID, UUID]]:
+        for key, value in self.table.items():
+            yield UUID(bytes=key), UUID(bytes=value)
+    
+    def close(self):
+        """Libère le tampon"""
+        self.table.close()
+
+
+class RecordLog:
+    """Journal d'enregistrements de taille fixe, débordant dans un fichier temporaire"""
+    
+    def __init__(self, budget: SpillBudget, record_size: int):
+        """
+        Initialise un journal vide.
+        
+        Args:
+            budget: Budget mémoire du parsing
+            record_size: Taille des enregistrements en octets
+        """
+        self.budget = budget
+        self.record_size = record_size
+        self.records_per_chunk = max(1, CHUNK_SIZE // record_size)
+        self._chunks: List[bytearray] = []
+        self._spill_file = None
+        self._count = 0
+        self._spilled_count = 0
+    
+    def append(self, record: bytes):
+        """
+        Ajoute un enregistrement.
+        
+        Args:
+            record: Enregistrement de record_size octets
+        """
+        if len(record) != self.record_size:
+            raise ValueError(f"Enregistrement invalide: {self.record_size} octets attendus")
+        
+        if self._spill_file is None:
+            chunk_bytes = self.records_per_chunk * self.record_size
+            if not self._chunks or len(self._chunks[-1]) >= chunk_bytes:
+                if self.budget.reserve(chunk_bytes):
+                    self._chunks.append(bytearray())
+                else:
+                    self._spill_file = self.budget.temporary_file()
+        
+        if self._spill_file is None:
+            self._chunks[-1] += record
+        else:
+            self._spill_file.write(record)
+            self.budget.spilled_bytes += self.record_size
+            self._spilled_count += 1
+        self._count += 1
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[bytes]:
+        """Parcourt les enregistrements dans l'ordre d'ajout"""
+        size = self.record_size
+        for chunk in self._chunks:
+            for offset in range(0, len(chunk), size):
+                yield bytes(chunk[offset:offset + size])
+        
+        if self._spill_file is not None:
+            self._spill_file.flush()
+            self._spill_file.seek(0)
+            while True:
+                block = self._spill_file.read(self.records_per_chunk * size)
+                if not block:
+                    break
+                for offset in range(0, len(block), size):
+                    yield block[offset:offset + size]
+            self._spill_file.seek(0, 2)
+    
+    def close(self):
+        """Libère les blocs et supprime le fichier de débordement"""
+        chunk_bytes = self.records_per_chunk * self.record_size
+        for chunk in self._chunks:
+            self.budget.release(chunk_bytes)
+        self._chunks = []
+        if self._spill_file is not None:
+            self.budget.spilled_bytes -= self.record_size * self._spilled_count
+            self._spill_file.close()
+            self._spill_file = None
+        self._count = 0
+        self._spilled_count = 0
+
+
+class BlobLog:
+    """
+    Journal d'enregistrements de taille variable, débordant dans un fichier temporaire.
+    
+    Chaque enregistrement est préfixé par sa taille et repéré par sa position
+    dans le journal (retournée par append): lecture directe avec read, ou
+    parcours dans l'ordre d'ajout.
+    """
+    
+    def __init__(self, budget: SpillBudget):
+        """
+        Initialise un journal vide.
+        
+        Args:
+            budget: Budget mémoire du parsing
+        """
+        self.budget = budget
+        self._chunks: List[bytearray] = []
+        self._chunk_starts: List[int] = []  # Position du premier enregistrement de chaque bloc
+        self._chunk_capacity = 0  # Octets réservés pour le dernier bloc
+        self._reserved = 0  # Octets réservés pour tous les blocs
+        self._memory_size = 0  # Octets des blocs (début du journal)
+        self._spill_file = None
+        self._spilled_size = 0  # Octets du fichier de débordement (fin du journal)
+        self._count = 0
+    
+    def append(self, record: bytes) -> int:
+        """
+        Ajoute un enregistrement.
+        
+        Args:
+            record: Enregistrement (octets)
+        
+        Returns:
+            Position de l'enregistrement dans le journal
+        """
+        data = len(record).to_bytes(LENGTH_SIZE, "little") + record
+        position = self._memory_size + self._spilled_size
+        
+        if self._spill_file is None:
+            if not self._chunks or len(self._chunks[-1]) + len(data) > self._chunk_capacity:
+                chunk_bytes = max(CHUNK_SIZE, len(data))
+                if self.budget.reserve(chunk_bytes):
+                    self._chunks.append(bytearray())
+                    self._chunk_starts.append(position)
+                    self._chunk_capacity = chunk_bytes
+                    self._reserved += chunk_bytes
+                else:
+                    self._spill_file = self.budget.temporary_file()
+        
+        if self._spill_file is None:
+            self._chunks[-1] += data
+            self._memory_size += len(data)
+        else:
+            self._spill_file.write(data)
+            self._spilled_size += len(data)
+            self.budget.spilled_bytes += len(data)
+        self._count += 1
+        return position
+    
+    def read(self, position: int) -> bytes:
+        """
+        Lit un enregistrement.
+        
+        Args:
+            position: Position retournée par append
+        
+        Returns:
+            Enregistrement
+        """
+        if position < self._memory_size:
+            index = bisect_right(self._chunk_starts, position) - 1
+            chunk = self._chunks[index]
+            offset = position - self._chunk_starts[index]
+            size = int.from_bytes(chunk[offset:offset + LENGTH_SIZE], "little")
+            return bytes(chunk[offset + LENGTH_SIZE:offset + LENGTH_SIZE + size])
+        
+        self._spill_file.flush()
+        fileno = self._spill_file.fileno()
+        offset = position - self._memory_size
+        size = int.from_bytes(os.pread(fileno, LENGTH_SIZE, offset), "little")
+        return os.pread(fileno, size, offset + LENGTH_SIZE)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[bytes]:
+        """Parcourt les enregistrements dans l'ordre d'ajout"""
+        for chunk in self._chunks:
+            offset = 0
+            while offset < len(chunk):
+                size = int.from_bytes(chunk[offset:offset + LENGTH_SIZE], "little")
+                yield bytes(chunk[offset + LENGTH_SIZE:offset + LENGTH_SIZE + size])
+                offset += LENGTH_SIZE + size
+        
+        position = self._memory_size
+        while position < self._memory_size + self._spilled_size:
+            record = self.read(position)
+            yield record
+            position += LENGTH_SIZE + len(record)
+    
+    def close(self):
+        """Libère les blocs et supprime le fichier de débordement"""
+        self.budget.release(self._reserved)
+        self._chunks = []
+        self._chunk_starts = []
+        self._chunk_capacity = self._reserved = self._memory_size = 0
+        if self._spill_file is not None:
+            self.budget.spilled_bytes -= self._spilled_size
+            self._spill_file.close()
+            self._spill_file = None
+        self._spilled_size = 0
+        self._count = 0
+
+
+class BlobTable:
+    """
+    Dictionnaire clé de 16 octets -> valeur de taille variable.
+    
+    Les valeurs sont ajoutées à un BlobLog, indexé par une CompactTable
+    (clé -> position): remplacer une valeur ajoute la nouvelle à la fin du
+    journal, l'ancienne occupe sa place jusqu'à la fermeture.
+    """
+    
+    def __init__(self, budget: SpillBudget):
+        """
+        Initialise un dictionnaire vide.
+        
+        Args:
+            budget: Budget mémoire du parsing
+        """
+        self.index = CompactTable(budget, value_size=POSITION_SIZE)
+        self.log = BlobLog(budget)
+    
+    def put(self, key: bytes, value: bytes):
+        """
+        Enregistre une valeur (remplace la valeur d'une clé déjà présente).
+        
+        Args:
+            key: Clé de 16 octets
+            value: Valeur (octets)
+        """
+        self.index.put(key, self.log.append(value).to_bytes(POSITION_SIZE, "little"))
+    
+    def get(self, key: bytes) -> Optional[bytes]:
+        """
+        Lit la valeur d'une clé.
+        
+        Args:
+            key: Clé de 16 octets
+        
+        Returns:
+            Valeur ou None si la clé est absente
+        """
+        position = self.index.get(key)
+        if position is None:
+            return None
+        return self.log.read(int.from_bytes(position, "little"))
+    
+    def __contains__(self, key: bytes) -> bool:
+        return key in self.index
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def close(self):
+        """Libère l'index et le journal"""
+        self.index.close()
+        self.log.close()
@@ -4,12 +4,54 @@ Utilitaires pour le parsing XML
 Fonctions utilitaires pour le traitement XML en streaming.
 """
 
-from typing import Optional, Iterator
+from typing import Callable, Dict, Iterable, List, Optional, Iterator
 from pathlib import Path
 from lxml import etree
 from lxml.etree import _Element as Element
 
 
+# Conteneurs d'entités sous la racine (ifcXML IFC2x3: <iso_10303_28><uos>...)
+ENTITY_CONTAINERS = {"uos"}
+
+
+class CountingReader:
+    """
+    Fichier lu par iterparse, qui rapporte la position de lecture.
+    
+    libxml2 lit le fichier par blocs (32 Ko): le rappel est appelé une fois
+    par bloc, sans coût mesurable sur le parsing.
+    
+    Avant chaque bloc, les entités terminées des conteneurs enregistrés
+    (racine, uos) sont supprimées, sauf la dernière (éventuellement en cours
+    de lecture). iterparse ne lit un bloc qu'une fois ses événements consommés:
+    les entités retournées ont déjà été traitées.
+    """
+    
+    def __init__(self, file, on_read: Optional[Callable[[int], None]] = None):
+        """
+        Initialise le lecteur.
+        
+        Args:
+            file: Fichier ouvert en binaire
+            on_read: Appelé avec le nombre d'octets lus depuis le début du fichier
+        """
+        self._file = file
+        self._on_read = on_read
+        self.position = 0
+        self.containers: List[Element] = []
+    
+    def read(self, size: int = -1) -> bytes:
+        """Libère les entités terminées, lit un bloc et rapporte la nouvelle position"""
+        for container in self.containers:
+            while len(container) > 1:
+                del container[0]
+        data = self._file.read(size)
+        self.position += len(data)
+        if self._on_read is not None:
+            self._on_read(self.position)
+        return data
+
+
 def detect_ifc_version(xml_file_path: Path) -> Optional[str]:
     """
     Détecte la version IFC depuis le namespace XML.
@@ -46,57 +88,265 @@ def detect_ifc_version(xml_file_path: Path) -> Optional[str]:
             while root_element.getprevious() is not None:
                 del root_element.getparent()[0]
         
-        # Détecter la version depuis les namespaces
-        # IFC2x3 utilise généralement: http://www.iai-tech.org/ifcXML/IFC2x3/FINAL
-        # IFC4 utilise généralement: http://www.buildingsmart-tech.org/ifcXML/IFC4
-        for uri in namespaces.values():
-            if "ifcXML" in uri.lower():
-                if "IFC2x3" in uri or "ifc2x3" in uri.lower():
-                    return "IFC2X3"
-                elif "IFC4" in uri or "ifc4" in uri.lower():
-                    return "IFC4"
-        
-        # Vérifier aussi l'élément racine
-        if root_element is not None:
-            tag = root_element.tag
-            if "IFC2x3" in tag or "ifc2x3" in tag.lower():
-                return "IFC2X3"
-            elif "IFC4" in tag or "ifc4" in tag.lower():
-                return "IFC4"
-        
-        return None
+        return ifc_version_from_root(
+            namespaces, root_element.tag if root_element is not None else None
+        )
         
     except Exception as e:
         # En cas d'erreur, retourner None
         return None
 
 
-def stream_xml_elements(xml_file_path: Path, element_tag: str) -> Iterator[Element]:
+def ifc_version_from_root(namespaces: Dict[str, str], root_tag: Optional[str]) -> Optional[str]:
     """
-    Stream les éléments XML d'un type donné.
+    Déduit la version IFC des namespaces déclarés et du tag de la racine.
+    
+    Args:
+        namespaces: Préfixe -> URI des namespaces déclarés avant la racine
+        root_tag: Tag qualifié de l'élément racine (None si inconnu)
+        
+    Returns:
+        'IFC2X3' ou 'IFC4' ou None si non détecté
+    """
+    # Détecter la version depuis les namespaces
+    # IFC2x3 utilise généralement: http://www.iai-tech.org/ifcXML/IFC2x3/FINAL
+    # IFC4 utilise généralement: http://www.buildingsmart-tech.org/ifcXML/IFC4
+    for uri in namespaces.values():
+        if "ifcXML" in uri.lower():
+            if "IFC2x3" in uri or "ifc2x3" in uri.lower():
+                return "IFC2X3"
+            elif "IFC4" in uri or "ifc4" in uri.lower():
+                return "IFC4"
+    
+    # Vérifier aussi l'élément racine
+    if root_tag is not None:
+        if "IFC2x3" in root_tag or "ifc2x3" in root_tag.lower():
+            return "IFC2X3"
+        elif "IFC4" in root_tag or "ifc4" in root_tag.lower():
+            return "IFC4"
+    
+    return None
+
+
+def detect_root_tag(xml_file_path: Path) -> Optional[str]:
+    """
+    Lit le tag qualifié de l'élément racine (sans parser le reste du fichier).
+    
+    Args:
+        xml_file_path: Chemin vers le fichier XML
+        
+    Returns:
+        Tag de la racine ('{uri}ifcXML') ou None si le fichier est vide
+    """
+    for event, elem in etree.iterparse(str(xml_file_path), events=("start",), huge_tree=True):
+        return elem.tag
+    return None
+
+
+def detect_namespace(xml_file_path: Path) -> Optional[str]:
+    """
+    Lit le namespace de l'élément racine (sans parser le reste du fichier).
     
     Args:
         xml_file_path: Chemin vers le fichier XML
-        element_tag: Tag de l'élément à extraire (ex: 'IfcWall')
+        
+    Returns:
+        URI du namespace ou None si la racine n'est pas dans un namespace
+    """
+    root_tag = detect_root_tag(xml_file_path)
+    return etree.QName(root_tag).namespace if root_tag is not None else None
+
+
+def entity_tags(xml_file_path: Path, ifc_types: Iterable[str]) -> List[str]:
+    """
+    Construit la liste des tags qualifiés à filtrer par libxml2.
+    
+    Le namespace est résolu une fois depuis la racine du fichier: les tags
+    explicites ('{uri}IfcWall') sont comparés directement, sans joker.
+    
+    Args:
+        xml_file_path: Chemin vers le fichier XML
+        ifc_types: Types IFC (ex: ['IfcWall', 'IfcSlab'])
+        
+    Returns:
+        Tags qualifiés pour iterparse(tag=[...])
+    """
+    namespace = detect_namespace(xml_file_path)
+    if namespace is None:
+        # Racine sans namespace (entités éventuellement préfixées): joker
+        return ["{*}" + ifc_type for ifc_type in ifc_types]
+    return [f"{{{namespace}}}{ifc_type}" for ifc_type in ifc_types]
+
+
+def iter_entities(
+    xml_file_path: Path,
+    tags: Optional[Iterable[str]] = None,
+    schema: Optional[etree.XMLSchema] = None,
+    on_read: Optional[Callable[[int], None]] = None
+) -> Iterator[Element]:
+    """
+    Parcourt en streaming les entités de premier niveau d'un fichier IFCXML.
+    
+    Seuls les événements "end" des entités directement sous la racine (ou sous
+    un conteneur uos) sont retournés: les enfants (Name, GlobalId...) et les
+    références imbriquées (<IfcWall ref="..."/>) restent intacts jusqu'à ce que
+    leur entité soit traitée. Après le traitement de chaque entité, l'entité est
+    vidée et tout ce qui la précède est supprimé, à chaque niveau d'ancêtre:
+    la mémoire reste bornée quelle que soit la taille du fichier.
+    
+    Le filtrage par tag est fait par libxml2 (tags qualifiés par le namespace
+    du fichier): les autres noeuds ne remontent pas en Python. Les entités de
+    premier niveau non demandées, sans événement, sont libérées avant chaque
+    bloc lu (voir CountingReader): elles ne s'accumulent pas jusqu'à l'entité
+    demandée suivante.
+    
+    Args:
+        xml_file_path: Chemin vers le fichier XML
+        tags: Types IFC à retourner (ex: ['IfcWall']), dans le namespace de
+              la racine, ou tags déjà qualifiés ('{uri}IfcWall'). Si None,
+              toutes les entités de premier niveau.
+        schema: Schéma XSD à valider pendant la lecture (lève XMLSyntaxError,
+                avec le détail dans error_log, au premier élément invalide)
+        on_read: Appelé avec la position de lecture dans le fichier (octets),
+                 à chaque bloc lu par libxml2
         
     Yields:
-        Element: Éléments XML correspondants
+        Element: Entités de premier niveau, complètes
     """
-    context = etree.iterparse(
-        str(xml_file_path),
-        events=("end",),
-        tag=element_tag,
-        huge_tree=True
-    )
+    events = ("end",)
+    containers = set()
+    if tags is not None:
+        qualified = [tag for tag in tags if tag.startswith("{")]
+        tags = qualified + entity_tags(
+            xml_file_path, [tag for tag in tags if not tag.startswith("{")]
+        )
+        # Début de la racine et des conteneurs: enregistrés pour la libération
+        # des entités non demandées
+        root_tag = detect_root_tag(xml_file_path)
+        containers = {"{*}" + container for container in ENTITY_CONTAINERS}
+        if root_tag is not None:
+            containers.add(root_tag)
+        tags = tags + sorted(containers)
+        events = ("start", "end")
     
-    for event, elem in context:
-        yield elem
-        # Nettoyer pour libérer la mémoire
-        elem.clear()
-        while elem.getprevious() is not None:
-            del elem.getparent()[0]
+    file = None
+    source = str(xml_file_path)
+    if on_read is not None or tags is not None:
+        file = open(xml_file_path, "rb")
+        source = CountingReader(file, on_read)
+    
+    try:
+        context = etree.iterparse(
+            source,
+            events=events,
+            tag=tags,
+            huge_tree=True,
+            schema=schema
+        )
+        
+        for event, elem in context:
+            if event == "start":
+                if containers and _is_container(elem):
+                    source.containers.append(elem)
+                continue
+            if not _is_top_level(elem) or (containers and _is_container(elem)):
+                # Racine, conteneur, ou contenu d'une entité: traité et libéré avec elle
+                continue
+            yield elem
+            _release(elem)
+        
+        del context
+    finally:
+        if file is not None:
+            file.close()
 
 
+def release_entities(events: Iterable[tuple]) -> int:
+    """
+    Libère les entités de premier niveau terminées, lues d'un XMLPullParser.
+    
+    Équivalent, pour un parseur alimenté par blocs, de la libération faite par
+    iter_entities: la mémoire reste bornée quelle que soit la taille du flux.
+    
+    Args:
+        events: Événements "end" (read_events() du parseur)
+        
+    Returns:
+        Nombre d'entités de premier niveau libérées
+    """
+    count = 0
+    for event, elem in events:
+        if _is_top_level(elem):
+            _release(elem)
+            count += 1
+    return count
 
 
+def _is_top_level(elem: Element) -> bool:
+    """
+    Vérifie si un élément est une entité de premier niveau.
+    
+    Args:
+        elem: Élément XML
+        
+    Returns:
+        True si l'élément est sous la racine ou sous un conteneur de la racine
+    """
+    parent = elem.getparent()
+    if parent is None:
+        return False
+    grandparent = parent.getparent()
+    if grandparent is None:
+        return True
+    return (
+        grandparent.getparent() is None
+        and parent.tag.rpartition("}")[2] in ENTITY_CONTAINERS
+    )
+
+
+def _is_container(elem: Element) -> bool:
+    """
+    Vérifie si un élément est la racine ou un conteneur d'entités de la racine.
+    
+    Args:
+        elem: Élément XML
+        
+    Returns:
+        True pour la racine et les conteneurs uos directement sous la racine
+    """
+    parent = elem.getparent()
+    if parent is None:
+        return True
+    return parent.getparent() is None and elem.tag.rpartition("}")[2] in ENTITY_CONTAINERS
+
 
+def _release(elem: Element):
+    """
+    Libère une entité traitée et tout ce qui la précède dans l'arbre.
+    
+    Args:
+        elem: Entité de premier niveau qui vient d'être traitée
+    """
+    elem.clear(keep_tail=False)
+    node = elem
+    parent = node.getparent()
+    while parent is not None:
+        # Frères précédents: entités déjà traitées, non demandées, en-tête...
+        while node.getprevious() is not None:
+            del parent[0]
+        node = parent
+        parent = node.getparent()
+
+
+def stream_xml_elements(xml_file_path: Path, element_tag: str) -> Iterator[Element]:
+    """
+    Stream les éléments XML d'un type donné.
+    
+    Args:
+        xml_file_path: Chemin vers le fichier XML
+        element_tag: Tag de l'élément à extraire (ex: 'IfcWall')
+        
+    Yields:
+        Element: Éléments XML correspondants (entités de premier niveau)
+    """
+    yield from iter_entities(xml_file_path, [element_tag])
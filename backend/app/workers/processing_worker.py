@@ -1,30 +1,62 @@
 """
 Worker de traitement en arrière-plan
 
-Traite les tâches d'upload: validation, parsing, transformation.
+Traite les tâches d'upload: validation, puis parsing et transformation XSLT
+en parallèle (la transformation, liée au CPU, tourne dans un processus séparé
+pendant que le parsing, lié à la base, écrit les éléments).
+
+Les mesures de chaque étape et sous-étape sont écrites dans
+job_metadata["stages"] et agrégées dans le registre de GET /metrics.
+Pendant la validation et le parsing, l'avancement de la lecture (octets lus,
+entités/seconde, fin estimée) est écrit dans job_metadata["progress"]. Chaque
+changement de statut, et l'avancement, sont diffusés aux clients de
+GET /jobs/{id}/events.
 """
 
+import cProfile
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Optional
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.database import Job, Model, Tenant
-from app.models.schemas import JobStatus
+from app.core.job_events import job_events, job_state
+from app.core.metrics import ProgressTracker, StageTimer, metrics_registry
+from app.models.database import Job, Model, ModelRevision, Tenant
+from app.models.schemas import JobStatus, ValidationResponse
 from app.services.validation_service import validation_service
-from app.services.parser_service import parser_service
-from app.services.xslt_service import xslt_service
+from app.services.parser_service import parser_service, PARSE_READS
+from app.services.xslt_service import xslt_service, transform_file
+
+
+# Pool de processus de transformation (créé au premier besoin, partagé entre tâches)
+_transform_pool: Optional[ProcessPoolExecutor] = None
+_transform_pool_lock = threading.Lock()
 
 
 def process_job(job_id: UUID):
     """
     Traite une tâche complète: validation, parsing, transformation.
     
+    Une tâche déjà validée pendant l'upload (statut VALIDE) passe
+    directement au parsing.
+    
     Args:
         job_id: ID de la tâche à traiter
     """
     db = SessionLocal()
+    job = None
+    transform_future = None
+    profiler = None
     
     try:
         # Récupérer la tâche
@@ -33,72 +65,88 @@ def process_job(job_id: UUID):
             print(f"Tâche {job_id} non trouvée")
             return
         
-        # Vérifier que la tâche est en attente
-        if job.status != JobStatus.EN_ATTENTE:
+        # Vérifier que la tâche est en attente (ou validée pendant l'upload)
+        if job.status not in (JobStatus.EN_ATTENTE, JobStatus.VALIDE):
             print(f"Tâche {job_id} déjà traitée ou en cours")
             return
+        validated = job.status == JobStatus.VALIDE
         
         # Mettre à jour le statut
-        job.status = JobStatus.VALIDATION
+        if not validated:
+            job.status = JobStatus.VALIDATION
         job.started_at = datetime.utcnow()
-        db.commit()
+        total_timer = StageTimer()
+        _commit(db, job)
         
-        # Étape 1: Validation XSD
-        print(f"Validation du fichier {job.filename}...")
-        file_path = Path(job.file_path)
+        if settings.JOB_PROFILING:
+            profiler = _start_profiler()
         
+        file_path = Path(job.file_path)
         if not file_path.exists():
             job.status = JobStatus.ECHOUE
             job.error_message = "Fichier non trouvé"
-            db.commit()
+            _commit(db, job)
             return
         
-        validation_result = validation_service.validate_file(file_path)
-        
-        if not validation_result.is_valid:
-            job.status = JobStatus.ECHOUE
-            job.error_message = f"Validation échouée: {len(validation_result.errors)} erreur(s)"
-            job.validation_errors = [
-                {
-                    "line": err.line,
-                    "column": err.column,
-                    "message": err.message
-                }
-                for err in validation_result.errors
-            ]
-            job.ifc_version = validation_result.ifc_version.value if validation_result.ifc_version else None
-            db.commit()
-            return
-        
-        # Mettre à jour avec la version détectée
-        if validation_result.ifc_version:
-            job.ifc_version = validation_result.ifc_version.value
+        # Étape 1: Validation XSD
+        if validated:
+            print(f"Fichier {job.filename} validé pendant l'upload")
+        else:
+            print(f"Validation du fichier {job.filename}...")
+            timer = StageTimer()
+            validation_result = validation_service.validate_file(
+                file_path, progress=_progress_tracker(job_id, file_path, reads=1)
+            )
+            is_valid = record_validation(
+                job, validation_result, timer.stop(bytes_read=file_path.stat().st_size)
+            )
+            _commit(db, job)
+            if not is_valid:
+                return
         
-        job.status = JobStatus.VALIDE
-        db.commit()
+        # Étape 2: Transformation XSLT lancée en arrière-plan pendant le parsing
+        if xslt_service:
+            print(f"Transformation XSLT du fichier {job.filename}...")
+            transform_future = _submit_transform(file_path, job.ifc_version)
+            _set_stage(job, "transformation", "EN_COURS")
+        else:
+            print("Service XSLT non disponible, transformation ignorée")
+            _set_stage(job, "transformation", "IGNOREE")
         
-        # Étape 2: Parsing
+        # Étape 3: Parsing
         print(f"Parsing du fichier {job.filename}...")
         job.status = JobStatus.PARSING
-        db.commit()
+        _set_stage(job, "parsing", "EN_COURS")
+        _commit(db, job)
         
-        # Créer le modèle
-        model = Model(
-            job_id=job.id,
-            tenant_id=job.tenant_id,
-            name=job.filename,
-            statistics={}
-        )
-        db.add(model)
-        db.flush()
+        # Nouvelle révision d'un projet déjà importé: mettre à jour son modèle
+        previous = _find_previous_model(db, job, file_path)
+        if previous:
+            model = previous
+            model.job_id = job.id
+            model.name = job.filename
+            print(f"Révision {model.revision + 1} du modèle {model.id}")
+        else:
+            # Créer le modèle
+            model = Model(
+                job_id=job.id,
+                tenant_id=job.tenant_id,
+                name=job.filename,
+                statistics={}
+            )
+            db.add(model)
+            db.flush()
         
         # Parser le fichier
         try:
+            timer = StageTimer()
             stats = parser_service.parse_file(
                 xml_file_path=file_path,
                 model_id=model.id,
                 tenant_id=job.tenant_id,
-                db=db
+                db=db,
+                incremental=previous is not None,
+                progress=_progress_tracker(job_id, file_path, reads=PARSE_READS)
             )
             
             # Mettre à jour les statistiques
@@ -112,60 +160,305 @@ def process_job(job_id: UUID):
             if stats.get("project_guid"):
                 model.project_guid = stats["project_guid"]
             
-            db.commit()
+            measurements = timer.stop(elements=stats["elements"])
+            if previous:
+                _record_revision(db, model, job, stats, measurements["seconds"])
             
+            _set_stage(job, "parsing", "TERMINE", {**measurements, "sub_stages": stats["stages"]})
+            _commit(db, job)
+            
+            # Les réponses en cache décrivent la révision précédente
+            if previous and response_cache is not None:
+                response_cache.invalidate_model(model.id)
+        
         except Exception as e:
+            # Annuler les écritures partielles (la révision précédente reste intacte)
+            db.rollback()
             job.status = JobStatus.ECHOUE
             job.error_message = f"Erreur lors du parsing: {str(e)}"
-            db.commit()
+            _set_stage(job, "parsing", "ECHOUE", timer.stop())
+            _commit(db, job)
             raise
         
-        # Étape 3: Transformation XSLT
-        print(f"Transformation XSLT du fichier {job.filename}...")
-        job.status = JobStatus.TRANSFORMATION
-        db.commit()
-        
-        if xslt_service:
+        # Attendre la fin de la transformation XSLT
+        if transform_future is not None:
+            job.status = JobStatus.TRANSFORMATION
+            _commit(db, job)
+            
             try:
-                # Transformer en JSON normalisé
-                normalized_json = xslt_service.transform_to_json(
-                    xml_file_path=file_path,
-                    ifc_version=job.ifc_version
-                )
+                normalized_json, measurements = transform_future.result()
                 
                 # Stocker le JSON dans le modèle
                 model.normalized_json = normalized_json
-                db.commit()
+                _set_stage(job, "transformation", "TERMINE", measurements)
+                _commit(db, job)
                 
             except Exception as e:
                 # Si la transformation échoue, on continue quand même
                 # Le modèle est déjà parsé et stocké
                 print(f"Erreur lors de la transformation XSLT (non bloquant): {str(e)}")
-                # On peut stocker une erreur dans les métadonnées
+                if isinstance(e, BrokenProcessPool):
+                    _reset_transform_pool()
                 # Note: model n'a pas de champ metadata, utiliser statistics à la place
-                if not model.statistics:
-                    model.statistics = {}
-                model.statistics["xslt_error"] = str(e)
-                db.commit()
-        else:
-            print("Service XSLT non disponible, transformation ignorée")
+                model.statistics = {**(model.statistics or {}), "xslt_error": str(e)}
+                _set_stage(job, "transformation", "ECHOUE")
+                _commit(db, job)
         
         # Terminé
         print(f"Traitement terminé pour {job.filename}")
         job.status = JobStatus.TERMINE
         job.completed_at = datetime.utcnow()
-        db.commit()
+        _set_stage(job, "total", "TERMINE", total_timer.stop())
+        _commit(db, job)
         
     except Exception as e:
         print(f"Erreur lors du traitement de la tâche {job_id}: {str(e)}")
         if job:
             job.status = JobStatus.ECHOUE
             job.error_message = str(e)
-            db.commit()
+            _commit(db, job)
     finally:
+        # Transformation devenue inutile (échec du parsing): ne pas la démarrer
+        if transform_future is not None:
+            transform_future.cancel()
+        if profiler is not None:
+            _save_profile(db, job, profiler)
+        if job is not None and job.status in (JobStatus.TERMINE, JobStatus.ECHOUE):
+            metrics_registry.count_job(JobStatus(job.status).value)
         db.close()
 
 
+def record_validation(job: Job, validation_result: ValidationResponse, measurements: dict) -> bool:
+    """
+    Enregistre le résultat de la validation XSD dans la tâche (sans valider la session).
+    
+    Args:
+        job: Tâche validée
+        validation_result: Résultat de la validation
+        measurements: Mesures de l'étape de validation
+    
+    Returns:
+        True si le fichier est valide (statut VALIDE), False sinon (statut ECHOUE)
+    """
+    _set_stage(job, "validation", "TERMINE", measurements)
+    
+    # Mettre à jour avec la version détectée
+    if validation_result.ifc_version:
+        job.ifc_version = validation_result.ifc_version.value
+    
+    if not validation_result.is_valid:
+        job.status = JobStatus.ECHOUE
+        job.error_message = f"Validation échouée: {len(validation_result.errors)} erreur(s)"
+        job.validation_errors = [
+            {
+                "line": err.line,
+                "column": err.column,
+                "message": err.message
+            }
+            for err in validation_result.errors
+        ]
+        return False
+    
+    job.status = JobStatus.VALIDE
+    return True
+
+
+def _submit_transform(file_path: Path, ifc_version: Optional[str]) -> Future:
+    """
+    Lance la transformation XSLT d'un fichier dans le pool de processus.
+    
+    Args:
+        file_path: Fichier validé
+        ifc_version: Version IFC détectée
+    
+    Returns:
+        Future du couple (JSON normalisé, durée en secondes)
+    """
+    global _transform_pool
+    with _transform_pool_lock:
+        if _transform_pool is None:
+            # spawn: pas de copie des connexions à la base ouvertes dans ce processus
+            _transform_pool = ProcessPoolExecutor(
+                max_workers=settings.XSLT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _transform_pool.submit(transform_file, str(file_path), ifc_version)
+
+
+def _reset_transform_pool():
+    """Abandonne un pool dont un processus s'est arrêté brutalement (recréé au prochain besoin)"""
+    global _transform_pool
+    with _transform_pool_lock:
+        if _transform_pool is not None:
+            _transform_pool.shutdown(wait=False, cancel_futures=True)
+            _transform_pool = None
+
+
+def _commit(db: Session, job: Job):
+    """Valide la session et diffuse le nouvel état de la tâche"""
+    # État lu avant la validation (les attributs expirent ensuite)
+    job_id, state = job.id, job_state(job)
+    db.commit()
+    job_events.publish(job_id, **state)
+
+
+def _progress_tracker(job_id: UUID, file_path: Path, reads: int) -> ProgressTracker:
+    """Suivi de l'avancement d'une étape qui lit le fichier reads fois"""
+    return ProgressTracker(
+        file_path.stat().st_size,
+        reads,
+        lambda progress: _report_progress(job_id, progress),
+        settings.JOB_PROGRESS_INTERVAL_MS / 1000
+    )
+
+
+def _report_progress(job_id: UUID, progress: dict):
+    """
+    Écrit l'avancement de la lecture dans job_metadata["progress"] et le diffuse.
+    
+    L'écriture passe par sa propre session: la transaction du parsing reste
+    ouverte jusqu'à la fin de l'étape. Seule la clé progress est modifiée
+    (jsonb ||), sans toucher aux autres clés de job_metadata.
+    
+    Args:
+        job_id: ID de la tâche
+        progress: État retourné par ProgressTracker.snapshot
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Job).where(Job.id == job_id).values(
+                job_metadata=func.coalesce(Job.job_metadata, func.jsonb_build_object()).op("||")(
+                    bindparam("progress", {"progress": progress}, type_=JSONB)
+                )
+            )
+        )
+        db.commit()
+    except Exception as e:
+        # L'avancement n'est pas essentiel au traitement de la tâche
+        db.rollback()
+        print(f"Erreur lors de l'écriture de l'avancement de la tâche {job_id}: {str(e)}")
+    finally:
+        db.close()
+    job_events.publish(job_id, progress=progress)
+
+
+def _set_stage(job: Job, stage: str, stage_status: str, measurements: Optional[dict] = None):
+    """
+    Enregistre l'état et les mesures d'une étape dans les métadonnées de la tâche.
+    
+    Parsing et transformation se chevauchent: chacun a son propre état
+    dans job_metadata["stages"] (le statut de la tâche suit le parsing).
+    Les mesures d'une étape terminée (et de ses sous-étapes) alimentent
+    aussi le registre de métriques.
+    
+    Args:
+        job: Tâche en cours
+        stage: Nom de l'étape (validation, parsing, transformation, total)
+        stage_status: État de l'étape (EN_COURS, TERMINE, ECHOUE, IGNOREE)
+        measurements: Mesures de StageTimer.stop (une fois l'étape terminée),
+                      avec éventuellement les sous-étapes (sub_stages)
+    """
+    entry = {"status": stage_status, **(measurements or {})}
+    _update_metadata(job, stages={**(job.job_metadata or {}).get("stages", {}), stage: entry})
+    
+    # L'avancement décrit la lecture en cours: retiré au changement d'étape
+    job.job_metadata = {key: value for key, value in job.job_metadata.items() if key != "progress"}
+    
+    if measurements:
+        metrics_registry.observe_stage(stage, measurements)
+        for name, sub_measurements in measurements.get("sub_stages", {}).items():
+            metrics_registry.observe_stage(f"{stage}.{name}", sub_measurements)
+
+
+def _update_metadata(job: Job, **values):
+    """Met à jour des clés de job_metadata"""
+    # Nouveau dictionnaire: la colonne JSONB n'est pas suivie en mutation
+    job.job_metadata = {**(job.job_metadata or {}), **values}
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    """Démarre le profilage de la tâche (thread courant)"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Un seul profileur actif à la fois (tâche concurrente déjà profilée)
+        print(f"Profilage de la tâche impossible: {str(e)}")
+        return None
+    return profiler
+
+
+def _save_profile(db: Session, job: Job, profiler: cProfile.Profile):
+    """
+    Arrête le profilage et écrit le profil à côté du fichier uploadé.
+    
+    Le fichier .prof se lit avec pstats ou snakeviz.
+    
+    Args:
+        db: Session de base de données
+        job: Tâche profilée
+        profiler: Profileur démarré par _start_profiler
+    """
+    profiler.disable()
+    profile_path = f"{job.file_path}.prof"
+    try:
+        profiler.dump_stats(profile_path)
+        _update_metadata(job, profile=profile_path)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Erreur lors de l'écriture du profil de la tâche {job.id}: {str(e)}")
+
+
+def _find_previous_model(db: Session, job: Job, file_path: Path) -> Optional[Model]:
+    """
+    Cherche le modèle existant du même projet (même project_guid).
+    
+    Args:
+        db: Session de base de données
+        job: Tâche en cours
+        file_path: Fichier à parser
+    
+    Returns:
+        Modèle le plus récent du projet (verrouillé jusqu'à la fin du parsing) ou None
+    """
+    if not settings.INCREMENTAL_REINGEST:
+        return None
+    
+    project_guid = parser_service.find_project_guid(file_path)
+    if project_guid is None:
+        return None
+    
+    return db.query(Model).filter(
+        Model.tenant_id == job.tenant_id,
+        Model.project_guid == project_guid
+    ).order_by(Model.created_at.desc()).with_for_update().first()
+
+
+def _record_revision(db: Session, model: Model, job: Job, stats: dict, duration: float):
+    """Enregistre les différences d'une nouvelle révision avec la précédente"""
+    changes = stats["changes"]
+    model.revision += 1
+    db.add(ModelRevision(
+        model_id=model.id,
+        tenant_id=model.tenant_id,
+        job_id=job.id,
+        revision=model.revision,
+        added=changes["added"],
+        modified=changes["modified"],
+        removed=changes["removed"],
+        statistics={
+            "added": len(changes["added"]),
+            "modified": len(changes["modified"]),
+            "removed": len(changes["removed"]),
+            "relationship_changes": stats["relationship_changes"],
+            "elements": stats["elements"],
+            "duration_seconds": round(duration, 3)
+        }
+    ))
+
+
 # Pour utilisation avec Celery (Phase 4)
 # @celery_app.task
 # def process_job_async(job_id: str):
@@ -0,0 +1,337 @@
+"""
+Benchmark du pipeline d'ingestion sur des fichiers IFCXML synthétiques
+
+Génère (ou réutilise) un fichier par taille avec scripts/generate_ifcxml.py, puis
+mesure chaque étape du pipeline séparément: détection de version, validation XSD,
+parsing vers PostgreSQL et transformation XSLT. Chaque étape tourne dans un
+processus neuf pour que le pic de mémoire mesuré soit celui de l'étape seule.
+
+Le parsing écrit dans la base configurée (DATABASE_URL) dans une transaction
+annulée à la fin: aucune donnée n'est conservée. PostgreSQL est requis (JSONB,
+TSVECTOR).
+
+Usage:
+    python scripts/benchmark.py --sizes 1000,10000,100000 --output resultats.json
+    python scripts/benchmark.py --sizes 1000000 --stages parse,xslt
+    python scripts/benchmark.py --baseline reference.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_ifcxml import elements_for_entities, generate
+
+
+STAGES = ("detect", "validate", "parse", "xslt")
+
+# Racine contenant xsd/ et xslt/ (résolus relativement au répertoire courant)
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _init_stage_process(root: str):
+    """
+    Prépare un processus d'étape: répertoires des schémas et des templates.
+    
+    Args:
+        root: Répertoire contenant xsd/ et xslt/
+    """
+    os.environ.setdefault("XSD_DIR", str(Path(root) / "xsd"))
+    os.chdir(root)
+
+
+def _run_stage(stage: str, xml_file_path: str) -> Dict[str, Any]:
+    """
+    Exécute une étape dans le processus courant et la mesure.
+    
+    Args:
+        stage: Nom de l'étape (detect, validate, parse, xslt)
+        xml_file_path: Chemin absolu du fichier à traiter
+    
+    Returns:
+        Mesures de l'étape (seconds, peak_rss_mb, result) ou error
+    """
+    from app.core.metrics import peak_rss_bytes
+    
+    path = Path(xml_file_path)
+    start = time.perf_counter()
+    
+    try:
+        if stage == "detect":
+            from app.utils.xml_utils import detect_ifc_version
+            result = {"ifc_version": detect_ifc_version(path)}
+        
+        elif stage == "validate":
+            from app.services.validation_service import validation_service
+            validation = validation_service.validate_file(path)
+            result = {"is_valid": validation.is_valid, "errors": len(validation.errors)}
+        
+        elif stage == "parse":
+            result = _run_parse(path)
+        
+        elif stage == "xslt":
+            from app.services.xslt_service import xslt_service
+            if xslt_service is None:
+                raise RuntimeError("saxonche n'est pas disponible")
+            normalized_json = xslt_service.transform_to_json(path)
+            result = {"json_bytes": len(json.dumps(normalized_json))}
+        
+        else:
+            raise ValueError(f"Étape inconnue: {stage}")
+    
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {str(e)[:300]}"}
+    
+    seconds = time.perf_counter() - start
+    measurements = {"seconds": round(seconds, 3), "result": result}
+    rss = peak_rss_bytes()
+    if rss is not None:
+        measurements["peak_rss_mb"] = round(rss / (1024 * 1024), 1)
+    return measurements
+
+
+def _run_parse(path: Path) -> Dict[str, Any]:
+    """
+    Parse un fichier dans une transaction annulée ensuite.
+    
+    Args:
+        path: Fichier à parser
+    
+    Returns:
+        Statistiques du parsing et mesures de ses sous-étapes
+    """
+    from app.core.database import SessionLocal
+    from app.models.database import Job, Model, Tenant
+    from app.models.schemas import JobStatus
+    from app.services.parser_service import parser_service
+    
+    db = SessionLocal()
+    try:
+        tenant = Tenant(name="benchmark", slug=f"benchmark-{os.getpid()}")
+        db.add(tenant)
+        db.flush()
+        job = Job(
+            tenant_id=tenant.id,
+            filename=path.name,
+            file_size=path.stat().st_size,
+            file_path=str(path),
+            status=JobStatus.PARSING
+        )
+        db.add(job)
+        db.flush()
+        model = Model(job_id=job.id, tenant_id=tenant.id, name=path.name, statistics={})
+        db.add(model)
+        db.flush()
+        
+        stats = parser_service.parse_file(path, model.id, tenant.id, db)
+        stats.pop("project_guid", None)
+        return stats
+    finally:
+        db.rollback()
+        db.close()
+
+
+def measure_stage(stage: str, xml_file_path: Path, root: Path) -> Dict[str, Any]:
+    """
+    Mesure une étape dans un processus neuf.
+    
+    Args:
+        stage: Nom de l'étape
+        xml_file_path: Fichier à traiter
+        root: Répertoire contenant xsd/ et xslt/
+    
+    Returns:
+        Mesures de l'étape
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=context,
+        initializer=_init_stage_process,
+        initargs=(str(root),)
+    ) as executor:
+        return executor.submit(_run_stage, stage, str(xml_file_path.resolve())).result()
+
+
+def prepare_file(work_dir: Path, entities: int, seed: int) -> Dict[str, Any]:
+    """
+    Génère le fichier d'une taille donnée s'il n'existe pas déjà.
+    
+    Args:
+        work_dir: Répertoire des fichiers générés
+        entities: Nombre d'entités visé
+        seed: Graine du générateur
+    
+    Returns:
+        Chemin, nombre d'entités et taille du fichier
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    path = work_dir / f"synthetic_{entities}_{seed}.ifcxml"
+    counts_path = path.with_suffix(".counts.json")
+    
+    if path.exists() and counts_path.exists():
+        counts = json.loads(counts_path.read_text())
+    else:
+        counts = generate(path, elements=elements_for_entities(entities), seed=seed)
+        counts_path.write_text(json.dumps(counts))
+    
+    return {
+        "path": path,
+        "entities": sum(counts.values()),
+        "bytes": path.stat().st_size
+    }
+
+
+def run_benchmark(
+    sizes: List[int],
+    stages: List[str],
+    work_dir: Path,
+    root: Path,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Exécute le benchmark pour chaque taille et chaque étape.
+    
+    Args:
+        sizes: Nombres d'entités visés
+        stages: Étapes à mesurer
+        work_dir: Répertoire des fichiers générés
+        root: Répertoire contenant xsd/ et xslt/
+        seed: Graine du générateur
+    
+    Returns:
+        Résultats (environnement et mesures par taille et par étape)
+    """
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": []
+    }
+    
+    for size in sizes:
+        sample = prepare_file(work_dir, size, seed)
+        megabytes = sample["bytes"] / (1024 * 1024)
+        print(f"📄 {sample['path'].name}: {sample['entities']} entités, {megabytes:.1f} Mo")
+        
+        run = {"size": size, "entities": sample["entities"], "bytes": sample["bytes"], "stages": {}}
+        for stage in stages:
+            measurements = measure_stage(stage, sample["path"], root)
+            if "seconds" in measurements and measurements["seconds"] > 0:
+                measurements["entities_per_second"] = round(sample["entities"] / measurements["seconds"], 1)
+                measurements["mb_per_second"] = round(megabytes / measurements["seconds"], 2)
+            run["stages"][stage] = measurements
+            print(f"   {stage}: {_format_measurements(measurements)}")
+        
+        results["runs"].append(run)
+    
+    return results
+
+
+def _format_measurements(measurements: Dict[str, Any]) -> str:
+    """Résumé d'une ligne des mesures d'une étape"""
+    if "error" in measurements:
+        return f"❌ {measurements['error']}"
+    return (
+        f"{measurements['seconds']:.2f}s, "
+        f"{measurements.get('entities_per_second', 0):.0f} entités/s, "
+        f"{measurements.get('mb_per_second', 0):.1f} Mo/s, "
+        f"pic {measurements.get('peak_rss_mb', '?')} Mo"
+    )
+
+
+def compare_with_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[str]:
+    """
+    Compare les durées aux résultats de référence.
+    
+    Args:
+        results: Résultats du benchmark courant
+        baseline: Résultats de référence (même format)
+        tolerance: Ralentissement toléré (0.2 = 20%)
+    
+    Returns:
+        Liste des régressions détectées
+    """
+    reference = {
+        (run["size"], stage): measurements.get("seconds")
+        for run in baseline.get("runs", [])
+        for stage, measurements in run["stages"].items()
+    }
+    
+    regressions = []
+    for run in results["runs"]:
+        for stage, measurements in run["stages"].items():
+            previous = reference.get((run["size"], stage))
+            current = measurements.get("seconds")
+            if previous is None or current is None:
+                continue
+            if current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{stage} ({run['size']} entités): {current:.2f}s contre {previous:.2f}s "
+                    f"(+{(current / previous - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> Optional[int]:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline d'ingestion IFCXML")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Nombres d'entités visés, séparés par des virgules (ex: 1000,10000,1000000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Étapes mesurées, séparées par des virgules ({', '.join(STAGES)})")
+    parser.add_argument("--work-dir", type=Path, default=Path("benchmark_data"),
+                        help="Répertoire des fichiers générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument("--root", type=Path, default=DEFAULT_ROOT,
+                        help="Répertoire contenant xsd/ et xslt/")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", type=Path, help="Résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Ralentissement toléré par rapport à la référence (0.2 = 20%%)")
+    args = parser.parse_args()
+    
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Étapes inconnues: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    
+    results = run_benchmark(sizes, stages, args.work_dir.resolve(), args.root.resolve(), args.seed)
+    
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, default=str))
+        print(f"✅ Résultats écrits dans {args.output}")
+    
+    if args.baseline:
+        regressions = compare_with_baseline(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("❌ Régressions détectées:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("✅ Aucune régression par rapport à la référence")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
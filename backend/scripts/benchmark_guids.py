@@ -0,0 +1,77 @@
+"""
+Benchmark du codec des GUID IFC compressés (app/utils/ifc_guid.py)
+
+Mesure le débit (GUID/seconde) de l'encodage et du décodage, unitaires et par
+lot, sur des UUID aléatoires reproductibles.
+
+Usage:
+    python scripts/benchmark_guids.py
+    python scripts/benchmark_guids.py --count 10000000 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.ifc_guid import (
+    decode_ifc_guid, decode_ifc_guids, encode_ifc_guid, encode_ifc_guids, parse_guids
+)
+
+
+def measure(operation: Callable[[], object], count: int, repeat: int) -> float:
+    """
+    Mesure le meilleur débit d'une opération sur plusieurs répétitions.
+    
+    Args:
+        operation: Opération traitant count GUID
+        count: Nombre de GUID par exécution
+        repeat: Nombre de répétitions
+    
+    Returns:
+        GUID par seconde
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmark du codec des GUID IFC")
+    parser.add_argument("--count", type=int, default=1000000, help="Nombre de GUID par mesure")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions (le meilleur débit est retenu)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine des UUID")
+    args = parser.parse_args()
+    
+    rnd = random.Random(args.seed)
+    uuids = [UUID(int=rnd.getrandbits(128)) for _ in range(args.count)]
+    global_ids = encode_ifc_guids(uuids)
+    if decode_ifc_guids(global_ids) != b"".join(value.bytes for value in uuids):
+        print("❌ Le décodage ne restitue pas les UUID encodés")
+        return 1
+    
+    operations = {
+        "decode_ifc_guids (octets)": lambda: decode_ifc_guids(global_ids),
+        "parse_guids (UUID)": lambda: parse_guids(global_ids),
+        "decode_ifc_guid (unitaire)": lambda: [decode_ifc_guid(value) for value in global_ids],
+        "encode_ifc_guids": lambda: encode_ifc_guids(uuids),
+        "encode_ifc_guid (unitaire)": lambda: [encode_ifc_guid(value) for value in uuids],
+    }
+    print(f"📄 {args.count} GUID, meilleur de {args.repeat} exécutions")
+    for name, operation in operations.items():
+        rate = measure(operation, args.count, args.repeat)
+        print(f"   {name}: {rate / 1e6:.2f} M GUID/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
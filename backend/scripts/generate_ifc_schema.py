@@ -0,0 +1,119 @@
+"""
+Génère la table de hiérarchie des entités IFC4 depuis xsd/ifcXML4.xsd
+
+Lit les déclarations globales d'entités (xs:element dont le type porte le même
+nom) et leur substitutionGroup, qui suit l'héritage EXPRESS: IfcWall →
+IfcBuildingElement → IfcElement → ... → IfcRoot. Le résultat est écrit dans
+app/utils/ifc_schema.py, chargé une seule fois à l'import.
+
+Usage:
+    python scripts/generate_ifc_schema.py
+    python scripts/generate_ifc_schema.py --xsd ../xsd/ifcXML4.xsd --output app/utils/ifc_schema.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from lxml import etree
+
+
+XS_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+# Groupe de substitution des entités racines (IfcRoot et les entités hors IfcRoot)
+ENTITY_ROOT_GROUP = "Entity"
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def read_entity_hierarchy(xsd_path: Path) -> Tuple[Dict[str, Optional[str]], Set[str]]:
+    """
+    Lit la hiérarchie des entités déclarées dans le schéma.
+    
+    Args:
+        xsd_path: Chemin vers ifcXML4.xsd
+    
+    Returns:
+        (type -> supertype direct ou None, types abstraits)
+    """
+    root = etree.parse(str(xsd_path)).getroot()
+    groups: Dict[str, Optional[str]] = {}
+    abstract: Set[str] = set()
+    
+    for declaration in root.iterchildren(f"{{{XS_NAMESPACE}}}element"):
+        name = declaration.get("name")
+        # Entités: élément global typé par le complexType du même nom
+        if not name or declaration.get("type", "").rpartition(":")[2] != name:
+            continue
+        group = declaration.get("substitutionGroup")
+        groups[name] = group.rpartition(":")[2] if group else None
+        if declaration.get("abstract") == "true":
+            abstract.add(name)
+    
+    # Ne garder que les entités qui remontent à Entity
+    supertypes: Dict[str, Optional[str]] = {}
+    for name in groups:
+        ancestor = name
+        while groups.get(ancestor) in groups and groups[ancestor] != ENTITY_ROOT_GROUP:
+            ancestor = groups[ancestor]
+        if groups.get(ancestor) == ENTITY_ROOT_GROUP:
+            parent = groups[name]
+            supertypes[name] = None if parent == ENTITY_ROOT_GROUP else parent
+    
+    return supertypes, abstract & supertypes.keys()
+
+
+def render_module(supertypes: Dict[str, Optional[str]], abstract: Set[str], xsd_name: str) -> str:
+    """
+    Rend le module Python de la table.
+    
+    Args:
+        supertypes: Type -> supertype direct
+        abstract: Types abstraits
+        xsd_name: Nom du schéma source (pour l'en-tête)
+    
+    Returns:
+        Code source du module
+    """
+    lines = [
+        '"""',
+        f"Hiérarchie des entités IFC4 ({xsd_name})",
+        "",
+        "Généré par scripts/generate_ifc_schema.py - ne pas modifier à la main.",
+        '"""',
+        "",
+        "",
+        "# Type IFC -> supertype direct (None pour les entités racines)",
+        "IFC4_SUPERTYPES = {",
+    ]
+    for name in sorted(supertypes):
+        parent = supertypes[name]
+        value = "None" if parent is None else f'"{parent}"'
+        lines.append(f'    "{name}": {value},')
+    lines.append("}")
+    lines.append("")
+    lines.append("# Types abstraits (jamais instanciés)")
+    lines.append("IFC4_ABSTRACT_TYPES = frozenset({")
+    for name in sorted(abstract):
+        lines.append(f'    "{name}",')
+    lines.append("})")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génère la table de hiérarchie des entités IFC4")
+    parser.add_argument("--xsd", type=Path, default=BACKEND_DIR.parent / "xsd" / "ifcXML4.xsd",
+                        help="Schéma ifcXML4.xsd")
+    parser.add_argument("--output", type=Path, default=BACKEND_DIR / "app" / "utils" / "ifc_schema.py",
+                        help="Module à écrire")
+    args = parser.parse_args()
+    
+    supertypes, abstract = read_entity_hierarchy(args.xsd)
+    args.output.write_text(render_module(supertypes, abstract, args.xsd.name), encoding="utf-8")
+    print(f"✅ {args.output}: {len(supertypes)} entités ({len(abstract)} abstraites)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""
+Générateur de fichiers IFCXML (IFC4) synthétiques pour les benchmarks
+
+Produit un fichier ifcXML valide contre xsd/ifcXML4.xsd, de taille configurable:
+Projet → Site → Bâtiment → Niveaux → Espaces, éléments de construction contenus
+dans les niveaux et les espaces, Psets/Qtos affectés par IfcRelDefinesByProperties
+et ouvertures (IfcRelVoidsElement / IfcRelFillsElement) dans les murs.
+
+Le fichier est écrit en flux (mémoire constante) et le contenu ne dépend que
+des paramètres: deux générations avec la même graine sont identiques octet
+pour octet.
+
+Usage:
+    python scripts/generate_ifcxml.py sortie.ifcxml --elements 100000
+    python scripts/generate_ifcxml.py sortie.ifcxml --entities 1000000
+    python scripts/generate_ifcxml.py sortie.ifcxml --elements 10000 --storeys 20 \\
+        --spaces-per-storey 30 --psets 3 --openings 0.3 --seed 7
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, TextIO, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.ifc_guid import encode_ifc_guid
+
+
+NAMESPACE = "http://www.buildingsmart-tech.org/ifcXML/IFC4/final"
+
+# Types d'éléments générés et leur poids relatif
+ELEMENT_TYPES = (
+    ("IfcWall", 30),
+    ("IfcSlab", 10),
+    ("IfcColumn", 10),
+    ("IfcBeam", 10),
+    ("IfcCovering", 10),
+    ("IfcFurnishingElement", 10),
+    ("IfcFlowTerminal", 10),
+    ("IfcRailing", 5),
+    ("IfcStair", 5),
+)
+
+# Valeurs des propriétés générées: (nom, type de valeur IFC, générateur)
+PROPERTY_TEMPLATES = (
+    ("FireRating", "IfcLabel", lambda rnd: rnd.choice(("REI30", "REI60", "REI90", "REI120"))),
+    ("IsExternal", "IfcBoolean", lambda rnd: rnd.choice(("true", "false"))),
+    ("LoadBearing", "IfcBoolean", lambda rnd: rnd.choice(("true", "false"))),
+    ("ThermalTransmittance", "IfcThermalTransmittanceMeasure", lambda rnd: f"{rnd.uniform(0.1, 2.5):.3f}"),
+    ("AcousticRating", "IfcLabel", lambda rnd: f"{rnd.randint(30, 60)} dB"),
+    ("Reference", "IfcIdentifier", lambda rnd: f"REF-{rnd.randint(1, 9999):04d}"),
+)
+
+QUANTITY_TEMPLATES = (
+    ("IfcQuantityLength", "Length", "LengthValue"),
+    ("IfcQuantityArea", "NetSideArea", "AreaValue"),
+    ("IfcQuantityVolume", "NetVolume", "VolumeValue"),
+)
+
+
+class IfcXmlWriter:
+    """Écriture en flux des entités ifcXML"""
+    
+    def __init__(self, out: TextIO, seed: int):
+        """
+        Initialise l'écrivain.
+        
+        Args:
+            out: Fichier texte de sortie
+            seed: Graine des GUIDs et des valeurs générées
+        """
+        self.out = out
+        self.seed = seed
+        self.next_id = 0
+        self.counts: Dict[str, int] = {}
+    
+    def new_id(self) -> str:
+        """Retourne un nouvel identifiant XML (xs:ID)"""
+        self.next_id += 1
+        return f"i{self.next_id}"
+    
+    def global_id(self, key: str) -> str:
+        """Retourne le GlobalId IFC déterministe d'une clé"""
+        return encode_ifc_guid(uuid.uuid5(uuid.NAMESPACE_URL, f"archiparse-bench/{self.seed}/{key}"))
+    
+    def entity(self, ifc_type: str, attributes: Dict[str, str], body: str = "") -> str:
+        """
+        Écrit une entité et retourne son identifiant.
+        
+        Args:
+            ifc_type: Type IFC (nom de l'élément XML)
+            attributes: Attributs XML (hors id)
+            body: Contenu XML des attributs de type entité
+        
+        Returns:
+            Identifiant XML de l'entité
+        """
+        entity_id = self.new_id()
+        attrs = "".join(f' {name}="{value}"' for name, value in attributes.items())
+        if body:
+            self.out.write(f'  <ifc:{ifc_type} id="{entity_id}"{attrs}>{body}</ifc:{ifc_type}>\n')
+        else:
+            self.out.write(f'  <ifc:{ifc_type} id="{entity_id}"{attrs}/>\n')
+        self.counts[ifc_type] = self.counts.get(ifc_type, 0) + 1
+        return entity_id
+    
+    def relationship(self, ifc_type: str, key: str, *roles: str) -> str:
+        """
+        Écrit une relation objectivée (IfcRel*) entre entités.
+        
+        Args:
+            ifc_type: Type de relation (IfcRelAggregates, ...)
+            key: Clé du GlobalId de la relation
+            roles: Rôles de la relation dans l'ordre du schéma (typed_ref, set_refs, select_ref)
+        
+        Returns:
+            Identifiant XML de la relation
+        """
+        return self.entity(ifc_type, {"GlobalId": self.global_id(key)}, "".join(roles))
+
+
+def typed_ref(role: str, entity: Tuple[str, str]) -> str:
+    """Rôle référençant une seule entité (type précisé par xsi:type)"""
+    return f'<ifc:{role} xsi:type="ifc:{entity[0]}" ref="{entity[1]}" xsi:nil="true"/>'
+
+
+def set_refs(role: str, item_type: str, entities: List[Tuple[str, str]]) -> str:
+    """Rôle référençant un ensemble d'entités"""
+    refs = "".join(f'<ifc:{t} ref="{i}" xsi:nil="true"/>' for t, i in entities)
+    return f'<ifc:{role} ifc:itemType="ifc:{item_type}" ifc:cType="set">{refs}</ifc:{role}>'
+
+
+def select_ref(role: str, entity: Tuple[str, str]) -> str:
+    """Rôle de type SELECT contenant la référence à une entité"""
+    return f'<ifc:{role}><ifc:{entity[0]} ref="{entity[1]}" xsi:nil="true"/></ifc:{role}>'
+
+
+def elements_for_entities(
+    entities: int,
+    psets: int = 2,
+    quantities: bool = True,
+    openings: float = 0.2
+) -> int:
+    """
+    Estime le nombre d'éléments à générer pour obtenir un nombre total d'entités.
+    
+    Chaque élément entraîne ses Psets et Qtos (entité + relation chacun) et,
+    pour une partie des murs, une ouverture, une porte/fenêtre et deux relations.
+    
+    Args:
+        entities: Nombre total d'entités visé
+        psets: Ensembles de propriétés par élément
+        quantities: Qtos générés
+        openings: Part des murs avec une ouverture
+    
+    Returns:
+        Nombre d'éléments (au moins 1)
+    """
+    wall_share = dict(ELEMENT_TYPES)["IfcWall"] / sum(weight for _, weight in ELEMENT_TYPES)
+    per_element = 1 + 2 * psets + (2 if quantities else 0) + 4 * wall_share * openings
+    return max(1, round(entities / per_element))
+
+
+def generate(
+    output: Path,
+    elements: int,
+    storeys: int = 10,
+    spaces_per_storey: int = 10,
+    psets: int = 2,
+    quantities: bool = True,
+    openings: float = 0.2,
+    seed: int = 42
+) -> Dict[str, int]:
+    """
+    Génère un fichier IFCXML synthétique.
+    
+    Args:
+        output: Chemin du fichier à écrire
+        elements: Nombre d'éléments de construction (hors ouvertures, portes et fenêtres)
+        storeys: Nombre de niveaux
+        spaces_per_storey: Nombre d'espaces par niveau
+        psets: Nombre d'ensembles de propriétés par élément
+        quantities: Ajouter un IfcElementQuantity par élément
+        openings: Part des murs percés d'une ouverture remplie par une porte ou une fenêtre
+        seed: Graine (contenu déterministe)
+    
+    Returns:
+        Nombre d'entités écrites par type IFC
+    """
+    rnd = random.Random(seed)
+    type_names = [name for name, _ in ELEMENT_TYPES]
+    type_weights = [weight for _, weight in ELEMENT_TYPES]
+    
+    with open(output, "w", encoding="utf-8", buffering=1024 * 1024) as out:
+        writer = IfcXmlWriter(out, seed)
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(
+            f'<ifcXML xmlns="{NAMESPACE}" xmlns:ifc="{NAMESPACE}" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            f'xsi:schemaLocation="{NAMESPACE} ifcXML4.xsd">\n'
+        )
+        out.write(
+            "  <header><name>Archiparse benchmark</name>"
+            "<time_stamp>2024-01-01T00:00:00</time_stamp>"
+            "<originating_system>scripts/generate_ifcxml.py</originating_system></header>\n"
+        )
+        
+        # Hiérarchie spatiale
+        project = ("IfcProject", writer.entity("IfcProject", {
+            "GlobalId": writer.global_id("project"), "Name": "Benchmark Project"
+        }))
+        site = ("IfcSite", writer.entity("IfcSite", {
+            "GlobalId": writer.global_id("site"), "Name": "Site"
+        }))
+        building = ("IfcBuilding", writer.entity("IfcBuilding", {
+            "GlobalId": writer.global_id("building"), "Name": "Building"
+        }))
+        writer.relationship(
+            "IfcRelAggregates", "agg/project",
+            typed_ref("RelatingObject", project),
+            set_refs("RelatedObjects", "IfcObjectDefinition", [site])
+        )
+        writer.relationship(
+            "IfcRelAggregates", "agg/site",
+            typed_ref("RelatingObject", site),
+            set_refs("RelatedObjects", "IfcObjectDefinition", [building])
+        )
+        
+        storey_refs = []
+        space_refs = []
+        for s in range(storeys):
+            storey = ("IfcBuildingStorey", writer.entity("IfcBuildingStorey", {
+                "GlobalId": writer.global_id(f"storey/{s}"),
+                "Name": f"Level {s}",
+                "Elevation": f"{3.2 * s:.2f}"
+            }))
+            storey_refs.append(storey)
+            
+            spaces = [
+                ("IfcSpace", writer.entity("IfcSpace", {
+                    "GlobalId": writer.global_id(f"space/{s}/{p}"),
+                    "Name": f"{s:02d}.{p:03d}",
+                    "LongName": f"Room {s:02d}.{p:03d}"
+                }))
+                for p in range(spaces_per_storey)
+            ]
+            space_refs.append(spaces)
+            if spaces:
+                writer.relationship(
+                    "IfcRelAggregates", f"agg/storey/{s}",
+                    typed_ref("RelatingObject", storey),
+                    set_refs("RelatedObjects", "IfcObjectDefinition", spaces)
+                )
+        
+        if storey_refs:
+            writer.relationship(
+                "IfcRelAggregates", "agg/building",
+                typed_ref("RelatingObject", building),
+                set_refs("RelatedObjects", "IfcObjectDefinition", storey_refs)
+            )
+        
+        # Éléments, répartis entre niveaux puis espaces
+        contained: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for e in range(elements):
+            ifc_type = rnd.choices(type_names, type_weights)[0]
+            element = (ifc_type, writer.entity(ifc_type, {
+                "GlobalId": writer.global_id(f"element/{e}"),
+                "Name": f"{ifc_type[3:]} {e}",
+                "Tag": f"E{e}"
+            }))
+            
+            s = e % storeys if storeys else None
+            if s is None:
+                container = building
+            elif spaces_per_storey and rnd.random() < 0.5:
+                container = space_refs[s][rnd.randrange(spaces_per_storey)]
+            else:
+                container = storey_refs[s]
+            contained.setdefault(container, []).append(element)
+            
+            # Psets et Qtos propres à l'élément
+            for p in range(psets):
+                properties = "".join(
+                    f'<ifc:IfcPropertySingleValue Name="{name}"><ifc:NominalValue>'
+                    f'<ifc:{value_type}-wrapper>{make_value(rnd)}</ifc:{value_type}-wrapper>'
+                    f'</ifc:NominalValue></ifc:IfcPropertySingleValue>'
+                    for name, value_type, make_value in PROPERTY_TEMPLATES[p % 2::2]
+                )
+                pset = ("IfcPropertySet", writer.entity("IfcPropertySet", {
+                    "GlobalId": writer.global_id(f"pset/{e}/{p}"),
+                    "Name": f"Pset_{ifc_type[3:]}Common" if p == 0 else f"Pset_Custom{p}"
+                }, f'<ifc:HasProperties ifc:itemType="ifc:IfcProperty" ifc:cType="set">{properties}</ifc:HasProperties>'))
+                writer.relationship(
+                    "IfcRelDefinesByProperties", f"rdp/{e}/{p}",
+                    typed_ref("RelatedObjects", element),
+                    select_ref("RelatingPropertyDefinition", pset)
+                )
+            
+            if quantities:
+                values = "".join(
+                    f'<ifc:{quantity_type} Name="{name}" {value_attr}="{rnd.uniform(0.5, 50.0):.3f}"/>'
+                    for quantity_type, name, value_attr in QUANTITY_TEMPLATES
+                )
+                qto = ("IfcElementQuantity", writer.entity("IfcElementQuantity", {
+                    "GlobalId": writer.global_id(f"qto/{e}"),
+                    "Name": f"Qto_{ifc_type[3:]}BaseQuantities"
+                }, f'<ifc:Quantities ifc:itemType="ifc:IfcPhysicalQuantity" ifc:cType="set">{values}</ifc:Quantities>'))
+                writer.relationship(
+                    "IfcRelDefinesByProperties", f"rdq/{e}",
+                    typed_ref("RelatedObjects", element),
+                    select_ref("RelatingPropertyDefinition", qto)
+                )
+            
+            # Ouverture dans un mur, remplie par une porte ou une fenêtre
+            if ifc_type == "IfcWall" and rnd.random() < openings:
+                opening = ("IfcOpeningElement", writer.entity("IfcOpeningElement", {
+                    "GlobalId": writer.global_id(f"opening/{e}"),
+                    "Name": f"Opening {e}"
+                }))
+                filling_type = rnd.choice(("IfcDoor", "IfcWindow"))
+                filling = (filling_type, writer.entity(filling_type, {
+                    "GlobalId": writer.global_id(f"filling/{e}"),
+                    "Name": f"{filling_type[3:]} {e}",
+                    "Tag": f"F{e}"
+                }))
+                contained[container].append(filling)
+                writer.relationship(
+                    "IfcRelVoidsElement", f"void/{e}",
+                    typed_ref("RelatingBuildingElement", element),
+                    typed_ref("RelatedOpeningElement", opening)
+                )
+                writer.relationship(
+                    "IfcRelFillsElement", f"fill/{e}",
+                    typed_ref("RelatingOpeningElement", opening),
+                    typed_ref("RelatedBuildingElement", filling)
+                )
+        
+        # Contenance spatiale (une relation par conteneur)
+        for container, members in contained.items():
+            writer.relationship(
+                "IfcRelContainedInSpatialStructure", f"contains/{container[1]}",
+                set_refs("RelatedElements", "IfcProduct", members),
+                typed_ref("RelatingStructure", container)
+            )
+        
+        out.write("</ifcXML>\n")
+    
+    return writer.counts
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génère un fichier IFCXML (IFC4) synthétique")
+    parser.add_argument("output", type=Path, help="Fichier à écrire")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--elements", type=int, default=1000, help="Nombre d'éléments de construction")
+    size.add_argument("--entities", type=int, help="Nombre total d'entités visé (remplace --elements)")
+    parser.add_argument("--storeys", type=int, default=10, help="Nombre de niveaux")
+    parser.add_argument("--spaces-per-storey", type=int, default=10, help="Nombre d'espaces par niveau")
+    parser.add_argument("--psets", type=int, default=2, help="Ensembles de propriétés par élément")
+    parser.add_argument("--no-quantities", action="store_true", help="Ne pas générer de Qtos")
+    parser.add_argument("--openings", type=float, default=0.2,
+                        help="Part des murs avec une ouverture et une porte/fenêtre (densité VOIDS/FILLS)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine (contenu déterministe)")
+    args = parser.parse_args()
+    
+    elements = args.elements
+    if args.entities:
+        elements = elements_for_entities(
+            args.entities, args.psets, not args.no_quantities, args.openings
+        )
+    
+    counts = generate(
+        args.output,
+        elements=elements,
+        storeys=args.storeys,
+        spaces_per_storey=args.spaces_per_storey,
+        psets=args.psets,
+        quantities=not args.no_quantities,
+        openings=args.openings,
+        seed=args.seed
+    )
+    
+    size_mb = args.output.stat().st_size / (1024 * 1024)
+    print(f"✅ {args.output}: {sum(counts.values())} entités, {size_mb:.1f} Mo")
+    for ifc_type, count in sorted(counts.items()):
+        print(f"   {ifc_type}: {count}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Test de charge: plusieurs tâches traitées en parallèle dans le même processus
+
+Génère un fichier IFCXML synthétique par tâche (graines différentes, donc des
+projets distincts), parse chaque fichier seul pour obtenir les statistiques de
+référence, puis lance toutes les tâches en même temps dans des threads
+(process_job, comme les BackgroundTasks de l'API). Vérifie ensuite que chaque
+tâche est terminée avec les statistiques de référence et qu'aucune relation ni
+ligne de la hiérarchie ne relie deux modèles (états de parsing mélangés entre
+tâches).
+
+Les tâches tournent dans la base configurée (DATABASE_URL), sous un locataire
+de test supprimé à la fin avec tout ce qu'il contient.
+
+Usage:
+    python scripts/stress_jobs.py --jobs 8 --entities 10000
+    python scripts/stress_jobs.py --jobs 16 --entities 1000 --keep
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import DEFAULT_ROOT, prepare_file
+
+
+# Statistiques comparées à la référence (model.statistics)
+STAT_KEYS = ("elements", "spaces", "storeys", "relationships")
+
+
+def reference_statistics(path: Path) -> Dict[str, Any]:
+    """
+    Parse un fichier seul, dans une transaction annulée ensuite.
+    
+    Args:
+        path: Fichier à parser
+    
+    Returns:
+        Statistiques attendues (STAT_KEYS)
+    """
+    from app.core.database import SessionLocal
+    from app.models.database import Job, Model, Tenant
+    from app.models.schemas import JobStatus
+    from app.services.parser_service import parser_service
+    
+    db = SessionLocal()
+    try:
+        tenant = Tenant(name="stress-reference", slug=f"stress-reference-{uuid.uuid4().hex[:8]}")
+        db.add(tenant)
+        db.flush()
+        job = Job(
+            tenant_id=tenant.id,
+            filename=path.name,
+            file_size=path.stat().st_size,
+            file_path=str(path),
+            status=JobStatus.PARSING
+        )
+        db.add(job)
+        db.flush()
+        model = Model(job_id=job.id, tenant_id=tenant.id, name=path.name, statistics={})
+        db.add(model)
+        db.flush()
+        
+        stats = parser_service.parse_file(path, model.id, tenant.id, db)
+        return {key: stats[key] for key in STAT_KEYS}
+    finally:
+        db.rollback()
+        db.close()
+
+
+def run_concurrent_jobs(paths: List[Path], workers: int) -> Dict[str, Any]:
+    """
+    Crée une tâche par fichier et les traite en parallèle dans des threads.
+    
+    Args:
+        paths: Fichiers à traiter (un par tâche)
+        workers: Nombre de threads
+    
+    Returns:
+        ID du locataire de test, IDs des tâches par fichier et durée totale
+    """
+    from app.core.database import SessionLocal
+    from app.models.database import Job, Tenant
+    from app.models.schemas import JobStatus
+    from app.workers.processing_worker import process_job
+    
+    db = SessionLocal()
+    try:
+        tenant = Tenant(name="stress", slug=f"stress-{uuid.uuid4().hex[:8]}")
+        db.add(tenant)
+        db.flush()
+        jobs = {}
+        for path in paths:
+            job = Job(
+                tenant_id=tenant.id,
+                filename=path.name,
+                file_size=path.stat().st_size,
+                file_path=str(path),
+                status=JobStatus.EN_ATTENTE
+            )
+            db.add(job)
+            db.flush()
+            jobs[path] = job.id
+        tenant_id = tenant.id
+        db.commit()
+    finally:
+        db.close()
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stress-job") as executor:
+        list(executor.map(process_job, jobs.values()))
+    
+    return {"tenant_id": tenant_id, "jobs": jobs, "seconds": time.perf_counter() - start}
+
+
+def check_jobs(run: Dict[str, Any], references: Dict[Path, Dict[str, Any]]) -> List[str]:
+    """
+    Vérifie les tâches traitées en parallèle.
+    
+    Args:
+        run: Résultat de run_concurrent_jobs
+        references: Statistiques de référence par fichier
+    
+    Returns:
+        Liste des anomalies détectées
+    """
+    from sqlalchemy import func, or_
+    from sqlalchemy.orm import aliased
+    from app.core.database import SessionLocal
+    from app.models.database import Element, ElementClosure, Job, Model, Relationship
+    from app.models.schemas import JobStatus
+    
+    problems = []
+    db = SessionLocal()
+    try:
+        for path, job_id in run["jobs"].items():
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if job.status != JobStatus.TERMINE:
+                problems.append(f"{path.name}: statut {job.status} ({(job.error_message or '')[:200]})")
+                continue
+            model = db.query(Model).filter(Model.job_id == job_id).first()
+            statistics = {key: (model.statistics or {}).get(key) for key in STAT_KEYS}
+            if statistics != references[path]:
+                problems.append(f"{path.name}: {statistics} au lieu de {references[path]}")
+        
+        # Lignes reliant des éléments de modèles différents
+        source, target = aliased(Element), aliased(Element)
+        crossed_relationships = db.query(func.count(Relationship.id)).join(
+            source, source.id == Relationship.from_element_id
+        ).join(
+            target, target.id == Relationship.to_element_id
+        ).filter(
+            Relationship.tenant_id == run["tenant_id"],
+            or_(source.model_id != Relationship.model_id, target.model_id != Relationship.model_id)
+        ).scalar()
+        if crossed_relationships:
+            problems.append(f"{crossed_relationships} relation(s) entre modèles différents")
+        
+        ancestor, descendant = aliased(Element), aliased(Element)
+        crossed_closure = db.query(func.count()).select_from(ElementClosure).join(
+            ancestor, ancestor.id == ElementClosure.ancestor_id
+        ).join(
+            descendant, descendant.id == ElementClosure.descendant_id
+        ).filter(
+            ElementClosure.tenant_id == run["tenant_id"],
+            or_(ancestor.model_id != ElementClosure.model_id, descendant.model_id != ElementClosure.model_id)
+        ).scalar()
+        if crossed_closure:
+            problems.append(f"{crossed_closure} ligne(s) de hiérarchie entre modèles différents")
+    finally:
+        db.close()
+    return problems
+
+
+def delete_tenant(tenant_id: uuid.UUID):
+    """Supprime le locataire de test (tâches, modèles et éléments en cascade)"""
+    from app.core.database import SessionLocal
+    from app.models.database import Tenant
+    
+    db = SessionLocal()
+    try:
+        db.query(Tenant).filter(Tenant.id == tenant_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Test de charge des tâches traitées en parallèle")
+    parser.add_argument("--jobs", type=int, default=4, help="Nombre de tâches simultanées")
+    parser.add_argument("--entities", type=int, default=10000, help="Nombre d'entités visé par fichier")
+    parser.add_argument("--work-dir", type=Path, default=Path("benchmark_data"),
+                        help="Répertoire des fichiers générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument("--root", type=Path, default=DEFAULT_ROOT,
+                        help="Répertoire contenant xsd/ et xslt/")
+    parser.add_argument("--seed", type=int, default=1000, help="Graine du premier fichier (+1 par tâche)")
+    parser.add_argument("--keep", action="store_true", help="Conserver le locataire de test et ses données")
+    args = parser.parse_args()
+    
+    work_dir = args.work_dir.resolve()
+    root = args.root.resolve()
+    os.environ.setdefault("XSD_DIR", str(root / "xsd"))
+    os.chdir(root)
+    
+    paths = [prepare_file(work_dir, args.entities, args.seed + index)["path"] for index in range(args.jobs)]
+    
+    print(f"📄 {args.jobs} fichiers de {args.entities} entités: parsing de référence, un à la fois")
+    start = time.perf_counter()
+    references = {path: reference_statistics(path) for path in paths}
+    sequential_seconds = time.perf_counter() - start
+    
+    print(f"🚀 {args.jobs} tâches en parallèle")
+    run = run_concurrent_jobs(paths, args.jobs)
+    try:
+        problems = check_jobs(run, references)
+    finally:
+        if not args.keep:
+            delete_tenant(run["tenant_id"])
+    
+    print(f"   Parsing de référence (séquentiel): {sequential_seconds:.2f}s")
+    print(f"   Tâches complètes en parallèle: {run['seconds']:.2f}s")
+    if problems:
+        print("❌ Anomalies détectées:")
+        for problem in problems:
+            print(f"   {problem}")
+        return 1
+    print("✅ Toutes les tâches sont terminées avec les statistiques de référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
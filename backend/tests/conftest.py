@@ -0,0 +1,81 @@
+"""
+Fixtures partagées des tests
+
+Les tests marqués par la fixture db travaillent sur la base PostgreSQL
+configurée (DATABASE_URL), dans une transaction annulée à la fin du test; ils
+sont ignorés si la base n'est pas joignable.
+"""
+
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from generate_ifcxml import generate
+
+from app.core.database import SessionLocal, engine
+from app.models.database import Job, Model, Tenant
+from app.models.schemas import JobStatus
+
+
+@pytest.fixture(scope="session")
+def database_available():
+    """Vérifie une fois que la base configurée est joignable"""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("Base PostgreSQL non disponible (DATABASE_URL)")
+
+
+@pytest.fixture
+def db(database_available):
+    """Session dans une transaction annulée à la fin du test"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+def create_model(session, path: Path) -> Model:
+    """Crée un locataire, une tâche et un modèle vides pour un fichier (sans valider)"""
+    tenant = Tenant(name="tests", slug=f"tests-{uuid4().hex[:8]}")
+    session.add(tenant)
+    session.flush()
+    job = Job(
+        tenant_id=tenant.id,
+        filename=path.name,
+        file_size=path.stat().st_size,
+        file_path=str(path),
+        status=JobStatus.PARSING
+    )
+    session.add(job)
+    session.flush()
+    model = Model(job_id=job.id, tenant_id=tenant.id, name=path.name, statistics={})
+    session.add(model)
+    session.flush()
+    return model
+
+
+@pytest.fixture
+def make_model(db):
+    """Crée un locataire, une tâche et un modèle vides pour un fichier"""
+    def factory(path: Path) -> Model:
+        return create_model(db, path)
+    return factory
+
+
+@pytest.fixture
+def generated_file(tmp_path):
+    """Fichier IFCXML synthétique (scripts/generate_ifcxml.py), paramètres de generate"""
+    def factory(name: str = "model.ifcxml", **options) -> Path:
+        path = tmp_path / name
+        generate(path, **options)
+        return path
+    return factory
@@ -0,0 +1,48 @@
+"""
+Tests de la comparaison de modèles par GUID et empreinte de contenu
+"""
+
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from app.models.database import Element
+from app.services.compare_service import compare_service
+
+
+def insert_elements(db, model, hashes):
+    """Insère un élément par GUID, avec son empreinte (None: sans empreinte)"""
+    db.execute(insert(Element), [
+        {
+            "id": uuid4(), "model_id": model.id, "tenant_id": model.tenant_id,
+            "guid": guid, "ifc_type": "IfcWall", "content_hash": content_hash
+        }
+        for guid, content_hash in hashes.items()
+    ])
+
+
+def test_compare_reports_added_removed_and_modified_guids(db, make_model, tmp_path):
+    path = tmp_path / "model.ifcxml"
+    path.write_text("")
+    model_a, model_b = make_model(path), make_model(path)
+    same, changed, removed, added = uuid4(), uuid4(), uuid4(), uuid4()
+    hash_removed_in_b, hash_added_in_b, both_without_hash = uuid4(), uuid4(), uuid4()
+    
+    insert_elements(db, model_a, {
+        same: "a" * 32, changed: "b" * 32, removed: "c" * 32,
+        hash_removed_in_b: "d" * 32, hash_added_in_b: None, both_without_hash: None
+    })
+    insert_elements(db, model_b, {
+        same: "a" * 32, changed: "e" * 32, added: "f" * 32,
+        hash_removed_in_b: None, hash_added_in_b: "d" * 32, both_without_hash: None
+    })
+    
+    result = compare_service.compare(db, model_a.id, model_b.id)
+    
+    assert result["added"] == [str(added)]
+    assert result["removed"] == [str(removed)]
+    # Empreinte absente d'un côté ou de l'autre: contenu inconnu, donc modifié
+    assert sorted(result["modified"]) == sorted(
+        str(guid) for guid in (changed, hash_removed_in_b, hash_added_in_b, both_without_hash)
+    )
+    assert result["unchanged"] == 1
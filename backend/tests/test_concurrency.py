@@ -0,0 +1,101 @@
+"""
+Tests des parsings et transformations XSLT lancés en parallèle dans des threads
+
+Chaque fichier est traité seul, puis tous en même temps: les résultats
+doivent être identiques (aucun état partagé entre les tâches).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.orm import aliased
+
+from app.core.database import SessionLocal
+from app.models.database import Element, Relationship
+from app.services import xslt_service as xslt_module
+from app.services.parser_service import ParseContext
+
+from generate_ifcxml import generate
+from tests.conftest import create_model
+
+
+# Statistiques dépendant uniquement du fichier parsé
+STAT_KEYS = ("elements", "spaces", "storeys", "relationships", "tree_nodes", "property_values", "project_guid")
+
+# Stylesheet de test: résumé du fichier en JSON
+SUMMARY_STYLESHEET = """<xsl:stylesheet version="3.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+  <xsl:output method="text"/>
+  <xsl:template match="/">
+    <xsl:text>{"nodes": </xsl:text>
+    <xsl:value-of select="count(//*)"/>
+    <xsl:text>, "walls": </xsl:text>
+    <xsl:value-of select="count(//*[local-name() = 'IfcWall'])"/>
+    <xsl:text>}</xsl:text>
+  </xsl:template>
+</xsl:stylesheet>
+"""
+
+
+def parse_alone(path):
+    """Parse un fichier dans sa propre session (annulée), résultat indépendant des IDs"""
+    session = SessionLocal()
+    try:
+        model = create_model(session, path)
+        stats = ParseContext().parse(path, model.id, model.tenant_id, session)
+        
+        storey = aliased(Element)
+        elements = session.query(Element.guid, Element.ifc_type, Element.name, storey.guid).outerjoin(
+            storey, storey.id == Element.storey_id
+        ).filter(Element.model_id == model.id).all()
+        source, target = aliased(Element), aliased(Element)
+        relationships = session.query(Relationship.relationship_type, source.guid, target.guid).join(
+            source, source.id == Relationship.from_element_id
+        ).join(
+            target, target.id == Relationship.to_element_id
+        ).filter(Relationship.model_id == model.id).all()
+        
+        return {
+            "stats": {key: stats[key] for key in STAT_KEYS},
+            "elements": sorted(tuple(str(value) for value in row) for row in elements),
+            "relationships": sorted(tuple(str(value) for value in row) for row in relationships)
+        }
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def generated_files(tmp_path):
+    """Fichiers distincts (graines différentes)"""
+    paths = []
+    for seed in range(4):
+        path = tmp_path / f"model-{seed}.ifcxml"
+        generate(path, elements=200 + 50 * seed, storeys=2 + seed, spaces_per_storey=3, seed=seed)
+        paths.append(path)
+    return paths
+
+
+def test_concurrent_parses_match_sequential_parses(database_available, generated_files):
+    sequential = [parse_alone(path) for path in generated_files]
+    
+    with ThreadPoolExecutor(max_workers=len(generated_files)) as executor:
+        concurrent = list(executor.map(parse_alone, generated_files))
+    
+    assert [result["stats"]["storeys"] for result in sequential] == [2, 3, 4, 5]
+    assert concurrent == sequential
+
+
+@pytest.mark.skipif(not xslt_module.SAXON_AVAILABLE, reason="saxonche non installé")
+def test_concurrent_transforms_match_sequential_transforms(tmp_path, generated_files):
+    service = xslt_module.XSLTService()
+    service.templates_dir = tmp_path / "templates"
+    service.templates_dir.mkdir()
+    (service.templates_dir / "to-json.xsl").write_text(SUMMARY_STYLESHEET)
+    
+    sequential = [service.transform_to_json(path) for path in generated_files]
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        concurrent = list(executor.map(service.transform_to_json, generated_files * 4))
+    
+    assert len({result["nodes"] for result in sequential}) == len(generated_files)
+    assert concurrent == sequential * 4
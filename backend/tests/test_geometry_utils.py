@@ -0,0 +1,161 @@
+"""
+Tests des boîtes englobantes: matrices, chaînes de placements, extrusions et éléments mappés
+"""
+
+import pytest
+from lxml import etree
+
+from app.utils.geometry_utils import GeometryReader, axes_matrix, compose, transform_box
+
+
+NAMESPACE = "http://www.buildingsmart-tech.org/ifcXML/IFC4/final"
+
+
+def read_boxes(fragment):
+    """Lit les entités d'un fragment ifcXML dans l'ordre; boîtes des produits par id"""
+    root = etree.fromstring(f'<ifcXML xmlns="{NAMESPACE}">{fragment}</ifcXML>')
+    values = {}
+    reader = GeometryReader(
+        lambda kind, ref: values.get((kind, ref)),
+        lambda kind, xml_id, value: values.__setitem__((kind, xml_id), value)
+    )
+    boxes = {}
+    for entity in root:
+        if entity.find("{*}Representation") is not None:
+            boxes[entity.get("id")] = reader.product_box(entity)
+        else:
+            reader.value(entity)
+    return boxes
+
+
+def assert_box(actual, expected):
+    assert actual is not None
+    assert actual == pytest.approx(expected, abs=1e-9)
+
+
+def test_axes_matrix_rotates_and_translates_boxes():
+    # Axe X local suivant Y global: rotation de 90° autour de Z
+    matrix = axes_matrix((1.0, 2.0, 3.0), (0.0, 0.0, 1.0), (0.0, 1.0, 0.0))
+    
+    assert_box(transform_box(matrix, (0.0, 0.0, 0.0, 2.0, 1.0, 1.0)), (0.0, 2.0, 3.0, 1.0, 4.0, 4.0))
+    
+    # Le parent (translation) s'applique après le placement relatif
+    parent = axes_matrix((10.0, 0.0, 0.0))
+    assert_box(
+        transform_box(compose(parent, matrix), (0.0, 0.0, 0.0, 2.0, 1.0, 1.0)),
+        (10.0, 2.0, 3.0, 11.0, 4.0, 4.0)
+    )
+
+
+def test_axes_matrix_scales_axes():
+    matrix = axes_matrix((0.0, 0.0, 0.0), scales=(2.0, 3.0, 4.0))
+    assert_box(transform_box(matrix, (-1.0, -1.0, 0.0, 1.0, 1.0, 1.0)), (-2.0, -3.0, 0.0, 2.0, 3.0, 4.0))
+
+
+def test_rotated_local_placement_chain():
+    boxes = read_boxes("""
+        <IfcDirection id="dz" DirectionRatios="0 0 1"/>
+        <IfcLocalPlacement id="p1"><RelativePlacement><IfcAxis2Placement3D>
+            <Location><IfcCartesianPoint Coordinates="0 0 3"/></Location>
+            <Axis><IfcDirection ref="dz"/></Axis>
+            <RefDirection><IfcDirection DirectionRatios="0 1 0"/></RefDirection>
+        </IfcAxis2Placement3D></RelativePlacement></IfcLocalPlacement>
+        <IfcLocalPlacement id="p2">
+            <PlacementRelTo><IfcLocalPlacement ref="p1"/></PlacementRelTo>
+            <RelativePlacement><IfcAxis2Placement3D>
+                <Location><IfcCartesianPoint Coordinates="1 0 0"/></Location>
+            </IfcAxis2Placement3D></RelativePlacement>
+        </IfcLocalPlacement>
+        <IfcWall id="w1">
+            <ObjectPlacement><IfcLocalPlacement ref="p2"/></ObjectPlacement>
+            <Representation><IfcProductDefinitionShape><Representations>
+                <IfcShapeRepresentation RepresentationType="BoundingBox"><Items>
+                    <IfcBoundingBox XDim="2" YDim="1" ZDim="1">
+                        <Corner><IfcCartesianPoint Coordinates="0 0 0"/></Corner>
+                    </IfcBoundingBox>
+                </Items></IfcShapeRepresentation>
+            </Representations></IfcProductDefinitionShape></Representation>
+        </IfcWall>
+    """)
+    
+    # Décalage de 1 en X local, puis niveau tourné de 90° et élevé de 3
+    assert_box(boxes["w1"], (-1.0, 1.0, 3.0, 0.0, 3.0, 4.0))
+
+
+def test_extrusion_with_position():
+    boxes = read_boxes("""
+        <IfcSlab id="s1">
+            <Representation><IfcProductDefinitionShape><Representations>
+                <IfcShapeRepresentation RepresentationType="SweptSolid"><Items>
+                    <IfcExtrudedAreaSolid Depth="3">
+                        <SweptArea><IfcRectangleProfileDef ProfileType="area" XDim="4" YDim="2"/></SweptArea>
+                        <Position><IfcAxis2Placement3D>
+                            <Location><IfcCartesianPoint Coordinates="5 0 0"/></Location>
+                            <RefDirection><IfcDirection DirectionRatios="0 1 0"/></RefDirection>
+                        </IfcAxis2Placement3D></Position>
+                        <ExtrudedDirection><IfcDirection DirectionRatios="0 0 1"/></ExtrudedDirection>
+                    </IfcExtrudedAreaSolid>
+                </Items></IfcShapeRepresentation>
+                <IfcShapeRepresentation RepresentationType="Annotation2D"><Items>
+                    <IfcCartesianPoint Coordinates="1000 1000 0"/>
+                </Items></IfcShapeRepresentation>
+            </Representations></IfcProductDefinitionShape></Representation>
+        </IfcSlab>
+    """)
+    
+    # Profil centré [-2, 2] x [-1, 1] extrudé sur 3, tourné de 90° puis décalé de 5 en X;
+    # la représentation d'annotation est ignorée
+    assert_box(boxes["s1"], (4.0, -2.0, 0.0, 6.0, 2.0, 3.0))
+
+
+def test_mapped_items():
+    boxes = read_boxes("""
+        <IfcRepresentationMap id="m1">
+            <MappingOrigin><IfcAxis2Placement3D>
+                <Location><IfcCartesianPoint Coordinates="0 0 1"/></Location>
+            </IfcAxis2Placement3D></MappingOrigin>
+            <MappedRepresentation><IfcShapeRepresentation RepresentationType="BoundingBox"><Items>
+                <IfcBoundingBox XDim="1" YDim="1" ZDim="1">
+                    <Corner><IfcCartesianPoint Coordinates="0 0 0"/></Corner>
+                </IfcBoundingBox>
+            </Items></IfcShapeRepresentation></MappedRepresentation>
+        </IfcRepresentationMap>
+        <IfcFurniture id="f1">
+            <Representation><IfcProductDefinitionShape><Representations>
+                <IfcShapeRepresentation RepresentationType="MappedRepresentation"><Items>
+                    <IfcMappedItem>
+                        <MappingSource><IfcRepresentationMap ref="m1"/></MappingSource>
+                        <MappingTarget><IfcCartesianTransformationOperator3D Scale="2">
+                            <LocalOrigin><IfcCartesianPoint Coordinates="10 0 0"/></LocalOrigin>
+                        </IfcCartesianTransformationOperator3D></MappingTarget>
+                    </IfcMappedItem>
+                    <IfcMappedItem>
+                        <MappingSource><IfcRepresentationMap ref="m1"/></MappingSource>
+                        <MappingTarget><IfcCartesianTransformationOperator3D>
+                            <Axis1><IfcDirection DirectionRatios="0 1 0"/></Axis1>
+                            <LocalOrigin><IfcCartesianPoint Coordinates="0 5 0"/></LocalOrigin>
+                        </IfcCartesianTransformationOperator3D></MappingTarget>
+                    </IfcMappedItem>
+                </Items></IfcShapeRepresentation>
+            </Representations></IfcProductDefinitionShape></Representation>
+        </IfcFurniture>
+    """)
+    
+    # Boîte de la carte [0, 1] x [0, 1] x [1, 2]: mise à l'échelle 2 et décalée de 10 en X,
+    # puis tournée de 90° et décalée de 5 en Y; union des deux occurrences
+    assert_box(boxes["f1"], (-1.0, 0.0, 1.0, 12.0, 6.0, 4.0))
+
+
+def test_product_with_unreadable_placement_has_no_box():
+    boxes = read_boxes("""
+        <IfcWall id="w1">
+            <ObjectPlacement><IfcLocalPlacement ref="inconnu"/></ObjectPlacement>
+            <Representation><IfcProductDefinitionShape><Representations>
+                <IfcShapeRepresentation RepresentationType="BoundingBox"><Items>
+                    <IfcBoundingBox XDim="1" YDim="1" ZDim="1"/>
+                </Items></IfcShapeRepresentation>
+            </Representations></IfcProductDefinitionShape></Representation>
+        </IfcWall>
+    """)
+    
+    assert boxes["w1"] is None
@@ -0,0 +1,97 @@
+"""
+Tests du codec des GUID IFC compressés (GlobalId)
+"""
+
+import random
+from uuid import UUID
+
+import pytest
+
+from app.utils.ifc_guid import (
+    IFC_GUID_ALPHABET,
+    decode_ifc_guid,
+    decode_ifc_guids,
+    encode_ifc_guid,
+    encode_ifc_guids,
+    parse_guid,
+    parse_guids,
+)
+
+
+# Vecteurs connus (UUID, GlobalId)
+KNOWN_VECTORS = [
+    (UUID(int=0), "0000000000000000000000"),
+    (UUID(int=1), "0000000000000000000001"),
+    (UUID(int=64), "0000000000000000000010"),
+    (UUID(int=(1 << 128) - 1), "3$$$$$$$$$$$$$$$$$$$$$"),
+    (UUID(int=1 << 126), "1000000000000000000000"),
+]
+
+
+def reference_encode(value: UUID) -> str:
+    """Encodage de référence: entier de 128 bits en 22 chiffres de la base 64 IFC"""
+    number = value.int
+    digits = []
+    for _ in range(22):
+        number, digit = divmod(number, 64)
+        digits.append(chr(IFC_GUID_ALPHABET[digit]))
+    return "".join(reversed(digits))
+
+
+def random_uuids(count):
+    generator = random.Random(43)
+    return [UUID(int=generator.getrandbits(128)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("value,global_id", KNOWN_VECTORS)
+def test_known_vectors(value, global_id):
+    assert reference_encode(value) == global_id
+    assert encode_ifc_guid(value) == global_id
+    assert decode_ifc_guid(global_id) == value
+
+
+def test_round_trip_matches_reference():
+    values = random_uuids(2000)
+    global_ids = [reference_encode(value) for value in values]
+    
+    assert [encode_ifc_guid(value) for value in values] == global_ids
+    assert [decode_ifc_guid(global_id) for global_id in global_ids] == values
+    assert encode_ifc_guids(values) == global_ids
+    raw = decode_ifc_guids(global_ids)
+    assert [UUID(bytes=raw[index:index + 16]) for index in range(0, len(raw), 16)] == values
+    assert encode_ifc_guids([]) == [] and decode_ifc_guids([]) == b""
+
+
+@pytest.mark.parametrize("global_id", [
+    "4000000000000000000000",  # Premier caractère au-delà de 3 (plus de 128 bits)
+    "$000000000000000000000",
+    "000000000000000000000+",  # Caractère base64 hors de l'alphabet IFC
+    "00000000000000000000é0",  # Non ASCII
+    "000000000000000000000",   # 21 caractères
+])
+def test_invalid_global_ids(global_id):
+    if len(global_id) == 22:
+        with pytest.raises(ValueError):
+            decode_ifc_guid(global_id)
+    with pytest.raises(ValueError):
+        decode_ifc_guids(["0000000000000000000000", global_id])
+    assert parse_guid(global_id) is None
+
+
+def test_parse_guids_isolates_invalid_values():
+    first, second = random_uuids(2)
+    values = [
+        encode_ifc_guid(first),
+        "4000000000000000000000",
+        str(second),
+        "00000000000000000000é0",
+        second.hex,
+        "pas un guid",
+        "000000000000000000000+",
+        encode_ifc_guid(second),
+    ]
+    
+    assert parse_guids(values) == [first, None, second, None, second, None, None, second]
+    # Lot entièrement valide: décodé en un seul passage
+    assert parse_guids([encode_ifc_guid(first), str(first)]) == [first, first]
+    assert parse_guids([]) == []
@@ -0,0 +1,71 @@
+"""
+Tests du parsing IFCXML vers PostgreSQL
+"""
+
+from decimal import Decimal
+
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.database import Element, Storey
+from app.services.parser_service import parser_service
+from app.services.search_service import search_service
+
+
+def test_reads_ifc4_attributes(db, make_model, generated_file):
+    path = generated_file(elements=20, storeys=2, spaces_per_storey=3, seed=7)
+    model = make_model(path)
+    
+    stats = parser_service.parse_file(path, model.id, model.tenant_id, db)
+    
+    assert stats["storeys"] == 2
+    assert stats["spaces"] == 6
+    storeys = db.query(Storey.name, Storey.elevation).filter(Storey.model_id == model.id).all()
+    assert sorted(storeys) == [("Level 0", Decimal("0.000")), ("Level 1", Decimal("3.200"))]
+    
+    space = db.query(Element).filter(
+        Element.model_id == model.id, Element.ifc_type == "IfcSpace", Element.name == "00.000"
+    ).one()
+    assert space.name == "00.000"
+    tagged = db.query(Element).filter(Element.model_id == model.id, Element.tag == "E0").one()
+    assert tagged.name.endswith(" 0")
+    assert db.query(Element).filter(Element.model_id == model.id, Element.name.is_(None)).count() == 0
+    
+    # Noms et tags alimentent la recherche plein texte (poids A et B)
+    results = search_service.search(db, model.tenant_id, "00", model_id=model.id)
+    assert "00.000" in [result["name"] for result in results]
+
+
+def element_rows(db, model_id):
+    """Contenu des éléments d'un modèle, indépendant des IDs"""
+    storey = aliased(Element)
+    rows = db.query(
+        Element.guid, Element.ifc_type, Element.name, Element.properties, Element.quantities, storey.guid
+    ).outerjoin(storey, storey.id == Element.storey_id).filter(Element.model_id == model_id)
+    return sorted(repr(tuple(row)) for row in rows)
+
+
+def test_parses_with_all_references_spilled(db, make_model, generated_file, monkeypatch):
+    first = generated_file("first.ifcxml", elements=300, storeys=3, seed=11)
+    second = generated_file("second.ifcxml", elements=300, storeys=3, seed=12)
+    reference = make_model(first)
+    expected = parser_service.parse_file(first, reference.id, reference.tenant_id, db)
+    
+    # Budget nul: tables de références, Psets et changements sur disque
+    monkeypatch.setattr(settings, "PARSER_MEMORY_BUDGET_MB", 0)
+    model = make_model(first)
+    stats = parser_service.parse_file(first, model.id, model.tenant_id, db)
+    keys = ("elements", "spaces", "storeys", "relationships", "tree_nodes", "property_values")
+    assert {key: stats[key] for key in keys} == {key: expected[key] for key in keys}
+    assert element_rows(db, model.id) == element_rows(db, reference.id)
+    
+    # Même fichier en révision: rien ne change
+    unchanged = parser_service.parse_file(first, model.id, model.tenant_id, db, incremental=True)
+    assert unchanged["changes"] == {"added": [], "modified": [], "removed": []}
+    
+    first_guids = {str(guid) for (guid,) in db.query(Element.guid).filter(Element.model_id == model.id)}
+    revision = parser_service.parse_file(second, model.id, model.tenant_id, db, incremental=True)
+    second_guids = {str(guid) for (guid,) in db.query(Element.guid).filter(Element.model_id == model.id)}
+    assert set(revision["changes"]["added"]) == second_guids
+    assert set(revision["changes"]["removed"]) == first_guids
+    assert revision["changes"]["modified"] == []
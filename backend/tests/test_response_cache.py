@@ -0,0 +1,44 @@
+"""
+Tests du cache de réponses en mémoire (invalidation et invalidations partagées)
+"""
+
+import time
+from uuid import uuid4
+
+from app.core.cache import MemoryResponseCache
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_response_built_during_invalidation_is_not_stored():
+    cache = MemoryResponseCache(1024, shared_invalidations=False)
+    model_id = uuid4()
+    
+    generation = cache.generation()
+    # Ré-ingestion terminée entre la lecture en base et le stockage
+    cache.invalidate_model(model_id)
+    cache.set("stale", model_id, '"etag"', b"ancienne revision", generation)
+    assert cache.get("stale") is None
+    
+    cache.set("fresh", model_id, '"etag"', b"nouvelle revision", cache.generation())
+    assert cache.get("fresh") == ('"etag"', b"nouvelle revision")
+    
+    cache.invalidate_model(model_id)
+    assert cache.get("fresh") is None
+
+
+def test_invalidation_reaches_other_processes(database_available):
+    reader = MemoryResponseCache(1024)
+    worker = MemoryResponseCache(1024)
+    model_id = uuid4()
+    
+    reader.set("model", model_id, '"etag"', b"revision 1", reader.generation())
+    assert reader.get("model") is not None
+    
+    worker.invalidate_model(model_id)
+    assert wait_for(lambda: reader.get("model") is None)
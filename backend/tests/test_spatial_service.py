@@ -0,0 +1,89 @@
+"""
+Tests des requêtes spatiales par boîte englobante et par rayon
+"""
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.database import Element
+from app.services.spatial_service import spatial_service
+
+
+def insert_boxes(db, model, boxes):
+    """Insère un élément par boîte (nom -> (type IFC, boîte)); retourne les IDs par nom"""
+    ids = {name: uuid4() for name in boxes}
+    db.execute(insert(Element), [
+        {
+            "id": ids[name], "model_id": model.id, "tenant_id": model.tenant_id, "guid": uuid4(),
+            "ifc_type": ifc_type, "name": name,
+            "geometry": {"bbox": [list(box[:3]), list(box[3:])]},
+            "bbox": (box[0], box[1], box[3], box[4]), "bbox_z_min": box[2], "bbox_z_max": box[5]
+        }
+        for name, (ifc_type, box) in boxes.items()
+    ])
+    return ids
+
+
+@pytest.fixture
+def model_with_boxes(db, make_model, tmp_path):
+    path = tmp_path / "model.ifcxml"
+    path.write_text("")
+    model = make_model(path)
+    ids = insert_boxes(db, model, {
+        "mur": ("IfcWall", (0.0, 0.0, 0.0, 4.0, 0.2, 3.0)),
+        "poteau": ("IfcColumn", (0.7, 1.8, 0.0, 1.0, 2.1, 3.0)),
+        "dalle": ("IfcSlab", (0.0, 0.0, 3.0, 10.0, 10.0, 3.2)),
+        "etage": ("IfcWall", (0.0, 0.0, 3.2, 4.0, 0.2, 6.2)),
+        "loin": ("IfcWall", (50.0, 50.0, 0.0, 51.0, 51.0, 3.0)),
+    })
+    return model, ids
+
+
+def names(results):
+    return sorted(result["name"] for result in results)
+
+
+def test_within_box_overlapping_and_contained(db, model_with_boxes):
+    model, ids = model_with_boxes
+    box = (0.5, 0.0, 0.0, 2.0, 2.0, 2.9)
+    
+    overlapping, truncated = spatial_service.within_box(db, model.tenant_id, model.id, box)
+    assert names(overlapping) == ["mur", "poteau"]
+    assert not truncated
+    
+    contained, _ = spatial_service.within_box(
+        db, model.tenant_id, model.id, (0.0, 0.0, 0.0, 5.0, 5.0, 3.0), contained=True
+    )
+    assert names(contained) == ["mur", "poteau"]
+    
+    # L'intervalle z écarte l'étage au-dessus, même si l'emprise x/y se chevauche
+    upper, _ = spatial_service.within_box(db, model.tenant_id, model.id, (0.0, 0.0, 4.0, 1.0, 1.0, 5.0))
+    assert names(upper) == ["etage"]
+    
+    walls, _ = spatial_service.within_box(
+        db, model.tenant_id, model.id, (0.0, 0.0, 0.0, 10.0, 10.0, 10.0),
+        ifc_type="IfcWall", exclude_id=ids["etage"]
+    )
+    assert names(walls) == ["mur"]
+    assert walls[0]["bbox"] == [[0.0, 0.0, 0.0], [4.0, 0.2, 3.0]]
+    
+    limited, truncated = spatial_service.within_box(
+        db, model.tenant_id, model.id, (0.0, 0.0, 0.0, 10.0, 10.0, 10.0), limit=2
+    )
+    assert len(limited) == 2 and truncated
+
+
+def test_within_radius_orders_by_distance(db, model_with_boxes):
+    model, _ = model_with_boxes
+    
+    results, truncated = spatial_service.within_radius(db, model.tenant_id, model.id, (2.0, 2.0, 1.0), 2.0)
+    
+    # Poteau à 1 (x), mur à 1.8 (y), dalle à 2 (z); étage et élément lointain hors rayon
+    assert [result["name"] for result in results] == ["poteau", "mur", "dalle"]
+    assert [result["distance"] for result in results] == pytest.approx([1.0, 1.8, 2.0])
+    assert not truncated
+    
+    # Autre locataire: aucun résultat
+    assert spatial_service.within_radius(db, uuid4(), model.id, (2.0, 2.0, 1.0), 2.0) == ([], False)
@@ -0,0 +1,78 @@
+"""
+Tests de la construction de l'arbre spatial
+"""
+
+import tracemalloc
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from app.models.database import Element, ElementClosure, ModelTreeNode
+from app.services import tree_service as tree_module
+from app.services.tree_service import tree_service
+from app.utils.reference_store import SpillBudget
+
+
+def insert_building(db, model, storeys, elements_per_storey):
+    """Insère projet, bâtiment, niveaux et éléments; retourne les parents (enfant -> parent)"""
+    def row(ifc_type, name):
+        return {
+            "id": uuid4(), "model_id": model.id, "tenant_id": model.tenant_id,
+            "guid": uuid4(), "ifc_type": ifc_type, "name": name
+        }
+    
+    project, building = row("IfcProject", "Projet"), row("IfcBuilding", "Bâtiment")
+    rows = [project, building]
+    parents = {building["id"]: project["id"]}
+    for level in range(storeys):
+        storey = row("IfcBuildingStorey", f"Niveau {level}")
+        rows.append(storey)
+        parents[storey["id"]] = building["id"]
+        for index in range(elements_per_storey):
+            element = row("IfcWall", f"Mur {index}")
+            rows.append(element)
+            parents[element["id"]] = storey["id"]
+    db.execute(insert(Element), rows)
+    return parents
+
+
+def build_and_measure(db, model, parents):
+    """Construit l'arbre, tables de références débordant sur disque; pic de mémoire Python"""
+    tracemalloc.start()
+    try:
+        nodes = tree_service.build_tree(db, model.id, model.tenant_id, parents, SpillBudget(0))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return nodes, peak
+
+
+def test_build_tree_memory_is_bounded_by_fan_out(db, make_model, tmp_path, monkeypatch):
+    # Petits lots d'écriture: la mémoire des lots ne masque pas celle du parcours
+    monkeypatch.setattr(tree_module, "BATCH_SIZE", 100)
+    path = tmp_path / "model.ifcxml"
+    path.write_text("")
+    small, large = make_model(path), make_model(path)
+    small_parents = insert_building(db, small, storeys=2, elements_per_storey=100)
+    large_parents = insert_building(db, large, storeys=16, elements_per_storey=100)
+    
+    small_nodes, small_peak = build_and_measure(db, small, small_parents)
+    large_nodes, large_peak = build_and_measure(db, large, large_parents)
+    
+    assert small_nodes == 2 + 2 + 2 * 100
+    assert large_nodes == 2 + 16 + 16 * 100
+    # Huit fois plus d'éléments, même nombre d'enfants par noeud
+    assert large_peak < 1.5 * small_peak + 256 * 1024
+    
+    # Ensembles imbriqués et fermeture complets malgré les écritures par lots
+    nodes = db.query(ModelTreeNode).filter(ModelTreeNode.model_id == large.id).all()
+    bounds = sorted(bound for node in nodes for bound in (node.lft, node.rgt))
+    assert len(set(bounds)) == 2 * large_nodes
+    root = min(nodes, key=lambda node: node.lft)
+    assert root.ifc_type == "IfcProject" and root.descendants == large_nodes - 1
+    closure = db.query(ElementClosure).filter(ElementClosure.model_id == large.id).count()
+    assert closure == 1 + 2 * 16 + 3 * 16 * 100
+    walls = db.query(Element).filter(
+        Element.model_id == large.id, Element.ifc_type == "IfcWall", Element.storey_id.is_(None)
+    ).count()
+    assert walls == 0
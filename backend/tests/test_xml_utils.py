@@ -0,0 +1,98 @@
+"""
+Tests de la lecture en streaming des fichiers IFCXML
+"""
+
+import tracemalloc
+from collections import Counter
+
+import pytest
+
+from app.utils.ifc_utils import get_ifc_type
+from app.utils.xml_utils import iter_entities
+
+from generate_ifcxml import generate
+
+
+IFC4_NAMESPACE = "http://www.buildingsmart-tech.org/ifcXML/IFC4/final"
+IFC2X3_NAMESPACE = "http://www.iai-tech.org/ifcXML/IFC2x3/FINAL"
+
+
+def read_file(path, tags=None):
+    """Compte les entités lues, avec le pic de mémoire Python et d'entités retenues dans l'arbre"""
+    counts = Counter()
+    retained = 0
+    tracemalloc.start()
+    try:
+        for elem in iter_entities(path, tags):
+            counts[get_ifc_type(elem)] += 1
+            retained = max(retained, len(elem.getparent()))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return counts, peak, retained
+
+
+def write_relationships_last(path, walls, relationships, container=None):
+    """Écrit des murs puis, en fin de fichier, les relations (racine ou conteneur uos)"""
+    namespace = IFC4_NAMESPACE if container is None else IFC2X3_NAMESPACE
+    with open(path, "w") as file:
+        file.write(f'<ifcXML xmlns="{namespace}"><header><name>test</name></header>')
+        if container:
+            file.write(f"<{container}>")
+        for index in range(walls):
+            file.write(
+                f'<IfcWall id="w{index}"><GlobalId>{index:022d}</GlobalId>'
+                f"<Name>Mur {index}</Name></IfcWall>"
+            )
+        for index in range(relationships):
+            file.write(
+                f'<IfcRelAggregates id="r{index}"><RelatedObjects>'
+                f'<IfcWall ref="w{index}"/></RelatedObjects></IfcRelAggregates>'
+            )
+        if container:
+            file.write(f"</{container}>")
+        file.write("</ifcXML>")
+
+
+def test_iter_entities_reads_every_entity_in_bounded_memory(tmp_path):
+    small_path, large_path = tmp_path / "small.ifcxml", tmp_path / "large.ifcxml"
+    generate(small_path, elements=500)
+    expected = generate(large_path, elements=5000)
+    # L'en-tête n'est pas une entité IFC
+    expected.pop("header", None)
+    
+    counts, peak, retained = read_file(large_path)
+    counts.pop("header", None)
+    assert counts == expected
+    
+    # Mémoire indépendante de la taille du fichier (dix fois plus d'entités)
+    _, small_peak, small_retained = read_file(small_path)
+    assert peak < 2 * small_peak + 256 * 1024
+    assert peak < 1024 * 1024
+    # Les entités traitées sont retirées de l'arbre: seules restent celles
+    # lues d'avance par libxml2 dans le bloc courant
+    assert retained <= 2 * small_retained
+    assert retained < 1000
+
+
+def test_iter_entities_filters_by_tag(tmp_path):
+    path = tmp_path / "model.ifcxml"
+    expected = generate(path, elements=500)
+    
+    counts, _, _ = read_file(path, ["IfcWall", "IfcBuildingStorey"])
+    assert counts == {"IfcWall": expected["IfcWall"], "IfcBuildingStorey": expected["IfcBuildingStorey"]}
+
+
+@pytest.mark.parametrize("container", [None, "uos"])
+def test_iter_entities_releases_entities_skipped_by_tag(tmp_path, container):
+    small_path, large_path = tmp_path / "small.ifcxml", tmp_path / "large.ifcxml"
+    write_relationships_last(small_path, walls=2000, relationships=10, container=container)
+    write_relationships_last(large_path, walls=20000, relationships=10, container=container)
+    
+    counts, _, retained = read_file(large_path, ["IfcRelAggregates"])
+    assert counts == {"IfcRelAggregates": 10}
+    # Les murs non demandés, sans événement, sont libérés au fil de la lecture
+    # et non à la première relation
+    _, _, small_retained = read_file(small_path, ["IfcRelAggregates"])
+    assert retained <= 2 * small_retained
+    assert retained < 1000